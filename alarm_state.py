@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Alarm State - Kol/batarya alarm ve balans durum bitleri
+Hatkon/Batkon alarm ve balans paketlerinden güncellenir; Modbus
+coil (FC1, mandallı) ve discrete input (FC2, anlık) alanına eşlenir
+"""
+
+import threading
+
+# Her kol için 256 bitlik blok:
+#   +0         Hatkon (kol) alarmı
+#   +1..+120   Batarya n Batkon alarmı (n = k - 2)
+#   +128+n     Batarya n balans durumu
+ARM_BLOCK_BITS = 256
+BALANCE_OFFSET = 128
+MAX_BATTERIES = 120
+BIT_COUNT = 4 * ARM_BLOCK_BITS
+
+
+def hatkon_alarm_active(error_msb):
+    """error_msb 0 veya 1 ise kol alarmı düzelmiştir"""
+    return error_msb not in (0, 1)
+
+
+def batkon_alarm_active(error_msb, error_lsb):
+    """error_msb=1 ve error_lsb=1 ise batarya alarmı düzelmiştir"""
+    return not (error_lsb == 1 and error_msb == 1)
+
+
+def arm_alarm_bit(arm):
+    return (arm - 1) * ARM_BLOCK_BITS
+
+
+def battery_alarm_bit(arm, battery):
+    return (arm - 1) * ARM_BLOCK_BITS + battery
+
+
+def balance_bit(arm, battery):
+    return (arm - 1) * ARM_BLOCK_BITS + BALANCE_OFFSET + battery
+
+
+def bit_key(bit):
+    """Bit -> (tür, kol, batarya); tür 'arm', 'battery' veya 'balance'"""
+    arm_index, offset = divmod(bit, ARM_BLOCK_BITS)
+    if offset == 0:
+        return 'arm', arm_index + 1, 0
+    if offset < BALANCE_OFFSET:
+        return 'battery', arm_index + 1, offset
+    return 'balance', arm_index + 1, offset - BALANCE_OFFSET
+
+
+def _valid(arm, battery=0):
+    return 1 <= arm <= 4 and 0 <= battery <= MAX_BATTERIES
+
+
+def pack_bits(bits, start, quantity):
+    """Modbus bit cevabı: LSB önce, 8 bit/byte"""
+    result = bytearray((quantity + 7) // 8)
+    for i in range(quantity):
+        if bits[start + i]:
+            result[i >> 3] |= 1 << (i & 7)
+    return bytes(result)
+
+
+class AlarmState:
+    """Anlık alarm/balans bitleri ve master tarafından onaylanana kadar
+    set kalan mandallı kopyası
+
+    apply_* metodları durum değiştiyse True döndürür. Anlık bit
+    değiştiğinde listeners listesindeki nesnelerin
+    on_alarm_change(bit, active) metodu (kilit dışında, paketi işleyen
+    thread'de) çağrılır (ör. SNMP trap kuyruğu).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.live = bytearray(BIT_COUNT)     # FC2 discrete inputs
+        self.latched = bytearray(BIT_COUNT)  # FC1/FC5/FC15 coils
+        self.listeners = []
+
+    def _set(self, bit, active):
+        with self.lock:
+            changed = self.live[bit] != active
+            self.live[bit] = active
+            if active:
+                self.latched[bit] = 1
+        if changed:
+            for listener in self.listeners:
+                listener.on_alarm_change(bit, active)
+        return changed
+
+    def apply_hatkon(self, arm, error_msb):
+        if not _valid(arm):
+            return False
+        return self._set(arm_alarm_bit(arm), int(hatkon_alarm_active(error_msb)))
+
+    def apply_batkon(self, arm, k, error_msb, error_lsb):
+        battery = k - 2
+        if not _valid(arm, battery) or battery < 1:
+            return False
+        return self._set(battery_alarm_bit(arm, battery), int(batkon_alarm_active(error_msb, error_lsb)))
+
+    def apply_balance(self, arm, slave, status):
+        battery = slave - 2
+        if not _valid(arm, battery) or battery < 1:
+            return False
+        return self._set(balance_bit(arm, battery), int(status != 0))
+
+    # Modbus erişimi
+
+    def read_inputs(self, start, quantity):
+        return pack_bits(self.live, start, quantity)
+
+    def read_coils(self, start, quantity):
+        return pack_bits(self.latched, start, quantity)
+
+    def write_coils(self, start, values):
+        """Mandallı bitleri yaz; 0 yazmak alarmı onaylar"""
+        with self.lock:
+            for i, value in enumerate(values):
+                self.latched[start + i] = 1 if value else 0
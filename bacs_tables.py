@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+BACS Tables - bacs2.mib bacsModuleTable ve bacsStringTable
+RAM store üzerinden kavramsal tablolar: satır indeksi armslavecounts'tan
+sıralı olarak bir kez oluşturulur, GETNEXT/GETBULK sütun sırasında
+(entry.sütun.satır) bisect ile bir sonraki hücreyi bulur.
+
+Birimler ve syntax MIB'deki gibi (snmp_schema): gerilim 0.01 V, sıcaklık
+0.1 °C, direnç 0.01 mOhm, akım 0.01 A, bypass 0.1 %. Verisi olmayan veya
+PositiveInteger aralığına sığmayan hücreler noSuchInstance'tır.
+"""
+
+from array import array
+from bisect import bisect_right
+
+from alarm_state import MAX_BATTERIES, arm_alarm_bit, balance_bit, battery_alarm_bit
+from battery_store import slot_of
+from snmp_schema import BACS_MODULE_COLUMNS, BACS_STRING_COLUMNS
+
+BACS2 = (1, 3, 6, 1, 2, 1, 33, 5)          # upsMIB.5
+BACS_OBJECTS = BACS2 + (2,)
+BACS_MODULE_TABLE = BACS_OBJECTS + (5,)   # bacsModuleTable
+BACS_STRING_TABLE = BACS_OBJECTS + (7,)   # bacsStringTable
+ENTRY = 1
+
+# bacsModuleState / bacsStringAlarm bayrakları
+GENERAL_ALARM = 0x1
+BYPASS_FULL = 100.0  # %
+
+
+def module_row(arm, battery):
+    """bacsModuleIndex: kollar art arda, kol başına 120 modül"""
+    return (arm - 1) * MAX_BATTERIES + battery
+
+
+def module_key(row):
+    """bacsModuleIndex -> (arm, battery)"""
+    arm_index, battery_index = divmod(row - 1, MAX_BATTERIES)
+    return arm_index + 1, battery_index + 1
+
+
+class ConceptualTable:
+    """Tek index'li SNMP tablosu: instance son eki (1, sütun, satır)
+
+    column_types ({sütun: SnmpType}) sütunları ve MIB syntax'ını,
+    rows_for(counts) satır indekslerini, measurement(snapshot, sütun,
+    satır) hücrenin ölçüm değerini verir. Verisi olmayan veya MIB
+    aralığına sığmayan hücre yoktur: GET noSuchInstance döner, GETNEXT
+    atlar. get/next/encode arayüzü battery_subtree_class nesneleriyle
+    kullanılır.
+    """
+
+    def __init__(self, store, counts, column_types, rows_for, measurement, alarms=None):
+        self.store = store
+        self.alarms = alarms
+        self.column_types = column_types
+        self.columns = tuple(sorted(column_types))
+        self.rows_for = rows_for
+        self.measurement = measurement
+        self.counts = {}
+        self.rows = array('i')
+        self.set_counts(counts)
+
+    def set_counts(self, counts):
+        """armslavecounts değişince satır indeksini yeniden oluştur"""
+        counts = dict(counts)
+        if counts != self.counts:
+            # Tek referans ataması: okuyucu ya eski ya yeni indeksi görür
+            self.rows = array('i', sorted(self.rows_for(counts)))
+            self.counts = counts
+
+    def _alarm(self, bit):
+        return self.alarms is not None and self.alarms.live[bit]
+
+    def _has_row(self, rows, row):
+        index = bisect_right(rows, row)
+        return index > 0 and rows[index - 1] == row
+
+    def cell(self, snapshot, column, row):
+        """MIB biriminde tam sayı, hücre yoksa None"""
+        return self.column_types[column].cell(self.measurement(snapshot, column, row))
+
+    def encode(self, suffix, value):
+        """Hücre değeri sütunun MIB syntax'ıyla (BatterySubtree encode)"""
+        return self.column_types[suffix[1]].syntax.clone(value)
+
+    def get(self, suffix):
+        if len(suffix) != 3 or suffix[0] != ENTRY or suffix[1] not in self.column_types:
+            return None
+        if not self._has_row(self.rows, suffix[2]):
+            return None
+        return self.cell(self.store.snapshot, suffix[1], suffix[2])
+
+    def next(self, suffix):
+        """Sütun sırasında (1, sütun, satır) > suffix olan ilk dolu hücre"""
+        rows = self.rows
+        if not rows or suffix[:1] > (ENTRY,):
+            return None
+        snapshot = self.store.snapshot
+        rest = suffix[1:] if suffix[:1] == (ENTRY,) else ()
+        for column in self.columns:
+            if rest and column < rest[0]:
+                continue
+            if rest and column == rest[0] and len(rest) > 1:
+                index = bisect_right(rows, rest[1])
+            else:
+                index = 0
+            for index in range(index, len(rows)):
+                value = self.cell(snapshot, column, rows[index])
+                if value is not None:
+                    return (ENTRY, column, rows[index]), value
+        return None
+
+
+class BacsModuleTable(ConceptualTable):
+    """bacsModuleTable: her batarya bir modül (k = batarya + 2)
+
+    Voltage (dtype 10), Temperature (NTC1, dtype 12), ChargeLevel (SOC,
+    dtype 126) store'dan; Bypass balans bitinden, State Batkon alarm
+    bitinden. Rint ölçümü paketlerde olmadığından Resistance hücresi yoktur.
+    """
+
+    def __init__(self, store, counts, alarms=None):
+        super().__init__(store, counts, BACS_MODULE_COLUMNS, self._rows_for, self._measurement, alarms)
+
+    def _rows_for(self, counts):
+        return [module_row(arm, battery)
+                for arm in range(1, 5)
+                for battery in range(1, min(counts.get(arm, 0), MAX_BATTERIES) + 1)]
+
+    def _measurement(self, snapshot, column, row):
+        arm, battery = module_key(row)
+        k = battery + 2
+        if column == 2:    # bacsModuleVoltage
+            return snapshot.value_at(slot_of(arm, k, 10))
+        if column == 3:    # bacsModuleTemperature
+            return snapshot.value_at(slot_of(arm, k, 12))
+        if column == 4:    # bacsModuleBypass
+            return BYPASS_FULL if self._alarm(balance_bit(arm, battery)) else 0
+        if column == 5:    # bacsModuleResistance
+            return None
+        if column == 6:    # bacsModuleState
+            return GENERAL_ALARM if self._alarm(battery_alarm_bit(arm, battery)) else 0
+        return snapshot.value_at(slot_of(arm, k, 126))  # bacsModuleChargeLevel
+
+
+class BacsStringTable(ConceptualTable):
+    """bacsStringTable: bataryası olan her kol bir string
+
+    Current kol akımından (k=2, dtype 10, deşarjda negatif), TotalVolt/
+    AverageVolt kolun batarya gerilimlerinden, Alarm Hatkon alarm
+    bitinden. AC akım ölçümü olmadığından CurrentAC hücresi yoktur.
+    Toplamlar snapshot kuşağı başına bir kez hesaplanır.
+    """
+
+    def __init__(self, store, counts, alarms=None):
+        self._totals = (None, {})  # (kuşak, {arm: (toplam, ortalama)})
+        super().__init__(store, counts, BACS_STRING_COLUMNS, self._rows_for, self._measurement, alarms)
+
+    def set_counts(self, counts):
+        super().set_counts(counts)
+        self._totals = (None, {})
+
+    def _rows_for(self, counts):
+        return [arm for arm in range(1, 5) if counts.get(arm, 0) > 0]
+
+    def _voltage_totals(self, snapshot, arm):
+        generation, totals = self._totals
+        if generation != snapshot.generation:
+            totals = {}
+            self._totals = (snapshot.generation, totals)
+        if arm not in totals:
+            voltages = [snapshot.value_at(slot_of(arm, battery + 2, 10))
+                        for battery in range(1, min(self.counts.get(arm, 0), MAX_BATTERIES) + 1)]
+            voltages = [v for v in voltages if v is not None]
+            if voltages:
+                total = sum(voltages)
+                totals[arm] = (total, total / len(voltages))
+            else:
+                totals[arm] = (None, None)
+        return totals[arm]
+
+    def _measurement(self, snapshot, column, row):
+        arm = row
+        if column == 2:    # bacsStringCurrent
+            return snapshot.value_at(slot_of(arm, 2, 10))
+        if column == 3:    # bacsStringTotalVolt
+            return self._voltage_totals(snapshot, arm)[0]
+        if column == 4:    # bacsStringAverageVolt
+            return self._voltage_totals(snapshot, arm)[1]
+        if column == 5:    # bacsStringCurrentAC
+            return None
+        if column == 6:    # bacsStringAlarm
+            return GENERAL_ALARM if self._alarm(arm_alarm_bit(arm)) else 0
+        return 0           # bacsStringAlarm2: bayrak kaynağı yok
@@ -11,6 +11,9 @@ from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp, context
 from pysnmp.carrier.asyncio.dgram import udp
 from pysnmp.proto.api import v2c
+from pysnmp.smi import exval
+
+from snmp_schema import dtype_type, scalar_syntax
 
 # RAM'de değer tutma sistemi
 from collections import defaultdict
@@ -96,17 +99,17 @@ def start_basic_snmp_agent():
                         for k in data[arm].keys():
                             if k > 2:  # k>2 olanlar batarya verisi
                                 battery_count += 1
-                    return self.getSyntax().clone(str(battery_count if battery_count > 0 else 1))
+                    return self.getSyntax().clone(battery_count if battery_count > 0 else 1)
                 elif oid == "1.3.6.5.3.0":  # totalArmCount
                     data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(len(data) if data else 2))
+                    return self.getSyntax().clone(len(data) if data else 2)
                 elif oid == "1.3.6.5.4.0":  # systemStatus
-                    return self.getSyntax().clone("1")
+                    return self.getSyntax().clone(1)
                 elif oid == "1.3.6.5.5.0":  # lastUpdateTime
                     return self.getSyntax().clone(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 elif oid == "1.3.6.5.6.0":  # dataCount
                     data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(sum(len(data[arm]) for arm in data) if data else 6))
+                    return self.getSyntax().clone(sum(len(data[arm]) for arm in data) if data else 6)
                 else:
                     # Gerçek batarya verileri - RAM'den oku
                     if oid.startswith("1.3.6.5.10."):
@@ -121,33 +124,33 @@ def start_basic_snmp_agent():
                             print(f"🔍 Debug: data={data}")
                             if data:
                                 print(f"🔍 Debug: value={data['value']}")
-                                return self.getSyntax().clone(str(data['value']))
+                                return dtype_type(dtype).encode(data['value'])
                             print(f"🔍 Debug: No data found, returning 0")
-                            return self.getSyntax().clone("0")
+                            return dtype_type(dtype).encode(0)
                     
-                    return self.getSyntax().clone("No Such Object")
+                    return exval.noSuchInstance
 
         # MIB Objects oluştur
         mibBuilder.export_symbols(
             "__BASIC_MIB",
             # Sistem bilgileri
-            MibScalar((1, 3, 6, 5, 1), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 1), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 1), scalar_syntax((1, 3, 6, 5, 1))),
+            BasicMibScalarInstance((1, 3, 6, 5, 1), (0,), scalar_syntax((1, 3, 6, 5, 1))),
             
-            MibScalar((1, 3, 6, 5, 2), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 2), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 2), scalar_syntax((1, 3, 6, 5, 2))),
+            BasicMibScalarInstance((1, 3, 6, 5, 2), (0,), scalar_syntax((1, 3, 6, 5, 2))),
             
-            MibScalar((1, 3, 6, 5, 3), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 3), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 3), scalar_syntax((1, 3, 6, 5, 3))),
+            BasicMibScalarInstance((1, 3, 6, 5, 3), (0,), scalar_syntax((1, 3, 6, 5, 3))),
             
-            MibScalar((1, 3, 6, 5, 4), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 4), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 4), scalar_syntax((1, 3, 6, 5, 4))),
+            BasicMibScalarInstance((1, 3, 6, 5, 4), (0,), scalar_syntax((1, 3, 6, 5, 4))),
             
-            MibScalar((1, 3, 6, 5, 5), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 5), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 5), scalar_syntax((1, 3, 6, 5, 5))),
+            BasicMibScalarInstance((1, 3, 6, 5, 5), (0,), scalar_syntax((1, 3, 6, 5, 5))),
             
-            MibScalar((1, 3, 6, 5, 6), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 6), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 6), scalar_syntax((1, 3, 6, 5, 6))),
+            BasicMibScalarInstance((1, 3, 6, 5, 6), (0,), scalar_syntax((1, 3, 6, 5, 6))),
         )
         
         # Batarya verileri için MIB Objects - Dinamik olarak oluştur
@@ -157,8 +160,8 @@ def start_basic_snmp_agent():
                     oid = (1, 3, 6, 5, 10, arm, k, dtype)
                     mibBuilder.export_symbols(
                         f"__BATTERY_MIB_{arm}_{k}_{dtype}",
-                        MibScalar(oid, v2c.OctetString()),
-                        BasicMibScalarInstance(oid, (0,), v2c.OctetString()),
+                        MibScalar(oid, dtype_type(dtype).syntax),
+                        BasicMibScalarInstance(oid, (0,), dtype_type(dtype).syntax),
                     )
         print("✅ MIB Objects oluşturuldu")
 
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+Battery Packet - data_queue üzerinde taşınan ikili UART paketi
+Hex string listesi yerine değişmez bytes ve önceden çözülmüş alanlar
+"""
+
+
+class BatteryPacket:
+    """UART'tan gelen tek bir paket
+
+    Paket düzeni: [header, k, dtype, arm, payload..., crc]
+    Alanlar kuyruğa konmadan önce bir kez çözülür; hex gösterim sadece
+    log gerektiğinde hex_list() ile üretilir.
+    """
+
+    __slots__ = ('raw', 'k', 'dtype', 'arm')
+
+    def __init__(self, raw):
+        raw = bytes(raw)
+        object.__setattr__(self, 'raw', raw)
+        object.__setattr__(self, 'k', raw[1])
+        object.__setattr__(self, 'dtype', raw[2])
+        object.__setattr__(self, 'arm', raw[3] if len(raw) > 3 else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BatteryPacket değiştirilemez")
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        return self.raw[index]
+
+    def __eq__(self, other):
+        if isinstance(other, BatteryPacket):
+            return self.raw == other.raw
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.raw)
+
+    def __repr__(self):
+        return f"BatteryPacket({self.raw.hex()})"
+
+    @property
+    def payload(self):
+        """Header/k/dtype/arm ve CRC hariç veri byte'ları"""
+        return self.raw[4:-1]
+
+    def hex_list(self):
+        """Eski log formatı: ['80', '03', ...]"""
+        return [f"{b:02x}" for b in self.raw]
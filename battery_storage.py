@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+"""
+Battery Storage - Zaman serisi için ayarlanmış SQLite depolama
+main-ornek.py'deki db_lock arkasında sıralanan veritabanı erişiminin yerine:
+
+* WAL modu: okuyucular yazıcıyı, yazıcı okuyucuları beklemez.
+* Tek yazıcı thread'i: tüm yazmalar bir iş kuyruğundan, her biri kendi
+  transaction'ında yapılır; çağıran Future alır (db_lock gerekmez).
+* Salt okunur okuyucu bağlantıları: her okuyan thread'in kendi
+  (mode=ro) bağlantısı vardır, toplu insert'leri beklemez.
+* Bölümlenmiş ölçüm tabloları: battery_data_YYYYMM (aylık) veya
+  battery_data_YYYYMMDD (günlük). Tablolar (arm, k, dtype, timestamp)
+  birincil anahtarlı WITHOUT ROWID'dir; anahtar B-ağacı data sütununu da
+  taşıdığı için (arm, k, dtype, zaman aralığı) sorguları kapsayan indeksten
+  okunur. Eski bölümler tek DROP TABLE ile silinir.
+* Sabit SQL metinleri ve büyük cached_statements ile hazırlanmış ifade önbelleği.
+"""
+
+import itertools
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from system_log import get_logger
+
+db_log = get_logger('db')
+
+DB_PATH = 'battery_data.db'
+PARTITIONING = 'month'  # 'month' veya 'day'
+PARTITION_PREFIX = 'battery_data_'
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT = 5.0  # s
+
+_PARTITION_FORMATS = {'month': '%Y%m', 'day': '%Y%m%d'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarms (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    arm INTEGER NOT NULL,
+    battery INTEGER NOT NULL,
+    error_msb INTEGER NOT NULL,
+    error_lsb INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    resolved_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS alarms_active ON alarms (arm, battery, resolved_at);
+CREATE TABLE IF NOT EXISTS arm_slave_counts (
+    arm INTEGER NOT NULL,
+    slave_count INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS passive_balance (
+    arm INTEGER NOT NULL,
+    slave INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS missing_data (
+    arm INTEGER NOT NULL,
+    slave INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+"""
+
+_PARTITION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    arm INTEGER NOT NULL,
+    k INTEGER NOT NULL,
+    dtype INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    data REAL,
+    PRIMARY KEY (arm, k, dtype, timestamp)
+) WITHOUT ROWID
+"""
+
+_INSERT_ALARM = "INSERT INTO alarms (arm, battery, error_msb, error_lsb, timestamp) VALUES (?, ?, ?, ?, ?)"
+_RESOLVE_ALARM = "UPDATE alarms SET resolved_at = ? WHERE arm = ? AND battery = ? AND resolved_at IS NULL"
+_INSERT_SLAVE_COUNT = "INSERT INTO arm_slave_counts (arm, slave_count, updated_at) VALUES (?, ?, ?)"
+_INSERT_BALANCE = "INSERT INTO passive_balance (arm, slave, status, updated_at) VALUES (?, ?, ?, ?)"
+_INSERT_MISSING = "INSERT INTO missing_data (arm, slave, status, timestamp) VALUES (?, ?, ?, ?)"
+_ACTIVE_ALARMS = ("SELECT arm, battery, error_msb, error_lsb, timestamp FROM alarms "
+                  "WHERE resolved_at IS NULL ORDER BY timestamp")
+_PARTITIONS = "SELECT name FROM sqlite_master WHERE type = 'table' AND name BETWEEN ? AND ? ORDER BY name"
+
+
+def partition_name(timestamp, partitioning=PARTITIONING):
+    """ms zaman damgasının (UTC) bölüm tablosu"""
+    return PARTITION_PREFIX + time.strftime(_PARTITION_FORMATS[partitioning], time.gmtime(timestamp / 1000))
+
+
+class BatteryStorage:
+    """WAL + tek yazıcı thread'i + salt okunur okuyucular
+
+    Yazma metodları iş kuyruğuna ekler ve concurrent.futures.Future
+    döndürür (sonuç gerekmiyorsa beklenmez). Okuma metodları çağıran
+    thread'in salt okunur bağlantısında hemen çalışır.
+    """
+
+    def __init__(self, path=DB_PATH, partitioning=PARTITIONING, cached_statements=CACHED_STATEMENTS):
+        if partitioning not in _PARTITION_FORMATS:
+            raise ValueError(f"Bilinmeyen bölümleme: {partitioning}")
+        if path == ':memory:':
+            raise ValueError("Okuyucu bağlantıları için dosya yolu gerekli")
+        self.path = path
+        self.partitioning = partitioning
+        self.cached_statements = cached_statements
+        self._uri = pathlib.Path(path).absolute().as_uri() + '?mode=ro'
+        self._jobs = queue.Queue()
+        self._local = threading.local()
+        self._partitions = set()  # Yazıcının oluşturduğu bölümler
+        self.writes = 0
+        self.write_errors = 0
+        self.rows_written = 0
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._writer, name='db-writer', daemon=True)
+        self._thread.start()
+        # Okuyucular (mode=ro) dosya ve şema oluşmadan bağlanamaz
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    # Yazıcı thread'i
+
+    def _connect_writer(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=self.cached_statements)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL'da checkpoint'te fsync
+        conn.execute("PRAGMA busy_timeout=%d" % int(BUSY_TIMEOUT * 1000))
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _writer(self):
+        try:
+            conn = self._connect_writer()
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                func, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    result = func(conn)
+                    conn.execute("COMMIT")
+                except BaseException as e:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    self._partitions.clear()  # Geri alınan CREATE TABLE olabilir
+                    self.write_errors += 1
+                    db_log.error("Veritabanı yazma hatası: %s", e)
+                    future.set_exception(e)
+                else:
+                    self.writes += 1
+                    future.set_result(result)
+        finally:
+            conn.close()
+
+    def _submit(self, func):
+        future = Future()
+        self._jobs.put((func, future))
+        return future
+
+    def close(self):
+        """Kuyruktaki yazmaları bitir ve bağlantıları kapat"""
+        self._jobs.put(None)
+        self._thread.join()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Ölçümler
+
+    def _ensure_partition(self, conn, table):
+        if table not in self._partitions:
+            conn.execute(_PARTITION_SCHEMA.format(table=table))
+            self._partitions.add(table)
+
+    def insert_battery_rows(self, rows):
+        """[(arm, k, dtype, data, timestamp)] satırlarını tek transaction'da yaz
+
+        Satırlar bölümlerine göre gruplanır, bölüm başına tek executemany.
+        Aynı (arm, k, dtype, timestamp) tekrar yazılırsa değer güncellenir.
+        """
+        rows = list(rows)
+
+        def write(conn):
+            key = lambda row: partition_name(row[4], self.partitioning)
+            for table, group in itertools.groupby(sorted(rows, key=key), key=key):
+                self._ensure_partition(conn, table)
+                conn.executemany(f"INSERT OR REPLACE INTO {table} (arm, k, dtype, data, timestamp) "
+                                 "VALUES (?, ?, ?, ?, ?)", group)
+            self.rows_written += len(rows)
+            return len(rows)
+        return self._submit(write)
+
+    def drop_partitions_before(self, timestamp):
+        """timestamp'in bölümünden eski bölümleri sil (saklama süresi)"""
+        limit = partition_name(timestamp, self.partitioning)
+
+        def drop(conn):
+            tables = [row[0] for row in conn.execute(_PARTITIONS, (PARTITION_PREFIX, limit))
+                      if row[0] < limit]
+            for table in tables:
+                conn.execute(f"DROP TABLE {table}")
+                self._partitions.discard(table)
+            return tables
+        return self._submit(drop)
+
+    # Olaylar
+
+    def insert_alarm(self, arm, battery, error_msb, error_lsb, timestamp):
+        return self._submit(lambda conn: conn.execute(_INSERT_ALARM, (arm, battery, error_msb, error_lsb, timestamp)).lastrowid)
+
+    def resolve_alarm(self, arm, battery, resolved_at=None):
+        """Aktif alarmları kapat; Future sonucu en az bir alarm kapandıysa True"""
+        resolved_at = int(time.time() * 1000) if resolved_at is None else resolved_at
+        return self._submit(lambda conn: conn.execute(_RESOLVE_ALARM, (resolved_at, arm, battery)).rowcount > 0)
+
+    def insert_arm_slave_counts(self, arm, slave_count, updated_at):
+        return self._submit(lambda conn: conn.execute(_INSERT_SLAVE_COUNT, (arm, slave_count, updated_at)))
+
+    def insert_passive_balance(self, arm, slave, status, updated_at):
+        return self._submit(lambda conn: conn.execute(_INSERT_BALANCE, (arm, slave, status, updated_at)))
+
+    def insert_missing_data(self, arm, slave, status, timestamp):
+        return self._submit(lambda conn: conn.execute(_INSERT_MISSING, (arm, slave, status, timestamp)))
+
+    def execute_query(self, sql, params=()):
+        """Yazıcı thread'inde serbest SQL (DDL, konfigürasyon); Future sonucu satırlar"""
+        return self._submit(lambda conn: conn.execute(sql, params).fetchall())
+
+    # Okuma (salt okunur, thread başına bağlantı)
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._uri, uri=True, cached_statements=self.cached_statements)
+            conn.execute("PRAGMA busy_timeout=%d" % int(BUSY_TIMEOUT * 1000))
+            self._local.conn = conn
+        return conn
+
+    def read_query(self, sql, params=()):
+        return self._reader().execute(sql, params).fetchall()
+
+    def partitions(self, start=None, end=None):
+        """[start, end] ms aralığıyla kesişen mevcut bölüm tabloları (eskiden yeniye)"""
+        low = PARTITION_PREFIX if start is None else partition_name(start, self.partitioning)
+        high = PARTITION_PREFIX + '~' if end is None else partition_name(end, self.partitioning)
+        return [row[0] for row in self._reader().execute(_PARTITIONS, (low, high))]
+
+    def query_battery_data(self, arm, k, dtype, start, end):
+        """[start, end] aralığındaki (timestamp, data) satırları, zamana göre sıralı
+
+        Her bölümde (arm, k, dtype, timestamp) anahtarında aralık taraması.
+        """
+        conn = self._reader()
+        result = []
+        for table in self.partitions(start, end):
+            result.extend(conn.execute(
+                f"SELECT timestamp, data FROM {table} "
+                "WHERE arm = ? AND k = ? AND dtype = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp",
+                (arm, k, dtype, start, end)))
+        return result
+
+    def latest_battery_data(self, arm, k, dtype):
+        """Son (timestamp, data) kaydı; yoksa None"""
+        conn = self._reader()
+        for table in reversed(self.partitions()):
+            row = conn.execute(
+                f"SELECT timestamp, data FROM {table} "
+                "WHERE arm = ? AND k = ? AND dtype = ? ORDER BY timestamp DESC LIMIT 1",
+                (arm, k, dtype)).fetchone()
+            if row is not None:
+                return row
+        return None
+
+    def active_alarms(self):
+        return self._reader().execute(_ACTIVE_ALARMS).fetchall()
+
+    def stats(self):
+        return {
+            'pending': self._jobs.qsize(),
+            'writes': self.writes,
+            'write_errors': self.write_errors,
+            'rows_written': self.rows_written,
+        }
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+"""
+Battery Store - Önceden ayrılmış dizi tabanlı RAM veri deposu
+battery_data_ram iç içe dict yapısının yerine sabit (arm, k, dtype) -> slot
+indeksli array('d') değerler ve array('q') zaman damgaları
+"""
+
+import math
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+ARMS = (1, 2, 3, 4)
+K_MIN = 1            # k=2 kol verisi, k=3..122 batarya verisi
+K_SLOTS = 122        # k=1..122
+DTYPES = (10, 11, 12, 13, 14, 15, 16, 126)
+
+SLOTS_PER_K = len(DTYPES)
+SLOTS_PER_ARM = K_SLOTS * SLOTS_PER_K
+SLOT_COUNT = len(ARMS) * SLOTS_PER_ARM
+
+# dtype -> dtype indeksi (tanımsız dtype için -1)
+_DTYPE_INDEX = [-1] * 256
+for _i, _dtype in enumerate(DTYPES):
+    _DTYPE_INDEX[_dtype] = _i
+
+_EMPTY = 0  # Zaman damgası 0 ise slot boş
+
+# Depo toplamları (SNMP 1.3.6.5.2/3/6, Modbus adres 0 bloğu):
+# battery_count veri olan (arm, k>2) sayısı, arm_count veri olan kol
+# sayısı, data_count (arm, k, dtype) kayıt sayısı
+StoreStats = namedtuple('StoreStats', 'battery_count arm_count data_count')
+EMPTY_STATS = StoreStats(0, 0, 0)
+
+
+def slot_of(arm, k, dtype):
+    """(arm, k, dtype) için slot indeksi, depolanamıyorsa -1"""
+    if arm not in ARMS or not K_MIN <= k < K_MIN + K_SLOTS or not 0 <= dtype < 256:
+        return -1
+    dtype_index = _DTYPE_INDEX[dtype]
+    if dtype_index < 0:
+        return -1
+    return ((arm - 1) * K_SLOTS + (k - K_MIN)) * SLOTS_PER_K + dtype_index
+
+
+def slot_key(slot):
+    """Slot indeksinden (arm, k, dtype) üret"""
+    arm_index, rest = divmod(slot, SLOTS_PER_ARM)
+    k_index, dtype_index = divmod(rest, SLOTS_PER_K)
+    return ARMS[arm_index], k_index + K_MIN, DTYPES[dtype_index]
+
+
+class StoreSnapshot:
+    """Yayınlanmış, değişmeyen bir veri kuşağı
+
+    Okuyucular (Modbus/SNMP) sadece bu nesneyi okur, kilit almaz.
+    """
+
+    __slots__ = ('values', 'timestamps', 'extra', 'generation', 'published_at', 'stats')
+
+    def __init__(self, values, timestamps, extra, generation, published_at, stats=EMPTY_STATS):
+        self.values = values
+        self.timestamps = timestamps
+        self.extra = extra            # {(arm, k, dtype): (value, timestamp)}
+        self.generation = generation
+        self.published_at = published_at
+        self.stats = stats            # StoreStats
+
+    def value_at(self, slot):
+        """Slot değeri; boşsa veya None kaydedildiyse None"""
+        if slot < 0 or self.timestamps[slot] == _EMPTY:
+            return None
+        value = self.values[slot]
+        return None if value != value else value
+
+    def has_k(self, arm, k):
+        """Bu (arm, k) için herhangi bir dtype kaydı var mı"""
+        base = slot_of(arm, k, DTYPES[0])
+        if base < 0:
+            return False
+        return any(self.timestamps[base:base + SLOTS_PER_K])
+
+    # Eski get_battery_data_ram uyumlu okuma
+
+    def _entry(self, slot):
+        value = self.values[slot]
+        return {'value': None if value != value else value, 'timestamp': self.timestamps[slot]}
+
+    def _k_dict(self, arm, k):
+        result = {}
+        base = slot_of(arm, k, DTYPES[0])
+        if base >= 0:
+            timestamps = self.timestamps
+            for i, dtype in enumerate(DTYPES):
+                if timestamps[base + i] != _EMPTY:
+                    result[dtype] = self._entry(base + i)
+        for (e_arm, e_k, e_dtype), (value, timestamp) in self.extra.items():
+            if e_arm == arm and e_k == k:
+                result[e_dtype] = {'value': value, 'timestamp': timestamp}
+        return result
+
+    def _arm_dict(self, arm):
+        result = {}
+        if arm in ARMS:
+            for k in range(K_MIN, K_MIN + K_SLOTS):
+                if self.has_k(arm, k):
+                    result[k] = self._k_dict(arm, k)
+        for (e_arm, e_k, e_dtype) in self.extra:
+            if e_arm == arm and e_k not in result:
+                result[e_k] = self._k_dict(arm, e_k)
+        return result
+
+    def get(self, arm=None, k=None, dtype=None):
+        """{arm: {k: {dtype: {'value', 'timestamp'}}}} yapısında kopya döndür"""
+        if arm is None:
+            arms = set(ARMS) | {key[0] for key in self.extra}
+            result = {}
+            for a in sorted(arms):
+                arm_data = self._arm_dict(a)
+                if arm_data:
+                    result[a] = arm_data
+            return result
+        elif k is None:
+            return self._arm_dict(arm)
+        elif dtype is None:
+            return self._k_dict(arm, k)
+        else:
+            slot = slot_of(arm, k, dtype)
+            if slot < 0:
+                entry = self.extra.get((arm, k, dtype))
+                return {'value': entry[0], 'timestamp': entry[1]} if entry else None
+            if self.timestamps[slot] == _EMPTY:
+                return None
+            return self._entry(slot)
+
+
+class BatteryStore:
+    """Sabit boyutlu batarya veri deposu
+
+    Değerler array('d'), zaman damgaları (ms) array('q') içinde tutulur.
+    None değerler NaN olarak saklanır. Slot dışında kalan dtype'lar
+    (beklenmeyen paketler) küçük bir yedek dict'te tutulur.
+
+    Yazıcı (data_processor) çalışma dizilerine yazar; publish() bu dizilerin
+    kopyasından yeni bir StoreSnapshot üretip tek bir referans atamasıyla
+    yayınlar. Okuyucular self.snapshot'ı kilitsiz okur, ingest'i bekletmez.
+    publish_every yazmada bir otomatik yayın yapılır (1: her yazmada).
+
+    observers listesindeki nesnelerin on_update(slot, value), on_clear() ve
+    on_publish(snapshot) metodları yazıcı kilidi altında çağrılır
+    (ör. Modbus register görüntüsü).
+
+    Toplamlar (StoreStats) bir kayıt ilk kez dolduğunda ve clear()'da
+    artımlı güncellenir; her kuşak kendi stats değerini taşır.
+    """
+
+    def __init__(self, lock=None, publish_every=1):
+        self.lock = lock if lock is not None else threading.Lock()
+        self.publish_every = publish_every
+        self.values = array('d', bytes(8 * SLOT_COUNT))
+        self.timestamps = array('q', bytes(8 * SLOT_COUNT))
+        self._extra = {}  # {(arm, k, dtype): (value, timestamp)}
+        self._pending = 0  # Son yayından beri yapılan yazma sayısı
+        self._k_entries = {}  # {(arm, k): dolu dtype sayısı}
+        self._arms = set()  # Verisi olan kollar
+        self._battery_count = 0
+        self._data_count = 0
+        self.observers = []
+        self.snapshot = StoreSnapshot(array('d', self.values), array('q', self.timestamps), {}, 0, 0)
+
+    # Yazma
+
+    def update(self, arm, k, dtype, value, timestamp=None):
+        """Tek değer yaz"""
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        slot = slot_of(arm, k, dtype)
+        with self.lock:
+            if slot < 0:
+                if (arm, k, dtype) not in self._extra:
+                    self._count_entry(arm, k)
+                self._extra[(arm, k, dtype)] = (value, timestamp)
+            else:
+                if self.timestamps[slot] == _EMPTY:
+                    self._count_entry(arm, k)
+                self.values[slot] = math.nan if value is None else value
+                self.timestamps[slot] = timestamp
+                for observer in self.observers:
+                    observer.on_update(slot, value)
+            self._pending += 1
+            if self._pending >= self.publish_every:
+                self._publish()
+
+    def update_many(self, entries, timestamp=None):
+        """[(arm, k, dtype, value)] kayıtlarını tek kilit altında yaz"""
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        with self.lock:
+            values, timestamps, observers = self.values, self.timestamps, self.observers
+            count = 0
+            for arm, k, dtype, value in entries:
+                count += 1
+                slot = slot_of(arm, k, dtype)
+                if slot < 0:
+                    if (arm, k, dtype) not in self._extra:
+                        self._count_entry(arm, k)
+                    self._extra[(arm, k, dtype)] = (value, timestamp)
+                    continue
+                if timestamps[slot] == _EMPTY:
+                    self._count_entry(arm, k)
+                values[slot] = math.nan if value is None else value
+                timestamps[slot] = timestamp
+                for observer in observers:
+                    observer.on_update(slot, value)
+            self._pending += count
+            if count and self._pending >= self.publish_every:
+                self._publish()
+
+    def clear(self):
+        """Tüm verileri sil"""
+        with self.lock:
+            # Zaman damgası 0 olan slot boş sayılır, değerleri silmeye gerek yok
+            self.timestamps[:] = array('q', bytes(8 * SLOT_COUNT))
+            self._extra.clear()
+            self._k_entries.clear()
+            self._arms.clear()
+            self._battery_count = 0
+            self._data_count = 0
+            for observer in self.observers:
+                observer.on_clear()
+            self._publish()
+
+    def _count_entry(self, arm, k):
+        """Yeni (arm, k, dtype) kaydı için toplamları artır (kilit altında)"""
+        self._data_count += 1
+        k_entries = self._k_entries.get((arm, k), 0)
+        self._k_entries[(arm, k)] = k_entries + 1
+        if k_entries == 0:
+            if k > 2:
+                self._battery_count += 1
+            self._arms.add(arm)
+
+    # Yayınlama
+
+    def _publish(self):
+        snapshot = StoreSnapshot(
+            array('d', self.values),
+            array('q', self.timestamps),
+            dict(self._extra),
+            self.snapshot.generation + 1,
+            int(time.time() * 1000),
+            StoreStats(self._battery_count, len(self._arms), self._data_count),
+        )
+        self._pending = 0
+        # Tek referans ataması: okuyucu ya eski ya yeni kuşağı görür
+        self.snapshot = snapshot
+        for observer in self.observers:
+            observer.on_publish(snapshot)
+        return snapshot
+
+    def publish(self):
+        """Çalışma dizilerini yeni kuşak olarak yayınla (periyot sonu)"""
+        with self.lock:
+            return self._publish()
+
+    def flush(self):
+        """Yayınlanmamış yazma varsa yayınla (veri akışı durduğunda)"""
+        with self.lock:
+            if self._pending:
+                return self._publish()
+        return self.snapshot
+
+    # Okuma (kilitsiz, son yayınlanan kuşak)
+
+    @property
+    def stats(self):
+        """Son kuşağın StoreStats toplamları, O(1)"""
+        return self.snapshot.stats
+
+    def value_at(self, slot):
+        return self.snapshot.value_at(slot)
+
+    def has_k(self, arm, k):
+        return self.snapshot.has_k(arm, k)
+
+    def get(self, arm=None, k=None, dtype=None):
+        return self.snapshot.get(arm, k, dtype)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark - Seri okuma yolu (GPIO'suz)
+Eski 10 ms polling döngüsü ile olay tabanlı SerialIngest'i fake pigpio
+üzerinde karşılaştırır: paket gecikmesi ve boşta okuma sayısı
+"""
+
+import threading
+import time
+
+import fake_pigpio
+from serial_ingest import SerialIngest
+from uart_frame_decoder import UARTFrameDecoder
+
+RX_PIN = 16
+BAUD_RATE = 9600
+
+# Bir periyot: kol verisi + 120 batarya gerilimi
+PERIOD_FRAMES = [bytes.fromhex("80020a0101020305060700")] + [
+    bytes([0x80, k, 0x0A, 0x01, 0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x00]) for k in range(3, 123)
+]
+
+
+def polling_reader(fake_pi, decoder, on_frame, stop_event):
+    """Eski read_serial davranışı: 10 ms uyku ile sürekli okuma"""
+    while not stop_event.is_set():
+        (count, data) = fake_pi.bb_serial_read(RX_PIN)
+        if count > 0:
+            for frame in decoder.feed(data):
+                on_frame(frame)
+        time.sleep(0.01)
+
+
+def run_case(name, start_reader, idle_seconds=2.0):
+    """Bir periyot gönder, ardından boşta okuma sayısını ölç"""
+    fake_pi = fake_pigpio.pi()
+    fake_pi.bb_serial_read_open(RX_PIN, BAUD_RATE)
+
+    sent_at = []
+    latencies = []
+    received = threading.Event()
+
+    def on_sent(frame):
+        sent_at.append(time.perf_counter())
+
+    def on_frame(frame):
+        latencies.append(time.perf_counter() - sent_at[len(latencies)])
+        if len(latencies) == len(PERIOD_FRAMES):
+            received.set()
+
+    stop = start_reader(fake_pi, on_frame)
+    time.sleep(0.05)
+
+    fake_pigpio.play_stream(fake_pi, RX_PIN, PERIOD_FRAMES, BAUD_RATE, on_sent=on_sent)
+    received.wait(5)
+
+    reads_before_idle = fake_pi.read_calls
+    time.sleep(idle_seconds)
+    idle_reads = fake_pi.read_calls - reads_before_idle
+    stop()
+
+    avg_ms = sum(latencies) / len(latencies) * 1000 if latencies else 0.0
+    max_ms = max(latencies) * 1000 if latencies else 0.0
+    print(f"{name:<12} paket={len(latencies):>4}  ort. gecikme={avg_ms:6.2f} ms  "
+          f"maks={max_ms:6.2f} ms  boşta okuma/s={idle_reads / idle_seconds:6.1f}")
+
+
+def start_polling(fake_pi, on_frame):
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=polling_reader, args=(fake_pi, UARTFrameDecoder(), on_frame, stop_event), daemon=True
+    )
+    thread.start()
+    return lambda: (stop_event.set(), thread.join())
+
+
+def start_ingest(fake_pi, on_frame):
+    ingest = SerialIngest(fake_pi, RX_PIN, BAUD_RATE, UARTFrameDecoder(), on_frame,
+                          falling_edge=fake_pigpio.FALLING_EDGE)
+    thread = threading.Thread(target=ingest.run, daemon=True)
+    thread.start()
+    return lambda: (ingest.stop(), thread.join())
+
+
+def main():
+    print("📊 Seri okuma benchmark'ı (fake pigpio)")
+    print("=" * 50)
+    run_case("polling", start_polling)
+    run_case("SerialIngest", start_ingest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+DB Compactor - db_worker için birleştirmeli yazma tamponu
+Ölçümler (arm, k, dtype, periyot) anahtarıyla tutulur; aynı periyotta
+aynı anahtara gelen yeni değer eskisinin yerine geçer. flush() kalan
+satırları tuple listesi olarak yazıcıya verir: BatteryStorage
+.insert_battery_rows (bölüm başına tek executemany, tek transaction)
+veya düz bir sqlite3 bağlantısı için insert_rows.
+"""
+
+import time
+
+BATTERY_DATA_INSERT = "INSERT INTO battery_data (arm, k, dtype, data, timestamp) VALUES (?, ?, ?, ?, ?)"
+
+FLUSH_ROWS = 2000      # Tamponda bu kadar satır birikince yaz
+FLUSH_INTERVAL = 5.0   # s, en geç bu aralıkta yaz
+MAX_ROWS = 4 * FLUSH_ROWS  # Başarısız flush sonrası tampon bu sınırı aşarsa atılır
+
+
+def insert_rows(conn, rows, sql=BATTERY_DATA_INSERT):
+    """rows'u tek transaction'da executemany ile yaz (hata olursa geri al)"""
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(sql, rows)
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class BatteryDataCompactor:
+    """(arm, k, dtype, periyot) başına son değeri tutan tampon
+
+    Sözlük ilk geliş sırasını korur; satırlar flush'ta
+    (arm, k, dtype, data, timestamp) tuple'larına dönüştürülür.
+    """
+
+    def __init__(self, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL, max_rows=MAX_ROWS):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self._values = {}  # {(arm, k, dtype, periyot): değer}
+        self.last_flush = time.monotonic()
+        self._retry_at = 0.0  # Başarısız flush sonrası bu ana kadar bekle
+        self.added = 0        # Tampona gelen değer sayısı
+        self.superseded = 0   # Aynı periyotta yenisi gelen (yazılmayan) değerler
+        self.written = 0      # Veritabanına yazılan satırlar
+        self.flushes = 0
+        self.failures = 0     # Başarısız flush sayısı
+        self.dropped = 0      # Sınır aşıldığı için atılan satırlar
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, arm, k, dtype, value, period):
+        key = (arm, k, dtype, period)
+        if key in self._values:
+            self.superseded += 1
+        self._values[key] = value
+        self.added += 1
+
+    def due(self, now=None):
+        """Boyut veya süre sınırı aşıldı mı (başarısız flush sonrası
+        flush_interval boyunca False)"""
+        if not self._values:
+            return False
+        now = time.monotonic() if now is None else now
+        if self.backing_off(now):
+            return False
+        return len(self._values) >= self.flush_rows or now - self.last_flush >= self.flush_interval
+
+    def backing_off(self, now=None):
+        """Başarısız flush sonrası bekleme süresi içinde miyiz"""
+        now = time.monotonic() if now is None else now
+        return now < self._retry_at
+
+    def rows(self):
+        """Tampondaki satırlar: [(arm, k, dtype, data, timestamp)]"""
+        return [(arm, k, dtype, value, period) for (arm, k, dtype, period), value in self._values.items()]
+
+    def flush(self, write):
+        """Tamponu write(rows) ile yaz, yazılan satır sayısını döndür
+
+        write tek transaction'da yazmalıdır; hata fırlatırsa tampon korunur
+        ve due() flush_interval dolana kadar yeniden denemez. Tampon
+        max_rows'a ulaşmışsa satırlar atılır (dropped), hata yine fırlatılır.
+        """
+        self.last_flush = time.monotonic()
+        if not self._values:
+            return 0
+        rows = self.rows()
+        try:
+            write(rows)
+        except BaseException:
+            self.failures += 1
+            self._retry_at = self.last_flush + self.flush_interval
+            if len(rows) >= self.max_rows:
+                self.dropped += len(rows)
+                self._values.clear()
+            raise
+        self._retry_at = 0.0
+        self._values.clear()
+        self.written += len(rows)
+        self.flushes += 1
+        return len(rows)
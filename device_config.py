@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+"""
+Device Config - batconfigs / armconfigs parametreleri
+Cihaza gönderilen konfigürasyon UART paketleri, Modbus holding
+register'larına eşlenmiş konfigürasyon tablosu ve main-ornek.py'nin
+batconfigs/armconfigs SQLite tablolarından yükleme/kaydetme
+"""
+
+import sqlite3
+import struct
+import threading
+import time
+
+from serial_ingest import load_pigpio
+
+pigpio = load_pigpio()
+
+# (alan, Modbus ölçeği) - register = değer * ölçek
+BATCONFIG_FIELDS = (
+    ('Vmin', 100), ('Vmax', 100), ('Vnom', 100), ('Rintnom', 1),
+    ('Tempmin_D', 1), ('Tempmax_D', 1), ('Tempmin_PN', 1), ('Tempmaks_PN', 1),
+    ('Socmin', 1), ('Sohmin', 1),
+)
+ARMCONFIG_FIELDS = (
+    ('akimKats', 1), ('akimMax', 1), ('nemMax', 1), ('nemMin', 1), ('tempMax', 1), ('tempMin', 1),
+)
+
+# load_default_configs ile aynı varsayılanlar
+DEFAULT_BATCONFIG = {
+    'Vmin': 10.12, 'Vmax': 13.95, 'Vnom': 11.00, 'Rintnom': 150,
+    'Tempmin_D': 15, 'Tempmax_D': 55, 'Tempmin_PN': 15, 'Tempmaks_PN': 30,
+    'Socmin': 30, 'Sohmin': 30,
+}
+DEFAULT_ARMCONFIG = {
+    'akimKats': 150, 'akimMax': 1000, 'nemMax': 100, 'nemMin': 0, 'tempMax': 65, 'tempMin': 15,
+}
+
+# main-ornek.py ile aynı veritabanı ve tablolar (initialize_config_tables)
+CONFIG_DB_PATH = 'battery_data.db'
+CONFIG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS batconfigs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        armValue INTEGER NOT NULL,
+        Vmin REAL NOT NULL,
+        Vmax REAL NOT NULL,
+        Vnom REAL NOT NULL,
+        Rintnom INTEGER NOT NULL,
+        Tempmin_D INTEGER NOT NULL,
+        Tempmax_D INTEGER NOT NULL,
+        Tempmin_PN INTEGER NOT NULL,
+        Tempmaks_PN INTEGER NOT NULL,
+        Socmin INTEGER NOT NULL,
+        Sohmin INTEGER NOT NULL,
+        time INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS armconfigs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        armValue INTEGER NOT NULL,
+        akimKats INTEGER NOT NULL,
+        akimMax INTEGER NOT NULL,
+        nemMax INTEGER NOT NULL,
+        nemMin INTEGER NOT NULL,
+        tempMax INTEGER NOT NULL,
+        tempMin INTEGER NOT NULL,
+        time INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Holding register adresleri: her kol için 16 register'lık blok
+BATCONFIG_BASE = 0x1000
+ARMCONFIG_BASE = 0x1040
+CONFIG_BLOCK = 16
+CONFIG_END = ARMCONFIG_BASE + 4 * CONFIG_BLOCK
+
+
+def build_batconfig_packet(config_data):
+    """Header(0x81) + Arm + Dtype(0x7C) + tüm parametreler + CRC"""
+    config_packet = bytearray([0x81])  # Header
+
+    # Arm değerini ekle
+    config_packet.append(int(config_data['armValue']) & 0xFF)
+
+    # Dtype ekle
+    config_packet.append(0x7C)
+
+    # Float değerleri 2 byte olarak hazırla (1 byte tam kısım, 1 byte ondalık kısım)
+    vnom = float(str(config_data['Vnom']))
+    vmax = float(str(config_data['Vmax']))
+    vmin = float(str(config_data['Vmin']))
+
+    # Float değerleri ekle (Vnom, Vmax, Vmin)
+    config_packet.extend([
+        int(vnom) & 0xFF,                # Vnom tam kısım
+        int((vnom % 1) * 100) & 0xFF,    # Vnom ondalık kısım
+        int(vmax) & 0xFF,                # Vmax tam kısım
+        int((vmax % 1) * 100) & 0xFF,    # Vmax ondalık kısım
+        int(vmin) & 0xFF,                # Vmin tam kısım
+        int((vmin % 1) * 100) & 0xFF     # Vmin ondalık kısım
+    ])
+
+    # 1 byte değerleri ekle
+    config_packet.extend([
+        int(config_data['Rintnom']) & 0xFF,
+        int(config_data['Tempmin_D']) & 0xFF,
+        int(config_data['Tempmax_D']) & 0xFF,
+        int(config_data['Tempmin_PN']) & 0xFF,
+        int(config_data['Tempmaks_PN']) & 0xFF,
+        int(config_data['Socmin']) & 0xFF,
+        int(config_data['Sohmin']) & 0xFF
+    ])
+
+    # CRC hesapla (tüm byte'ların toplamı)
+    config_packet.append(sum(config_packet) & 0xFF)
+    return config_packet
+
+
+def build_armconfig_packet(config_data):
+    """Header(0x81) + Arm + Dtype(0x7B) + tüm parametreler + CRC"""
+    config_packet = bytearray([0x81])  # Header
+
+    # Arm değerini ekle
+    config_packet.append(int(config_data['armValue']) & 0xFF)
+
+    # Dtype ekle (0x7B)
+    config_packet.append(0x7B)
+
+    # akimMax değerini 3 haneli formata çevir (örn: 045, 126)
+    akimMax_str = f"{int(config_data['akimMax']):03d}"
+
+    # ArmConfig değerlerini ekle
+    config_packet.extend([
+        int(config_data['akimKats']) & 0xFF,    # akimKats
+        int(akimMax_str[0]) & 0xFF,            # akimMax1 (ilk hane)
+        int(akimMax_str[1]) & 0xFF,            # akimMax2 (ikinci hane)
+        int(akimMax_str[2]) & 0xFF,            # akimMax3 (üçüncü hane)
+        int(config_data['nemMax']) & 0xFF,      # nemMax
+        int(config_data['nemMin']) & 0xFF,      # nemMin
+        int(config_data['tempMax']) & 0xFF,     # tempMax
+        int(config_data['tempMin']) & 0xFF      # tempMin
+    ])
+
+    # CRC hesapla (tüm byte'ların toplamı)
+    config_packet.append(sum(config_packet) & 0xFF)
+    return config_packet
+
+
+def wave_uart_send(pi, gpio_pin, data_bytes, bit_time):
+    """Bit-banging UART ile veri gönder"""
+    try:
+        # Start bit (0) + data bits + stop bit (1)
+        wave_data = []
+
+        for byte in data_bytes:
+            # Start bit
+            wave_data.append(pigpio.pulse(0, 1 << gpio_pin, bit_time))
+            # Data bits (LSB first)
+            for i in range(8):
+                bit = (byte >> i) & 1
+                if bit:
+                    wave_data.append(pigpio.pulse(1 << gpio_pin, 0, bit_time))
+                else:
+                    wave_data.append(pigpio.pulse(0, 1 << gpio_pin, bit_time))
+            # Stop bit
+            wave_data.append(pigpio.pulse(1 << gpio_pin, 0, bit_time))
+
+        # Wave oluştur ve gönder
+        pi.wave_clear()
+        pi.wave_add_generic(wave_data)
+        wave_id = pi.wave_create()
+        pi.wave_send_once(wave_id)
+
+        # Wave'i temizle
+        pi.wave_delete(wave_id)
+
+        # UART gönderim log'u
+        print(f"  → UART Gönderim: GPIO{gpio_pin}, {len(data_bytes)} byte, {round(1e6 / bit_time)} baud")
+        print(f"  → Wave ID: {wave_id}, Wave Data: {len(wave_data)} pulse")
+
+    except Exception as e:
+        print(f"UART gönderim hatası: {e}")
+
+
+class ConfigStorage:
+    """batconfigs/armconfigs SQLite tabloları
+
+    main-ornek.py her kayıtta yeni satır ekler; kolun geçerli
+    konfigürasyonu en büyük id'li satırdır. Kayıtlar seyrek olduğundan
+    her çağrı kendi bağlantısını açar (thread'ler arası paylaşım yok).
+    """
+
+    TABLES = {'batconfig': ('batconfigs', BATCONFIG_FIELDS), 'armconfig': ('armconfigs', ARMCONFIG_FIELDS)}
+
+    def __init__(self, path=CONFIG_DB_PATH):
+        self.path = path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.executescript(CONFIG_SCHEMA)
+        return conn
+
+    def load(self):
+        """{'batconfig': {arm: {alan: değer}}, 'armconfig': {...}} (son kayıtlar)"""
+        configs = {}
+        conn = self._connect()
+        try:
+            for kind, (table, fields) in self.TABLES.items():
+                names = [name for name, _scale in fields]
+                rows = conn.execute(
+                    "SELECT armValue, %s FROM %s WHERE id IN (SELECT MAX(id) FROM %s GROUP BY armValue)"
+                    % (", ".join(names), table, table)).fetchall()
+                configs[kind] = {row[0]: dict(zip(names, row[1:])) for row in rows}
+        finally:
+            conn.close()
+        return configs
+
+    def save(self, kind, config):
+        """Konfigürasyonu yeni satır olarak kaydet"""
+        table, fields = self.TABLES[kind]
+        names = ['armValue'] + [name for name, _scale in fields] + ['time']
+        values = [config['armValue']] + [config[name] for name, _scale in fields] + [int(time.time() * 1000)]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT INTO %s (%s) VALUES (%s)" % (table, ", ".join(names), ", ".join("?" * len(names))),
+                             values)
+        finally:
+            conn.close()
+
+
+class ConfigRegisters:
+    """batconfigs/armconfigs tablolarının Modbus holding register görünümü
+
+    BATCONFIG_BASE + (arm-1)*16 + i -> BATCONFIG_FIELDS[i]
+    ARMCONFIG_BASE + (arm-1)*16 + i -> ARMCONFIG_FIELDS[i]
+    Blok içindeki kullanılmayan register'lar 0 okunur, yazmalar yok sayılır.
+    Kayıtlı konfigürasyonu olmayan kollar varsayılanlarla başlar.
+    """
+
+    def __init__(self, initial=None):
+        self.lock = threading.Lock()
+        self.batconfigs = {arm: dict(DEFAULT_BATCONFIG, armValue=arm) for arm in range(1, 5)}
+        self.armconfigs = {arm: dict(DEFAULT_ARMCONFIG, armValue=arm) for arm in range(1, 5)}
+        if initial:
+            self.load(initial)
+
+    def load(self, configs):
+        """ConfigStorage.load() sonucunu tablolara uygula"""
+        with self.lock:
+            for kind, table in (('batconfig', self.batconfigs), ('armconfig', self.armconfigs)):
+                for arm, values in configs.get(kind, {}).items():
+                    if arm in table:
+                        table[arm].update(values)
+
+    @staticmethod
+    def contains(start_address, quantity):
+        return BATCONFIG_BASE <= start_address and start_address + quantity <= CONFIG_END
+
+    def _locate(self, address):
+        """Adres -> (tablo adı, arm, alan, ölçek) veya kullanılmayan register için None alanı"""
+        if address >= ARMCONFIG_BASE:
+            kind, fields, base = 'armconfig', ARMCONFIG_FIELDS, ARMCONFIG_BASE
+        else:
+            kind, fields, base = 'batconfig', BATCONFIG_FIELDS, BATCONFIG_BASE
+        arm_index, offset = divmod(address - base, CONFIG_BLOCK)
+        field = fields[offset] if offset < len(fields) else (None, 1)
+        return kind, arm_index + 1, field[0], field[1]
+
+    def _table(self, kind):
+        return self.armconfigs if kind == 'armconfig' else self.batconfigs
+
+    def read(self, start_address, quantity):
+        """Register değerleri (big-endian bytes)"""
+        words = []
+        with self.lock:
+            for address in range(start_address, start_address + quantity):
+                kind, arm, name, scale = self._locate(address)
+                value = self._table(kind)[arm][name] if name else 0
+                words.append(int(round(value * scale)) & 0xFFFF)
+        return struct.pack('>%dH' % quantity, *words)
+
+    def write(self, start_address, words):
+        """Register'lara yaz; değişen (tablo adı, arm) çiftlerini sırayla döndür"""
+        changed = []
+        with self.lock:
+            for address, word in enumerate(words, start_address):
+                kind, arm, name, scale = self._locate(address)
+                if name is None:
+                    continue
+                value = word / scale if scale != 1 else word
+                table = self._table(kind)
+                if table[arm][name] != value:
+                    table[arm][name] = value
+                    if (kind, arm) not in changed:
+                        changed.append((kind, arm))
+        return changed
+
+    def get(self, kind, arm):
+        """Konfigürasyon kopyası (build_*_packet girdisi)"""
+        with self.lock:
+            return dict(self._table(kind)[arm])
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fake pigpio - GPIO donanımı olmadan pigpio arka ucu
+PIGPIO_BACKEND=fake ile seçilir; bit-bang UART RX akışını bellekten besler
+"""
+
+import threading
+import time
+
+INPUT = 0
+OUTPUT = 1
+RISING_EDGE = 0
+FALLING_EDGE = 1
+EITHER_EDGE = 2
+
+
+class error(Exception):
+    """pigpio.error karşılığı"""
+
+
+class pulse:
+    """pigpio.pulse karşılığı"""
+
+    def __init__(self, gpio_on, gpio_off, delay):
+        self.gpio_on = gpio_on
+        self.gpio_off = gpio_off
+        self.delay = delay
+
+
+class _Callback:
+    def __init__(self, owner, gpio, edge, func):
+        self._owner = owner
+        self.gpio = gpio
+        self.edge = edge
+        self.func = func
+
+    def cancel(self):
+        self._owner._remove_callback(self)
+
+
+class pi:
+    """pigpio.pi karşılığı - sadece bu projede kullanılan metodlar"""
+
+    def __init__(self, host=None, port=None):
+        self.connected = True
+        self._lock = threading.Lock()
+        self._rx = {}          # {gpio: bytearray}
+        self._open = set()
+        self._callbacks = []
+        self._modes = {}
+        self._levels = {}
+        self._waves = {}
+        self._next_wave_id = 0
+        self.sent = []         # wave_send_once ile gönderilen pulse listeleri
+        self.read_calls = 0
+
+    # GPIO
+    def set_mode(self, gpio, mode):
+        self._modes[gpio] = mode
+
+    def write(self, gpio, level):
+        self._levels[gpio] = level
+
+    def stop(self):
+        self.connected = False
+
+    # Bit-bang UART RX
+    def bb_serial_read_open(self, gpio, baud, data_bits=8):
+        with self._lock:
+            if gpio in self._open:
+                raise error("GPIO already in use")
+            self._open.add(gpio)
+            self._rx[gpio] = bytearray()
+        return 0
+
+    def bb_serial_read_close(self, gpio):
+        with self._lock:
+            if gpio not in self._open:
+                raise error("no serial read in progress on GPIO")
+            self._open.discard(gpio)
+            self._rx.pop(gpio, None)
+        return 0
+
+    def bb_serial_read(self, gpio):
+        with self._lock:
+            self.read_calls += 1
+            buf = self._rx.get(gpio)
+            if not buf:
+                return 0, bytearray()
+            data = bytearray(buf)
+            buf.clear()
+        return len(data), data
+
+    def inject(self, gpio, data):
+        """RX tamponuna byte ekle"""
+        with self._lock:
+            if gpio not in self._rx:
+                raise error("no serial read in progress on GPIO")
+            self._rx[gpio].extend(data)
+
+    def edge(self, gpio, level=0):
+        """RX pininde kenar oluştur (start biti için level=0)"""
+        wanted = (FALLING_EDGE, EITHER_EDGE) if level == 0 else (RISING_EDGE, EITHER_EDGE)
+        with self._lock:
+            callbacks = [cb for cb in self._callbacks if cb.gpio == gpio and cb.edge in wanted]
+        tick = int(time.monotonic() * 1e6) & 0xFFFFFFFF
+        for cb in callbacks:
+            cb.func(gpio, level, tick)
+
+    # Callback
+    def callback(self, user_gpio, edge=RISING_EDGE, func=None):
+        cb = _Callback(self, user_gpio, edge, func)
+        with self._lock:
+            self._callbacks.append(cb)
+        return cb
+
+    def _remove_callback(self, cb):
+        with self._lock:
+            if cb in self._callbacks:
+                self._callbacks.remove(cb)
+
+    # Wave (TX)
+    def wave_clear(self):
+        self._waves.clear()
+
+    def wave_add_generic(self, pulses):
+        self._pending_pulses = list(pulses)
+        return len(self._pending_pulses)
+
+    def wave_create(self):
+        wave_id = self._next_wave_id
+        self._next_wave_id += 1
+        self._waves[wave_id] = getattr(self, '_pending_pulses', [])
+        self._pending_pulses = []
+        return wave_id
+
+    def wave_send_once(self, wave_id):
+        self.sent.append(self._waves.get(wave_id, []))
+        return len(self._waves.get(wave_id, []))
+
+    def wave_delete(self, wave_id):
+        self._waves.pop(wave_id, None)
+
+
+def play_stream(fake_pi, gpio, frames, baud_rate, gap=0.0, on_sent=None):
+    """Paketleri hat hızında RX'e besle (her byte 10 bit süresi)
+
+    Her byte'ın start biti düşen kenar oluşturur, byte hattan geçtikten
+    sonra pigpiod tamponunda okunabilir hale gelir.
+    """
+    byte_time = 10.0 / baud_rate
+    for frame in frames:
+        for i in range(len(frame)):
+            fake_pi.edge(gpio, 0)
+            time.sleep(byte_time)
+            fake_pi.inject(gpio, frame[i:i + 1])
+        if on_sent:
+            on_sent(frame)
+        if gap:
+            time.sleep(gap)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ingest Queue - Sınırlı UART paket kuyruğu
+read_serial ile data_processor/db_worker arasındaki sınırsız queue.Queue
+yerine sabit kapasiteli kuyruk. Tüketici yetişemezse bellek büyümez:
+
+* 'drop_oldest': kuyruk doluysa en eski paket atılır.
+* 'coalesce': kuyrukta aynı periyottan aynı (arm, k, dtype) ölçüm paketi
+  bekliyorsa yeni paket onun yerine geçer (sırası korunur, değer en yenisi
+  olur); alarm, balans ve armslavecounts gibi olay paketleri birleştirilmez.
+  k=2 dışı bir ölçümden sonra gelen k=2 ölçümü yeni periyot başlatır;
+  farklı periyotların paketleri birleştirilmez, böylece tüketici her
+  periyodu ayrı görür. Kuyruk yine de dolarsa en eski paket atılır.
+
+stats() sayaçları: enqueued, dequeued, dropped, coalesced, high_water,
+lag (en eski bekleyen paketin yaşı, s) ve max_lag.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+from system_log import WARNING, RateLimitedSampler, get_logger
+
+ingest_log = get_logger('ingest')
+overflow_sampler = RateLimitedSampler(ingest_log, level=WARNING, interval=10.0, burst=1)
+lag_sampler = RateLimitedSampler(ingest_log, level=WARNING, interval=10.0, burst=1)
+
+INGEST_CAPACITY = 4096   # ~1.5 tam periyot (4 kol x 122 k x 5 ölçüm)
+POLICIES = ('drop_oldest', 'coalesce')
+LAG_WARNING = 5.0        # s, tüketici bu kadar geride kalırsa uyar
+
+MEASUREMENT_LENGTH = 11
+PERIOD_START_K = 2       # Periyot k=2 (kol) ölçümleriyle başlar
+
+
+def measurement_key(packet):
+    """Ölçüm paketi için (arm, k, dtype), birleştirilemeyen paket için None"""
+    if packet is None or len(packet) != MEASUREMENT_LENGTH:
+        return None
+    return packet.arm, packet.k, packet.dtype
+
+
+class IngestQueue:
+    """Sınırlı, birleştirmeli FIFO
+
+    queue.Queue'nun put()/get(timeout)/task_done()/qsize() arayüzü;
+    put() hiç bloklamaz. Girdiler [anahtar, paket, kuyruğa giriş zamanı]
+    listeleridir, birleştirmede paket yerinde değiştirilir. Birleştirme
+    anahtarı (periyot kuşağı,) + key(paket) olur.
+    """
+
+    def __init__(self, capacity=INGEST_CAPACITY, policy='coalesce', key=measurement_key):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen kuyruk politikası: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.key = key if policy == 'coalesce' else None
+        self._entries = deque()
+        self._index = {}  # {anahtar: kuyruktaki girdi}
+        self._period = 0  # Periyot kuşağı, k=2 dışı ölçümden sonra k=2 gelince artar
+        self._last_k = None
+        self._not_empty = threading.Condition(threading.Lock())
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+        self.max_lag = 0.0
+
+    def put(self, item):
+        """Paketi kuyruğa ekle; gerekirse birleştir veya en eskiyi at"""
+        key = self.key(item) if self.key is not None else None
+        now = time.monotonic()
+        dropped = False
+        with self._not_empty:
+            self.enqueued += 1
+            if key is not None:
+                k = item.k
+                if k == PERIOD_START_K and self._last_k not in (None, PERIOD_START_K):
+                    self._period += 1
+                self._last_k = k
+                key = (self._period,) + key
+                entry = self._index.get(key)
+                if entry is not None:
+                    entry[1] = item
+                    self.coalesced += 1
+                    return
+            if len(self._entries) >= self.capacity:
+                self._drop_oldest()
+                dropped = True
+            entry = [key, item, now]
+            self._entries.append(entry)
+            if key is not None:
+                self._index[key] = entry
+            if len(self._entries) > self.high_water:
+                self.high_water = len(self._entries)
+            self._not_empty.notify()
+        if dropped:
+            overflow_sampler.log("Ingest kuyruğu dolu (%d), en eski paket atıldı: toplam %d atılan",
+                                 self.capacity, self.dropped)
+
+    def _drop_oldest(self):
+        key = self._entries.popleft()[0]
+        if key is not None:
+            del self._index[key]
+        self.dropped += 1
+
+    def get(self, block=True, timeout=None):
+        """En eski paketi döndür; boşsa queue.Empty"""
+        with self._not_empty:
+            if not block:
+                if not self._entries:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self._entries:
+                    self._not_empty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self._entries:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._not_empty.wait(remaining)
+            key, item, queued_at = self._entries.popleft()
+            if key is not None:
+                del self._index[key]
+            self.dequeued += 1
+            lag = time.monotonic() - queued_at
+            if lag > self.max_lag:
+                self.max_lag = lag
+        if lag > LAG_WARNING:
+            lag_sampler.log("Ingest tüketicisi %.1f s geride (%d paket bekliyor)", lag, len(self._entries))
+        return item
+
+    def task_done(self):
+        """queue.Queue uyumluluğu (join() desteklenmez)"""
+
+    def qsize(self):
+        with self._not_empty:
+            return len(self._entries)
+
+    def lag(self):
+        """En eski bekleyen paketin yaşı (s); kuyruk boşsa 0"""
+        with self._not_empty:
+            if not self._entries:
+                return 0.0
+            return time.monotonic() - self._entries[0][2]
+
+    def stats(self):
+        with self._not_empty:
+            depth = len(self._entries)
+            lag = time.monotonic() - self._entries[0][2] if depth else 0.0
+            return {
+                'capacity': self.capacity,
+                'policy': self.policy,
+                'depth': depth,
+                'enqueued': self.enqueued,
+                'dequeued': self.dequeued,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced,
+                'high_water': self.high_water,
+                'lag': lag,
+                'max_lag': self.max_lag,
+            }
@@ -4,15 +4,28 @@ import time
 import datetime
 import threading
 import queue
-import math
-import pigpio
 import json
 import os
-from database import BatteryDatabase
+from battery_storage import BatteryStorage
+from uart_frame_decoder import UARTFrameDecoder
+from ingest_queue import IngestQueue
+from db_compactor import BatteryDataCompactor
+from serial_ingest import SerialIngest, load_pigpio
+from battery_packet import BatteryPacket
+from packet_handlers import PacketSink, dispatch_packet, now_text
+from device_config import build_armconfig_packet, build_batconfig_packet, wave_uart_send
+from system_log import configure_logging, get_logger
+from soc_estimator import Calc_SOC, Calc_SOH
+
+pigpio = load_pigpio()
 
 # Global variables
-buffer = bytearray()
-data_queue = queue.Queue()
+frame_decoder = UARTFrameDecoder()
+# Sınırlı ingest kuyruğu: tüketici yetişemezse aynı (arm, k, dtype) ölçümleri
+# birleştirilir, yine dolarsa en eski paket atılır (data_queue.stats())
+INGEST_CAPACITY = 4096
+INGEST_POLICY = 'coalesce'  # veya 'drop_oldest'
+data_queue = IngestQueue(INGEST_CAPACITY, INGEST_POLICY)
 RX_PIN = 16
 TX_PIN = 26
 BAUD_RATE = 9600
@@ -24,9 +37,11 @@ last_data_received = time.time()
 last_k_value = None  # Son gelen verinin k değerini tutar
 last_k_value_lock = threading.Lock()  # Thread-safe erişim için
 
-# Database instance
-db = BatteryDatabase()
-db_lock = threading.Lock()  # Veritabanı işlemleri için lock
+# Veritabanı: WAL, tek yazıcı thread'i (yazma metodları Future döndürür),
+# okuyan her thread için salt okunur bağlantı; db_lock gerekmez
+DB_PATH = 'battery_data.db'
+db = BatteryStorage(DB_PATH)
+db_log = get_logger('db')
 
 pi = pigpio.pi()
 pi.set_mode(TX_PIN, pigpio.OUTPUT)
@@ -69,431 +84,199 @@ def get_last_k_value():
     with last_k_value_lock:
         return last_k_value
 
-def Calc_SOH(x):
-    if x is None:
-        return None
-    
-    try:
-        a1, b1, c1 = 85.918, 0.0181, 0.0083
-        a2, b2, c2 = 85.11, 0.0324, 0.0104
-        a3, b3, c3 = 0.3085, 0.0342, 0.0021
-        a4, b4, c4 = 16.521, 0.0382, 0.0013
-        a5, b5, c5 = -13.874, 0.0381, 0.0011
-        a6, b6, c6 = 40.077, 0.0474, 0.0079
-        a7, b7, c7 = 18.207, 0.0556, 0.0048
-
-        SohSonuc = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2) +
-            a5 * math.exp(-((x - b5) / c5) ** 2) +
-            a6 * math.exp(-((x - b6) / c6) ** 2) +
-            a7 * math.exp(-((x - b7) / c7) ** 2)
-        )
-        
-        if SohSonuc > 100.0:
-            SohSonuc = 100.0
-        
-        return round(SohSonuc, 4)
-    except Exception as e:
-        print(f"SOH hesaplama hatası: {str(e)}")
-        return None
-
-def Calc_SOC(x):
-    if x is None:
-        return None
-        
-    a1, a2, a3, a4 = 112.1627, 14.3937, 0, 10.5555
-    b1, b2, b3, b4 = 14.2601, 11.6890, 12.7872, 10.9406
-    c1, c2, c3, c4 = 1.8161, 0.8211, 0.0025, 0.3866
-    
-    try:
-        Soctahmin = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2)
-        )
-        
-        if Soctahmin > 100.0:
-            Soctahmin = 100.0
-        elif Soctahmin < 0.0:
-            Soctahmin = 0.0
-            
-        return round(Soctahmin, 4)
-    except Exception as e:
-        print(f"SOC hesaplama hatası: {str(e)}")
-        return None
-
 def read_serial(pi):
     """Bit-banging ile GPIO üzerinden seri veri oku"""
-    global buffer
     print("\nBit-banging UART veri alımı başladı...")
-    
-    buffer.clear()
 
-    while True:
+    ingest = SerialIngest(
+        pi, RX_PIN, BAUD_RATE, frame_decoder,
+        lambda frame: data_queue.put(BatteryPacket(frame)),
+        falling_edge=pigpio.FALLING_EDGE
+    )
+    ingest.run()
+
+class DBPacketSink(PacketSink):
+    """Çözülmüş paketleri SQLite'ye kaydeden hedef"""
+
+    def __init__(self):
+        # (arm, k, dtype, periyot) başına son değer; db_worker toplu yazar
+        self.compactor = BatteryDataCompactor()
+
+    def begin_measurement(self, k_value):
+        # k_value 2 geldiğinde yeni periyot başlat (ard arda gelmemesi şartıyla)
+        if k_value == 2:
+            if get_last_k_value() != 2:  # Non-consecutive arm data
+                reset_period()
+                get_period_timestamp()
+            update_last_k_value(2)
+        else:  # Battery data
+            update_last_k_value(k_value)
+
+    def on_value(self, arm_value, k_value, dtype, value):
+        self.compactor.add(arm_value, k_value, dtype, value, get_period_timestamp())
+
+    def on_voltage(self, arm_value, k_value, value):
+        if k_value != 2:  # k_value 2 değilse SOC hesapla
+            self.on_value(arm_value, k_value, 126, Calc_SOC(value))
+
+        # Her durumda ham veriyi kaydet
+        self.on_value(arm_value, k_value, 10, value)
+
+    # on_soh: PacketSink varsayılanı dtype=11 yazar. dtype=126 SOC'a aittir;
+    # SOH'un ek 126 kaydı aynı periyotta SOC'un yerine geçeceği için yazılmaz.
+
+    def on_arm_slave_counts(self, counts):
+        super().on_arm_slave_counts(counts)
         try:
-            (count, data) = pi.bb_serial_read(RX_PIN)
-            if count > 0:
-                buffer.extend(data)
-                
-                while len(buffer) >= 3:
-                    try:
-                        # Header (0x80 veya 0x81) bul
-                        header_index = -1
-                        for i, byte in enumerate(buffer):
-                            if byte == 0x80 or byte == 0x81:
-                                header_index = i
-                                break
-                        
-                        if header_index == -1:
-                            buffer.clear()
-                            break
-
-                        if header_index > 0:
-                            buffer = buffer[header_index:]
-
-                        # Paket uzunluğunu belirle
-                        if len(buffer) >= 3:
-                            dtype = buffer[2]
-                            
-                            # 5 byte'lık missing data paketi kontrolü
-                            if dtype == 0x7F and len(buffer) >= 5:
-                                packet_length = 5
-                            # 6 byte'lık paket kontrolü
-                            elif len(buffer) >= 6 and (buffer[2] == 0x0F or buffer[1] == 0x7E or (buffer[2] == 0x7D and buffer[1] == 2)):
-                                packet_length = 6
-                            elif dtype == 0x7D and len(buffer) >= 7 and buffer[1] > 2:
-                                packet_length = 7
-                            else:
-                                packet_length = 11
-
-                            if len(buffer) >= packet_length:
-                                packet = buffer[:packet_length]
-                                buffer = buffer[packet_length:]
-                                hex_packet = [f"{b:02x}" for b in packet]
-                                data_queue.put(hex_packet)
-                            else:
-                                # Paket tamamlanmamış, daha fazla veri bekle
-                                break
-                        else:
-                            break
-
-                    except Exception as e:
-                        print(f"Paket işleme hatası: {e}")
-                        buffer.clear()
-                        continue
-
-            time.sleep(0.01)
+            updated_at = int(time.time() * 1000)
+            # Her arm için ayrı kayıt oluştur
+            for arm in range(1, 5):
+                db.insert_arm_slave_counts(arm, counts[arm], updated_at).result()
+            print("✓ Armslavecounts SQLite'ye kaydedildi")
 
         except Exception as e:
-            print(f"Veri okuma hatası: {e}")
-            time.sleep(1)
+            print(f"armslavecounts kayıt hatası: {e}")
+
+    def on_balance(self, arm_value, slave_value, status_value):
+        global program_start_time
+        try:
+            updated_at = int(time.time() * 1000)
+            if updated_at > program_start_time:
+                db.insert_passive_balance(arm_value, slave_value, status_value, updated_at).result()
+                print(f"✓ Balans SQLite'ye kaydedildi: Arm={arm_value}, Slave={slave_value}, Status={status_value}")
+                program_start_time = updated_at
+        except Exception as e:
+            print(f"Balans kayıt hatası: {e}")
+
+    def on_hatkon_alarm(self, arm_value, error_msb):
+        super().on_hatkon_alarm(arm_value, error_msb)
+        error_lsb = 9
+        alarm_timestamp = int(time.time() * 1000)
+
+        # Eğer error_msb=1 veya error_msb=0 ise, mevcut alarmı düzelt
+        if error_msb == 1 or error_msb == 0:
+            if db.resolve_alarm(arm_value, 2).result():  # Hatkon alarmları için battery=2
+                print(f"✓ Hatkon alarm düzeltildi - Arm: {arm_value} (error_msb: {error_msb})")
+            else:
+                print(f"⚠ Düzeltilecek aktif Hatkon alarm bulunamadı - Arm: {arm_value}")
+        else:
+            # Yeni alarm ekle
+            try:
+                db.insert_alarm(arm_value, 2, error_msb, error_lsb, alarm_timestamp).result()
+                print("✓ Yeni Hatkon alarm SQLite'ye kaydedildi")
+            except Exception as e:
+                print(f"Hatkon alarm kayıt hatası: {e}")
+
+    def on_batkon_alarm(self, packet, arm_value, battery, error_msb, error_lsb):
+        # Detaylı console log
+        print(f"\n*** BATKON ALARM VERİSİ ALGILANDI - {now_text()} ***")
+        print(f"Arm: {arm_value}, Battery: {battery}, Error MSB: {error_msb}, Error LSB: {error_lsb}")
+        print(f"Ham Veri: {packet.hex_list()}")
+        alarm_timestamp = int(time.time() * 1000)
+
+        # Eğer errorlsb=1 ve errormsb=1 ise, mevcut alarmı düzelt
+        if error_lsb == 1 and error_msb == 1:
+            if db.resolve_alarm(arm_value, battery).result():
+                print(f"✓ Batkon alarm düzeltildi - Arm: {arm_value}, Battery: {battery}")
+            else:
+                print(f"⚠ Düzeltilecek aktif alarm bulunamadı - Arm: {arm_value}, Battery: {battery}")
+        else:
+            # Yeni alarm ekle
+            try:
+                db.insert_alarm(arm_value, battery, error_msb, error_lsb, alarm_timestamp).result()
+                print("✓ Yeni Batkon alarm SQLite'ye kaydedildi")
+            except Exception as e:
+                print(f"Batkon alarm kayıt hatası: {e}")
+
+    def on_missing_data(self, arm_value, slave_value, status_value):
+        super().on_missing_data(arm_value, slave_value, status_value)
+        missing_timestamp = int(time.time() * 1000)
+
+        # SQLite'ye kaydet
+        try:
+            db.insert_missing_data(arm_value, slave_value, status_value, missing_timestamp).result()
+            print("✓ Missing data SQLite'ye kaydedildi")
+        except Exception as e:
+            print(f"Missing data kayıt hatası: {e}")
+
+db_sink = DBPacketSink()
+
+def flush_battery_data():
+    """Birleştirilmiş ölçümleri tek transaction'da SQLite'ye yaz (yazıcı thread'i)
+
+    Hata loglanır; compactor FLUSH_INTERVAL boyunca yeniden denemez ve
+    sınırı aşan tamponu atar.
+    """
+    compactor = db_sink.compactor
+    try:
+        compactor.flush(lambda rows: db.insert_battery_rows(rows).result())
+    except Exception as e:
+        db_log.error("Ölçüm yazma hatası (%d satır bekliyor, %d atıldı): %s",
+                     len(compactor), compactor.dropped, e)
 
 def db_worker():
     """Veritabanı işlemleri"""
-    batch = []
-    last_insert = time.time()
     global last_data_received
     
     while True:
         try:
-            data = data_queue.get(timeout=1)
-            if data is None:
-                break
-            
+            packet = data_queue.get(timeout=1)
+        except queue.Empty:
+            # Veri yokken bekleyenleri yaz (başarısız flush sonrası beklerken değil)
+            if len(db_sink.compactor) and not db_sink.compactor.backing_off():
+                flush_battery_data()
+            continue
+        if packet is None:
+            break
+        try:
             # Veri alındığında zaman damgasını güncelle
             last_data_received = time.time()
-        
-            # 7 byte Batkon alarm verisi kontrolü
-            if len(data) == 7:
-                raw_bytes = [int(b, 16) for b in data]
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                
-                # Batkon alarm verisi işleme
-                arm_value = int(data[3], 16)
-                battery = int(data[2], 16)
-                error_msb = int(data[4], 16)
-                error_lsb = int(data[5], 16)
-                
-                # Detaylı console log
-                print(f"\n*** BATKON ALARM VERİSİ ALGILANDI - {timestamp} ***")
-                print(f"Arm: {arm_value}, Battery: {battery}, Error MSB: {error_msb}, Error LSB: {error_lsb}")
-                print(f"Ham Veri: {data}")
-                alarm_timestamp = int(time.time() * 1000)
-                
-                # Eğer errorlsb=1 ve errormsb=1 ise, mevcut alarmı düzelt
-                if error_lsb == 1 and error_msb == 1:
-                    with db_lock:
-                        if db.resolve_alarm(arm_value, battery):
-                            print(f"✓ Batkon alarm düzeltildi - Arm: {arm_value}, Battery: {battery}")
-                        else:
-                            print(f"⚠ Düzeltilecek aktif alarm bulunamadı - Arm: {arm_value}, Battery: {battery}")
-                else:
-                    # Yeni alarm ekle
-                    with db_lock:
-                        db.insert_alarm(arm_value, battery, error_msb, error_lsb, alarm_timestamp)
-                    print("✓ Yeni Batkon alarm SQLite'ye kaydedildi")
-                continue
-
-            # 5 byte'lık missing data verisi kontrolü
-            if len(data) == 5:
-                raw_bytes = [int(b, 16) for b in data]
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                
-                print(f"\n*** MISSING DATA VERİSİ ALGILANDI - {timestamp} ***")
-                
-                # Missing data kaydı hazırla
-                arm_value = raw_bytes[3]
-                slave_value = raw_bytes[1]
-                status_value = raw_bytes[4]
-                missing_timestamp = int(time.time() * 1000)
-                
-                # SQLite'ye kaydet
-                with db_lock:
-                    db.insert_missing_data(arm_value, slave_value, status_value, missing_timestamp)
-                print("✓ Missing data SQLite'ye kaydedildi")
-                continue
-
-            # 11 byte'lık veri kontrolü
-            if len(data) == 11:
-                arm_value = int(data[3], 16)
-                dtype = int(data[2], 16)
-                k_value = int(data[1], 16)
-                
-                # k_value 2 geldiğinde yeni periyot başlat (ard arda gelmemesi şartıyla)
-                if k_value == 2:
-                    if get_last_k_value() != 2:  # Non-consecutive arm data
-                        reset_period()
-                        get_period_timestamp()
-                    update_last_k_value(2)
-                else:  # Battery data
-                    update_last_k_value(k_value)
-                
-                # Arm değeri kontrolü
-                if arm_value not in [1, 2, 3, 4]:
-                    print(f"\nHATALI ARM DEĞERİ: {arm_value}")
-                    continue
-                
-                # Salt data hesapla
-                if dtype == 11 and k_value == 2:  # Nem hesapla
-                    onlar = int(data[5], 16)
-                    birler = int(data[6], 16)
-                    kusurat1 = int(data[7], 16)
-                    kusurat2 = int(data[8], 16)
-                    
-                    tam_kisim = (onlar * 10 + birler)
-                    kusurat_kisim = (kusurat1 * 0.1 + kusurat2 * 0.01)
-                    salt_data = tam_kisim + kusurat_kisim
-                    salt_data = round(salt_data, 4)
-                else:
-                    # Normal hesaplama
-                    saltData = int(data[4], 16) * 100 + int(data[5], 16) * 10 + int(data[6], 16) + int(data[7], 16) * 0.1 + int(data[8], 16) * 0.01 + int(data[9], 16) * 0.001
-                    salt_data = round(saltData, 4)
-                
-                # Veri tipine göre log mesajı - KALDIRILDI
-                
-                # Veri işleme ve kayıt (tek tabloya)
-                if dtype == 10:  # SOC
-                    if k_value != 2:  # k_value 2 değilse SOC hesapla
-                        soc_value = Calc_SOC(salt_data)
-                        
-                        record = {
-                            "Arm": arm_value,
-                            "k": k_value,
-                            "Dtype": 126,
-                            "data": soc_value,
-                            "timestamp": get_period_timestamp()
-                        }
-                        batch.append(record)
-                    
-                    # Her durumda ham veriyi kaydet
-                    record = {
-                        "Arm": arm_value,
-                        "k": k_value,
-                        "Dtype": 10,
-                        "data": salt_data,
-                        "timestamp": get_period_timestamp()
-                    }
-                    batch.append(record)
-                
-                elif dtype == 11:  # SOH veya Nem
-                    if k_value == 2:  # Nem verisi
-                        print(f"*** VERİ ALGILANDI - Arm: {arm_value}, Nem: {salt_data}% ***")
-                        record = {
-                            "Arm": arm_value,
-                            "k": k_value,
-                            "Dtype": 11,
-                            "data": salt_data,
-                            "timestamp": get_period_timestamp()
-                        }
-                        batch.append(record)
-                    else:  # SOH verisi
-                        if int(data[4], 16) == 1:  # Eğer data[4] 1 ise SOH 100'dür
-                            soh_value = 100.0
-                        else:
-                            onlar = int(data[5], 16)
-                            birler = int(data[6], 16)
-                            kusurat1 = int(data[7], 16)
-                            kusurat2 = int(data[8], 16)
-                            
-                            tam_kisim = (onlar * 10 + birler)
-                            kusurat_kisim = (kusurat1 * 0.1 + kusurat2 * 0.01)
-                            soh_value = tam_kisim + kusurat_kisim
-                            soh_value = round(soh_value, 4)
-                        
-                        record = {
-                            "Arm": arm_value,
-                            "k": k_value,
-                            "Dtype": 11,
-                            "data": soh_value,
-                            "timestamp": get_period_timestamp()
-                        }
-                        batch.append(record)
-                        
-                        # SOH verisi için ek kayıt (dtype=126)
-                        soh_record = {
-                            "Arm": arm_value,
-                            "k": k_value,
-                            "Dtype": 126,  # SOH için özel dtype
-                            "data": soh_value,
-                            "timestamp": get_period_timestamp()
-                        }
-                        batch.append(soh_record)
-                
-                else:  # Diğer Dtype değerleri için
-                    record = {
-                        "Arm": arm_value,
-                        "k": k_value,
-                        "Dtype": dtype,
-                        "data": salt_data,
-                        "timestamp": get_period_timestamp()
-                    }
-                    batch.append(record)
-
-            # 6 byte'lık balans komutu veya armslavecounts kontrolü
-            elif len(data) == 6:
-                raw_bytes = [int(b, 16) for b in data]
-                
-                # Slave sayısı verisi: 2. byte (index 1) 0x7E ise
-                if raw_bytes[1] == 0x7E:
-                    arm1, arm2, arm3, arm4 = raw_bytes[2], raw_bytes[3], raw_bytes[4], raw_bytes[5]
-                    print(f"armslavecounts verisi tespit edildi: arm1={arm1}, arm2={arm2}, arm3={arm3}, arm4={arm4}")
-                    
-                    try:
-                        updated_at = int(time.time() * 1000)
-                        # Her arm için ayrı kayıt oluştur
-                        with db_lock:
-                            db.insert_arm_slave_counts(1, arm1, updated_at)
-                            db.insert_arm_slave_counts(2, arm2, updated_at)
-                            db.insert_arm_slave_counts(3, arm3, updated_at)
-                            db.insert_arm_slave_counts(4, arm4, updated_at)
-                        print("✓ Armslavecounts SQLite'ye kaydedildi")
-                        
-                    except Exception as e:
-                        print(f"armslavecounts kayıt hatası: {e}")
-                    continue
-                
-                # Balans verisi: 3. byte (index 2) 0x0F ise
-                elif raw_bytes[2] == 0x0F:
-                    try:
-                        updated_at = int(time.time() * 1000)
-                        global program_start_time
-                        if updated_at > program_start_time:
-                            slave_value = raw_bytes[1]
-                            arm_value = raw_bytes[3]
-                            status_value = raw_bytes[4]
-                            balance_timestamp = updated_at
-                            
-                            with db_lock:
-                                db.insert_passive_balance(arm_value, slave_value, status_value, balance_timestamp)
-                            print(f"✓ Balans SQLite'ye kaydedildi: Arm={arm_value}, Slave={slave_value}, Status={status_value}")
-                            program_start_time = updated_at
-                    except Exception as e:
-                        print(f"Balans kayıt hatası: {e}")
-                    continue
-                
-                # Hatkon alarmı: 3. byte (index 2) 0x7D ise
-                elif raw_bytes[2] == 0x7D:
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    print(f"\n*** HATKON ALARM VERİSİ ALGILANDI - {timestamp} ***")
-
-                    arm_value = raw_bytes[3]
-                    error_msb = raw_bytes[4]
-                    error_lsb = 9
-                    alarm_timestamp = int(time.time() * 1000)
-                    
-                    # Eğer error_msb=1 veya error_msb=0 ise, mevcut alarmı düzelt
-                    if error_msb == 1 or error_msb == 0:
-                        with db_lock:
-                            if db.resolve_alarm(arm_value, 2):  # Hatkon alarmları için battery=2
-                                print(f"✓ Hatkon alarm düzeltildi - Arm: {arm_value} (error_msb: {error_msb})")
-                            else:
-                                print(f"⚠ Düzeltilecek aktif Hatkon alarm bulunamadı - Arm: {arm_value}")
-                    else:
-                        # Yeni alarm ekle
-                        with db_lock:
-                            db.insert_alarm(arm_value, 2, error_msb, error_lsb, alarm_timestamp)
-                        print("✓ Yeni Hatkon alarm SQLite'ye kaydedildi")
-                    continue
-
-            # Batch kontrolü ve kayıt
-            if len(batch) >= 100 or (time.time() - last_insert) > 5:
-                with db_lock:
-                    db.insert_battery_data_batch(batch)
-                batch = []
-                last_insert = time.time()
 
-            data_queue.task_done()
-            
-        except queue.Empty:
-            if batch:
-                with db_lock:
-                    db.insert_battery_data_batch(batch)
-                batch = []
-                last_insert = time.time()
+            dispatch_packet(packet, db_sink)
+
+            # Boyut (FLUSH_ROWS) veya süre (FLUSH_INTERVAL) dolunca yaz
+            if db_sink.compactor.due():
+                flush_battery_data()
         except Exception as e:
             print(f"\ndb_worker'da beklenmeyen hata: {e}")
-            continue
+        finally:
+            data_queue.task_done()
 
 def initialize_config_tables():
     """Konfigürasyon tablolarını oluştur ve varsayılan verileri yükle"""
     try:
-        with db_lock:
-            db.execute_query('''
-                CREATE TABLE IF NOT EXISTS batconfigs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    armValue INTEGER NOT NULL,
-                    Vmin REAL NOT NULL,
-                    Vmax REAL NOT NULL,
-                    Vnom REAL NOT NULL,
-                    Rintnom INTEGER NOT NULL,
-                    Tempmin_D INTEGER NOT NULL,
-                    Tempmax_D INTEGER NOT NULL,
-                    Tempmin_PN INTEGER NOT NULL,
-                    Tempmaks_PN INTEGER NOT NULL,
-                    Socmin INTEGER NOT NULL,
-                    Sohmin INTEGER NOT NULL,
-                    time INTEGER NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            db.execute_query('''
-                CREATE TABLE IF NOT EXISTS armconfigs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    armValue INTEGER NOT NULL,
-                    akimKats INTEGER NOT NULL,
-                    akimMax INTEGER NOT NULL,
-                    nemMax INTEGER NOT NULL,
-                    nemMin INTEGER NOT NULL,
-                    tempMax INTEGER NOT NULL,
-                    tempMin INTEGER NOT NULL,
-                    time INTEGER NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+        db.execute_query('''
+            CREATE TABLE IF NOT EXISTS batconfigs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                armValue INTEGER NOT NULL,
+                Vmin REAL NOT NULL,
+                Vmax REAL NOT NULL,
+                Vnom REAL NOT NULL,
+                Rintnom INTEGER NOT NULL,
+                Tempmin_D INTEGER NOT NULL,
+                Tempmax_D INTEGER NOT NULL,
+                Tempmin_PN INTEGER NOT NULL,
+                Tempmaks_PN INTEGER NOT NULL,
+                Socmin INTEGER NOT NULL,
+                Sohmin INTEGER NOT NULL,
+                time INTEGER NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''').result()
+        db.execute_query('''
+            CREATE TABLE IF NOT EXISTS armconfigs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                armValue INTEGER NOT NULL,
+                akimKats INTEGER NOT NULL,
+                akimMax INTEGER NOT NULL,
+                nemMax INTEGER NOT NULL,
+                nemMin INTEGER NOT NULL,
+                tempMax INTEGER NOT NULL,
+                tempMin INTEGER NOT NULL,
+                time INTEGER NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''').result()
         print("✓ Konfigürasyon tabloları oluşturuldu")
         load_default_configs()
     except Exception as e:
@@ -502,22 +285,21 @@ def initialize_config_tables():
 def load_default_configs():
     """Varsayılan konfigürasyon değerlerini yükle"""
     try:
-        with db_lock:
-            # 4 kol için varsayılan batarya konfigürasyonları
-            for arm in range(1, 5):
-                db.execute_query('''
-                    INSERT OR IGNORE INTO batconfigs 
-                    (armValue, Vmin, Vmax, Vnom, Rintnom, Tempmin_D, Tempmax_D, Tempmin_PN, Tempmaks_PN, Socmin, Sohmin, time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (arm, 10.12, 13.95, 11.00, 150, 15, 55, 15, 30, 30, 30, int(time.time() * 1000)))
+        # 4 kol için varsayılan batarya konfigürasyonları
+        for arm in range(1, 5):
+            db.execute_query('''
+                INSERT OR IGNORE INTO batconfigs 
+                (armValue, Vmin, Vmax, Vnom, Rintnom, Tempmin_D, Tempmax_D, Tempmin_PN, Tempmaks_PN, Socmin, Sohmin, time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (arm, 10.12, 13.95, 11.00, 150, 15, 55, 15, 30, 30, 30, int(time.time() * 1000))).result()
             
-            # 4 kol için varsayılan kol konfigürasyonları
-            for arm in range(1, 5):
-                db.execute_query('''
-                    INSERT OR IGNORE INTO armconfigs 
-                    (armValue, akimKats, akimMax, nemMax, nemMin, tempMax, tempMin, time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (arm, 150, 1000, 100, 0, 65, 15, int(time.time() * 1000)))
+        # 4 kol için varsayılan kol konfigürasyonları
+        for arm in range(1, 5):
+            db.execute_query('''
+                INSERT OR IGNORE INTO armconfigs 
+                (armValue, akimKats, akimMax, nemMax, nemMin, tempMax, tempMin, time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (arm, 150, 1000, 100, 0, 65, 15, int(time.time() * 1000))).result()
         
         print("✓ Varsayılan konfigürasyon değerleri yüklendi")
     except Exception as e:
@@ -526,15 +308,14 @@ def load_default_configs():
 def save_batconfig_to_db(config_data):
     """Batarya konfigürasyonunu veritabanına kaydet ve cihaza gönder"""
     try:
-        with db_lock:
-            db.execute_query('''
-                INSERT OR REPLACE INTO batconfigs 
-                (armValue, Vmin, Vmax, Vnom, Rintnom, Tempmin_D, Tempmax_D, Tempmin_PN, Tempmaks_PN, Socmin, Sohmin, time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (config_data['armValue'], config_data['Vmin'], config_data['Vmax'], config_data['Vnom'], 
-                  config_data['Rintnom'], config_data['Tempmin_D'], config_data['Tempmax_D'], 
-                  config_data['Tempmin_PN'], config_data['Tempmaks_PN'], config_data['Socmin'], 
-                  config_data['Sohmin'], config_data['time']))
+        db.execute_query('''
+            INSERT OR REPLACE INTO batconfigs 
+            (armValue, Vmin, Vmax, Vnom, Rintnom, Tempmin_D, Tempmax_D, Tempmin_PN, Tempmaks_PN, Socmin, Sohmin, time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (config_data['armValue'], config_data['Vmin'], config_data['Vmax'], config_data['Vnom'], 
+              config_data['Rintnom'], config_data['Tempmin_D'], config_data['Tempmax_D'], 
+              config_data['Tempmin_PN'], config_data['Tempmaks_PN'], config_data['Socmin'], 
+              config_data['Sohmin'], config_data['time'])).result()
         
         print(f"✓ Kol {config_data['armValue']} batarya konfigürasyonu veritabanına kaydedildi")
         send_batconfig_to_device(config_data)
@@ -544,14 +325,13 @@ def save_batconfig_to_db(config_data):
 def save_armconfig_to_db(config_data):
     """Kol konfigürasyonunu veritabanına kaydet ve cihaza gönder"""
     try:
-        with db_lock:
-            db.execute_query('''
-                INSERT OR REPLACE INTO armconfigs 
-                (armValue, akimKats, akimMax, nemMax, nemMin, tempMax, tempMin, time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (config_data['armValue'], config_data['akimKats'], config_data['akimMax'], 
-                  config_data['nemMax'], config_data['nemMin'], config_data['tempMax'], 
-                  config_data['tempMin'], config_data['time']))
+        db.execute_query('''
+            INSERT OR REPLACE INTO armconfigs 
+            (armValue, akimKats, akimMax, nemMax, nemMin, tempMax, tempMin, time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (config_data['armValue'], config_data['akimKats'], config_data['akimMax'], 
+              config_data['nemMax'], config_data['nemMin'], config_data['tempMax'], 
+              config_data['tempMin'], config_data['time'])).result()
         
         print(f"✓ Kol {config_data['armValue']} konfigürasyonu veritabanına kaydedildi")
         send_armconfig_to_device(config_data)
@@ -562,45 +342,12 @@ def send_batconfig_to_device(config_data):
     """Batarya konfigürasyonunu cihaza gönder"""
     try:
         # UART paketi hazırla: Header(0x81) + Arm + Dtype(0x7C) + tüm parametreler + CRC
-        config_packet = bytearray([0x81])  # Header
-        
-        # Arm değerini ekle
-        arm_value = int(config_data['armValue']) & 0xFF
-        config_packet.append(arm_value)
-        
-        # Dtype ekle
-        config_packet.append(0x7C)
-        
-        # Float değerleri 2 byte olarak hazırla (1 byte tam kısım, 1 byte ondalık kısım)
+        config_packet = build_batconfig_packet(config_data)
+        crc = config_packet[-1]
         vnom = float(str(config_data['Vnom']))
         vmax = float(str(config_data['Vmax']))
         vmin = float(str(config_data['Vmin']))
         
-        # Float değerleri ekle (Vnom, Vmax, Vmin)
-        config_packet.extend([
-            int(vnom) & 0xFF,                # Vnom tam kısım
-            int((vnom % 1) * 100) & 0xFF,    # Vnom ondalık kısım
-            int(vmax) & 0xFF,                # Vmax tam kısım
-            int((vmax % 1) * 100) & 0xFF,    # Vmax ondalık kısım
-            int(vmin) & 0xFF,                # Vmin tam kısım
-            int((vmin % 1) * 100) & 0xFF     # Vmin ondalık kısım
-        ])
-        
-        # 1 byte değerleri ekle
-        config_packet.extend([
-            int(config_data['Rintnom']) & 0xFF,
-            int(config_data['Tempmin_D']) & 0xFF,
-            int(config_data['Tempmax_D']) & 0xFF,
-            int(config_data['Tempmin_PN']) & 0xFF,
-            int(config_data['Tempmaks_PN']) & 0xFF,
-            int(config_data['Socmin']) & 0xFF,
-            int(config_data['Sohmin']) & 0xFF
-        ])
-        
-        # CRC hesapla (tüm byte'ların toplamı)
-        crc = sum(config_packet) & 0xFF
-        config_packet.append(crc)
-        
         # Detaylı log
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         print(f"\n*** BATARYA KONFİGÜRASYONU GÖNDERİLİYOR - {timestamp} ***")
@@ -631,35 +378,11 @@ def send_armconfig_to_device(config_data):
     """Kol konfigürasyonunu cihaza gönder"""
     try:
         # UART paketi hazırla: Header(0x81) + Arm + Dtype(0x7B) + tüm parametreler + CRC
-        config_packet = bytearray([0x81])  # Header
-        
-        # Arm değerini ekle
-        arm_value = int(config_data['armValue']) & 0xFF
-        config_packet.append(arm_value)
-        
-        # Dtype ekle (0x7B)
-        config_packet.append(0x7B)
-        
-        # akimMax değerini 3 haneli formata çevir
+        config_packet = build_armconfig_packet(config_data)
+        crc = config_packet[-1]
         akimMax = int(config_data['akimMax'])
         akimMax_str = f"{akimMax:03d}"  # 3 haneli string formatı (örn: 045, 126)
         
-        # ArmConfig değerlerini ekle
-        config_packet.extend([
-            int(config_data['akimKats']) & 0xFF,    # akimKats
-            int(akimMax_str[0]) & 0xFF,            # akimMax1 (ilk hane)
-            int(akimMax_str[1]) & 0xFF,            # akimMax2 (ikinci hane)
-            int(akimMax_str[2]) & 0xFF,            # akimMax3 (üçüncü hane)
-            int(config_data['nemMax']) & 0xFF,      # nemMax
-            int(config_data['nemMin']) & 0xFF,      # nemMin
-            int(config_data['tempMax']) & 0xFF,     # tempMax
-            int(config_data['tempMin']) & 0xFF      # tempMin
-        ])
-        
-        # CRC hesapla (tüm byte'ların toplamı)
-        crc = sum(config_packet) & 0xFF
-        config_packet.append(crc)
-        
         # Detaylı log
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         print(f"\n*** KOL KONFİGÜRASYONU GÖNDERİLİYOR - {timestamp} ***")
@@ -685,41 +408,6 @@ def send_armconfig_to_device(config_data):
     except Exception as e:
         print(f"Kol konfigürasyonu cihaza gönderilirken hata: {e}")
 
-def wave_uart_send(pi, gpio_pin, data_bytes, bit_time):
-    """Bit-banging UART ile veri gönder"""
-    try:
-        # Start bit (0) + data bits + stop bit (1)
-        wave_data = []
-        
-        for byte in data_bytes:
-            # Start bit
-            wave_data.append(pigpio.pulse(0, 1 << gpio_pin, bit_time))
-            # Data bits (LSB first)
-            for i in range(8):
-                bit = (byte >> i) & 1
-                if bit:
-                    wave_data.append(pigpio.pulse(1 << gpio_pin, 0, bit_time))
-                else:
-                    wave_data.append(pigpio.pulse(0, 1 << gpio_pin, bit_time))
-            # Stop bit
-            wave_data.append(pigpio.pulse(1 << gpio_pin, 0, bit_time))
-        
-        # Wave oluştur ve gönder
-        pi.wave_clear()
-        pi.wave_add_generic(wave_data)
-        wave_id = pi.wave_create()
-        pi.wave_send_once(wave_id)
-        
-        # Wave'i temizle
-        pi.wave_delete(wave_id)
-        
-        # UART gönderim log'u
-        print(f"  → UART Gönderim: GPIO{TX_PIN}, {len(data_bytes)} byte, {BAUD_RATE} baud")
-        print(f"  → Wave ID: {wave_id}, Wave Data: {len(wave_data)} pulse")
-        
-    except Exception as e:
-        print(f"UART gönderim hatası: {e}")
-
 def config_worker():
     """Konfigürasyon değişikliklerini işle"""
     while True:
@@ -746,6 +434,7 @@ def config_worker():
             time.sleep(1)
 
 def main():
+    configure_logging()
     try:
         # Konfigürasyon tablolarını başlat
         initialize_config_tables()
@@ -785,6 +474,7 @@ def main():
 
     except KeyboardInterrupt:
         print("\nProgram sonlandırılıyor...")
+        print(f"Ingest kuyruğu: {data_queue.stats()}")
 
     finally:
         if 'pi' in locals():
@@ -794,6 +484,14 @@ def main():
             except pigpio.error:
                 print("Bit-bang UART zaten kapalı.")
             pi.stop()
+        # Önce db_worker'ı durdur: kuyrukta kalanları işleyip çıksın, son
+        # flush ve kapatma compactor'a tek thread'den dokunsun
+        if 'db_thread' in locals():
+            data_queue.put(None)
+            db_thread.join()
+        # Tampondaki ölçümleri ve kuyruktaki yazmaları bitir
+        flush_battery_data()
+        db.close()
 
 if __name__ == '__main__':
     print("Program başlatıldı ==>")
@@ -4,24 +4,54 @@ import time
 import datetime
 import threading
 import queue
-import math
-import pigpio
 import json
 import os
-import socket
 import struct
 import sys
-from collections import defaultdict
+from uart_frame_decoder import UARTFrameDecoder
+from ingest_queue import IngestQueue
+from battery_store import BatteryStore
+from register_map import RegisterImage, RegisterMap
+from modbus_async_server import AsyncModbusServer
+from modbus_functions import ModbusFunctions
+from alarm_state import AlarmState
+from device_config import (ConfigRegisters, ConfigStorage, build_armconfig_packet, build_batconfig_packet,
+                           wave_uart_send)
+from system_log import DEBUG, RateLimitedSampler, configure_logging, get_logger
+from serial_ingest import SerialIngest, load_pigpio
+from battery_packet import BatteryPacket
+from packet_handlers import PacketSink, dispatch_packet
+from snmp_battery_subtree import BATTERY_SUBTREE, BatterySubtreeIndex, battery_subtree_class
+from snmp_schema import ARM4_COUNT, encode_battery_value, scalar_syntax
+from bacs_tables import BACS2, BACS_MODULE_TABLE, BACS_STRING_TABLE, BacsModuleTable, BacsStringTable
+from snmp_trap_server import SNMPTrapServer
+from soc_estimator import soc_entries
+from period_accumulator import PeriodAccumulator
 
 # SNMP imports
 from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp, context
 from pysnmp.carrier.asyncio.dgram import udp
 from pysnmp.proto.api import v2c
+from pysnmp.smi import exval
+
+pigpio = load_pigpio()
+
+# Alt sistem logger'ları
+ingest_log = get_logger('ingest')
+ram_log = get_logger('ram')
+modbus_log = get_logger('modbus')
+snmp_log = get_logger('snmp')
+ram_write_sampler = RateLimitedSampler(ram_log)
+modbus_request_sampler = RateLimitedSampler(modbus_log)
 
 # Global variables
-buffer = bytearray()
-data_queue = queue.Queue()
+frame_decoder = UARTFrameDecoder()
+# Sınırlı ingest kuyruğu: tüketici yetişemezse aynı (arm, k, dtype) ölçümleri
+# birleştirilir, yine dolarsa en eski paket atılır (data_queue.stats())
+INGEST_CAPACITY = 4096
+INGEST_POLICY = 'coalesce'  # veya 'drop_oldest'
+data_queue = IngestQueue(INGEST_CAPACITY, INGEST_POLICY)
 RX_PIN = 16
 TX_PIN = 26
 BAUD_RATE = 9600
@@ -34,9 +64,22 @@ last_k_value = None  # Son gelen verinin k değerini tutar
 last_k_value_lock = threading.Lock()  # Thread-safe erişim için
 
 # RAM'de veri tutma sistemi
-battery_data_ram = defaultdict(dict)  # {arm: {k: {dtype: value}}}
 arm_slave_counts_ram = {1: 0, 2: 0, 3: 0, 4: 0}  # Her kol için batarya sayısı
 data_lock = threading.Lock()  # Thread-safe erişim için
+# Okuyucular periyot sonunda veya PUBLISH_EVERY yazmada bir yayınlanan kuşağı görür
+PUBLISH_EVERY = 64
+battery_store = BatteryStore(lock=data_lock, publish_every=PUBLISH_EVERY)  # (arm, k, dtype) -> slot
+# data_processor değerleri periyot boyunca tamponlar, periyot sonunda tek yazımla depoya aktarır
+period_accumulator = PeriodAccumulator(battery_store, derive=soc_entries)
+register_map = RegisterMap(arm_slave_counts_ram)  # Modbus adresi -> slot
+register_image = RegisterImage(battery_store, register_map)  # FC3/FC4 için hazır register görüntüsü
+alarm_state = AlarmState()  # FC1/FC2 alarm ve balans bitleri
+config_registers = ConfigRegisters()  # FC6/FC16/FC23 batconfigs/armconfigs
+config_storage = ConfigStorage()  # main-ornek.py'nin batconfigs/armconfigs tabloları
+config_send_queue = queue.Queue()  # (kind, arm) -> config_sender thread'i
+battery_subtree_index = BatterySubtreeIndex(battery_store, arm_slave_counts_ram)  # SNMP 1.3.6.5.10
+bacs_module_table = BacsModuleTable(battery_store, arm_slave_counts_ram, alarm_state)  # bacs2.mib
+bacs_string_table = BacsStringTable(battery_store, arm_slave_counts_ram, alarm_state)
 
 # Dinamik veri indeksleme sistemi
 def get_dynamic_data_index(arm, battery_num, data_type):
@@ -72,212 +115,45 @@ def get_dynamic_data_index(arm, battery_num, data_type):
 
 def get_dynamic_data_by_index(start_index, quantity):
     """Dinamik veri indeksine göre veri döndür"""
-    with data_lock:
-        result = []
-        current_index = start_index  # start_index'ten başla
-        
-        print(f"DEBUG: get_dynamic_data_by_index start={start_index}, quantity={quantity}")
-        print(f"DEBUG: arm_slave_counts_ram = {arm_slave_counts_ram}")
-        
-        # Armslavecounts'a göre sıralı veri oluştur - sadece bataryası olan kolları işle
-        for arm in range(1, 5):  # Kol 1-4
-            if arm_slave_counts_ram.get(arm, 0) == 0:
-                print(f"DEBUG: Kol {arm} atlandı (batarya yok)")
-                continue  # Bu kolda batarya yok, atla
-                
-            print(f"DEBUG: Kol {arm} işleniyor...")
-            print(f"DEBUG: battery_data_ram[{arm}] = {battery_data_ram.get(arm, 'YOK')}")
-            
-            # Kol verileri (akım, nem, sıcaklık, sıcaklık2)
-            for data_type in range(1, 5):
-                print(f"DEBUG: current_index={current_index}, start_index={start_index}, len(result)={len(result)}, quantity={quantity}")
-                if current_index >= start_index and len(result) < quantity:
-                    print(f"DEBUG: IF BLOĞU GİRİLDİ!")
-                    print(f"DEBUG: get_battery_data_ram({arm}) çağrılıyor...")
-                    try:
-                        # data_lock zaten alınmış, direkt erişim
-                        arm_data = dict(battery_data_ram.get(arm, {}))
-                        print(f"DEBUG: arm_data = {arm_data}")
-                        print(f"DEBUG: arm_data type = {type(arm_data)}")
-                    except Exception as e:
-                        print(f"DEBUG: HATA! arm_data okuma hatası: {e}")
-                        arm_data = None
-                    if arm_data and 2 in arm_data:  # k=2 (kol verisi)
-                        print(f"DEBUG: k=2 verisi bulundu!")
-                        if data_type == 1:  # Akım
-                            value = arm_data[2].get(10, {}).get('value', 0)  # dtype=10 (A)
-                        elif data_type == 2:  # Nem
-                            value = arm_data[2].get(11, {}).get('value', 0)  # dtype=11 (B)
-                        elif data_type == 3:  # Sıcaklık
-                            value = arm_data[2].get(12, {}).get('value', 0)  # dtype=12 (C)
-                        elif data_type == 4:  # Sıcaklık2
-                            value = arm_data[2].get(13, {}).get('value', 0)  # dtype=13 (D)
-                        else:
-                            value = 0
-                        result.append(float(value) if value else 0.0)
-                        print(f"DEBUG: current_index={current_index}, data_type={data_type}, value={value}")
-                    else:
-                        print(f"DEBUG: k=2 verisi bulunamadı!")
-                        result.append(0.0)
-                        print(f"DEBUG: current_index={current_index}, data_type={data_type}, value=0.0 (veri yok)")
-                else:
-                    print(f"DEBUG: IF BLOĞU GİRİLMEDİ!")
-                current_index += 1
-                
-                if len(result) >= quantity:
-                    break
-                    
-            if len(result) >= quantity:
-                break
-                
-            # Batarya verileri
-            battery_count = arm_slave_counts_ram.get(arm, 0)
-            print(f"DEBUG: Kol {arm} batarya sayısı: {battery_count}")
-            for battery_num in range(1, battery_count + 1):
-                print(f"DEBUG: Batarya {battery_num} işleniyor...")
-                k_value = battery_num + 2  # k=3,4,5,6...
-                print(f"DEBUG: k_value = {k_value}")
-                # data_lock zaten alınmış, direkt erişim
-                arm_data = dict(battery_data_ram.get(arm, {}))
-                print(f"DEBUG: arm_data = {arm_data}")
-                if arm_data and k_value in arm_data:
-                    print(f"DEBUG: k={k_value} verisi bulundu!")
-                    # Her batarya için 7 veri tipi
-                    for data_type in range(5, 12):  # 5-11 (gerilim, soc, rint, soh, ntc1, ntc2, ntc3)
-                        print(f"DEBUG: current_index={current_index}, start_index={start_index}, len(result)={len(result)}, quantity={quantity}")
-                        if current_index >= start_index and len(result) < quantity:
-                            print(f"DEBUG: BATARYA IF BLOĞU GİRİLDİ!")
-                            if data_type == 5:  # Gerilim
-                                value = arm_data[k_value].get(10, {}).get('value', 0)  # dtype=10 (A)
-                            elif data_type == 6:  # SOC
-                                value = arm_data[k_value].get(15, {}).get('value', 0)  # dtype=15 (F)
-                            elif data_type == 7:  # Rint
-                                value = arm_data[k_value].get(11, {}).get('value', 0)  # dtype=11 (B)
-                            elif data_type == 8:  # SOH
-                                value = arm_data[k_value].get(126, {}).get('value', 0)  # dtype=126 (SOH)
-                            elif data_type == 9:  # NTC1
-                                value = arm_data[k_value].get(12, {}).get('value', 0)  # dtype=12 (C)
-                            elif data_type == 10:  # NTC2
-                                value = arm_data[k_value].get(13, {}).get('value', 0)  # dtype=13 (D)
-                            elif data_type == 11:  # NTC3
-                                value = arm_data[k_value].get(14, {}).get('value', 0)  # dtype=14 (E)
-                            else:
-                                value = 0
-                            result.append(float(value) if value else 0.0)
-                            print(f"DEBUG: current_index={current_index}, arm={arm}, bat={battery_num}, data_type={data_type}, value={value}")
-                        else:
-                            print(f"DEBUG: BATARYA IF BLOĞU GİRİLMEDİ!")
-                        current_index += 1
-                        
-                        if len(result) >= quantity:
-                            break
-                else:
-                    print(f"DEBUG: k={k_value} verisi bulunamadı!")
-                            
-                if len(result) >= quantity:
-                    break
-                    
-            if len(result) >= quantity:
-                break
-                
-        print(f"DEBUG: Sonuç: {result}")
-        return result
+    # Kilitsiz okuma: tüm istek son yayınlanan kuşaktan ve register düzeninden cevaplanır
+    result = register_map.read(battery_store.snapshot, start_index, quantity)
+    modbus_log.debug("get_dynamic_data_by_index start=%d, quantity=%d: %s", start_index, quantity, result)
+    return result
 
 def get_dynamic_register_names(start_index, quantity):
     """Dinamik register isimlerini oluştur"""
-    names = []
-    current_index = start_index
-    
-    # Armslavecounts'a göre sıralı isim oluştur
-    for arm in range(1, 5):  # Kol 1-4
-        if arm_slave_counts_ram.get(arm, 0) == 0:
-            continue  # Bu kolda batarya yok, atla
-            
-        # Kol verileri (akım, nem, sıcaklık, sıcaklık2)
-        for data_type in range(1, 5):
-            if current_index >= start_index and len(names) < quantity:
-                if data_type == 1:  # Akım
-                    names.append(f"Kol{arm}_Akım(A)")
-                elif data_type == 2:  # Nem
-                    names.append(f"Kol{arm}_Nem(%)")
-                elif data_type == 3:  # Sıcaklık
-                    names.append(f"Kol{arm}_Sıcaklık(°C)")
-                elif data_type == 4:  # Sıcaklık2
-                    names.append(f"Kol{arm}_Sıcaklık2(°C)")
-            current_index += 1
-            
-            if len(names) >= quantity:
-                break
-                
-        if len(names) >= quantity:
-            break
-            
-        # Batarya verileri
-        battery_count = arm_slave_counts_ram.get(arm, 0)
-        for battery_num in range(1, battery_count + 1):
-            # Her batarya için 7 veri tipi
-            for data_type in range(5, 12):  # 5-11 (gerilim, soc, rint, soh, ntc1, ntc2, ntc3)
-                if current_index >= start_index and len(names) < quantity:
-                    if data_type == 5:  # Gerilim
-                        names.append(f"Kol{arm}_Bat{battery_num}_Gerilim(V)")
-                    elif data_type == 6:  # SOC
-                        names.append(f"Kol{arm}_Bat{battery_num}_SOC(%)")
-                    elif data_type == 7:  # Rint
-                        names.append(f"Kol{arm}_Bat{battery_num}_Rint(Ω)")
-                    elif data_type == 8:  # SOH
-                        names.append(f"Kol{arm}_Bat{battery_num}_SOH(%)")
-                    elif data_type == 9:  # NTC1
-                        names.append(f"Kol{arm}_Bat{battery_num}_NTC1(°C)")
-                    elif data_type == 10:  # NTC2
-                        names.append(f"Kol{arm}_Bat{battery_num}_NTC2(°C)")
-                    elif data_type == 11:  # NTC3
-                        names.append(f"Kol{arm}_Bat{battery_num}_NTC3(°C)")
-                current_index += 1
-                
-                if len(names) >= quantity:
-                    break
-                    
-            if len(names) >= quantity:
-                break
-                
-        if len(names) >= quantity:
-            break
-            
-    return names
+    return register_map.name_range(start_index, quantity)
+
+def rebuild_register_map():
+    """armslavecounts değiştiyse register düzenini yeniden oluştur (data_lock altında)"""
+    global register_map
+    counts = dict(arm_slave_counts_ram)
+    if counts != register_map.counts:
+        # Tek referans ataması: istekler ya eski ya yeni düzeni görür
+        register_map = RegisterMap(counts)
+        register_image.set_map(register_map)
+        bacs_module_table.set_counts(counts)
+        bacs_string_table.set_counts(counts)
+        modbus_log.info("Register düzeni yeniden oluşturuldu: %d register", len(register_map))
 
 # Modbus TCP server ayarları
 MODBUS_TCP_PORT = 1502  # Port 1502 kullan (SNMP ile uyumlu)
 MODBUS_TCP_HOST = '0.0.0.0'
+MODBUS_MAX_CONNECTIONS = 32  # Aynı anda bağlı SCADA istemcisi sınırı
+MODBUS_IDLE_TIMEOUT = 60.0   # İstek gelmeyen bağlantı bu süre sonra kapatılır (s)
 
 # SNMP Agent ayarları
 SNMP_PORT = 1161
 SNMP_HOST = '0.0.0.0'  # Dışarıdan erişim için 0.0.0.0
 
-def Calc_SOC(x):
-    if x is None:
-        return None
-        
-    a1, a2, a3, a4 = 112.1627, 14.3937, 0, 10.5555
-    b1, b2, b3, b4 = 14.2601, 11.6890, 12.7872, 10.9406
-    c1, c2, c3, c4 = 1.8161, 0.8211, 0.0025, 0.3866
-    
-    try:
-        Soctahmin = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2)
-        )
-        
-        if Soctahmin > 100.0:
-            Soctahmin = 100.0
-        elif Soctahmin < 0.0:
-            Soctahmin = 0.0
-            
-        return round(Soctahmin, 4)
-    except Exception as e:
-        print(f"SOC hesaplama hatası: {str(e)}")
-        return None
+# SNMP Trap ayarları
+TRAP_TARGETS = [
+    ('192.168.137.1', 162),  # Bilgisayarınız
+    # ('192.168.1.100', 162),  # Başka bir sunucu
+]
+TRAP_COMMUNITY = 'public'
+TRAP_KIND = 'trap'  # 'inform': alıcı onaylayana kadar yeniden dene
+TRAP_OUTBOX_PATH = 'trap_outbox.db'  # Gönderilmemiş bildirimler (yeniden başlatmada gönderilir)
 
 pi = pigpio.pi()
 pi.set_mode(TX_PIN, pigpio.OUTPUT)
@@ -317,168 +193,91 @@ def get_last_k_value():
         return last_k_value
 
 def update_battery_data_ram(arm, k, dtype, value):
-    """RAM'deki batarya verilerini güncelle"""
-    with data_lock:
-        if arm not in battery_data_ram:
-            battery_data_ram[arm] = {}
-        if k not in battery_data_ram[arm]:
-            battery_data_ram[arm][k] = {}
-        
-        battery_data_ram[arm][k][dtype] = {
-            'value': value,
-            'timestamp': int(time.time() * 1000)
-        }
-        
-        print(f"RAM'e kaydedildi: Arm={arm}, k={k}, dtype={dtype}, value={value}")
+    """Değeri periyot tamponuna ekle (commit_period() ile RAM'e yazılır)"""
+    period_accumulator.stage(arm, k, dtype, value)
+    ram_write_sampler.log("RAM'e kaydedildi: Arm=%s, k=%s, dtype=%s, value=%s", arm, k, dtype, value)
+
+def commit_period():
+    """Periyot tamponunu periyot zaman damgasıyla tek kilit işleminde RAM'e yaz ve yayınla"""
+    if current_period_timestamp is None:  # Henüz periyot başlamadı
+        return
+    period_accumulator.commit(current_period_timestamp)
+    battery_store.flush()
 
 def clear_battery_data_ram():
     """RAM'deki tüm batarya verilerini temizle"""
-    with data_lock:
-        battery_data_ram.clear()
-        print("RAM tamamen temizlendi.")
+    battery_store.clear()
+    ram_log.info("RAM tamamen temizlendi.")
 
 def get_battery_data_ram(arm=None, k=None, dtype=None):
     """RAM'den batarya verilerini oku"""
-    with data_lock:
+    result = battery_store.get(arm, k, dtype)
+    if ram_log.isEnabledFor(DEBUG):
         if arm is None:
-            result = dict(battery_data_ram)
-            print(f"RAM'den okundu: Tüm veriler, {len(result)} arm")
-            return result
+            ram_log.debug("RAM'den okundu: Tüm veriler, %d arm", len(result))
         elif k is None:
-            result = dict(battery_data_ram.get(arm, {}))
-            print(f"RAM'den okundu: Arm={arm}, {len(result)} k değeri")
-            return result
+            ram_log.debug("RAM'den okundu: Arm=%s, %d k değeri", arm, len(result))
         elif dtype is None:
-            result = dict(battery_data_ram.get(arm, {}).get(k, {}))
-            print(f"RAM'den okundu: Arm={arm}, k={k}, {len(result)} dtype")
-            return result
+            ram_log.debug("RAM'den okundu: Arm=%s, k=%s, %d dtype", arm, k, len(result))
         else:
-            result = battery_data_ram.get(arm, {}).get(k, {}).get(dtype, None)
-            print(f"RAM'den okundu: Arm={arm}, k={k}, dtype={dtype}, value={result}")
-            return result
-
-def Calc_SOH(x):
-    if x is None:
-        return None
-    
-    try:
-        a1, b1, c1 = 85.918, 0.0181, 0.0083
-        a2, b2, c2 = 85.11, 0.0324, 0.0104
-        a3, b3, c3 = 0.3085, 0.0342, 0.0021
-        a4, b4, c4 = 16.521, 0.0382, 0.0013
-        a5, b5, c5 = -13.874, 0.0381, 0.0011
-        a6, b6, c6 = 40.077, 0.0474, 0.0079
-        a7, b7, c7 = 18.207, 0.0556, 0.0048
-
-        SohSonuc = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2) +
-            a5 * math.exp(-((x - b5) / c5) ** 2) +
-            a6 * math.exp(-((x - b6) / c6) ** 2) +
-            a7 * math.exp(-((x - b7) / c7) ** 2)
-        )
-        
-        if SohSonuc > 100.0:
-            SohSonuc = 100.0
-        
-        return round(SohSonuc, 4)
-    except Exception as e:
-        print(f"SOH hesaplama hatası: {str(e)}")
-        return None
-
-def Calc_SOC(x):
-    if x is None:
-        return None
-        
-    a1, a2, a3, a4 = 112.1627, 14.3937, 0, 10.5555
-    b1, b2, b3, b4 = 14.2601, 11.6890, 12.7872, 10.9406
-    c1, c2, c3, c4 = 1.8161, 0.8211, 0.0025, 0.3866
-    
-    try:
-        Soctahmin = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2)
-        )
-        
-        if Soctahmin > 100.0:
-            Soctahmin = 100.0
-        elif Soctahmin < 0.0:
-            Soctahmin = 0.0
-            
-        return round(Soctahmin, 4)
-    except Exception as e:
-        print(f"SOC hesaplama hatası: {str(e)}")
-        return None
+            ram_log.debug("RAM'den okundu: Arm=%s, k=%s, dtype=%s, value=%s", arm, k, dtype, result)
+    return result
 
 def read_serial(pi):
     """Bit-banging ile GPIO üzerinden seri veri oku"""
-    global buffer
     print("\nBit-banging UART veri alımı başladı...")
-    
-    buffer.clear()
 
-    while True:
-        try:
-            (count, data) = pi.bb_serial_read(RX_PIN)
-            if count > 0:
-                buffer.extend(data)
-                
-                while len(buffer) >= 3:
-                    try:
-                        # Header (0x80 veya 0x81) bul
-                        header_index = -1
-                        for i, byte in enumerate(buffer):
-                            if byte == 0x80 or byte == 0x81:
-                                header_index = i
-                                break
-                        
-                        if header_index == -1:
-                            buffer.clear()
-                            break
-
-                        if header_index > 0:
-                            buffer = buffer[header_index:]
-
-                        # Paket uzunluğunu belirle
-                        if len(buffer) >= 3:
-                            dtype = buffer[2]
-                            
-                            # 5 byte'lık missing data paketi kontrolü
-                            if dtype == 0x7F and len(buffer) >= 5:
-                                packet_length = 5
-                            # 6 byte'lık paket kontrolü
-                            elif len(buffer) >= 6 and (buffer[2] == 0x0F or buffer[1] == 0x7E or (buffer[2] == 0x7D and buffer[1] == 2)):
-                                packet_length = 6
-                            elif dtype == 0x7D and len(buffer) >= 7 and buffer[1] > 2:
-                                packet_length = 7
-                            else:
-                                packet_length = 11
-
-                            if len(buffer) >= packet_length:
-                                packet = buffer[:packet_length]
-                                buffer = buffer[packet_length:]
-                                hex_packet = [f"{b:02x}" for b in packet]
-                                data_queue.put(hex_packet)
-                            else:
-                                # Paket tamamlanmamış, daha fazla veri bekle
-                                break
-                        else:
-                            break
-
-                    except Exception as e:
-                        print(f"Paket işleme hatası: {e}")
-                        buffer.clear()
-                        continue
-
-            time.sleep(0.01)
+    ingest = SerialIngest(
+        pi, RX_PIN, BAUD_RATE, frame_decoder,
+        lambda frame: data_queue.put(BatteryPacket(frame)),
+        falling_edge=pigpio.FALLING_EDGE
+    )
+    ingest.run()
+
+class RAMPacketSink(PacketSink):
+    """Çözülmüş paketleri RAM'e kaydeden hedef"""
+
+    def begin_measurement(self, k_value):
+        # k_value 2 geldiğinde yeni periyot başlat (ard arda gelmemesi şartıyla)
+        if k_value == 2:
+            if get_last_k_value() != 2:  # Non-consecutive arm data
+                # Biten periyodu (SOC dahil) tek seferde yaz ve okuyuculara yayınla
+                commit_period()
+                reset_period()
+                period_accumulator.begin(get_period_timestamp())
+            update_last_k_value(2)
+        else:  # Battery data
+            update_last_k_value(k_value)
+
+    def on_value(self, arm_value, k_value, dtype, value):
+        update_battery_data_ram(arm_value, k_value, dtype, value)
+
+    # on_voltage: PacketSink varsayılanı dtype=10 yazar; SOC (dtype=126)
+    # commit_period()'da periyodun tüm gerilimlerinden tek batch ile türetilir
+
+    def on_arm_slave_counts(self, counts):
+        super().on_arm_slave_counts(counts)
+
+        # RAM'de armslavecounts güncelle
+        with data_lock:
+            arm_slave_counts_ram.update(counts)
+            rebuild_register_map()
 
-        except Exception as e:
-            print(f"Veri okuma hatası: {e}")
-            time.sleep(1)
+        ram_log.info("Armslavecounts RAM'e kaydedildi: %s", arm_slave_counts_ram)
+
+    def on_balance(self, arm_value, slave_value, status_value):
+        super().on_balance(arm_value, slave_value, status_value)
+        alarm_state.apply_balance(arm_value, slave_value, status_value)
+
+    def on_hatkon_alarm(self, arm_value, error_msb):
+        super().on_hatkon_alarm(arm_value, error_msb)
+        alarm_state.apply_hatkon(arm_value, error_msb)
+
+    def on_batkon_alarm(self, packet, arm_value, battery, error_msb, error_lsb):
+        super().on_batkon_alarm(packet, arm_value, battery, error_msb, error_lsb)
+        alarm_state.apply_batkon(arm_value, battery, error_msb, error_lsb)
+
+ram_sink = RAMPacketSink()
 
 def data_processor():
     """Gelen verileri işle ve RAM'e kaydet"""
@@ -486,297 +285,69 @@ def data_processor():
     
     while True:
         try:
-            data = data_queue.get(timeout=1)
-            if data is None:
+            packet = data_queue.get(timeout=1)
+            if packet is None:
                 break
             
             # Veri alındığında zaman damgasını güncelle
             last_data_received = time.time()
-        
-            # 7 byte Batkon alarm verisi kontrolü
-            if len(data) == 7:
-                raw_bytes = [int(b, 16) for b in data]
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                
-                print(f"\n*** BATKON ALARM VERİSİ ALGILANDI - {timestamp} ***")
-                print(f"Ham Veri: {data}")
-                continue
-
-            # 5 byte'lık missing data verisi kontrolü
-            if len(data) == 5:
-                raw_bytes = [int(b, 16) for b in data]
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                
-                print(f"\n*** MISSING DATA VERİSİ ALGILANDI - {timestamp} ***")
-                continue
-
-            # 11 byte'lık veri kontrolü
-            if len(data) == 11:
-                arm_value = int(data[3], 16)
-                dtype = int(data[2], 16)
-                k_value = int(data[1], 16)
-                
-                # k_value 2 geldiğinde yeni periyot başlat (ard arda gelmemesi şartıyla)
-                if k_value == 2:
-                    if get_last_k_value() != 2:  # Non-consecutive arm data
-                        reset_period()
-                        get_period_timestamp()
-                    update_last_k_value(2)
-                else:  # Battery data
-                    update_last_k_value(k_value)
-                
-                # Arm değeri kontrolü
-                if arm_value not in [1, 2, 3, 4]:
-                    print(f"\nHATALI ARM DEĞERİ: {arm_value}")
-                    continue
-                
-                # Salt data hesapla
-                if dtype == 11 and k_value == 2:  # Nem hesapla
-                    onlar = int(data[5], 16)
-                    birler = int(data[6], 16)
-                    kusurat1 = int(data[7], 16)
-                    kusurat2 = int(data[8], 16)
-                    
-                    tam_kisim = (onlar * 10 + birler)
-                    kusurat_kisim = (kusurat1 * 0.1 + kusurat2 * 0.01)
-                    salt_data = tam_kisim + kusurat_kisim
-                    salt_data = round(salt_data, 4)
-                else:
-                    # Normal hesaplama
-                    saltData = int(data[4], 16) * 100 + int(data[5], 16) * 10 + int(data[6], 16) + int(data[7], 16) * 0.1 + int(data[8], 16) * 0.01 + int(data[9], 16) * 0.001
-                    salt_data = round(saltData, 4)
-                
-                # Veri işleme ve RAM'e kayıt
-                if dtype == 10:  # Gerilim
-                    # Ham gerilim verisini kaydet
-                    update_battery_data_ram(arm_value, k_value, 10, salt_data)
-                    
-                    # SOC hesapla ve dtype=126'ya kaydet
-                    if k_value != 2:  # k_value 2 değilse SOC hesapla
-                        soc_value = Calc_SOC(salt_data)
-                        update_battery_data_ram(arm_value, k_value, 126, soc_value)
-                
-                elif dtype == 11:  # SOH veya Nem
-                    if k_value == 2:  # Nem verisi
-                        print(f"*** VERİ ALGILANDI - Arm: {arm_value}, Nem: {salt_data}% ***")
-                        update_battery_data_ram(arm_value, k_value, 11, salt_data)
-                    else:  # SOH verisi
-                        if int(data[4], 16) == 1:  # Eğer data[4] 1 ise SOH 100'dür
-                            soh_value = 100.0
-                        else:
-                            onlar = int(data[5], 16)
-                            birler = int(data[6], 16)
-                            kusurat1 = int(data[7], 16)
-                            kusurat2 = int(data[8], 16)
-                            
-                            tam_kisim = (onlar * 10 + birler)
-                            kusurat_kisim = (kusurat1 * 0.1 + kusurat2 * 0.01)
-                            soh_value = tam_kisim + kusurat_kisim
-                            soh_value = round(soh_value, 4)
-                        
-                        # SOH verisini dtype=11'e kaydet
-                        update_battery_data_ram(arm_value, k_value, 11, soh_value)
-                
-                elif dtype == 12:  # NTC1
-                    update_battery_data_ram(arm_value, k_value, 12, salt_data)
-                
-                elif dtype == 13:  # NTC2
-                    update_battery_data_ram(arm_value, k_value, 13, salt_data)
-                
 
-                
-                else:  # Diğer Dtype değerleri için
-                    update_battery_data_ram(arm_value, k_value, dtype, salt_data)
-
-            # 6 byte'lık balans komutu veya armslavecounts kontrolü
-            elif len(data) == 6:
-                raw_bytes = [int(b, 16) for b in data]
-                
-                # Slave sayısı verisi: 2. byte (index 1) 0x7E ise
-                if raw_bytes[1] == 0x7E:
-                    arm1, arm2, arm3, arm4 = raw_bytes[2], raw_bytes[3], raw_bytes[4], raw_bytes[5]
-                    print(f"armslavecounts verisi tespit edildi: arm1={arm1}, arm2={arm2}, arm3={arm3}, arm4={arm4}")
-                    
-                    # RAM'de armslavecounts güncelle
-                    with data_lock:
-                        arm_slave_counts_ram[1] = arm1
-                        arm_slave_counts_ram[2] = arm2
-                        arm_slave_counts_ram[3] = arm3
-                        arm_slave_counts_ram[4] = arm4
-                    
-                    print(f"✓ Armslavecounts RAM'e kaydedildi: {arm_slave_counts_ram}")
-                    continue
-                
-                # Balans verisi: 3. byte (index 2) 0x0F ise
-                elif raw_bytes[2] == 0x0F:
-                    print(f"Balans verisi tespit edildi")
-                    continue
-                
-                # Hatkon alarmı: 3. byte (index 2) 0x7D ise
-                elif raw_bytes[2] == 0x7D:
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    print(f"\n*** HATKON ALARM VERİSİ ALGILANDI - {timestamp} ***")
-                    continue
+            dispatch_packet(packet, ram_sink)
 
             data_queue.task_done()
             
         except queue.Empty:
+            # Veri akışı durdu: yarım kalan periyodu da yayınla
+            commit_period()
             continue
         except Exception as e:
-            print(f"\ndata_processor'da beklenmeyen hata: {e}")
+            ingest_log.exception("data_processor'da beklenmeyen hata: %s", e)
             continue
 
 def modbus_tcp_server():
-    """Modbus TCP server - cihazlardan gelen istekleri dinle"""
+    """Modbus TCP server - cihazlardan gelen istekleri dinle (tek thread, asyncio)"""
     try:
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind((MODBUS_TCP_HOST, MODBUS_TCP_PORT))
-        server_socket.listen(5)
-        
+        server = AsyncModbusServer(
+            MODBUS_TCP_HOST, MODBUS_TCP_PORT, handle_modbus_request,
+            max_connections=MODBUS_MAX_CONNECTIONS, idle_timeout=MODBUS_IDLE_TIMEOUT
+        )
         print(f"Modbus TCP Server başlatıldı: {MODBUS_TCP_HOST}:{MODBUS_TCP_PORT}")
-        
-        while True:
-            try:
-                client_socket, client_address = server_socket.accept()
-                print(f"Yeni bağlantı: {client_address}")
-                
-                # Her bağlantı için ayrı thread
-                client_thread = threading.Thread(
-                    target=handle_modbus_client,
-                    args=(client_socket, client_address),
-                    daemon=True
-                )
-                client_thread.start()
-                
-            except Exception as e:
-                print(f"Modbus TCP server hatası: {e}")
-                continue
-                
+        server.run()
     except Exception as e:
         print(f"Modbus TCP server başlatma hatası: {e}")
 
-def handle_modbus_client(client_socket, client_address):
-    """Modbus TCP client isteklerini işle"""
-    try:
-        while True:
-            # Modbus TCP frame oku
-            data = client_socket.recv(1024)
-            if not data:
-                break
-            
-            if len(data) < 8:  # Minimum Modbus TCP frame boyutu
-                continue
-            
-            # Modbus TCP frame parse et
-            transaction_id = struct.unpack('>H', data[0:2])[0]
-            protocol_id = struct.unpack('>H', data[2:4])[0]
-            length = struct.unpack('>H', data[4:6])[0]
-            unit_id = data[6]
-            function_code = data[7]
-            
-            print(f"Modbus TCP isteği: Transaction={transaction_id}, Function={function_code}, Unit={unit_id}")
-            
-            # Function code 3 (Read Holding Registers) işle
-            if function_code == 3:
-                if len(data) >= 12:
-                    start_address = struct.unpack('>H', data[8:10])[0]
-                    quantity = struct.unpack('>H', data[10:12])[0]
-                    
-                    response = handle_read_holding_registers(transaction_id, unit_id, start_address, quantity)
-                    if response:
-                        client_socket.send(response)
-            
-            # Function code 4 (Read Input Registers) işle
-            elif function_code == 4:
-                if len(data) >= 12:
-                    start_address = struct.unpack('>H', data[8:10])[0]
-                    quantity = struct.unpack('>H', data[10:12])[0]
-                    
-                    response = handle_read_input_registers(transaction_id, unit_id, start_address, quantity)
-                    if response:
-                        client_socket.send(response)
-            
-    except Exception as e:
-        print(f"Client {client_address} işleme hatası: {e}")
-    finally:
-        client_socket.close()
-        print(f"Client {client_address} bağlantısı kapatıldı")
+def handle_modbus_request(transaction_id, unit_id, pdu):
+    """Tek bir Modbus PDU'sunu işle ve cevap ADU'sunu döndür"""
+    modbus_request_sampler.log("Modbus TCP isteği: Transaction=%d, Function=%d, Unit=%d", transaction_id, pdu[0], unit_id)
+    return modbus_functions.handle(transaction_id, unit_id, pdu)
 
-def handle_read_holding_registers(transaction_id, unit_id, start_address, quantity):
-    """Read Holding Registers (Function Code 3) işle"""
-    try:
-        print(f"DEBUG: start_address={start_address}, quantity={quantity}")
-        
-        # Batarya verilerini hazırla
-        registers = []
-        
-        # Start address'e göre veri döndür
-        if start_address == 0:  # Armslavecounts verileri
-            # Register 0'dan başlayarak armslavecounts doldur
-            registers = []
-            with data_lock:
-                for i in range(quantity):
-                    if i < 4:  # İlk 4 register armslavecounts
-                        arm_num = i + 1
-                        registers.append(float(arm_slave_counts_ram.get(arm_num, 0)))
-                    else:
-                        registers.append(0.0)  # Boş register
-            print(f"DEBUG: Armslavecounts verileri: {registers}")
-        elif start_address >= 1:  # Dinamik veri okuma
-            # Dinamik veri sistemi kullan
-            registers = get_dynamic_data_by_index(start_address, quantity)
-            print(f"DEBUG: Dinamik veri (start={start_address}, qty={quantity}): {registers}")
-        else:
-            # Bilinmeyen adres için boş veri
-            registers = [0.0] * quantity
-            print(f"DEBUG: Bilinmeyen adres {start_address}, boş veri: {registers}")
-        
-        # Modbus TCP response hazırla
-        byte_count = len(registers) * 2  # Her register 2 byte
-        response = struct.pack('>HHHBB', 
-                      transaction_id,
-                      0,
-                      byte_count + 3,
-                      unit_id,
-                      3
-                     )
-        response += struct.pack('B', byte_count)
-
-        for reg in registers:
-            # Virgüllü sayıları 100 ile çarpıp integer olarak gönder
-            if reg == int(reg):  # Tam sayı ise
-                response += struct.pack('>H', int(reg))
-            else:  # Virgüllü sayı ise
-                response += struct.pack('>H', int(reg * 100))  # 100 ile çarp
+def send_config_to_device(kind, arm):
+    """Modbus ile değişen batconfig/armconfig'i gönderim kuyruğuna koy
 
-        
-        # Register isimlerini hazırla
-        register_names = []
-        if start_address == 0:
-            register_names = ["Arm1", "Arm2", "Arm3", "Arm4"]
-        elif start_address >= 1:
-            # Dinamik veri isimleri
-            register_names = get_dynamic_register_names(start_address, quantity)
-        else:
-            register_names = ["Bilinmeyen"]
-        
-        print(f"DEBUG: Response hazırlandı, byte_count={byte_count}")
-        print(f"DEBUG: Register Names: {register_names[:len(registers)]}")
-        print(f"DEBUG: Register Values: {registers}")
-        print(f"DEBUG: Modbus Values (100x): {[int(reg * 100) if reg != int(reg) else int(reg) for reg in registers]}")
-        return response
-        
-    except Exception as e:
-        print(f"Read Holding Registers hatası: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    Asyncio döngüsünden çağrılır; kayıt ve bit-bang UART gönderimi
+    config_sender thread'inde yapılır, yazma cevabı beklemez.
+    """
+    config_send_queue.put((kind, arm))
+
+def config_sender():
+    """Kuyruktaki konfigürasyonları veritabanına kaydet ve cihaza gönder"""
+    while True:
+        kind, arm = config_send_queue.get()
+        try:
+            config_data = config_registers.get(kind, arm)
+            modbus_log.info("Modbus %s yazıldı - Kol %s: %s", kind, arm, config_data)
+            config_storage.save(kind, config_data)
+            if kind == 'batconfig':
+                config_packet = build_batconfig_packet(config_data)
+            else:
+                config_packet = build_armconfig_packet(config_data)
+            if modbus_log.isEnabledFor(DEBUG):
+                modbus_log.debug("UART Paketi: %s", [f'0x{b:02X}' for b in config_packet])
+            wave_uart_send(pi, TX_PIN, config_packet, int(1e6 / BAUD_RATE))
+        except Exception as e:
+            modbus_log.error("Konfigürasyon cihaza gönderilirken hata: %s", e)
 
-def handle_read_input_registers(transaction_id, unit_id, start_address, quantity):
-    """Read Input Registers (Function Code 4) işle"""
-    # Şimdilik Read Holding Registers ile aynı
-    return handle_read_holding_registers(transaction_id, unit_id, start_address, quantity)
+modbus_functions = ModbusFunctions(register_image, alarm_state, config_registers, send_config_to_device)
 
 def format_arm_data_for_modbus(arm_data, k_value, quantity):
     """Arm verilerini Modbus register formatına çevir - sadece k=2 (arm) verileri"""
@@ -795,7 +366,7 @@ def format_arm_data_for_modbus(arm_data, k_value, quantity):
         # Sadece k=2 (arm) verilerini kontrol et
         if k_value in arm_data and dtype in arm_data[k_value]:
             value = arm_data[k_value][dtype]['value']
-            print(f"DEBUG: k={k_value} (arm) verisi kullanıldı: dtype={dtype}, value={value}")
+            modbus_log.debug("k=%s (arm) verisi kullanıldı: dtype=%s, value=%s", k_value, dtype, value)
         
         registers.append(value)
     
@@ -818,7 +389,7 @@ def format_specific_battery_data(arm_data, battery_num, quantity):
         # Belirli batarya numarası için veri ara
         if battery_num in arm_data and dtype in arm_data[battery_num]:
             value = arm_data[battery_num][dtype]['value']
-            print(f"DEBUG: Batarya {battery_num} verisi kullanıldı: dtype={dtype}, value={value}")
+            modbus_log.debug("Batarya %s verisi kullanıldı: dtype=%s, value=%s", battery_num, dtype, value)
         
         registers.append(value)
     
@@ -834,7 +405,7 @@ def format_specific_dtype_data(arm_data, battery_num, dtype, quantity):
     # Belirli batarya numarası ve dtype için veri ara
     if battery_num in arm_data and dtype in arm_data[battery_num]:
         value = arm_data[battery_num][dtype]['value']
-        print(f"DEBUG: Batarya {battery_num}, dtype={dtype} verisi kullanıldı: value={value}")
+        modbus_log.debug("Batarya %s, dtype=%s verisi kullanıldı: value=%s", battery_num, dtype, value)
     
     # Quantity kadar aynı değeri döndür
     for i in range(quantity):
@@ -869,6 +440,7 @@ def start_snmp_agent():
 
         # Allow read MIB access for this user / securityModels at VACM
         config.add_vacm_user(snmpEngine, 2, "my-area", "noAuthNoPriv", (1, 3, 6, 5))
+        config.add_vacm_user(snmpEngine, 2, "my-area", "noAuthNoPriv", BACS2)
         print("✅ VACM ayarlandı")
 
         # Create an SNMP context
@@ -881,13 +453,14 @@ def start_snmp_agent():
         MibScalar, MibScalarInstance = mibBuilder.import_symbols(
             "SNMPv2-SMI", "MibScalar", "MibScalarInstance"
         )
+        BatterySubtree = battery_subtree_class(MibScalar)
         print("✅ MIB Builder oluşturuldu")
 
         class ModbusRAMMibScalarInstance(MibScalarInstance):
             """Modbus TCP Server RAM sistemi ile MIB Instance"""
             def getValue(self, name, **context):
                 oid = '.'.join([str(x) for x in name])
-                print(f"🔍 SNMP OID sorgusu: {oid}")
+                snmp_log.debug("SNMP OID sorgusu: %s", oid)
                 
                 # Sistem bilgileri
                 if oid == "1.3.6.5.1.0":
@@ -895,109 +468,65 @@ def start_snmp_agent():
                         f"Python {sys.version} running on a {sys.platform} platform"
                     )
                 elif oid == "1.3.6.5.2.0":  # totalBatteryCount
-                    data = get_battery_data_ram()
-                    battery_count = 0
-                    for arm in data.keys():
-                        for k in data[arm].keys():
-                            if k > 2:  # k>2 olanlar batarya verisi
-                                battery_count += 1
-                    return self.getSyntax().clone(str(battery_count if battery_count > 0 else 0))
+                    return self.getSyntax().clone(battery_store.stats.battery_count)
                 elif oid == "1.3.6.5.3.0":  # totalArmCount
-                    data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(len(data) if data else 0))
+                    return self.getSyntax().clone(battery_store.stats.arm_count)
                 elif oid == "1.3.6.5.4.0":  # systemStatus
-                    return self.getSyntax().clone("1")
+                    return self.getSyntax().clone(1)
                 elif oid == "1.3.6.5.5.0":  # lastUpdateTime
                     return self.getSyntax().clone(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 elif oid == "1.3.6.5.6.0":  # dataCount
-                    data = get_battery_data_ram()
-                    total_data = 0
-                    for arm in data.values():
-                        for k in arm.values():
-                            total_data += len(k)
-                    return self.getSyntax().clone(str(total_data if total_data > 0 else 0))
+                    return self.getSyntax().clone(battery_store.stats.data_count)
                 elif oid == "1.3.6.5.7.0":  # arm1SlaveCount
-                    with data_lock:
-                        return self.getSyntax().clone(str(arm_slave_counts_ram.get(1, 0)))
+                    return self.getSyntax().clone(arm_slave_counts_ram.get(1, 0))
                 elif oid == "1.3.6.5.8.0":  # arm2SlaveCount
-                    with data_lock:
-                        return self.getSyntax().clone(str(arm_slave_counts_ram.get(2, 0)))
+                    return self.getSyntax().clone(arm_slave_counts_ram.get(2, 0))
                 elif oid == "1.3.6.5.9.0":  # arm3SlaveCount
-                    with data_lock:
-                        return self.getSyntax().clone(str(arm_slave_counts_ram.get(3, 0)))
-                elif oid == "1.3.6.5.10.0":  # arm4SlaveCount
-                    with data_lock:
-                        return self.getSyntax().clone(str(arm_slave_counts_ram.get(4, 0)))
+                    return self.getSyntax().clone(arm_slave_counts_ram.get(3, 0))
                 else:
-                    # Gerçek batarya verileri - Modbus TCP Server RAM'den oku
-                    if oid.startswith("1.3.6.5.10."):
-                        parts = oid.split('.')
-                        if len(parts) >= 8:  # 1.3.6.5.10.arm.k.dtype.0
-                            arm = int(parts[5])    # 1.3.6.5.10.{arm}
-                            k = int(parts[6])      # 1.3.6.5.10.arm.{k}
-                            dtype = int(parts[7])  # 1.3.6.5.10.arm.k.{dtype}
-                            
-                            data = get_battery_data_ram(arm, k, dtype)
-                            if data:
-                                return self.getSyntax().clone(str(data['value']))
-                            return self.getSyntax().clone("0")
-                    
-                    return self.getSyntax().clone("No Such Object")
+                    return exval.noSuchInstance
 
         # MIB Objects oluştur
         mibBuilder.export_symbols(
             "__MODBUS_RAM_MIB",
             # Sistem bilgileri
-            MibScalar((1, 3, 6, 5, 1), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 1), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 1), scalar_syntax((1, 3, 6, 5, 1))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 1), (0,), scalar_syntax((1, 3, 6, 5, 1))),
             
-            MibScalar((1, 3, 6, 5, 2), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 2), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 2), scalar_syntax((1, 3, 6, 5, 2))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 2), (0,), scalar_syntax((1, 3, 6, 5, 2))),
             
-            MibScalar((1, 3, 6, 5, 3), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 3), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 3), scalar_syntax((1, 3, 6, 5, 3))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 3), (0,), scalar_syntax((1, 3, 6, 5, 3))),
             
-            MibScalar((1, 3, 6, 5, 4), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 4), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 4), scalar_syntax((1, 3, 6, 5, 4))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 4), (0,), scalar_syntax((1, 3, 6, 5, 4))),
             
-            MibScalar((1, 3, 6, 5, 5), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 5), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 5), scalar_syntax((1, 3, 6, 5, 5))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 5), (0,), scalar_syntax((1, 3, 6, 5, 5))),
             
-            MibScalar((1, 3, 6, 5, 6), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 6), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 6), scalar_syntax((1, 3, 6, 5, 6))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 6), (0,), scalar_syntax((1, 3, 6, 5, 6))),
             
             # Armslavecounts OID'leri
-            MibScalar((1, 3, 6, 5, 7), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 7), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 7), scalar_syntax((1, 3, 6, 5, 7))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 7), (0,), scalar_syntax((1, 3, 6, 5, 7))),
             
-            MibScalar((1, 3, 6, 5, 8), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 8), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 8), scalar_syntax((1, 3, 6, 5, 8))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 8), (0,), scalar_syntax((1, 3, 6, 5, 8))),
             
-            MibScalar((1, 3, 6, 5, 9), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 9), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 9), scalar_syntax((1, 3, 6, 5, 9))),
+            ModbusRAMMibScalarInstance((1, 3, 6, 5, 9), (0,), scalar_syntax((1, 3, 6, 5, 9))),
             
-            MibScalar((1, 3, 6, 5, 10), v2c.OctetString()),
-            ModbusRAMMibScalarInstance((1, 3, 6, 5, 10), (0,), v2c.OctetString()),
+            # 1.3.6.5.10.0 arm4SlaveCount ve 1.3.6.5.10.arm.k.dtype.0 batarya
+            # verileri - tek dinamik alt ağaç, instance'lar store'dan çözülür
+            BatterySubtree(BATTERY_SUBTREE, ARM4_COUNT.syntax, battery_subtree_index, encode_battery_value),
+
+            # bacs2.mib bacsModuleTable / bacsStringTable (sütun.satır, hücreler sütunun MIB syntax'ında)
+            BatterySubtree(BACS_MODULE_TABLE, v2c.Integer32(), bacs_module_table, bacs_module_table.encode),
+            BatterySubtree(BACS_STRING_TABLE, v2c.Integer32(), bacs_string_table, bacs_string_table.encode),
         )
         
-        # Batarya verileri için MIB Objects - Dinamik olarak oluştur
-        for arm in range(1, 5):  # 1, 2, 3, 4
-            for k in range(2, 6):  # 2, 3, 4, 5
-                for dtype in range(10, 15):  # 10, 11, 12, 13, 14
-                    oid = (1, 3, 6, 5, 10, arm, k, dtype)
-                    mibBuilder.export_symbols(
-                        f"__BATTERY_MIB_{arm}_{k}_{dtype}",
-                        MibScalar(oid, v2c.OctetString()),
-                        ModbusRAMMibScalarInstance(oid, (0,), v2c.OctetString()),
-                    )
-                
-                # SOC verisi için dtype=126
-                oid = (1, 3, 6, 5, 10, arm, k, 126)
-                mibBuilder.export_symbols(
-                    f"__BATTERY_MIB_{arm}_{k}_126",
-                    MibScalar(oid, v2c.OctetString()),
-                    ModbusRAMMibScalarInstance(oid, (0,), v2c.OctetString()),
-                )
         print("✅ MIB Objects oluşturuldu")
 
         # --- end of Managed Object Instance initialization ----
@@ -1026,6 +555,7 @@ def start_snmp_agent():
         print("1.3.6.5.8.0  - Kol 2 batarya sayısı")
         print("1.3.6.5.9.0  - Kol 3 batarya sayısı")
         print("1.3.6.5.10.0 - Kol 4 batarya sayısı")
+        print("1.3.6.5.10.{arm}.{k}.{dtype}.0 - Batarya verileri (k=3..122)")
         print("=" * 50)
         print("SNMP Test komutları:")
         print(f"snmpget -v2c -c public localhost:{SNMP_PORT} 1.3.6.5.2.0")
@@ -1033,7 +563,10 @@ def start_snmp_agent():
         print(f"snmpget -v2c -c public localhost:{SNMP_PORT} 1.3.6.5.8.0")
         print(f"snmpget -v2c -c public localhost:{SNMP_PORT} 1.3.6.5.9.0")
         print(f"snmpget -v2c -c public localhost:{SNMP_PORT} 1.3.6.5.10.0")
+        print(f"snmpget -v2c -c public localhost:{SNMP_PORT} 1.3.6.5.10.3.3.10.0")
         print(f"snmpwalk -v2c -c public localhost:{SNMP_PORT} 1.3.6.5")
+        print(f"snmpbulkwalk -v2c -c public localhost:{SNMP_PORT} 1.3.6.1.2.1.33.5.2.5  # bacsModuleTable")
+        print(f"snmpbulkwalk -v2c -c public localhost:{SNMP_PORT} 1.3.6.1.2.1.33.5.2.7  # bacsStringTable")
         print("=" * 50)
 
         # Run I/O dispatcher which would receive queries and send responses
@@ -1056,6 +589,7 @@ def set_static_arm_counts():
         arm_slave_counts_ram[2] = 0  # Kol 2'de batarya yok
         arm_slave_counts_ram[3] = 7  # Kol 3'te 7 batarya
         arm_slave_counts_ram[4] = 0  # Kol 4'te batarya yok
+        rebuild_register_map()
         
         print("✓ Statik armslavecounts ayarlandı")
         print(f"  Kol 1: {arm_slave_counts_ram[1]} batarya")
@@ -1064,10 +598,10 @@ def set_static_arm_counts():
         print(f"  Kol 4: {arm_slave_counts_ram[4]} batarya")
 
 def main():
+    configure_logging()
     try:
         # RAM'i temizle
-        with data_lock:
-            battery_data_ram.clear()
+        battery_store.clear()
         print("RAM temizlendi.")
         
         # Statik armslavecounts ayarla
@@ -1088,11 +622,26 @@ def main():
         read_thread.start()
         print("read_serial thread'i başlatıldı.")
 
+        # Alarm trap'leri: Hatkon/Batkon değişiklikleri data_processor'dan kuyruğa
+        trap_server = SNMPTrapServer(trap_port=162, community=TRAP_COMMUNITY, trap_targets=TRAP_TARGETS,
+                                     outbox_path=TRAP_OUTBOX_PATH, notify_kind=TRAP_KIND)
+        alarm_state.listeners.append(trap_server)
+        trap_server.start()
+
         # Veri işleme thread'i
         data_thread = threading.Thread(target=data_processor, daemon=True)
         data_thread.start()
         print("data_processor thread'i başlatıldı.")
 
+        # Konfigürasyon: kayıtlı değerlerle başla, Modbus yazmalarını kaydet/gönder
+        try:
+            config_registers.load(config_storage.load())
+        except Exception as e:
+            print(f"Konfigürasyon yüklenirken hata: {e}")
+        config_thread = threading.Thread(target=config_sender, daemon=True)
+        config_thread.start()
+        print("config_sender thread'i başlatıldı.")
+
         # Modbus TCP server thread'i
         modbus_thread = threading.Thread(target=modbus_tcp_server, daemon=True)
         modbus_thread.start()
@@ -1110,6 +659,11 @@ def main():
         print("  Start=12, Quantity=7: Kol3_Bat2_Gerilim, Kol3_Bat2_SOC, Kol3_Bat2_Rint, Kol3_Bat2_SOH, Kol3_Bat2_NTC1, Kol3_Bat2_NTC2, Kol3_Bat2_NTC3")
         print("  Start=19, Quantity=7: Kol3_Bat3_Gerilim, Kol3_Bat3_SOC, Kol3_Bat3_Rint, Kol3_Bat3_SOH, Kol3_Bat3_NTC1, Kol3_Bat3_NTC2, Kol3_Bat3_NTC3")
         print("  ... (Kol3_Bat4, Kol3_Bat5, Kol3_Bat6, Kol3_Bat7)")
+        print("Konfigürasyon (FC3/FC6/FC16/FC23):")
+        print("  batconfig Kol n: 0x1000 + (n-1)*16 -> Vmin, Vmax, Vnom (x100), Rintnom, Tempmin_D, Tempmax_D, Tempmin_PN, Tempmaks_PN, Socmin, Sohmin")
+        print("  armconfig Kol n: 0x1040 + (n-1)*16 -> akimKats, akimMax, nemMax, nemMin, tempMax, tempMin")
+        print("Alarm bitleri (FC1 mandallı / FC2 anlık, FC5/FC15 ile 0 yazarak onay):")
+        print("  Kol n: (n-1)*256 + 0 Hatkon, + bat Batkon, + 128 + bat Balans")
         print("=" * 50)
 
         # SNMP Agent thread'i
@@ -1122,6 +676,7 @@ def main():
 
     except KeyboardInterrupt:
         print("\nProgram sonlandırılıyor...")
+        print(f"Ingest kuyruğu: {data_queue.stats()}")
 
     finally:
         if 'pi' in locals():
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+Modbus Async Server - asyncio tabanlı Modbus TCP sunucusu
+Tek thread'de çok sayıda SCADA istemcisi; MBAP uzunluk alanına göre
+akış okuma, sıralı pipelining, boşta zaman aşımı ve bağlantı sınırı
+"""
+
+import asyncio
+import struct
+
+from system_log import get_logger
+
+modbus_log = get_logger('modbus')
+
+MBAP_HEADER = struct.Struct('>HHHB')  # transaction, protocol, length, unit
+MBAP_SIZE = MBAP_HEADER.size
+MAX_PDU_SIZE = 253  # Modbus PDU üst sınırı
+
+
+class MBAPError(Exception):
+    """Geçersiz MBAP başlığı (bağlantı kapatılır)"""
+
+
+async def read_adu(reader):
+    """Bir Modbus TCP ADU oku: (transaction_id, unit_id, pdu)
+
+    Bölünmüş veya birleşik gelen frame'ler readexactly ile length alanına
+    göre ayrılır. Bağlantı kapanırsa asyncio.IncompleteReadError fırlar.
+    """
+    header = await reader.readexactly(MBAP_SIZE)
+    transaction_id, protocol_id, length, unit_id = MBAP_HEADER.unpack(header)
+    if protocol_id != 0 or not 2 <= length <= MAX_PDU_SIZE + 1:
+        raise MBAPError(f"protocol={protocol_id}, length={length}")
+    pdu = await reader.readexactly(length - 1)
+    return transaction_id, unit_id, pdu
+
+
+class AsyncModbusServer:
+    """asyncio.start_server tabanlı Modbus TCP sunucusu
+
+    handle_request(transaction_id, unit_id, pdu) tam cevap ADU'sunu
+    (bytes veya bytes-benzeri) ya da cevap yoksa None döndürür. Aynı
+    bağlantıdaki istekler geliş sırasıyla cevaplanır.
+    """
+
+    def __init__(self, host, port, handle_request, max_connections=32, idle_timeout=60.0):
+        self.host = host
+        self.port = port
+        self.handle_request = handle_request
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.loop = None
+
+        # İstatistikler
+        self.active_connections = 0
+        self.total_connections = 0
+        self.rejected_connections = 0
+        self.idle_timeouts = 0
+        self.requests = 0
+        self.framing_errors = 0
+
+    async def _handle_client(self, reader, writer):
+        client_address = writer.get_extra_info('peername')
+        if self.active_connections >= self.max_connections:
+            self.rejected_connections += 1
+            modbus_log.warning("Modbus bağlantı sınırı (%d) dolu, reddedildi: %s", self.max_connections, client_address)
+            writer.close()
+            return
+
+        self.active_connections += 1
+        self.total_connections += 1
+        modbus_log.info("Yeni bağlantı: %s", client_address)
+        try:
+            while True:
+                try:
+                    transaction_id, unit_id, pdu = await asyncio.wait_for(read_adu(reader), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.idle_timeouts += 1
+                    modbus_log.info("Client %s boşta zaman aşımı", client_address)
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                except MBAPError as e:
+                    self.framing_errors += 1
+                    modbus_log.warning("Client %s geçersiz MBAP başlığı: %s", client_address, e)
+                    break
+
+                self.requests += 1
+                response = self.handle_request(transaction_id, unit_id, pdu)
+                if response:
+                    # drain sadece gönderim tamponu doluysa bekler
+                    writer.write(response)
+                    await writer.drain()
+
+        except (ConnectionError, OSError) as e:
+            modbus_log.warning("Client %s işleme hatası: %s", client_address, e)
+        finally:
+            self.active_connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            modbus_log.info("Client %s bağlantısı kapatıldı", client_address)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def run(self):
+        """Kendi event loop'unda çalış (thread hedefi)"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve_forever())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def stop(self):
+        """Başka bir thread'den durdur"""
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
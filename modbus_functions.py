@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+Modbus Functions - Modbus TCP fonksiyon kodları
+FC1/2 (alarm/balans bitleri), FC3/4 (register görüntüsü), FC5/15 (alarm
+onayı), FC6/16/23 (batconfigs/armconfigs) ve standart exception cevapları
+(01-04)
+"""
+
+import struct
+
+from alarm_state import BIT_COUNT
+from device_config import ConfigRegisters
+from system_log import get_logger
+
+modbus_log = get_logger('modbus')
+
+# Exception kodları
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SERVER_DEVICE_FAILURE = 0x04
+
+# Modbus istek başına üst sınırlar
+MAX_READ_BITS = 2000
+MAX_READ_REGISTERS = 125
+MAX_WRITE_BITS = 1968
+MAX_WRITE_REGISTERS = 123
+MAX_RW_WRITE_REGISTERS = 121
+
+COUNT_BLOCK_REGISTERS = 125  # Adres 0 armslavecounts bloğu
+
+
+class ModbusError(Exception):
+    """Exception cevabına dönüştürülen istek hatası"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def _require(condition, code):
+    if not condition:
+        raise ModbusError(code)
+
+
+def _check_quantity(quantity, maximum):
+    _require(1 <= quantity <= maximum, ILLEGAL_DATA_VALUE)
+
+
+def _unpack(fmt, pdu, offset=1):
+    _require(len(pdu) >= offset + struct.calcsize(fmt), ILLEGAL_DATA_VALUE)
+    return struct.unpack_from(fmt, pdu, offset)
+
+
+class ModbusFunctions:
+    """PDU -> cevap ADU dönüşümü
+
+    Handler'lar cevap PDU'sunu parça tuple'ı olarak döndürür; handle
+    MBAP başlığıyla birlikte tek b''.join ile birleştirir.
+
+    register_image: FC3/FC4 veri alanı (adres 0 ve 1..len(map))
+    config: batconfigs/armconfigs holding register'ları
+    alarms: AlarmState (coil ve discrete input'lar)
+    on_config_write(kind, arm): değişen konfigürasyonu gönderime bildirir; asyncio
+    döngüsünde çağrıldığından bloklamamalıdır (kuyruğa koyup dönmeli)
+    """
+
+    def __init__(self, register_image, alarms, config=None, on_config_write=None):
+        self.register_image = register_image
+        self.alarms = alarms
+        self.config = config if config is not None else ConfigRegisters()
+        self.on_config_write = on_config_write
+        self.handlers = {
+            1: self.read_coils,
+            2: self.read_discrete_inputs,
+            3: self.read_holding_registers,
+            4: self.read_input_registers,
+            5: self.write_single_coil,
+            6: self.write_single_register,
+            15: self.write_multiple_coils,
+            16: self.write_multiple_registers,
+            23: self.read_write_multiple_registers,
+        }
+
+    def handle(self, transaction_id, unit_id, pdu):
+        """Tam cevap ADU'su; hata durumunda exception cevabı
+
+        Beklenmeyen hatalar (konfigürasyon, pigpio, struct) 04 SERVER
+        DEVICE FAILURE olarak cevaplanır; master cevapsız kalmaz.
+        """
+        function_code = pdu[0]
+        handler = self.handlers.get(function_code)
+        try:
+            _require(handler is not None, ILLEGAL_FUNCTION)
+            chunks = handler(pdu)
+        except ModbusError as e:
+            chunks = (bytes((function_code | 0x80, e.code)),)
+        except Exception as e:
+            modbus_log.error("FC%d işlenirken hata: %s", function_code, e)
+            chunks = (bytes((function_code | 0x80, SERVER_DEVICE_FAILURE)),)
+        length = sum(len(chunk) for chunk in chunks) + 1
+        # Register verisi (görüntünün memoryview dilimi) ADU'ya tek kez kopyalanır
+        return b''.join((struct.pack('>HHHB', transaction_id, 0, length, unit_id),) + chunks)
+
+    # Register okuma
+
+    def _check_read(self, start_address, quantity):
+        """Okuma aralığını doğrula (ModbusError), okuma yapmadan"""
+        _check_quantity(quantity, MAX_READ_REGISTERS)
+        if start_address == 0:
+            _require(quantity <= COUNT_BLOCK_REGISTERS, ILLEGAL_DATA_ADDRESS)
+        elif not self.config.contains(start_address, quantity):
+            # read() kopyalamadan dilim döndürür, sadece uzunluğa bakılır
+            _require(len(self.register_image.read(start_address, quantity)) == 2 * quantity,
+                     ILLEGAL_DATA_ADDRESS)
+
+    def _read_registers(self, start_address, quantity):
+        """Holding/input register alanı: armslavecounts, veri, konfigürasyon"""
+        self._check_read(start_address, quantity)
+        if start_address != 0 and self.config.contains(start_address, quantity):
+            return self.config.read(start_address, quantity)
+        data = self.register_image.read(start_address, quantity)
+        _require(len(data) == 2 * quantity, ILLEGAL_DATA_ADDRESS)
+        return data
+
+    def _register_response(self, function_code, data):
+        """Cevap parçaları: (fonksiyon + byte sayısı, veri); handle birleştirir"""
+        return bytes((function_code, len(data))), data
+
+    def read_holding_registers(self, pdu):
+        start_address, quantity = _unpack('>HH', pdu)
+        return self._register_response(3, self._read_registers(start_address, quantity))
+
+    def read_input_registers(self, pdu):
+        start_address, quantity = _unpack('>HH', pdu)
+        return self._register_response(4, self._read_registers(start_address, quantity))
+
+    # Bit okuma/yazma
+
+    def _check_bits(self, start, quantity, maximum):
+        _check_quantity(quantity, maximum)
+        _require(start + quantity <= BIT_COUNT, ILLEGAL_DATA_ADDRESS)
+
+    def read_coils(self, pdu):
+        start, quantity = _unpack('>HH', pdu)
+        self._check_bits(start, quantity, MAX_READ_BITS)
+        data = self.alarms.read_coils(start, quantity)
+        return (bytes((1, len(data))), data)
+
+    def read_discrete_inputs(self, pdu):
+        start, quantity = _unpack('>HH', pdu)
+        self._check_bits(start, quantity, MAX_READ_BITS)
+        data = self.alarms.read_inputs(start, quantity)
+        return (bytes((2, len(data))), data)
+
+    def write_single_coil(self, pdu):
+        address, value = _unpack('>HH', pdu)
+        _require(value in (0x0000, 0xFF00), ILLEGAL_DATA_VALUE)
+        self._check_bits(address, 1, 1)
+        self.alarms.write_coils(address, (value == 0xFF00,))
+        return (bytes(pdu[:5]),)
+
+    def write_multiple_coils(self, pdu):
+        start, quantity, byte_count = _unpack('>HHB', pdu)
+        self._check_bits(start, quantity, MAX_WRITE_BITS)
+        _require(byte_count == (quantity + 7) // 8 and len(pdu) >= 6 + byte_count, ILLEGAL_DATA_VALUE)
+        values = [(pdu[6 + (i >> 3)] >> (i & 7)) & 1 for i in range(quantity)]
+        self.alarms.write_coils(start, values)
+        return (bytes(pdu[:5]),)
+
+    # Konfigürasyon yazma
+
+    def _write_config(self, start_address, words):
+        _require(self.config.contains(start_address, len(words)), ILLEGAL_DATA_ADDRESS)
+        for kind, arm in self.config.write(start_address, words):
+            if self.on_config_write:
+                self.on_config_write(kind, arm)
+
+    def _unpack_words(self, pdu, offset, quantity, byte_count, maximum):
+        _check_quantity(quantity, maximum)
+        _require(byte_count == 2 * quantity and len(pdu) >= offset + byte_count, ILLEGAL_DATA_VALUE)
+        return struct.unpack_from('>%dH' % quantity, pdu, offset)
+
+    def write_single_register(self, pdu):
+        address, value = _unpack('>HH', pdu)
+        self._write_config(address, (value,))
+        return (bytes(pdu[:5]),)
+
+    def write_multiple_registers(self, pdu):
+        start_address, quantity, byte_count = _unpack('>HHB', pdu)
+        words = self._unpack_words(pdu, 6, quantity, byte_count, MAX_WRITE_REGISTERS)
+        self._write_config(start_address, words)
+        return (bytes(pdu[:5]),)
+
+    def read_write_multiple_registers(self, pdu):
+        read_start, read_quantity, write_start, write_quantity, byte_count = _unpack('>HHHHB', pdu)
+        _check_quantity(read_quantity, MAX_READ_REGISTERS)
+        words = self._unpack_words(pdu, 10, write_quantity, byte_count, MAX_RW_WRITE_REGISTERS)
+        # Okuma aralığı yazmadan önce doğrulanır: geçersiz istek cihaza gitmez
+        self._check_read(read_start, read_quantity)
+        # Önce yazma, sonra okuma
+        self._write_config(write_start, words)
+        return self._register_response(23, self._read_registers(read_start, read_quantity))
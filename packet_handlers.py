@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+Packet Handlers - Tablo tabanlı UART paket dağıtımı
+(paket uzunluğu, ayırt edici byte) -> handler fonksiyonu kayıt tablosu
+"""
+
+import datetime
+
+from system_log import WARNING, RateLimitedSampler, get_logger
+
+ingest_log = get_logger('ingest')
+# Her periyotta kol başına gelen paketler için hız sınırlı izler
+measurement_sampler = RateLimitedSampler(ingest_log)
+invalid_arm_sampler = RateLimitedSampler(ingest_log, level=WARNING)
+
+# {(uzunluk, ayırt edici byte): handler}
+PACKET_HANDLERS = {}
+
+# Kayıtlı olmayan ayırt edici byte'lar için uzunluk bazlı varsayılan handler
+DEFAULT_HANDLERS = {}
+
+VALID_ARMS = (1, 2, 3, 4)
+
+
+def register_handler(length, discriminator=None):
+    """Handler'ı kayıt tablosuna ekle; discriminator=None uzunluğun varsayılanıdır"""
+    def decorator(func):
+        if discriminator is None:
+            DEFAULT_HANDLERS[length] = func
+        else:
+            PACKET_HANDLERS[(length, discriminator)] = func
+        return func
+    return decorator
+
+
+def packet_key(raw):
+    """Paketin kayıt tablosundaki anahtarını döndür"""
+    length = len(raw)
+    # 6 byte'lık pakette armslavecounts 2. byte (index 1) ile ayırt edilir
+    if length == 6 and raw[1] == 0x7E:
+        return (6, 0x7E)
+    return (length, raw[2])
+
+
+def dispatch_packet(packet, sink):
+    """Paketi ilgili handler'a yönlendir, handler yoksa False döndür"""
+    raw = packet.raw
+    key = packet_key(raw)
+    handler = PACKET_HANDLERS.get(key) or DEFAULT_HANDLERS.get(key[0])
+    if handler is None:
+        return False
+    handler(packet, sink)
+    return True
+
+
+def now_text():
+    """Log mesajları için milisaniyeli zaman damgası"""
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+# BCD benzeri hane çözümleme
+
+def decode_salt_data(raw):
+    """raw[4..9] hanelerini ddd.ddd değerine çevir"""
+    digits = raw[4] * 100000 + raw[5] * 10000 + raw[6] * 1000 + raw[7] * 100 + raw[8] * 10 + raw[9]
+    return round(digits / 1000, 4)
+
+
+def decode_percent(raw):
+    """raw[5..8] hanelerini dd.dd değerine çevir (nem ve SOH)"""
+    digits = raw[5] * 1000 + raw[6] * 100 + raw[7] * 10 + raw[8]
+    return round(digits / 100, 4)
+
+
+class PacketSink:
+    """Handler'ların çözülmüş veriyi ilettiği hedef
+
+    data_processor (RAM) ve db_worker (SQLite) bu sınıfı genişletir.
+    Varsayılan metodlar sadece konsola log basar.
+    """
+
+    def begin_measurement(self, k_value):
+        """11 byte'lık her ölçüm paketinde çağrılır (periyot takibi)"""
+
+    def on_invalid_arm(self, arm_value):
+        invalid_arm_sampler.log("HATALI ARM DEĞERİ: %s", arm_value)
+
+    def on_value(self, arm_value, k_value, dtype, value):
+        """Ham ölçüm değeri"""
+
+    def on_voltage(self, arm_value, k_value, value):
+        """Gerilim (batarya) veya akım (kol, k=2) verisi"""
+        self.on_value(arm_value, k_value, 10, value)
+
+    def on_humidity(self, arm_value, value):
+        """Kol nem verisi"""
+        measurement_sampler.log("VERİ ALGILANDI - Arm: %s, Nem: %s%%", arm_value, value)
+        self.on_value(arm_value, 2, 11, value)
+
+    def on_soh(self, arm_value, k_value, value):
+        """Batarya SOH verisi"""
+        self.on_value(arm_value, k_value, 11, value)
+
+    def on_arm_slave_counts(self, counts):
+        """counts: {arm: batarya sayısı}"""
+        ingest_log.info("armslavecounts verisi tespit edildi: arm1=%s, arm2=%s, arm3=%s, arm4=%s",
+                        counts[1], counts[2], counts[3], counts[4])
+
+    def on_balance(self, arm_value, slave_value, status_value):
+        measurement_sampler.log("Balans verisi tespit edildi: Arm=%s, Slave=%s, Status=%s",
+                                arm_value, slave_value, status_value)
+
+    def on_hatkon_alarm(self, arm_value, error_msb):
+        ingest_log.info("HATKON ALARM VERİSİ ALGILANDI - Arm: %s, Error MSB: %s", arm_value, error_msb)
+
+    def on_batkon_alarm(self, packet, arm_value, battery, error_msb, error_lsb):
+        ingest_log.info("BATKON ALARM VERİSİ ALGILANDI - Arm: %s, Battery: %s, Error MSB: %s, Error LSB: %s, Ham Veri: %s",
+                        arm_value, battery, error_msb, error_lsb, packet)
+
+    def on_missing_data(self, arm_value, slave_value, status_value):
+        ingest_log.info("MISSING DATA VERİSİ ALGILANDI - Arm: %s, Slave: %s, Status: %s",
+                        arm_value, slave_value, status_value)
+
+
+# 11 byte'lık ölçüm paketleri: [header, k, dtype, arm, d4..d9, crc]
+
+def _measurement_arm(packet, sink):
+    """Periyot takibini yap ve geçerli arm değerini döndür (geçersizse None)"""
+    sink.begin_measurement(packet.k)
+    if packet.arm not in VALID_ARMS:
+        sink.on_invalid_arm(packet.arm)
+        return None
+    return packet.arm
+
+
+@register_handler(11, 10)
+def handle_voltage(packet, sink):
+    """Gerilim / kol akımı"""
+    arm_value = _measurement_arm(packet, sink)
+    if arm_value is not None:
+        sink.on_voltage(arm_value, packet.k, decode_salt_data(packet.raw))
+
+
+@register_handler(11, 11)
+def handle_humidity_or_soh(packet, sink):
+    """k=2 ise kol nemi, değilse batarya SOH"""
+    arm_value = _measurement_arm(packet, sink)
+    if arm_value is None:
+        return
+    if packet.k == 2:
+        handle_humidity(packet, sink, arm_value)
+    else:
+        handle_soh(packet, sink, arm_value)
+
+
+def handle_humidity(packet, sink, arm_value):
+    sink.on_humidity(arm_value, decode_percent(packet.raw))
+
+
+def handle_soh(packet, sink, arm_value):
+    # raw[4] 1 ise SOH 100'dür
+    if packet.raw[4] == 1:
+        soh_value = 100.0
+    else:
+        soh_value = decode_percent(packet.raw)
+    sink.on_soh(arm_value, packet.k, soh_value)
+
+
+@register_handler(11, 12)
+@register_handler(11, 13)
+@register_handler(11)
+def handle_ntc(packet, sink):
+    """NTC1/NTC2 ve diğer dtype değerleri ham olarak kaydedilir"""
+    arm_value = _measurement_arm(packet, sink)
+    if arm_value is not None:
+        sink.on_value(arm_value, packet.k, packet.dtype, decode_salt_data(packet.raw))
+
+
+# 6 byte'lık paketler
+
+@register_handler(6, 0x7E)
+def handle_arm_slave_counts(packet, sink):
+    """Slave sayısı verisi: 2. byte (index 1) 0x7E"""
+    raw = packet.raw
+    sink.on_arm_slave_counts({1: raw[2], 2: raw[3], 3: raw[4], 4: raw[5]})
+
+
+@register_handler(6, 0x0F)
+def handle_balance(packet, sink):
+    """Balans verisi: 3. byte (index 2) 0x0F"""
+    raw = packet.raw
+    sink.on_balance(raw[3], raw[1], raw[4])
+
+
+@register_handler(6, 0x7D)
+def handle_hatkon_alarm(packet, sink):
+    """Hatkon alarmı: 3. byte (index 2) 0x7D"""
+    raw = packet.raw
+    sink.on_hatkon_alarm(raw[3], raw[4])
+
+
+# 7 byte'lık Batkon alarmı ve 5 byte'lık missing data
+
+@register_handler(7, 0x7D)
+def handle_batkon_alarm(packet, sink):
+    """Batkon alarmı: [header, k, 0x7D, arm, error_msb, error_lsb, crc]"""
+    raw = packet.raw
+    sink.on_batkon_alarm(packet, raw[3], raw[1], raw[4], raw[5])
+
+
+@register_handler(5, 0x7F)
+def handle_missing_data(packet, sink):
+    raw = packet.raw
+    sink.on_missing_data(raw[3], raw[1], raw[4])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+"""
+Period Accumulator - Periyot bazlı toplu RAM yazımı
+Bir periyotta çözülen tüm değerler önce yazıcı thread'inin kendi
+(thread-local) tamponunda toplanır; periyot sonunda paylaşılan periyot
+zaman damgasıyla BatteryStore.update_many() üzerinden tek kilit
+işlemiyle depoya yazılır. Okuyucular periyodu ya hiç ya tamamen görür.
+"""
+
+import threading
+
+# Periyot sınırı hiç gelmezse tampon bu kadar kayıtta boşaltılır
+# (4 kol x 122 k x 8 dtype, bir tam periyottan fazlası)
+STAGE_LIMIT = 4096
+
+
+class PeriodAccumulator:
+    """Periyot tamponu
+
+    stage() kilit almaz, sadece yazıcı thread'inin tamponuna ekler.
+    begin(timestamp) thread'in aktif periyot zaman damgasını tutar.
+    commit() tamponu bu zaman damgasıyla boşaltır; derive verilmişse
+    tampondaki kayıtlardan türetilen kayıtlar (ör. SOC) aynı yazıma
+    eklenir. Periyot başlamadan (zaman damgası yokken) yazım yapılmaz.
+    """
+
+    def __init__(self, store, derive=None, limit=STAGE_LIMIT):
+        self.store = store
+        self.derive = derive  # [(arm, k, dtype, value)] -> ek kayıtlar
+        self.limit = limit
+        self._local = threading.local()
+        self.commits = 0     # Depoya yapılan toplu yazım sayısı
+        self.committed = 0   # Yazılan kayıt sayısı (türetilenler dahil)
+        self.discarded = 0   # Periyot başlamadan limit dolunca atılan kayıtlar
+
+    def _buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = []
+        return buffer
+
+    def begin(self, timestamp):
+        """Bu thread'in aktif periyot zaman damgasını (ms) ayarla"""
+        self._local.timestamp = timestamp
+
+    def timestamp(self):
+        """Bu thread'in aktif periyot zaman damgası; periyot yoksa None"""
+        return getattr(self._local, 'timestamp', None)
+
+    def stage(self, arm, k, dtype, value):
+        """Değeri periyot tamponuna ekle"""
+        buffer = self._buffer()
+        buffer.append((arm, k, dtype, value))
+        if len(buffer) >= self.limit:
+            if self.timestamp() is None:
+                # Zaman damgası verilemeyen kayıtlar sınırsız birikmez
+                self._local.buffer = []
+                self.discarded += len(buffer)
+            else:
+                self.commit()
+
+    def pending(self):
+        """Bu thread'in tamponundaki kayıt sayısı"""
+        return len(self._buffer())
+
+    def commit(self, timestamp=None):
+        """Tamponu tek kilit işlemiyle depoya yaz, yazılan kayıt sayısını döndür
+
+        timestamp periyot zaman damgasıdır (ms); None ise begin() ile
+        ayarlanan kullanılır. Hiçbiri yoksa tampon korunur, yazım yapılmaz.
+        """
+        if timestamp is None:
+            timestamp = self.timestamp()
+        buffer = self._buffer()
+        if not buffer or timestamp is None:
+            return 0
+        self._local.buffer = []
+        if self.derive is not None:
+            buffer.extend(self.derive(buffer))
+        self.store.update_many(buffer, timestamp)
+        self.commits += 1
+        self.committed += len(buffer)
+        return len(buffer)
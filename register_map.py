@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+"""
+Register Map - Önceden hesaplanmış Modbus register düzeni
+Modbus adresi -> BatteryStore slot eşlemesi; sadece armslavecounts (0x7E)
+düzeni değiştirdiğinde yeniden oluşturulur. RegisterImage bu düzenin
+ölçeklenmiş ve big-endian paketlenmiş hazır görüntüsünü tutar.
+"""
+
+import struct
+from array import array
+
+from battery_store import SLOT_COUNT, slot_of
+
+# Modbus veri tipi -> RAM dtype eşlemesi
+ARM_REGISTER_DTYPES = (10, 11, 12, 13)                   # akım, nem, sıcaklık, sıcaklık2
+BATTERY_REGISTER_DTYPES = (10, 15, 11, 126, 12, 13, 14)   # gerilim, soc, rint, soh, ntc1, ntc2, ntc3
+
+ARM_REGISTER_NAMES = ("Akım(A)", "Nem(%)", "Sıcaklık(°C)", "Sıcaklık2(°C)")
+BATTERY_REGISTER_NAMES = ("Gerilim(V)", "SOC(%)", "Rint(Ω)", "SOH(%)", "NTC1(°C)", "NTC2(°C)", "NTC3(°C)")
+
+FIRST_ADDRESS = 1  # Adres 0 armslavecounts bloğu
+COUNT_REGISTERS = 4  # Adres 0 bloğundaki kol sayısı register'ları
+STATS_REGISTERS = 3  # Ardından StoreStats: batarya, kol, kayıt sayısı
+HEAD_REGISTERS = COUNT_REGISTERS + STATS_REGISTERS
+
+_WORD = struct.Struct('>H')
+_HEAD = struct.Struct('>%dH' % HEAD_REGISTERS)
+
+
+def register_word(value):
+    """Değeri 16 bit register'a çevir: tam sayı aynen, virgüllü sayı 100 ile çarpılır"""
+    if value is None or value != value:
+        return 0
+    if value == int(value):  # Tam sayı ise
+        word = int(value)
+    else:  # Virgüllü sayı ise
+        word = int(value * 100)
+    return word & 0xFFFF
+
+
+class RegisterMap:
+    """Bir armslavecounts düzeni için adres tablosu
+
+    Adres 1'den başlayarak bataryası olan her kol için 4 kol register'ı,
+    ardından her batarya için 7 register sıralanır. slots[i] adres
+    FIRST_ADDRESS + i'nin BatteryStore slot'udur.
+    """
+
+    __slots__ = ('counts', 'slots', 'names')
+
+    def __init__(self, counts):
+        self.counts = dict(counts)
+        self.slots = array('i')
+        self.names = []
+        for arm in range(1, 5):
+            battery_count = self.counts.get(arm, 0)
+            if battery_count == 0:
+                continue  # Bu kolda batarya yok, atla
+            for dtype, name in zip(ARM_REGISTER_DTYPES, ARM_REGISTER_NAMES):
+                self.slots.append(slot_of(arm, 2, dtype))
+                self.names.append(f"Kol{arm}_{name}")
+            for battery_num in range(1, battery_count + 1):
+                k_value = battery_num + 2  # k=3,4,5,6...
+                for dtype, name in zip(BATTERY_REGISTER_DTYPES, BATTERY_REGISTER_NAMES):
+                    self.slots.append(slot_of(arm, k_value, dtype))
+                    self.names.append(f"Kol{arm}_Bat{battery_num}_{name}")
+
+    def __len__(self):
+        return len(self.slots)
+
+    def slot_range(self, start_address, quantity):
+        """[start_address, start_address + quantity) aralığının slotları"""
+        offset = start_address - FIRST_ADDRESS
+        if offset < 0:
+            return self.slots[0:0]
+        return self.slots[offset:offset + quantity]
+
+    def name_range(self, start_address, quantity):
+        offset = start_address - FIRST_ADDRESS
+        if offset < 0:
+            return []
+        return self.names[offset:offset + quantity]
+
+    def read(self, snapshot, start_address, quantity):
+        """Yayınlanmış kuşaktan register değerleri (boş slot 0.0)"""
+        result = []
+        for slot in self.slot_range(start_address, quantity):
+            value = snapshot.value_at(slot)
+            result.append(float(value) if value else 0.0)
+        return result
+
+
+class RegisterImage:
+    """Modbus cevapları için hazır register görüntüsü
+
+    data_processor her yazmada ilgili register'ı struct.pack_into ile
+    çalışma görüntüsüne paketler; BatteryStore yayın yaptığında görüntünün
+    kopyası (map, bytes) çifti olarak tek referans atamasıyla yayınlanır.
+    FC3/FC4 cevabı MBAP başlığı + bu görüntünün memoryview dilimidir.
+    Metodlar BatteryStore observer'ı olarak yazıcı kilidi altında çağrılır.
+    """
+
+    def __init__(self, store, reg_map):
+        self.store = store
+        self._register_of_slot = array('i', [-1]) * SLOT_COUNT
+        self._working = bytearray()
+        self.view = (RegisterMap({}), b'', b'')  # (düzen, yayınlanan görüntü, adres 0 bloğu)
+        with store.lock:
+            self.set_map(reg_map)
+        store.observers.append(self)
+
+    def set_map(self, reg_map):
+        """Yeni register düzeni (store.lock altında çağrılmalı)"""
+        register_of_slot = self._register_of_slot
+        for slot in self.view[0].slots:
+            if slot >= 0:
+                register_of_slot[slot] = -1
+        for index, slot in enumerate(reg_map.slots):
+            if slot >= 0:
+                register_of_slot[slot] = index
+
+        # Çalışma görüntüsü yazıcının dizilerinden, yayınlanan görüntü son kuşaktan
+        store = self.store
+        self._working = self._pack(reg_map, store.values, store.timestamps)
+        snapshot = store.snapshot
+        published = bytes(self._pack(reg_map, snapshot.values, snapshot.timestamps))
+        self.view = (reg_map, published, self._pack_head(reg_map, snapshot.stats))
+
+    @staticmethod
+    def _pack_head(reg_map, stats):
+        """Adres 0 bloğu: kol sayıları ve depo toplamları"""
+        counts = [reg_map.counts.get(arm, 0) for arm in range(1, COUNT_REGISTERS + 1)]
+        return _HEAD.pack(*(min(value, 0xFFFF) for value in counts + list(stats)))
+
+    @staticmethod
+    def _pack(reg_map, values, timestamps):
+        image = bytearray(2 * len(reg_map))
+        for index, slot in enumerate(reg_map.slots):
+            if slot >= 0 and timestamps[slot]:
+                _WORD.pack_into(image, 2 * index, register_word(values[slot]))
+        return image
+
+    # BatteryStore observer metodları
+
+    def on_update(self, slot, value):
+        index = self._register_of_slot[slot]
+        if index >= 0:
+            _WORD.pack_into(self._working, 2 * index, register_word(value))
+
+    def on_clear(self):
+        self._working[:] = bytes(len(self._working))
+
+    def on_publish(self, snapshot):
+        reg_map = self.view[0]
+        self.view = (reg_map, bytes(self._working), self._pack_head(reg_map, snapshot.stats))
+
+    # Okuma (kilitsiz)
+
+    def read(self, start_address, quantity):
+        """Register verisi (2 * quantity byte'a kadar), kopyalamadan"""
+        _reg_map, image, head = self.view
+        if start_address == 0:
+            # Armslavecounts + toplamlar bloğu, kalan register'lar boş
+            if quantity <= HEAD_REGISTERS:
+                return memoryview(head)[:2 * quantity]
+            return head + bytes(2 * (quantity - HEAD_REGISTERS))
+        offset = 2 * (start_address - FIRST_ADDRESS)
+        return memoryview(image)[offset:offset + 2 * quantity]
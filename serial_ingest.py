@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Serial Ingest - Olay tabanlı bit-banging UART okuma
+Hat boştayken RX pinindeki düşen kenarı bekler, veri akarken
+baud hızına göre uyarlanmış aralıklarla okur
+"""
+
+import os
+import threading
+import time
+
+from system_log import get_logger
+
+ingest_log = get_logger('ingest')
+
+# pigpio arka ucu: "pigpio" (gerçek) veya "fake" (GPIO'suz test/benchmark)
+PIGPIO_BACKEND = os.environ.get("PIGPIO_BACKEND", "pigpio")
+
+
+def load_pigpio(backend=None):
+    """Seçili pigpio modülünü döndür"""
+    backend = backend or PIGPIO_BACKEND
+    if backend == "fake":
+        import fake_pigpio
+        return fake_pigpio
+    import pigpio
+    return pigpio
+
+
+class SerialIngest:
+    """bb_serial_read tabanlı okuyucu
+
+    Paket sınırında veya hat boşken RX pinine kenar callback'i kurulur ve
+    thread bir sonraki start bitine kadar (en fazla idle_timeout) bloklanır.
+    Kenar geldikten sonra callback kaldırılır ve paketin hattan geçme süresi
+    (9600 baud'da 11 byte ~11.5 ms) beklenerek okunur. Yarım paket kalmışsa
+    eksik byte'ların süresi kadar beklenir.
+    """
+
+    def __init__(self, pi, rx_pin, baud_rate, decoder, on_frame,
+                 packet_bytes=11, idle_timeout=1.0, falling_edge=1):
+        self.pi = pi
+        self.rx_pin = rx_pin
+        self.decoder = decoder
+        self.on_frame = on_frame
+        self.idle_timeout = idle_timeout
+        self.falling_edge = falling_edge
+        # 1 start + 8 data + 1 stop bit
+        self.byte_time = 10.0 / baud_rate
+        self.packet_bytes = packet_bytes
+        self.packet_time = self.byte_time * packet_bytes
+        self.running = False
+        self._wakeup = threading.Event()
+        self._edge_callback = None
+
+        # İstatistikler
+        self.reads = 0
+        self.idle_waits = 0
+        self.frames = 0
+
+    def _on_edge(self, gpio, level, tick):
+        self._wakeup.set()
+
+    def _arm_edge_wakeup(self):
+        """Hat boşa düştüğünde kenar callback'ini kur"""
+        self._wakeup.clear()
+        if self._edge_callback is None:
+            self._edge_callback = self.pi.callback(self.rx_pin, self.falling_edge, self._on_edge)
+
+    def _disarm_edge_wakeup(self):
+        """Veri akarken her kenar için callback çağrılmasın"""
+        if self._edge_callback is not None:
+            self._edge_callback.cancel()
+            self._edge_callback = None
+
+    def _read_once(self):
+        """Bekleyen byte'ları oku ve tamamlanan paketleri ilet"""
+        self.reads += 1
+        (count, data) = self.pi.bb_serial_read(self.rx_pin)
+        if count > 0:
+            for frame in self.decoder.feed(data):
+                self.frames += 1
+                self.on_frame(frame)
+        return count
+
+    def run(self):
+        """Okuma döngüsü (thread hedefi)"""
+        self.running = True
+        self.decoder.clear()
+        try:
+            while self.running:
+                try:
+                    if self._read_once() > 0 and len(self.decoder):
+                        # Yarım paket var: kalan byte'ların süresi kadar bekle
+                        remaining = max(self.packet_bytes - len(self.decoder), 1)
+                        time.sleep(remaining * self.byte_time)
+                        continue
+
+                    # Paket sınırı veya hat boş: bir sonraki start bitini bekle,
+                    # callback kurulduktan sonra yarış durumuna karşı tekrar oku
+                    self._arm_edge_wakeup()
+                    if self._read_once() > 0:
+                        # Veri akmaya devam ediyor: kenar başına callback çağrılmasın
+                        self._disarm_edge_wakeup()
+                        continue
+                    self.idle_waits += 1
+                    if self._wakeup.wait(self.idle_timeout):
+                        self._disarm_edge_wakeup()
+                        # Paketin hattan geçmesini bekle
+                        time.sleep(self.packet_time)
+
+                except Exception as e:
+                    ingest_log.error("Veri okuma hatası: %s", e)
+                    self.decoder.clear()
+                    time.sleep(1)
+        finally:
+            self._disarm_edge_wakeup()
+
+    def stop(self):
+        """Döngüyü durdur"""
+        self.running = False
+        self._wakeup.set()
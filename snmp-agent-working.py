@@ -10,10 +10,10 @@ import time
 import datetime
 import threading
 import queue
-import math
 import pigpio
 import json
 from collections import defaultdict
+from soc_estimator import Calc_SOC, Calc_SOH
 
 # Global variables
 buffer = bytearray()
@@ -38,63 +38,6 @@ SNMP_AGENT_PORT = 161
 SNMP_COMMUNITY = 'public'
 SNMP_ENTERPRISE_OID = '1.3.6.1.4.1.99999'  # Özel enterprise OID
 
-def Calc_SOC(x):
-    if x is None:
-        return None
-        
-    a1, a2, a3, a4 = 112.1627, 14.3937, 0, 10.5555
-    b1, b2, b3, b4 = 14.2601, 11.6890, 12.7872, 10.9406
-    c1, c2, c3, c4 = 1.8161, 0.8211, 0.0025, 0.3866
-    
-    try:
-        Soctahmin = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2)
-        )
-        
-        if Soctahmin > 100.0:
-            Soctahmin = 100.0
-        elif Soctahmin < 0.0:
-            Soctahmin = 0.0
-            
-        return round(Soctahmin, 4)
-    except Exception as e:
-        print(f"SOC hesaplama hatası: {str(e)}")
-        return None
-
-def Calc_SOH(x):
-    if x is None:
-        return None
-    
-    try:
-        a1, b1, c1 = 85.918, 0.0181, 0.0083
-        a2, b2, c2 = 85.11, 0.0324, 0.0104
-        a3, b3, c3 = 0.3085, 0.0342, 0.0021
-        a4, b4, c4 = 16.521, 0.0382, 0.0013
-        a5, b5, c5 = -13.874, 0.0381, 0.0011
-        a6, b6, c6 = 40.077, 0.0474, 0.0079
-        a7, b7, c7 = 18.207, 0.0556, 0.0048
-
-        SohSonuc = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2) +
-            a5 * math.exp(-((x - b5) / c5) ** 2) +
-            a6 * math.exp(-((x - b6) / c6) ** 2) +
-            a7 * math.exp(-((x - b7) / c7) ** 2)
-        )
-        
-        if SohSonuc > 100.0:
-            SohSonuc = 100.0
-        
-        return round(SohSonuc, 4)
-    except Exception as e:
-        print(f"SOH hesaplama hatası: {str(e)}")
-        return None
-
 pi = pigpio.pi()
 pi.set_mode(TX_PIN, pigpio.OUTPUT)
 
@@ -4,18 +4,37 @@ import time
 import datetime
 import threading
 import queue
-import math
-import pigpio
 import json
 import os
 import socket
 import struct
-from collections import defaultdict
+from uart_frame_decoder import UARTFrameDecoder
+from ingest_queue import IngestQueue
+from battery_store import BatteryStore
+from serial_ingest import SerialIngest, load_pigpio
+from battery_packet import BatteryPacket
+from packet_handlers import PacketSink, dispatch_packet
+from system_log import DEBUG, RateLimitedSampler, configure_logging, get_logger
+from soc_estimator import soc_entries
+from period_accumulator import PeriodAccumulator
+from snmp_schema import dtype_type
 from pysnmp.hlapi.v3arch.asyncio import *
 
+pigpio = load_pigpio()
+
+# Alt sistem logger'ları
+ingest_log = get_logger('ingest')
+ram_log = get_logger('ram')
+snmp_log = get_logger('snmp')
+ram_write_sampler = RateLimitedSampler(ram_log)
+
 # Global variables
-buffer = bytearray()
-data_queue = queue.Queue()
+frame_decoder = UARTFrameDecoder()
+# Sınırlı ingest kuyruğu: tüketici yetişemezse aynı (arm, k, dtype) ölçümleri
+# birleştirilir, yine dolarsa en eski paket atılır (data_queue.stats())
+INGEST_CAPACITY = 4096
+INGEST_POLICY = 'coalesce'  # veya 'drop_oldest'
+data_queue = IngestQueue(INGEST_CAPACITY, INGEST_POLICY)
 RX_PIN = 16
 TX_PIN = 26
 BAUD_RATE = 9600
@@ -28,71 +47,18 @@ last_k_value = None  # Son gelen verinin k değerini tutar
 last_k_value_lock = threading.Lock()  # Thread-safe erişim için
 
 # RAM'de veri tutma sistemi
-battery_data_ram = defaultdict(dict)  # {arm: {k: {dtype: value}}}
 data_lock = threading.Lock()  # Thread-safe erişim için
+# Okuyucular periyot sonunda veya PUBLISH_EVERY yazmada bir yayınlanan kuşağı görür
+PUBLISH_EVERY = 64
+battery_store = BatteryStore(lock=data_lock, publish_every=PUBLISH_EVERY)  # (arm, k, dtype) -> slot
+# data_processor değerleri periyot boyunca tamponlar, periyot sonunda tek yazımla depoya aktarır
+period_accumulator = PeriodAccumulator(battery_store, derive=soc_entries)
 
 # SNMP Agent ayarları
 SNMP_AGENT_PORT = 161
 SNMP_COMMUNITY = 'public'
 SNMP_ENTERPRISE_OID = '1.3.6.1.4.1.1001'  # MIB dosyasındaki enterprise OID
 
-def Calc_SOC(x):
-    if x is None:
-        return None
-        
-    a1, a2, a3, a4 = 112.1627, 14.3937, 0, 10.5555
-    b1, b2, b3, b4 = 14.2601, 11.6890, 12.7872, 10.9406
-    c1, c2, c3, c4 = 1.8161, 0.8211, 0.0025, 0.3866
-    
-    try:
-        Soctahmin = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2)
-        )
-        
-        if Soctahmin > 100.0:
-            Soctahmin = 100.0
-        elif Soctahmin < 0.0:
-            Soctahmin = 0.0
-            
-        return round(Soctahmin, 4)
-    except Exception as e:
-        print(f"SOC hesaplama hatası: {str(e)}")
-        return None
-
-def Calc_SOH(x):
-    if x is None:
-        return None
-    
-    try:
-        a1, b1, c1 = 85.918, 0.0181, 0.0083
-        a2, b2, c2 = 85.11, 0.0324, 0.0104
-        a3, b3, c3 = 0.3085, 0.0342, 0.0021
-        a4, b4, c4 = 16.521, 0.0382, 0.0013
-        a5, b5, c5 = -13.874, 0.0381, 0.0011
-        a6, b6, c6 = 40.077, 0.0474, 0.0079
-        a7, b7, c7 = 18.207, 0.0556, 0.0048
-
-        SohSonuc = (
-            a1 * math.exp(-((x - b1) / c1) ** 2) +
-            a2 * math.exp(-((x - b2) / c2) ** 2) +
-            a3 * math.exp(-((x - b3) / c3) ** 2) +
-            a4 * math.exp(-((x - b4) / c4) ** 2) +
-            a5 * math.exp(-((x - b5) / c5) ** 2) +
-            a6 * math.exp(-((x - b6) / c6) ** 2) +
-            a7 * math.exp(-((x - b7) / c7) ** 2)
-        )
-        
-        if SohSonuc > 100.0:
-            SohSonuc = 100.0
-        
-        return round(SohSonuc, 4)
-    except Exception as e:
-        print(f"SOH hesaplama hatası: {str(e)}")
-        return None
-
 pi = pigpio.pi()
 pi.set_mode(TX_PIN, pigpio.OUTPUT)
 
@@ -131,58 +97,53 @@ def get_last_k_value():
         return last_k_value
 
 def update_battery_data_ram(arm, k, dtype, value):
-    """RAM'deki batarya verilerini güncelle"""
-    with data_lock:
-        if arm not in battery_data_ram:
-            battery_data_ram[arm] = {}
-        if k not in battery_data_ram[arm]:
-            battery_data_ram[arm][k] = {}
-        
-        battery_data_ram[arm][k][dtype] = {
-            'value': value,
-            'timestamp': int(time.time() * 1000)
-        }
-        
-        print(f"RAM'e kaydedildi: Arm={arm}, k={k}, dtype={dtype}, value={value}")
+    """Değeri periyot tamponuna ekle (commit_period() ile RAM'e yazılır)"""
+    period_accumulator.stage(arm, k, dtype, value)
+    ram_write_sampler.log("RAM'e kaydedildi: Arm=%s, k=%s, dtype=%s, value=%s", arm, k, dtype, value)
+
+def commit_period():
+    """Periyot tamponunu periyot zaman damgasıyla tek kilit işleminde RAM'e yaz ve yayınla"""
+    if current_period_timestamp is None:  # Henüz periyot başlamadı
+        return
+    period_accumulator.commit(current_period_timestamp)
+    battery_store.flush()
 
 def clear_battery_data_ram():
     """RAM'deki tüm batarya verilerini temizle"""
-    with data_lock:
-        battery_data_ram.clear()
-        print("RAM tamamen temizlendi.")
+    battery_store.clear()
+    ram_log.info("RAM tamamen temizlendi.")
 
 def get_battery_data_ram(arm=None, k=None, dtype=None):
     """RAM'den batarya verilerini oku"""
-    with data_lock:
+    result = battery_store.get(arm, k, dtype)
+    if ram_log.isEnabledFor(DEBUG):
         if arm is None:
-            result = dict(battery_data_ram)
-            print(f"RAM'den okundu: Tüm veriler, {len(result)} arm")
-            return result
+            ram_log.debug("RAM'den okundu: Tüm veriler, %d arm", len(result))
         elif k is None:
-            result = dict(battery_data_ram.get(arm, {}))
-            print(f"RAM'den okundu: Arm={arm}, {len(result)} k değeri")
-            return result
+            ram_log.debug("RAM'den okundu: Arm=%s, %d k değeri", arm, len(result))
         elif dtype is None:
-            result = dict(battery_data_ram.get(arm, {}).get(k, {}))
-            print(f"RAM'den okundu: Arm={arm}, k={k}, {len(result)} dtype")
-            return result
+            ram_log.debug("RAM'den okundu: Arm=%s, k=%s, %d dtype", arm, k, len(result))
         else:
-            result = battery_data_ram.get(arm, {}).get(k, {}).get(dtype, None)
-            print(f"RAM'den okundu: Arm={arm}, k={k}, dtype={dtype}, value={result}")
-            return result
+            ram_log.debug("RAM'den okundu: Arm=%s, k=%s, dtype=%s, value=%s", arm, k, dtype, result)
+    return result
 
 def get_snmp_value(oid):
-    """OID'ye göre SNMP değeri döndür - MIB dosyasındaki OID yapısına uygun"""
+    """OID'ye göre SNMP değeri döndür - MIB dosyasındaki OID yapısına uygun
+
+    Değer snmp_schema ile dtype'ın tipine ve sabit noktalı birimine
+    kodlanır (battery-monitoring.mib: gerilim/akım 0.01, sıcaklık 0.1,
+    yüzdeler 0.01 %).
+    """
     try:
         # OID'yi temizle - sonundaki .0'ı kaldır
         oid_clean = oid.rstrip('.0').lstrip('.')
         oid_parts = oid_clean.split('.')
         
-        print(f"SNMP OID parse ediliyor: Orijinal={oid}, Temizlenmiş={oid_clean}")
+        snmp_log.debug("SNMP OID parse ediliyor: Orijinal=%s, Temizlenmiş=%s", oid, oid_clean)
         
         # Enterprise OID kontrolü (1.3.6.1.4.1.1001)
         if len(oid_parts) < 7 or '.'.join(oid_parts[:7]) != SNMP_ENTERPRISE_OID:
-            print(f"Enterprise OID uyumsuzluğu: {oid_parts[:7] if len(oid_parts) >= 7 else 'Yetersiz parça'}")
+            snmp_log.debug("Enterprise OID uyumsuzluğu: %s", oid_parts[:7] if len(oid_parts) >= 7 else 'Yetersiz parça')
             return None
         
         # MIB dosyasındaki OID yapısına göre parse et
@@ -194,40 +155,40 @@ def get_snmp_value(oid):
             k_value = 2  # Kol verisi için k=2
             dtype = veri_tipi
             
-            print(f"Kol verisi algılandı: Arm={arm_num}, VeriTipi={veri_tipi}")
+            snmp_log.debug("Kol verisi algılandı: Arm=%s, VeriTipi=%s", arm_num, veri_tipi)
             
         elif len(oid_parts) == 10:  # Batarya verisi: 1.3.6.1.4.1.1001.{KOL}.5.{BATARYA}.{VERI_TIPI}
             arm_num = int(oid_parts[7])  # Kol numarası
             if int(oid_parts[8]) != 5:  # 5 olmalı (batarya verisi)
-                print(f"Geçersiz batarya veri formatı: {oid_parts[8]}")
+                snmp_log.debug("Geçersiz batarya veri formatı: %s", oid_parts[8])
                 return None
             k_value = int(oid_parts[9])  # Batarya numarası
             dtype = int(oid_parts[10])  # Veri tipi (1=Gerilim, 2=SOC, 3=RIMT, 4=NTC1, 5=NTC2, 6=NTC3, 7=SOH)
             
-            print(f"Batarya verisi algılandı: Arm={arm_num}, Batarya={k_value}, VeriTipi={dtype}")
+            snmp_log.debug("Batarya verisi algılandı: Arm=%s, Batarya=%s, VeriTipi=%s", arm_num, k_value, dtype)
             
         elif len(oid_parts) == 9:  # Status verisi: 1.3.6.1.4.1.1001.{KOL}.6.{BATARYA}
             arm_num = int(oid_parts[7])  # Kol numarası
             if int(oid_parts[8]) != 6:  # 6 olmalı (status verisi)
-                print(f"Geçersiz status veri formatı: {oid_parts[8]}")
+                snmp_log.debug("Geçersiz status veri formatı: %s", oid_parts[8])
                 return None
             k_value = int(oid_parts[9])  # Batarya numarası (0=Kol status, >0=Batarya status)
             dtype = 6  # Status verisi
             
-            print(f"Status verisi algılandı: Arm={arm_num}, Batarya={k_value}")
+            snmp_log.debug("Status verisi algılandı: Arm=%s, Batarya=%s", arm_num, k_value)
             
         elif len(oid_parts) == 11:  # Alarm verisi: 1.3.6.1.4.1.1001.{KOL}.7.{BATARYA}.{ALARM_TIPI}
             arm_num = int(oid_parts[7])  # Kol numarası
             if int(oid_parts[8]) != 7:  # 7 olmalı (alarm verisi)
-                print(f"Geçersiz alarm veri formatı: {oid_parts[8]}")
+                snmp_log.debug("Geçersiz alarm veri formatı: %s", oid_parts[8])
                 return None
             k_value = int(oid_parts[9])  # Batarya numarası (0=Kol alarm, >0=Batarya alarm)
             dtype = int(oid_parts[10])  # Alarm tipi
             
-            print(f"Alarm verisi algılandı: Arm={arm_num}, Batarya={k_value}, AlarmTipi={dtype}")
+            snmp_log.debug("Alarm verisi algılandı: Arm=%s, Batarya=%s, AlarmTipi=%s", arm_num, k_value, dtype)
             
         else:
-            print(f"Desteklenmeyen OID formatı: {oid_clean}")
+            snmp_log.debug("Desteklenmeyen OID formatı: %s", oid_clean)
             return None
         
         # Veri tipi mapping (MIB'deki veri tiplerini internal dtype'lara çevir)
@@ -247,20 +208,20 @@ def get_snmp_value(oid):
         else:
             internal_dtype = dtype
         
-        print(f"Internal mapping: dtype={dtype} -> internal_dtype={internal_dtype}")
+        snmp_log.debug("Internal mapping: dtype=%s -> internal_dtype=%s", dtype, internal_dtype)
         
         # RAM'den veri oku
         data = get_battery_data_ram(arm_num, k_value, internal_dtype)
         
         if data is None:
-            print(f"Veri bulunamadı: Arm={arm_num}, k={k_value}, dtype={internal_dtype}")
-            return 0.0
+            snmp_log.debug("Veri bulunamadı: Arm=%s, k=%s, dtype=%s", arm_num, k_value, internal_dtype)
+            return dtype_type(internal_dtype).encode(None)
             
-        print(f"Veri bulundu: {data['value']}")
-        return data['value']
+        snmp_log.debug("Veri bulundu: %s", data['value'])
+        return dtype_type(internal_dtype).encode(data['value'])
         
     except Exception as e:
-        print(f"SNMP OID parse hatası: {e}")
+        snmp_log.warning("SNMP OID parse hatası: %s", e)
         return None
 
 def get_all_battery_data(arm_num, k_value):
@@ -278,74 +239,42 @@ def get_all_battery_data(arm_num, k_value):
         return result
         
     except Exception as e:
-        print(f"Tüm batarya verisi alma hatası: {e}")
+        ram_log.warning("Tüm batarya verisi alma hatası: %s", e)
         return {}
 
 def read_serial(pi):
     """Bit-banging ile GPIO üzerinden seri veri oku"""
-    global buffer
     print("\nBit-banging UART veri alımı başladı...")
-    
-    buffer.clear()
 
-    while True:
-        try:
-            (count, data) = pi.bb_serial_read(RX_PIN)
-            if count > 0:
-                buffer.extend(data)
-                
-                while len(buffer) >= 3:
-                    try:
-                        # Header (0x80 veya 0x81) bul
-                        header_index = -1
-                        for i, byte in enumerate(buffer):
-                            if byte == 0x80 or byte == 0x81:
-                                header_index = i
-                                break
-                        
-                        if header_index == -1:
-                            buffer.clear()
-                            break
-
-                        if header_index > 0:
-                            buffer = buffer[header_index:]
-
-                        # Paket uzunluğunu belirle
-                        if len(buffer) >= 3:
-                            dtype = buffer[2]
-                            
-                            # 5 byte'lık missing data paketi kontrolü
-                            if dtype == 0x7F and len(buffer) >= 5:
-                                packet_length = 5
-                            # 6 byte'lık paket kontrolü
-                            elif len(buffer) >= 6 and (buffer[2] == 0x0F or buffer[1] == 0x7E or (buffer[2] == 0x7D and buffer[1] == 2)):
-                                packet_length = 6
-                            elif dtype == 0x7D and len(buffer) >= 7 and buffer[1] > 2:
-                                packet_length = 7
-                            else:
-                                packet_length = 11
-
-                            if len(buffer) >= packet_length:
-                                packet = buffer[:packet_length]
-                                buffer = buffer[packet_length:]
-                                hex_packet = [f"{b:02x}" for b in packet]
-                                data_queue.put(hex_packet)
-                            else:
-                                # Paket tamamlanmamış, daha fazla veri bekle
-                                break
-                        else:
-                            break
-
-                    except Exception as e:
-                        print(f"Paket işleme hatası: {e}")
-                        buffer.clear()
-                        continue
-
-            time.sleep(0.01)
+    ingest = SerialIngest(
+        pi, RX_PIN, BAUD_RATE, frame_decoder,
+        lambda frame: data_queue.put(BatteryPacket(frame)),
+        falling_edge=pigpio.FALLING_EDGE
+    )
+    ingest.run()
 
-        except Exception as e:
-            print(f"Veri okuma hatası: {e}")
-            time.sleep(1)
+class RAMPacketSink(PacketSink):
+    """Çözülmüş paketleri RAM'e kaydeden hedef"""
+
+    def begin_measurement(self, k_value):
+        # k_value 2 geldiğinde yeni periyot başlat (ard arda gelmemesi şartıyla)
+        if k_value == 2:
+            if get_last_k_value() != 2:  # Non-consecutive arm data
+                # Biten periyodu (SOC dahil) tek seferde yaz ve okuyuculara yayınla
+                commit_period()
+                reset_period()
+                period_accumulator.begin(get_period_timestamp())
+            update_last_k_value(2)
+        else:  # Battery data
+            update_last_k_value(k_value)
+
+    def on_value(self, arm_value, k_value, dtype, value):
+        update_battery_data_ram(arm_value, k_value, dtype, value)
+
+    # on_voltage: PacketSink varsayılanı dtype=10 yazar; SOC (dtype=126)
+    # commit_period()'da periyodun tüm gerilimlerinden tek batch ile türetilir
+
+ram_sink = RAMPacketSink()
 
 def data_processor():
     """Gelen verileri işle ve RAM'e kaydet"""
@@ -353,133 +282,23 @@ def data_processor():
     
     while True:
         try:
-            data = data_queue.get(timeout=1)
-            if data is None:
+            packet = data_queue.get(timeout=1)
+            if packet is None:
                 break
             
             # Veri alındığında zaman damgasını güncelle
             last_data_received = time.time()
-        
-            # 7 byte Batkon alarm verisi kontrolü
-            if len(data) == 7:
-                raw_bytes = [int(b, 16) for b in data]
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                
-                print(f"\n*** BATKON ALARM VERİSİ ALGILANDI - {timestamp} ***")
-                print(f"Ham Veri: {data}")
-                continue
-
-            # 5 byte'lık missing data verisi kontrolü
-            if len(data) == 5:
-                raw_bytes = [int(b, 16) for b in data]
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                
-                print(f"\n*** MISSING DATA VERİSİ ALGILANDI - {timestamp} ***")
-                continue
-
-            # 11 byte'lık veri kontrolü
-            if len(data) == 11:
-                arm_value = int(data[3], 16)
-                dtype = int(data[2], 16)
-                k_value = int(data[1], 16)
-                
-                # k_value 2 geldiğinde yeni periyot başlat (ard arda gelmemesi şartıyla)
-                if k_value == 2:
-                    if get_last_k_value() != 2:  # Non-consecutive arm data
-                        reset_period()
-                        get_period_timestamp()
-                    update_last_k_value(2)
-                else:  # Battery data
-                    update_last_k_value(k_value)
-                
-                # Arm değeri kontrolü
-                if arm_value not in [1, 2, 3, 4]:
-                    print(f"\nHATALI ARM DEĞERİ: {arm_value}")
-                    continue
-                
-                # Salt data hesapla
-                if dtype == 11 and k_value == 2:  # Nem hesapla
-                    onlar = int(data[5], 16)
-                    birler = int(data[6], 16)
-                    kusurat1 = int(data[7], 16)
-                    kusurat2 = int(data[8], 16)
-                    
-                    tam_kisim = (onlar * 10 + birler)
-                    kusurat_kisim = (kusurat1 * 0.1 + kusurat2 * 0.01)
-                    salt_data = tam_kisim + kusurat_kisim
-                    salt_data = round(salt_data, 4)
-                else:
-                    # Normal hesaplama
-                    saltData = int(data[4], 16) * 100 + int(data[5], 16) * 10 + int(data[6], 16) + int(data[7], 16) * 0.1 + int(data[8], 16) * 0.01 + int(data[9], 16) * 0.001
-                    salt_data = round(saltData, 4)
-                
-                # Veri işleme ve RAM'e kayıt
-                if dtype == 10:  # Gerilim
-                    # Ham gerilim verisini kaydet
-                    update_battery_data_ram(arm_value, k_value, 10, salt_data)
-                    
-                    # SOC hesapla ve dtype=126'ya kaydet
-                    if k_value != 2:  # k_value 2 değilse SOC hesapla
-                        soc_value = Calc_SOC(salt_data)
-                        update_battery_data_ram(arm_value, k_value, 126, soc_value)
-                
-                elif dtype == 11:  # SOH veya Nem
-                    if k_value == 2:  # Nem verisi
-                        print(f"*** VERİ ALGILANDI - Arm: {arm_value}, Nem: {salt_data}% ***")
-                        update_battery_data_ram(arm_value, k_value, 11, salt_data)
-                    else:  # SOH verisi
-                        if int(data[4], 16) == 1:  # Eğer data[4] 1 ise SOH 100'dür
-                            soh_value = 100.0
-                        else:
-                            onlar = int(data[5], 16)
-                            birler = int(data[6], 16)
-                            kusurat1 = int(data[7], 16)
-                            kusurat2 = int(data[8], 16)
-                            
-                            tam_kisim = (onlar * 10 + birler)
-                            kusurat_kisim = (kusurat1 * 0.1 + kusurat2 * 0.01)
-                            soh_value = tam_kisim + kusurat_kisim
-                            soh_value = round(soh_value, 4)
-                        
-                        # SOH verisini dtype=11'e kaydet
-                        update_battery_data_ram(arm_value, k_value, 11, soh_value)
-                
-                elif dtype == 12:  # NTC1
-                    update_battery_data_ram(arm_value, k_value, 12, salt_data)
-                
-                elif dtype == 13:  # NTC2
-                    update_battery_data_ram(arm_value, k_value, 13, salt_data)
-                
-                else:  # Diğer Dtype değerleri için
-                    update_battery_data_ram(arm_value, k_value, dtype, salt_data)
 
-            # 6 byte'lık balans komutu veya armslavecounts kontrolü
-            elif len(data) == 6:
-                raw_bytes = [int(b, 16) for b in data]
-                
-                # Slave sayısı verisi: 2. byte (index 1) 0x7E ise
-                if raw_bytes[1] == 0x7E:
-                    arm1, arm2, arm3, arm4 = raw_bytes[2], raw_bytes[3], raw_bytes[4], raw_bytes[5]
-                    print(f"armslavecounts verisi tespit edildi: arm1={arm1}, arm2={arm2}, arm3={arm3}, arm4={arm4}")
-                    continue
-                
-                # Balans verisi: 3. byte (index 2) 0x0F ise
-                elif raw_bytes[2] == 0x0F:
-                    print(f"Balans verisi tespit edildi")
-                    continue
-                
-                # Hatkon alarmı: 3. byte (index 2) 0x7D ise
-                elif raw_bytes[2] == 0x7D:
-                    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                    print(f"\n*** HATKON ALARM VERİSİ ALGILANDI - {timestamp} ***")
-                    continue
+            dispatch_packet(packet, ram_sink)
 
             data_queue.task_done()
             
         except queue.Empty:
+            # Veri akışı durdu: yarım kalan periyodu da yayınla
+            commit_period()
             continue
         except Exception as e:
-            print(f"\ndata_processor'da beklenmeyen hata: {e}")
+            ingest_log.exception("data_processor'da beklenmeyen hata: %s", e)
             continue
 
 def snmp_get_handler(snmpEngine, stateReference, contextName, varBinds, cbCtx):
@@ -487,30 +306,28 @@ def snmp_get_handler(snmpEngine, stateReference, contextName, varBinds, cbCtx):
     try:
         for oid, val in varBinds:
             oid_str = '.'.join([str(x) for x in oid])
-            print(f"SNMP GET isteği: OID={oid_str}")
+            snmp_log.debug("SNMP GET isteği: OID=%s", oid_str)
             
             # OID'ye göre değer al
             value = get_snmp_value(oid_str)
             
             if value is not None:
-                # Float değeri integer'a çevir (SNMP için)
-                int_value = int(value * 100) if isinstance(value, float) else int(value)
-                print(f"SNMP değer döndürüldü: OID={oid_str}, Value={value} -> {int_value}")
+                snmp_log.debug("SNMP değer döndürüldü: OID=%s, Value=%s", oid_str, value.prettyPrint())
                 
                 # SNMP response hazırla
-                varBinds = [(oid, rfc1902.Integer(int_value))]
+                varBinds = [(oid, value)]
                 snmpEngine.msgAndPduDsp.returnResponsePdu(
                     snmpEngine, stateReference, 0, 0, varBinds
                 )
             else:
-                print(f"SNMP değer bulunamadı: OID={oid_str}")
+                snmp_log.debug("SNMP değer bulunamadı: OID=%s", oid_str)
                 # NoSuchInstance hatası döndür
                 snmpEngine.msgAndPduDsp.returnResponsePdu(
                     snmpEngine, stateReference, 0, 2, varBinds
                 )
                 
     except Exception as e:
-        print(f"SNMP GET handler hatası: {e}")
+        snmp_log.error("SNMP GET handler hatası: %s", e)
 
 def start_snmp_agent():
     """SNMP Agent'ı başlat"""
@@ -550,10 +367,10 @@ def start_snmp_agent():
         print(f"SNMP Agent başlatma hatası: {e}")
 
 def main():
+    configure_logging()
     try:
         # RAM'i temizle
-        with data_lock:
-            battery_data_ram.clear()
+        battery_store.clear()
         print("RAM temizlendi.")
         
         if not pi.connected:
@@ -589,6 +406,7 @@ def main():
 
     except KeyboardInterrupt:
         print("\nProgram sonlandırılıyor...")
+        print(f"Ingest kuyruğu: {data_queue.stats()}")
 
     finally:
         if 'pi' in locals():
@@ -11,33 +11,21 @@ from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp, context
 from pysnmp.carrier.asyncio.dgram import udp
 from pysnmp.proto.api import v2c
+from pysnmp.smi import exval
+
+from snmp_schema import dtype_type, scalar_syntax
 
 # RAM'de değer tutma sistemi
-from collections import defaultdict
-battery_data_ram = defaultdict(dict)
+from battery_store import BatteryStore
+battery_store = BatteryStore()
 
 def update_battery_data_ram(arm, k, dtype, value):
     """RAM'deki batarya verilerini güncelle"""
-    if arm not in battery_data_ram:
-        battery_data_ram[arm] = {}
-    if k not in battery_data_ram[arm]:
-        battery_data_ram[arm][k] = {}
-    
-    battery_data_ram[arm][k][dtype] = {
-        'value': value,
-        'timestamp': int(time.time() * 1000)
-    }
+    battery_store.update(arm, k, dtype, value)
 
 def get_battery_data_ram(arm=None, k=None, dtype=None):
     """RAM'den batarya verilerini oku"""
-    if arm is None:
-        return dict(battery_data_ram)
-    elif k is None:
-        return dict(battery_data_ram.get(arm, {}))
-    elif dtype is None:
-        return dict(battery_data_ram.get(arm, {}).get(k, {}))
-    else:
-        return battery_data_ram.get(arm, {}).get(k, {}).get(dtype, None)
+    return battery_store.get(arm, k, dtype)
 
 # Test verileri ekle
 update_battery_data_ram(1, 3, 10, 12.5)  # arm=1, k=3, dtype=10, value=12.5
@@ -96,23 +84,18 @@ def start_basic_snmp_agent():
                         f"Python {sys.version} running on a {sys.platform} platform"
                     )
                 elif oid == "1.3.6.5.2.0":  # totalBatteryCount
-                    data = get_battery_data_ram()
-                    battery_count = 0
-                    for arm in data.keys():
-                        for k in data[arm].keys():
-                            if k > 2:  # k>2 olanlar batarya verisi
-                                battery_count += 1
-                    return self.getSyntax().clone(str(battery_count if battery_count > 0 else 1))
+                    battery_count = battery_store.stats.battery_count
+                    return self.getSyntax().clone(battery_count if battery_count > 0 else 1)
                 elif oid == "1.3.6.5.3.0":  # totalArmCount
-                    data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(len(data) if data else 2))
+                    arm_count = battery_store.stats.arm_count
+                    return self.getSyntax().clone(arm_count if arm_count else 2)
                 elif oid == "1.3.6.5.4.0":  # systemStatus
-                    return self.getSyntax().clone("1")
+                    return self.getSyntax().clone(1)
                 elif oid == "1.3.6.5.5.0":  # lastUpdateTime
                     return self.getSyntax().clone(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 elif oid == "1.3.6.5.6.0":  # dataCount
-                    data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(sum(len(data[arm]) for arm in data) if data else 6))
+                    data_count = battery_store.stats.data_count
+                    return self.getSyntax().clone(data_count if data_count else 6)
                 else:
                     # Gerçek batarya verileri - RAM'den oku
                     if oid.startswith("1.3.6.5.10."):
@@ -124,38 +107,38 @@ def start_basic_snmp_agent():
                             
                             data = get_battery_data_ram(arm, k, dtype)
                             if data:
-                                return self.getSyntax().clone(str(data['value']))
-                            return self.getSyntax().clone("0")
+                                return dtype_type(dtype).encode(data['value'])
+                            return dtype_type(dtype).encode(0)
                     
-                    return self.getSyntax().clone("No Such Object")
+                    return exval.noSuchInstance
 
         # MIB Objects oluştur
         mibBuilder.export_symbols(
             "__BASIC_MIB",
             # Sistem bilgileri
-            MibScalar((1, 3, 6, 5, 1), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 1), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 1), scalar_syntax((1, 3, 6, 5, 1))),
+            BasicMibScalarInstance((1, 3, 6, 5, 1), (0,), scalar_syntax((1, 3, 6, 5, 1))),
             
-            MibScalar((1, 3, 6, 5, 2), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 2), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 2), scalar_syntax((1, 3, 6, 5, 2))),
+            BasicMibScalarInstance((1, 3, 6, 5, 2), (0,), scalar_syntax((1, 3, 6, 5, 2))),
             
-            MibScalar((1, 3, 6, 5, 3), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 3), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 3), scalar_syntax((1, 3, 6, 5, 3))),
+            BasicMibScalarInstance((1, 3, 6, 5, 3), (0,), scalar_syntax((1, 3, 6, 5, 3))),
             
-            MibScalar((1, 3, 6, 5, 4), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 4), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 4), scalar_syntax((1, 3, 6, 5, 4))),
+            BasicMibScalarInstance((1, 3, 6, 5, 4), (0,), scalar_syntax((1, 3, 6, 5, 4))),
             
-            MibScalar((1, 3, 6, 5, 5), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 5), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 5), scalar_syntax((1, 3, 6, 5, 5))),
+            BasicMibScalarInstance((1, 3, 6, 5, 5), (0,), scalar_syntax((1, 3, 6, 5, 5))),
             
-            MibScalar((1, 3, 6, 5, 6), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 6), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 6), scalar_syntax((1, 3, 6, 5, 6))),
+            BasicMibScalarInstance((1, 3, 6, 5, 6), (0,), scalar_syntax((1, 3, 6, 5, 6))),
             
-            MibScalar((1, 3, 6, 5, 7), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 7), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 7), scalar_syntax((1, 3, 6, 5, 7))),
+            BasicMibScalarInstance((1, 3, 6, 5, 7), (0,), scalar_syntax((1, 3, 6, 5, 7))),
             
-            MibScalar((1, 3, 6, 5, 8), v2c.OctetString()),
-            BasicMibScalarInstance((1, 3, 6, 5, 8), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 8), scalar_syntax((1, 3, 6, 5, 8))),
+            BasicMibScalarInstance((1, 3, 6, 5, 8), (0,), scalar_syntax((1, 3, 6, 5, 8))),
         )
         print("✅ MIB Objects oluşturuldu")
 
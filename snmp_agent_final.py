@@ -12,6 +12,9 @@ from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp, context
 from pysnmp.carrier.asyncio.dgram import udp
 from pysnmp.proto.api import v2c
+from pysnmp.smi import exval
+
+from snmp_schema import dtype_type, scalar_syntax
 
 # RAM'de veri tutma sistemi
 battery_data_ram = defaultdict(dict)
@@ -94,73 +97,73 @@ def start_snmp_agent():
                         for k in data[arm].keys():
                             if k > 2:  # k>2 olanlar batarya verisi
                                 battery_count += 1
-                    return self.getSyntax().clone(str(battery_count if battery_count > 0 else 1))
+                    return self.getSyntax().clone(battery_count if battery_count > 0 else 1)
                 elif oid == "1.3.6.5.3.0":  # totalArmCount
                     data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(len(data) if data else 2))
+                    return self.getSyntax().clone(len(data) if data else 2)
                 elif oid == "1.3.6.5.4.0":  # systemStatus
-                    return self.getSyntax().clone("1")
+                    return self.getSyntax().clone(1)
                 elif oid == "1.3.6.5.5.0":  # lastUpdateTime
                     return self.getSyntax().clone(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 elif oid == "1.3.6.5.6.0":  # dataCount
                     data = get_battery_data_ram()
-                    return self.getSyntax().clone(str(sum(len(data[arm]) for arm in data) if data else 13))
+                    return self.getSyntax().clone(sum(len(data[arm]) for arm in data) if data else 13)
                 else:
                     # Gerçek batarya verileri
                     if oid.startswith("1.3.6.5.10."):
                         parts = oid.split('.')
-                        if len(parts) >= 6:
-                            arm = int(parts[4])
-                            k = int(parts[5])
-                            dtype = int(parts[6]) if len(parts) > 6 else 0
+                        if len(parts) >= 8:  # 1.3.6.5.10.arm.k.dtype.0
+                            arm = int(parts[5])
+                            k = int(parts[6])
+                            dtype = int(parts[7])
                             
                             data = get_battery_data_ram(arm, k, dtype)
                             if data:
-                                return self.getSyntax().clone(str(data['value']))
-                            return self.getSyntax().clone("0")
+                                return dtype_type(dtype).encode(data['value'])
+                            return dtype_type(dtype).encode(0)
                     
-                    return self.getSyntax().clone("No Such Object")
+                    return exval.noSuchInstance
             
-            def setValue(self, name, value, **context):
+            def setValue(self, value, name, **context):
                 oid = '.'.join([str(x) for x in name])
                 print(f"✏️ MIB OID yazma: {oid} = {value}")
                 
                 # Gerçek batarya verileri yazma
                 if oid.startswith("1.3.6.5.10."):
                     parts = oid.split('.')
-                    if len(parts) >= 6:
-                        arm = int(parts[4])
-                        k = int(parts[5])
-                        dtype = int(parts[6]) if len(parts) > 6 else 0
+                    if len(parts) >= 8:  # 1.3.6.5.10.arm.k.dtype.0
+                        arm = int(parts[5])
+                        k = int(parts[6])
+                        dtype = int(parts[7])
                         
-                        # Veriyi kaydet
-                        update_battery_data_ram(arm, k, dtype, str(value))
+                        # Veriyi kaydet (SNMP tam sayısı şema ölçeğiyle geri çevrilir)
+                        update_battery_data_ram(arm, k, dtype, int(value) / dtype_type(dtype).scale)
                         print(f"✅ Veri kaydedildi: arm={arm}, k={k}, dtype={dtype}, value={value}")
-                        return True
+                        return self.getSyntax().clone(value)
                 
-                return False
+                return MibScalarInstance.setValue(self, value, name, **context)
 
         # MIB Objects oluştur
         mibBuilder.export_symbols(
             "__BATTERY_MIB",
             # Sistem bilgileri (sadece okunabilir)
-            MibScalar((1, 3, 6, 5, 1), v2c.OctetString()),
-            BatteryMibScalarInstance((1, 3, 6, 5, 1), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 1), scalar_syntax((1, 3, 6, 5, 1))),
+            BatteryMibScalarInstance((1, 3, 6, 5, 1), (0,), scalar_syntax((1, 3, 6, 5, 1))),
             
-            MibScalar((1, 3, 6, 5, 2), v2c.OctetString()),
-            BatteryMibScalarInstance((1, 3, 6, 5, 2), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 2), scalar_syntax((1, 3, 6, 5, 2))),
+            BatteryMibScalarInstance((1, 3, 6, 5, 2), (0,), scalar_syntax((1, 3, 6, 5, 2))),
             
-            MibScalar((1, 3, 6, 5, 3), v2c.OctetString()),
-            BatteryMibScalarInstance((1, 3, 6, 5, 3), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 3), scalar_syntax((1, 3, 6, 5, 3))),
+            BatteryMibScalarInstance((1, 3, 6, 5, 3), (0,), scalar_syntax((1, 3, 6, 5, 3))),
             
-            MibScalar((1, 3, 6, 5, 4), v2c.OctetString()),
-            BatteryMibScalarInstance((1, 3, 6, 5, 4), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 4), scalar_syntax((1, 3, 6, 5, 4))),
+            BatteryMibScalarInstance((1, 3, 6, 5, 4), (0,), scalar_syntax((1, 3, 6, 5, 4))),
             
-            MibScalar((1, 3, 6, 5, 5), v2c.OctetString()),
-            BatteryMibScalarInstance((1, 3, 6, 5, 5), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 5), scalar_syntax((1, 3, 6, 5, 5))),
+            BatteryMibScalarInstance((1, 3, 6, 5, 5), (0,), scalar_syntax((1, 3, 6, 5, 5))),
             
-            MibScalar((1, 3, 6, 5, 6), v2c.OctetString()),
-            BatteryMibScalarInstance((1, 3, 6, 5, 6), (0,), v2c.OctetString()),
+            MibScalar((1, 3, 6, 5, 6), scalar_syntax((1, 3, 6, 5, 6))),
+            BatteryMibScalarInstance((1, 3, 6, 5, 6), (0,), scalar_syntax((1, 3, 6, 5, 6))),
         )
         
         # Batarya verileri için yazılabilir MIB Objects
@@ -171,8 +174,8 @@ def start_snmp_agent():
                     oid = (1, 3, 6, 5, 10, arm, k, dtype)
                     mibBuilder.export_symbols(
                         f"__BATTERY_MIB_{arm}_{k}_{dtype}",
-                        MibScalar(oid, v2c.OctetString()),
-                        BatteryMibScalarInstance(oid, (0,), v2c.OctetString()),
+                        MibScalar(oid, dtype_type(dtype).syntax),
+                        BatteryMibScalarInstance(oid, (0,), dtype_type(dtype).syntax),
                     )
         print("✅ MIB Objects oluşturuldu")
 
@@ -208,10 +211,10 @@ def start_snmp_agent():
         print("1.3.6.5.5.0  - Son güncelleme")
         print("1.3.6.5.6.0  - Veri sayısı")
         print("=" * 50)
-        print("Veri Yazma (SET) Örnekleri:")
-        print("snmpset -v2c -c public localhost:1161 1.3.6.5.10.1.3.10.0 s \"12.5\"")
-        print("snmpset -v2c -c public localhost:1161 1.3.6.5.10.2.4.11.0 s \"85.0\"")
-        print("snmpset -v2c -c public localhost:1161 1.3.6.5.10.3.3.12.0 s \"25.0\"")
+        print("Veri Yazma (SET) Örnekleri (0.01 V, 0.01 %, 0.1 °C):")
+        print("snmpset -v2c -c public localhost:1161 1.3.6.5.10.1.3.10.0 i 1250")
+        print("snmpset -v2c -c public localhost:1161 1.3.6.5.10.2.4.11.0 u 8500")
+        print("snmpset -v2c -c public localhost:1161 1.3.6.5.10.3.3.12.0 i 250")
         print("=" * 50)
         print("Veri Okuma (GET) Örnekleri:")
         print("snmpget -v2c -c public localhost:1161 1.3.6.5.10.1.3.10.0")
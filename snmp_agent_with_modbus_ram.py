@@ -8,7 +8,8 @@ import sys
 import time
 import datetime
 import threading
-from collections import defaultdict
+from battery_store import BatteryStore
+from system_log import RateLimitedSampler, configure_logging, get_logger
 from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp, context
 from pysnmp.carrier.asyncio.dgram import udp
@@ -16,39 +17,20 @@ from pysnmp.proto.api import v2c
 
 # Modbus TCP Server'dan RAM veri yapısını import et
 # Bu değişkenler Modbus TCP Server ile aynı olmalı
-battery_data_ram = defaultdict(dict)  # {arm: {k: {dtype: value}}}
 data_lock = threading.Lock()  # Thread-safe erişim için
+ram_log = get_logger('ram')
+snmp_log = get_logger('snmp')
+ram_write_sampler = RateLimitedSampler(ram_log)
+battery_store = BatteryStore(lock=data_lock)  # (arm, k, dtype) -> slot
 
 def update_battery_data_ram(arm, k, dtype, value):
     """RAM'deki batarya verilerini güncelle - Modbus TCP Server ile aynı"""
-    with data_lock:
-        if arm not in battery_data_ram:
-            battery_data_ram[arm] = {}
-        if k not in battery_data_ram[arm]:
-            battery_data_ram[arm][k] = {}
-        
-        battery_data_ram[arm][k][dtype] = {
-            'value': value,
-            'timestamp': int(time.time() * 1000)
-        }
-        
-        print(f"SNMP RAM'e kaydedildi: Arm={arm}, k={k}, dtype={dtype}, value={value}")
+    battery_store.update(arm, k, dtype, value)
+    ram_write_sampler.log("SNMP RAM'e kaydedildi: Arm=%s, k=%s, dtype=%s, value=%s", arm, k, dtype, value)
 
 def get_battery_data_ram(arm=None, k=None, dtype=None):
     """RAM'den batarya verilerini oku - Modbus TCP Server ile aynı"""
-    with data_lock:
-        if arm is None:
-            result = dict(battery_data_ram)
-            return result
-        elif k is None:
-            result = dict(battery_data_ram.get(arm, {}))
-            return result
-        elif dtype is None:
-            result = dict(battery_data_ram.get(arm, {}).get(k, {}))
-            return result
-        else:
-            result = battery_data_ram.get(arm, {}).get(k, {}).get(dtype, None)
-            return result
+    return battery_store.get(arm, k, dtype)
 
 def start_snmp_agent_with_modbus_ram():
     """SNMP Agent başlat - Modbus TCP Server RAM sistemi ile"""
@@ -91,7 +73,7 @@ def start_snmp_agent_with_modbus_ram():
             """Modbus TCP Server RAM sistemi ile MIB Instance"""
             def getValue(self, name, **context):
                 oid = '.'.join([str(x) for x in name])
-                print(f"🔍 MIB OID sorgusu: {oid}")
+                snmp_log.debug("MIB OID sorgusu: %s", oid)
                 
                 # Sistem bilgileri
                 if oid == "1.3.6.5.1.0":
@@ -129,13 +111,10 @@ def start_snmp_agent_with_modbus_ram():
                             k = int(parts[6])      # 1.3.6.5.10.arm.{k}
                             dtype = int(parts[7])  # 1.3.6.5.10.arm.k.{dtype}
                             
-                            print(f"🔍 Debug: arm={arm}, k={k}, dtype={dtype}")
                             data = get_battery_data_ram(arm, k, dtype)
-                            print(f"🔍 Debug: data={data}")
+                            snmp_log.debug("arm=%s, k=%s, dtype=%s, data=%s", arm, k, dtype, data)
                             if data:
-                                print(f"🔍 Debug: value={data['value']}")
                                 return self.getSyntax().clone(str(data['value']))
-                            print(f"🔍 Debug: No data found, returning 0")
                             return self.getSyntax().clone("0")
                     
                     return self.getSyntax().clone("No Such Object")
@@ -260,4 +239,5 @@ def start_snmp_agent_with_modbus_ram():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    configure_logging()
     start_snmp_agent_with_modbus_ram()
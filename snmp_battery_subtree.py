@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+SNMP Battery Subtree - 1.3.6.5.10 altındaki batarya verileri
+Tek bir MIB nesnesi: instance OID'i (arm, k, dtype, 0) aritmetik olarak
+BatteryStore slot'una çözülür, GETNEXT sözlük sırasındaki bir sonraki
+dolu slot'u doğrudan hesaplar. Tüm kollar ve k=1..122 gezilebilir.
+"""
+
+from pysnmp.smi import error, exval
+
+from battery_store import DTYPES, K_SLOTS, SLOT_COUNT, SLOTS_PER_K, _EMPTY, slot_key, slot_of
+
+BATTERY_SUBTREE = (1, 3, 6, 5, 10)
+COUNT_INSTANCE = (0,)  # 1.3.6.5.10.0 - arm4SlaveCount
+COUNT_ARM = 4
+
+# Slot sırası (arm, k, dtype) sözlük sırasıyla aynıdır:
+# slot = ((arm-1)*K_SLOTS + (k-1))*SLOTS_PER_K + dtype indeksi
+_FIRST_K_SLOT = slot_of(1, 1, DTYPES[0])
+
+
+def instance_of(slot):
+    """Slot -> instance OID son eki (arm, k, dtype, 0)"""
+    arm, k, dtype = slot_key(slot)
+    return arm, k, dtype, 0
+
+
+def instance_slot(suffix):
+    """(arm, k, dtype, 0) son eki -> slot, geçersizse -1"""
+    if len(suffix) != 4 or suffix[3] != 0:
+        return -1
+    return slot_of(suffix[0], suffix[1], suffix[2])
+
+
+def successor_slot(suffix):
+    """instance_of(slot) > suffix olan en küçük slot (SLOT_COUNT: yok)
+
+    Sınır aşımları slot aritmetiğiyle taşınır: son dtype'tan sonra bir
+    sonraki k'ya, k=122'den sonra bir sonraki kola geçilir.
+    """
+    if not suffix or suffix[0] < 1:
+        return _FIRST_K_SLOT
+    arm = suffix[0]
+    if arm > 4:
+        return SLOT_COUNT
+    if len(suffix) == 1 or suffix[1] < 1:
+        return slot_of(arm, 1, DTYPES[0])
+    k = suffix[1]
+    if k > K_SLOTS:
+        return slot_of(arm, 1, DTYPES[0]) + K_SLOTS * SLOTS_PER_K
+    base = slot_of(arm, k, DTYPES[0])
+    if len(suffix) == 2:
+        return base
+    dtype = suffix[2]
+    for index, slot_dtype in enumerate(DTYPES):
+        # (arm, k, dtype, 0) > (arm, k, dtype) ama > (arm, k, dtype, 0, ...) değil
+        if slot_dtype > dtype or (slot_dtype == dtype and len(suffix) == 3):
+            return base + index
+    return base + SLOTS_PER_K
+
+
+class BatterySubtreeIndex:
+    """1.3.6.5.10 instance'larının store üzerindeki çözümü
+
+    get(suffix) ve next(suffix) son yayınlanan snapshot'ı kilitsiz okur.
+    Adreslenebilir ama henüz verisi olmayan slot GET'te 0 döner (eski
+    sabit grid davranışı); GETNEXT sadece dolu slot'ları gezer.
+    """
+
+    def __init__(self, store, counts):
+        self.store = store
+        self.counts = counts  # arm_slave_counts_ram
+
+    def _slot_value(self, snapshot, slot):
+        value = snapshot.value_at(slot)
+        return 0 if value is None else value
+
+    def get(self, suffix):
+        """Instance değeri, instance yoksa None"""
+        if suffix == COUNT_INSTANCE:
+            return self.counts.get(COUNT_ARM, 0)
+        slot = instance_slot(suffix)
+        if slot < 0:
+            return None
+        return self._slot_value(self.store.snapshot, slot)
+
+    def next(self, suffix):
+        """suffix'ten sonraki (instance, değer), yoksa None"""
+        if suffix < COUNT_INSTANCE:
+            return COUNT_INSTANCE, self.counts.get(COUNT_ARM, 0)
+        snapshot = self.store.snapshot
+        timestamps = snapshot.timestamps
+        for slot in range(successor_slot(suffix), SLOT_COUNT):
+            if timestamps[slot] != _EMPTY:
+                return instance_of(slot), self._slot_value(snapshot, slot)
+        return None
+
+
+def battery_subtree_class(MibScalar):
+    """mibBuilder'dan alınan MibScalar'dan türeyen dinamik alt ağaç sınıfı
+
+    Instance'lar export edilmez; okuma metodları index'in get(suffix) ve
+    next(suffix) metodları üzerinden çalışır (BatterySubtreeIndex veya
+    bacs_tables tabloları). encode(suffix, value) SNMP değerini üretir
+    (snmp_schema); verilmezse syntax.clone(value) kullanılır.
+    """
+
+    class BatterySubtree(MibScalar):
+
+        def __init__(self, name, syntax, index, encode=None):
+            MibScalar.__init__(self, name, syntax)
+            self.index = index
+            self.encode = encode or (lambda suffix, value: self.syntax.clone(value))
+
+        def _check_access(self, name, context):
+            acFun = context.get("acFun")
+            if acFun and acFun("read", (name, self.syntax), **context):
+                raise error.NoAccessError(name=name, idx=context.get("idx"))
+
+        def _suffix(self, name):
+            """Alt ağaca göre son ek; alt ağaçtan büyükse None"""
+            prefix_len = len(self.name)
+            if name[:prefix_len] == self.name:
+                return tuple(name[prefix_len:])
+            if name < self.name:
+                return ()
+            return None
+
+        def _next(self, name, context):
+            oName = context.get("oName")
+            suffix = self._suffix(name if oName is None else oName)
+            found = None if suffix is None else self.index.next(suffix)
+            if found is None:
+                raise error.NoSuchInstanceError(name=name, idx=context.get("idx"))
+            return found
+
+        def readTest(self, varBind, **context):
+            name, val = varBind
+            if name == self.name:
+                raise error.NoAccessError(name=name, idx=context.get("idx"))
+            self._check_access(name, context)
+
+        def readGet(self, varBind, **context):
+            name, val = varBind
+            suffix = self._suffix(name)
+            value = None if suffix is None else self.index.get(suffix)
+            if value is None:
+                return name, exval.noSuchInstance
+            return name, self.encode(suffix, value)
+
+        def readTestNext(self, varBind, **context):
+            name, val = varBind
+            self._check_access(name, context)
+            self._next(name, context)
+
+        def readGetNext(self, varBind, **context):
+            name, val = varBind
+            self._check_access(name, context)
+            suffix, value = self._next(name, context)
+            return self.name + suffix, self.encode(suffix, value)
+
+    return BatterySubtree
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+SNMP Schema - OID -> (tip, ölçek) şeması
+Sayısal nesneler OctetString yerine Gauge32/Integer32/Unsigned32 olarak,
+MIB'lerdeki sabit noktalı birimlerle kodlanır: battery-monitoring.mib
+Hundredths/Tenths (Integer32, "d-2"/"d-1") ve CentiPercent (Gauge32),
+bacs2.mib tablo sütunları. Ajanlar syntax ve değer dönüşümünü buradan alır.
+"""
+
+from collections import namedtuple
+
+from pyasn1.type import constraint
+from pyasn1.type.error import ValueConstraintError
+from pysnmp.proto import rfc1902
+
+_INT32_MIN = -2 ** 31
+_INT32_MAX = 2 ** 31 - 1
+_UINT32_MAX = 2 ** 32 - 1
+
+
+class PositiveInteger(rfc1902.Integer32):
+    """bacs2.mib PositiveInteger (1..2147483647)"""
+    subtypeSpec = rfc1902.Integer32.subtypeSpec + constraint.ValueRangeConstraint(1, _INT32_MAX)
+
+
+class NonNegativeInteger(rfc1902.Integer32):
+    """bacs2.mib NonNegativeInteger (0..2147483647)"""
+    subtypeSpec = rfc1902.Integer32.subtypeSpec + constraint.ValueRangeConstraint(0, _INT32_MAX)
+
+
+class SnmpType(namedtuple('SnmpType', 'syntax scale')):
+    """Bir nesnenin SNMP tipi ve ölçeği
+
+    scale None ise değer metin olarak kodlanır; aksi halde
+    round(value * scale) tam sayısı tipin aralığına sıkıştırılır.
+    Tablo hücreleri için cell() sıkıştırmaz: aralık dışı değer yoktur.
+    """
+
+    __slots__ = ()
+
+    def scaled(self, value):
+        """Ölçüm -> MIB tam sayı birimi (veri yoksa 0)"""
+        if value is None or value != value:
+            return 0
+        number = int(round(value * self.scale))
+        if isinstance(self.syntax, rfc1902.Integer32):
+            return max(_INT32_MIN, min(number, _INT32_MAX))
+        return max(0, min(number, _UINT32_MAX))
+
+    def cell(self, value):
+        """Tablo hücresi: veri yoksa veya syntax aralığı dışındaysa None
+        (noSuchInstance / GETNEXT'te atlanır)"""
+        if value is None or value != value:
+            return None
+        number = int(round(value * self.scale))
+        try:
+            self.syntax.subtypeSpec(number)
+        except ValueConstraintError:
+            return None
+        return number
+
+    def encode(self, value):
+        """syntax.clone ile SNMP değeri"""
+        if self.scale is None:
+            return self.syntax.clone(str(value))
+        return self.syntax.clone(self.scaled(value))
+
+
+TEXT = SnmpType(rfc1902.OctetString(), None)
+COUNT = SnmpType(rfc1902.Gauge32(), 1)
+STATUS = SnmpType(rfc1902.Integer32(), 1)
+
+# 1.3.6.5.n.0 sistem nesneleri
+SCALAR_TYPES = {
+    (1, 3, 6, 5, 1): TEXT,     # Python bilgisi
+    (1, 3, 6, 5, 2): COUNT,    # totalBatteryCount
+    (1, 3, 6, 5, 3): COUNT,    # totalArmCount
+    (1, 3, 6, 5, 4): STATUS,   # systemStatus
+    (1, 3, 6, 5, 5): TEXT,     # lastUpdateTime
+    (1, 3, 6, 5, 6): COUNT,    # dataCount
+    (1, 3, 6, 5, 7): COUNT,    # arm1SlaveCount
+    (1, 3, 6, 5, 8): COUNT,    # arm2SlaveCount
+    (1, 3, 6, 5, 9): COUNT,    # arm3SlaveCount
+}
+
+# 1.3.6.5.10.arm.k.dtype.0 batarya verileri: dtype -> tip
+DTYPE_TYPES = {
+    10: SnmpType(rfc1902.Integer32(), 100),   # gerilim 0.01 V, kol akımı (k=2) 0.01 A
+    11: SnmpType(rfc1902.Gauge32(), 100),     # nem (k=2) / SOH, 0.01 %
+    12: SnmpType(rfc1902.Integer32(), 10),    # NTC1 0.1 °C
+    13: SnmpType(rfc1902.Integer32(), 10),    # NTC2 0.1 °C
+    14: SnmpType(rfc1902.Integer32(), 10),    # NTC3 0.1 °C
+    15: SnmpType(rfc1902.Integer32(), 100),   # MIB'de nesnesi yok, yerel ölçek
+    16: SnmpType(rfc1902.Integer32(), 100),   # MIB'de nesnesi yok, yerel ölçek
+    126: SnmpType(rfc1902.Gauge32(), 100),    # SOC 0.01 %
+}
+ARM4_COUNT = COUNT  # 1.3.6.5.10.0 arm4SlaveCount
+
+# bacs2.mib tablo sütunları: sütun -> tip (MIB syntax'ı ve birimi)
+BACS_MODULE_COLUMNS = {
+    2: SnmpType(PositiveInteger(), 100),      # bacsModuleVoltage 0.01 V
+    3: SnmpType(rfc1902.Integer32(), 10),     # bacsModuleTemperature 0.1 °C
+    4: SnmpType(NonNegativeInteger(), 10),    # bacsModuleBypass 0.1 %
+    5: SnmpType(NonNegativeInteger(), 100),   # bacsModuleResistance 0.01 mOhm
+    6: SnmpType(NonNegativeInteger(), 1),     # bacsModuleState (bayraklar)
+    7: SnmpType(NonNegativeInteger(), 1),     # bacsModuleChargeLevel %
+}
+BACS_STRING_COLUMNS = {
+    2: SnmpType(rfc1902.Integer32(), 100),    # bacsStringCurrent 0.01 A (işaretli, bacs2.mib notu)
+    3: SnmpType(PositiveInteger(), 100),      # bacsStringTotalVolt 0.01 V
+    4: SnmpType(PositiveInteger(), 100),      # bacsStringAverageVolt 0.01 V
+    5: SnmpType(PositiveInteger(), 100),      # bacsStringCurrentAC 0.01 A
+    6: SnmpType(NonNegativeInteger(), 1),     # bacsStringAlarm (bayraklar)
+    7: SnmpType(NonNegativeInteger(), 1),     # bacsStringAlarm2 (bayraklar)
+}
+
+_DEFAULT_DTYPE = SnmpType(rfc1902.Integer32(), 100)
+
+
+def scalar_syntax(oid):
+    """Sistem nesnesi için syntax prototipi"""
+    return SCALAR_TYPES[tuple(oid)].syntax
+
+
+def dtype_type(dtype):
+    return DTYPE_TYPES.get(dtype, _DEFAULT_DTYPE)
+
+
+def encode_battery_value(suffix, value):
+    """1.3.6.5.10 instance son eki (0,) veya (arm, k, dtype, 0) için değer"""
+    if len(suffix) == 1:
+        return ARM4_COUNT.encode(value)
+    return dtype_type(suffix[2]).encode(value)
@@ -6,25 +6,146 @@ SNMP Trap Receiver - Alarm Bildirimleri Al
 Raspberry Pi'den gelen alarm trap'lerini dinler ve gösterir
 """
 
+import asyncio
+import json
+import os
+import socket
 import threading
 import time
 from datetime import datetime
-from pysnmp.hlapi import *
-from pysnmp.entity import engine, config
-from pysnmp.carrier.udp.udp import UdpTransport
-from pysnmp.entity.rfc3413 import ntforg, context
-from pysnmp.smi import rfc1902
+
+from pysnmp.carrier.asyncio.dgram import udp
+from pysnmp.entity import config, engine
+from pysnmp.entity.rfc3413 import ntfrcv
+
+from trap_originator import cancel_pending_tasks
+
+LOG_PATH = 'snmp_trap_log.txt'      # İnsan okunur format
+JSONL_PATH = 'snmp_trap_log.jsonl'  # Satır başına bir JSON kaydı
+QUEUE_SIZE = 65536    # Bellekteki trap kuyruğu; doluysa trap sayılıp atılır
+BATCH_SIZE = 512      # Tek yazmada en fazla trap
+FSYNC_INTERVAL = 1.0  # s, diske zorlama aralığı
+CONSOLE_LINES = 10    # Bundan büyük batch'ler konsolda tek satır özetlenir
+RECV_BUFFER = 1 << 22  # UDP alma tamponu; fırtınada paket kaybını önler
+
+SNMP_TRAP_OID = (1, 3, 6, 1, 6, 3, 1, 1, 4, 1, 0)
+MESSAGE_OID = (1, 3, 6, 1, 4, 1, 1001, 999, 1, 1)
+BITMAP_OID = (1, 3, 6, 1, 4, 1, 1001, 999, 1, 2)
+
+
+def classify(trap_oid):
+    """Trap OID'inden (konum, alarm tipi)"""
+    parts = trap_oid.split('.')
+    if len(parts) >= 3 and parts[-2] == '7':
+        arm_num = parts[-3]
+        if parts[-1] == '0':
+            return f"Kol {arm_num}", "KOL ALARMI"
+        if parts[-1] == '255':
+            return f"Kol {arm_num}", "KOL ÖZETİ"
+        return f"Kol {arm_num}, Batarya {parts[-1]}", "BATARYA ALARMI"
+    return "Bilinmeyen", "BİLİNMEYEN ALARM"
+
+
+def alarm_status(message):
+    if 'ACTIVE' in message:
+        return "🚨 AKTİF"
+    if 'RESOLVED' in message:
+        return "✅ ÇÖZÜLDÜ"
+    if 'SUMMARY' in message:
+        return "📊 ÖZET"
+    return "❓ BİLİNMEYEN"
+
+
+def decode_trap(var_binds, source):
+    """SNMPv2c trap/INFORM varbind'lerinden log kaydı"""
+    trap_oid = ''
+    message = ''
+    bitmap = None
+    for name, value in var_binds:
+        name = tuple(name)
+        if name == SNMP_TRAP_OID:
+            trap_oid = str(value)
+        elif name == MESSAGE_OID:
+            message = value.asOctets().decode('utf-8', 'replace')
+        elif name == BITMAP_OID:
+            bitmap = value.asOctets().hex()
+    location, alarm_type = classify(trap_oid)
+    record = {
+        'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        'source': f"{source[0]}:{source[1]}",
+        'oid': trap_oid,
+        'location': location,
+        'alarm_type': alarm_type,
+        'message': message,
+        'status': alarm_status(message),
+    }
+    if bitmap is not None:
+        record['bitmap'] = bitmap
+    return record
+
+
+def format_line(record):
+    return (f"{record['time']} | {record['oid']} | {record['location']} | "
+            f"{record['alarm_type']} | {record['message']} | {record['status']}\n")
+
+
+class TrapLogWriter:
+    """Uzun ömürlü tamponlu log dosyaları
+
+    write() bir batch'i her iki dosyaya tek seferde yazar ve işletim
+    sistemine aktarır; sync() fsync ile diske zorlar.
+    """
+
+    def __init__(self, log_path=LOG_PATH, jsonl_path=JSONL_PATH):
+        self.files = [open(log_path, 'a', encoding='utf-8', buffering=1 << 16),
+                      open(jsonl_path, 'a', encoding='utf-8', buffering=1 << 16)]
+        self.dirty = False
+
+    def write(self, records):
+        log_file, jsonl_file = self.files
+        log_file.write(''.join(format_line(record) for record in records))
+        jsonl_file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        for f in self.files:
+            f.flush()
+        self.dirty = True
+
+    def sync(self):
+        for f in self.files:
+            os.fsync(f.fileno())
+        self.dirty = False
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
 
 class SNMPTrapReceiver:
-    def __init__(self, listen_port=162, community='public'):
+    """asyncio trap alıcısı
+
+    Notification receiver callback'i trap'i çözüp bellekteki kuyruğa
+    koyar; tek bir yazıcı görevi kuyruğu batch'ler halinde log dosyalarına
+    yazar ve FSYNC_INTERVAL'da bir fsync yapar. INFORM'lar engine
+    tarafından onaylanır.
+    """
+
+    def __init__(self, listen_port=162, community='public', listen_host='0.0.0.0',
+                 log_path=LOG_PATH, jsonl_path=JSONL_PATH, fsync_interval=FSYNC_INTERVAL):
         self.listen_port = listen_port
+        self.listen_host = listen_host
         self.community = community
+        self.log_path = log_path
+        self.jsonl_path = jsonl_path
+        self.fsync_interval = fsync_interval
         self.running = False
         self.receiver_thread = None
+        self.loop = None
+        self.stats = {'received': 0, 'dropped': 0, 'written': 0, 'batches': 0, 'fsyncs': 0}
+        self._ready = threading.Event()
         
         print("📡 SNMP Trap Receiver başlatılıyor...")
         print(f"👂 Dinleme Portu: {listen_port}")
         print(f"🔐 Community: {community}")
+        print(f"📝 Log: {log_path}, {jsonl_path}")
     
     def start(self):
         """Trap receiver'ı başlat"""
@@ -32,123 +153,109 @@ class SNMPTrapReceiver:
             print("⚠️  Trap receiver zaten çalışıyor!")
             return
         
+        # Port hatası start()'ta görülsün diye soket burada açılır
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        self._socket.bind((self.listen_host, self.listen_port))
+        self.listen_port = self._socket.getsockname()[1]
+        
         self.running = True
-        self.receiver_thread = threading.Thread(target=self._listen_for_traps, daemon=True)
+        self.receiver_thread = threading.Thread(target=self._run, daemon=True)
         self.receiver_thread.start()
+        self._ready.wait()
         print("✅ SNMP Trap Receiver başlatıldı!")
-        print("⏳ Trap'ler dinleniyor...")
+        print(f"🎯 Trap'ler dinleniyor: {self.listen_host}:{self.listen_port}")
     
     def stop(self):
-        """Trap receiver'ı durdur"""
+        """Trap receiver'ı durdur (kuyruktakiler yazılır ve diske zorlanır)"""
+        if not self.running:
+            return
         self.running = False
-        if self.receiver_thread:
-            self.receiver_thread.join()
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.receiver_thread.join()
         print("⏹️  SNMP Trap Receiver durduruldu!")
     
-    def _listen_for_traps(self):
-        """Trap'leri dinle"""
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.log_writer = TrapLogWriter(self.log_path, self.jsonl_path)
+        
+        self.snmp_engine = engine.SnmpEngine()
+        config.add_transport(self.snmp_engine, udp.DOMAIN_NAME,
+                             udp.UdpAsyncioTransport().open_server_mode(sock=self._socket))
+        config.add_v1_system(self.snmp_engine, 'my-area', self.community)
+        ntfrcv.NotificationReceiver(self.snmp_engine, self._handle_trap)
+        
+        self._writer_task = self.loop.create_task(self._writer())
+        self._ready.set()
         try:
-            # SNMP Engine oluştur
-            snmpEngine = engine.SnmpEngine()
-            
-            # Transport ayarla
-            config.addTransport(
-                snmpEngine,
-                udp.domainName,
-                UdpTransport().openServerMode(('0.0.0.0', self.listen_port))
-            )
-            
-            # SNMPv2c ayarla
-            config.addV1System(snmpEngine, 'my-area', self.community)
-            
-            # Trap handler oluştur
-            def cbFun(snmpEngine, stateReference, varName, varBind, cbCtx):
-                self._handle_trap(snmpEngine, stateReference, varName, varBind, cbCtx)
-            
-            # Trap handler'ı kaydet
-            ntforg.NotificationOriginator().configure(snmpEngine, 'my-area', cbFun)
-            
-            print(f"🎯 Trap'ler dinleniyor: 0.0.0.0:{self.listen_port}")
-            
-            # Ana döngü
-            snmpEngine.transportDispatcher.jobStarted(1)
-            
-            try:
-                snmpEngine.transportDispatcher.runDispatcher()
-            except Exception as e:
-                if self.running:
-                    print(f"❌ Trap dinleme hatası: {e}")
-            
-        except Exception as e:
-            print(f"❌ Trap receiver başlatma hatası: {e}")
+            self.loop.run_forever()
+        finally:
+            self.snmp_engine.close_dispatcher()
+            cancel_pending_tasks(self.loop)
+            self.loop.close()
     
-    def _handle_trap(self, snmpEngine, stateReference, varName, varBind, cbCtx):
-        """Gelen trap'i işle"""
+    def _handle_trap(self, snmpEngine, stateReference, contextEngineId, contextName, varBinds, cbCtx):
+        """Gelen trap'i çöz ve kuyruğa koy (yazma yazıcı görevinde)"""
+        self.stats['received'] += 1
         try:
-            # Trap bilgilerini al
-            trap_oid = str(varBind[0][0])
-            trap_value = str(varBind[0][1])
-            
-            # Zaman damgası
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Trap tipini belirle
-            if '.7.0' in trap_oid:
-                # Kol alarmı
-                arm_num = trap_oid.split('.')[-3]
-                alarm_type = "KOL ALARMI"
-                location = f"Kol {arm_num}"
-            elif '.7.' in trap_oid:
-                # Batarya alarmı
-                parts = trap_oid.split('.')
-                arm_num = parts[-3]
-                battery_num = parts[-1]
-                alarm_type = "BATARYA ALARMI"
-                location = f"Kol {arm_num}, Batarya {battery_num}"
-            else:
-                alarm_type = "BİLİNMEYEN ALARM"
-                location = "Bilinmeyen"
-            
-            # Alarm durumunu belirle
-            if 'ACTIVE' in trap_value:
-                status = "🚨 AKTİF"
-                status_color = "\033[91m"  # Kırmızı
-            elif 'RESOLVED' in trap_value:
-                status = "✅ ÇÖZÜLDÜ"
-                status_color = "\033[92m"  # Yeşil
-            else:
-                status = "❓ BİLİNMEYEN"
-                status_color = "\033[93m"  # Sarı
-            
-            # Reset color
-            reset_color = "\033[0m"
-            
-            # Trap'i göster
-            print("\n" + "="*60)
-            print(f"📨 YENİ TRAP ALINDI - {timestamp}")
-            print(f"🎯 OID: {trap_oid}")
-            print(f"📍 Konum: {location}")
-            print(f"🚨 Tip: {alarm_type}")
-            print(f"📝 Mesaj: {trap_value}")
-            print(f"⚡ Durum: {status_color}{status}{reset_color}")
-            print("="*60)
-            
-            # Log dosyasına yaz
-            self._log_trap(timestamp, trap_oid, location, alarm_type, trap_value, status)
-            
+            _domain, source = snmpEngine.message_dispatcher.get_transport_info(stateReference)
+            self.queue.put_nowait(decode_trap(varBinds, source))
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
         except Exception as e:
             print(f"❌ Trap işleme hatası: {e}")
     
-    def _log_trap(self, timestamp, oid, location, alarm_type, message, status):
-        """Trap'i log dosyasına yaz"""
-        try:
-            log_entry = f"{timestamp} | {oid} | {location} | {alarm_type} | {message} | {status}\n"
-            
-            with open('snmp_trap_log.txt', 'a', encoding='utf-8') as f:
-                f.write(log_entry)
-                
-        except Exception as e:
-            print(f"❌ Log yazma hatası: {e}")
+    async def _writer(self):
+        """Kuyruğu batch'ler halinde yaz, aralıklarla fsync yap"""
+        queue = self.queue
+        next_sync = time.monotonic() + self.fsync_interval
+        while True:
+            try:
+                timeout = max(0.0, next_sync - time.monotonic()) if self.log_writer.dirty else None
+                record = await asyncio.wait_for(queue.get(), timeout)
+                batch = [record]
+                while len(batch) < BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+                self._log_batch(batch)
+            except asyncio.TimeoutError:
+                pass
+            except Exception as e:
+                print(f"❌ Log yazma hatası: {e}")
+            if self.log_writer.dirty and time.monotonic() >= next_sync:
+                await self.loop.run_in_executor(None, self._sync)
+                next_sync = time.monotonic() + self.fsync_interval
+    
+    def _log_batch(self, batch):
+        self.log_writer.write(batch)
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+        self._show(batch)
+    
+    def _sync(self):
+        self.log_writer.sync()
+        self.stats['fsyncs'] += 1
+    
+    def _show(self, batch):
+        """Konsolda trap başına tek satır; büyük batch'ler özetlenir"""
+        if len(batch) > CONSOLE_LINES:
+            last = batch[-1]
+            print(f"📨 {len(batch)} trap alındı - son: {last['time']} | {last['location']} | {last['status']}")
+            return
+        for record in batch:
+            print(f"📨 {record['time']} | {record['location']} | {record['status']} | {record['message']}")
+    
+    async def _shutdown(self):
+        self._writer_task.cancel()
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if batch:
+            self._log_batch(batch)
+        self._sync()
+        self.log_writer.close()
+        self.loop.call_soon(self.loop.stop)
 
 def main():
     """Ana fonksiyon"""
@@ -179,9 +286,10 @@ def main():
                     print(f"📊 Durum: {'Çalışıyor' if receiver.running else 'Durduruldu'}")
                     print(f"👂 Port: {receiver.listen_port}")
                     print(f"🔐 Community: {receiver.community}")
+                    print(f"📈 Sayaçlar: {receiver.stats}")
                 elif command == 'log':
                     try:
-                        with open('snmp_trap_log.txt', 'r', encoding='utf-8') as f:
+                        with open(receiver.log_path, 'r', encoding='utf-8') as f:
                             lines = f.readlines()
                             if lines:
                                 print("\n📋 Son 10 trap:")
@@ -4,41 +4,71 @@
 """
 SNMP Trap Server - Batarya Alarm Sistemi
 Kol veya batarya alarma girerse otomatik trap gönderir
+
+Alarm durumu AlarmState'te tutulur: data_processor Hatkon/Batkon
+paketlerini uyguladığında değişen bit on_alarm_change ile trap
+kuyruğuna eklenir, trap thread'i kuyruğu bekler (periyodik tarama yok).
+Olaylar TrapSuppressor'dan (hold-down, kol özeti) geçip outbox'a yazılır,
+outbox hedef başına hız sınırıyla gönderilir.
 """
 
+import queue
 import threading
 import time
-import json
-from datetime import datetime
-from pysnmp.hlapi import *
-from pysnmp.entity import engine, config
-from pysnmp.carrier.udp.udp import UdpTransport
-from pysnmp.entity.rfc3413 import ntforg, context
-from pysnmp.smi import rfc1902
+from collections import namedtuple
+
+from alarm_state import bit_key
+from system_log import get_logger
+from trap_originator import TrapOriginator
+from trap_outbox import TrapOutbox
+from trap_suppressor import SummaryEvent, TargetRateLimiter, TrapSuppressor
+
+trap_log = get_logger('trap')
+
+# Kuyruktaki trap bildirimi; queued_at time.monotonic() (gecikme ölçümü)
+TrapEvent = namedtuple('TrapEvent', 'alarm_type arm_num battery_num alarm_desc status queued_at')
+
+
+def alarm_description(alarm_type, arm_num, battery_num):
+    if alarm_type == 'arm_alarm':
+        return f"Kol {arm_num} Hatkon Alarmı"
+    return f"Batarya {arm_num}-{battery_num} Batkon Alarmı"
+
 
 class SNMPTrapServer:
-    def __init__(self, trap_port=162, community='public'):
+    def __init__(self, trap_port=162, community='public', trap_targets=None,
+                 outbox_path='trap_outbox.db', notify_kind='trap', suppressor=None, rate_limiter=None):
         self.trap_port = trap_port
         self.community = community
+        self.notify_kind = notify_kind  # 'trap' veya 'inform' (alıcı onaylı)
         self.running = False
         self.trap_thread = None
         
-        # Alarm durumları (önceki durumları takip etmek için)
-        self.previous_alarms = {
-            'arm_alarms': {},  # {arm_num: alarm_description}
-            'battery_alarms': {}  # {f"{arm_num}_{battery_num}": alarm_description}
-        }
+        # Alarm değişiklikleri (AlarmState listener'ı olarak doldurulur)
+        self.events = queue.Queue()
         
         # Trap gönderilecek hedefler
-        self.trap_targets = [
+        self.trap_targets = list(trap_targets) if trap_targets is not None else [
             ('192.168.137.1', 162),  # Bilgisayarınız
             # ('192.168.1.100', 162),  # Başka bir sunucu
         ]
         
+        # Kalıcı engine + çözülmüş hedef tablosu (start() ile çalışır)
+        self.originator = TrapOriginator(community, self.trap_targets)
+        
+        # Gönderilene/onaylanana kadar diskte bekleyen bildirimler
+        self.outbox = TrapOutbox(outbox_path)
+        
+        # Fırtına bastırma ve hedef başına hız sınırı
+        self.suppressor = suppressor if suppressor is not None else TrapSuppressor()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TargetRateLimiter()
+        self.rate_deferred = 0  # Hız sınırıyla ertelenen outbox satırları
+        
         print("🚨 SNMP Trap Server başlatılıyor...")
         print(f"📡 Trap Port: {trap_port}")
         print(f"🔐 Community: {community}")
         print(f"🎯 Hedefler: {self.trap_targets}")
+        print(f"📬 Outbox: {outbox_path} ({self.outbox.pending()} bekleyen, {notify_kind.upper()})")
     
     def start(self):
         """Trap server'ı başlat"""
@@ -47,7 +77,8 @@ class SNMPTrapServer:
             return
         
         self.running = True
-        self.trap_thread = threading.Thread(target=self._monitor_alarms, daemon=True)
+        self.originator.start()
+        self.trap_thread = threading.Thread(target=self._trap_worker, daemon=True)
         self.trap_thread.start()
         print("✅ SNMP Trap Server başlatıldı!")
     
@@ -55,168 +86,158 @@ class SNMPTrapServer:
         """Trap server'ı durdur"""
         self.running = False
         if self.trap_thread:
+            self.events.put(None)  # Bekleyen thread'i uyandır
             self.trap_thread.join()
+        self.originator.stop()
+        self.outbox.close()
         print("⏹️  SNMP Trap Server durduruldu!")
     
-    def _monitor_alarms(self):
-        """Alarm durumlarını sürekli kontrol et"""
-        print("🔍 Alarm durumları kontrol ediliyor...")
+    def on_alarm_change(self, bit, active):
+        """AlarmState listener'ı: değişen alarm bitini trap kuyruğuna ekle"""
+        kind, arm_num, battery_num = bit_key(bit)
+        if kind == 'balance':
+            return  # Balans durumu alarm değil
+        alarm_type = 'arm_alarm' if kind == 'arm' else 'battery_alarm'
+        self.events.put(TrapEvent(
+            alarm_type, arm_num, battery_num,
+            alarm_description(alarm_type, arm_num, battery_num),
+            'ACTIVE' if active else 'RESOLVED',
+            time.monotonic(),
+        ))
+    
+    def _wait_time(self):
+        """Bir sonraki outbox denemesine veya bastırma süresine kalan süre"""
+        timeouts = [self.outbox.next_due_in()]
+        deadline = self.suppressor.next_deadline()
+        if deadline is not None:
+            timeouts.append(max(0.0, deadline - time.monotonic()))
+        timeouts = [timeout for timeout in timeouts if timeout is not None]
+        return min(timeouts) if timeouts else None
+    
+    def _trap_worker(self):
+        """Alarm değişikliklerini bastırma aşamasından outbox'a yaz, zamanı gelenleri gönder
+
+        Kuyruk bir sonraki yeniden deneme / bastırma zamanına kadar
+        beklenir; yeniden başlatmada outbox'ta kalan bildirimler ilk turda
+        gönderilir.
+        """
+        print("🔍 Alarm değişiklikleri bekleniyor...")
         
         while self.running:
             try:
-                # Kol alarmlarını kontrol et
-                self._check_arm_alarms()
-                
-                # Batarya alarmlarını kontrol et
-                self._check_battery_alarms()
-                
-                # 5 saniye bekle
-                time.sleep(5)
-                
+                event = self.events.get(timeout=self._wait_time())
+            except queue.Empty:
+                event = None
+            try:
+                while event is not None:
+                    if event.status == 'ACTIVE':
+                        trap_log.info("YENİ ALARM: %s", event.alarm_desc)
+                    else:
+                        trap_log.info("ALARM ÇÖZÜLDÜ: %s", event.alarm_desc)
+                    self._queue_events(self.suppressor.offer(event, time.monotonic()))
+                    trap_log.debug("Trap gecikmesi: %.1f ms", (time.monotonic() - event.queued_at) * 1000)
+                    try:
+                        event = self.events.get_nowait()
+                    except queue.Empty:
+                        event = None
+                self._queue_events(self.suppressor.flush(time.monotonic()))
+                self._deliver_due()
             except Exception as e:
-                print(f"❌ Alarm kontrol hatası: {e}")
-                time.sleep(10)
+                print(f"❌ Alarm trap hatası: {e}")
     
-    def _check_arm_alarms(self):
-        """Kol alarmlarını kontrol et"""
-        try:
-            # Burada gerçek alarm verilerini alacaksın
-            # Şimdilik örnek veri kullanıyoruz
-            current_alarms = self._get_current_arm_alarms()
-            
-            for arm_num, alarm_desc in current_alarms.items():
-                previous_desc = self.previous_alarms['arm_alarms'].get(arm_num)
-                
-                # Yeni alarm mı?
-                if alarm_desc and not previous_desc:
-                    print(f"🚨 YENİ KOL ALARMI: Kol {arm_num} - {alarm_desc}")
-                    self._send_trap('arm_alarm', arm_num, 0, alarm_desc, 'ACTIVE')
-                
-                # Alarm çözüldü mü?
-                elif not alarm_desc and previous_desc:
-                    print(f"✅ KOL ALARMI ÇÖZÜLDÜ: Kol {arm_num}")
-                    self._send_trap('arm_alarm', arm_num, 0, previous_desc, 'RESOLVED')
-                
-                # Alarm durumunu güncelle
-                self.previous_alarms['arm_alarms'][arm_num] = alarm_desc
-                
-        except Exception as e:
-            print(f"❌ Kol alarm kontrol hatası: {e}")
-    
-    def _check_battery_alarms(self):
-        """Batarya alarmlarını kontrol et"""
-        try:
-            # Burada gerçek alarm verilerini alacaksın
-            # Şimdilik örnek veri kullanıyoruz
-            current_alarms = self._get_current_battery_alarms()
-            
-            for key, alarm_desc in current_alarms.items():
-                arm_num, battery_num = key.split('_')
-                previous_desc = self.previous_alarms['battery_alarms'].get(key)
-                
-                # Yeni alarm mı?
-                if alarm_desc and not previous_desc:
-                    print(f"🚨 YENİ BATARYA ALARMI: Kol {arm_num}, Batarya {battery_num} - {alarm_desc}")
-                    self._send_trap('battery_alarm', int(arm_num), int(battery_num), alarm_desc, 'ACTIVE')
-                
-                # Alarm çözüldü mü?
-                elif not alarm_desc and previous_desc:
-                    print(f"✅ BATARYA ALARMI ÇÖZÜLDÜ: Kol {arm_num}, Batarya {battery_num}")
-                    self._send_trap('battery_alarm', int(arm_num), int(battery_num), previous_desc, 'RESOLVED')
-                
-                # Alarm durumunu güncelle
-                self.previous_alarms['battery_alarms'][key] = alarm_desc
-                
-        except Exception as e:
-            print(f"❌ Batarya alarm kontrol hatası: {e}")
-    
-    def _get_current_arm_alarms(self):
-        """Mevcut kol alarmlarını al (gerçek veri kaynağından)"""
-        # Burada gerçek alarm verilerini alacaksın
-        # Şimdilik örnek veri döndürüyoruz
-        return {
-            1: "Kol 1 Yüksek Sıcaklık",
-            2: None,  # Alarm yok
-            3: "Kol 3 Düşük Gerilim",
-            4: None   # Alarm yok
-        }
-    
-    def _get_current_battery_alarms(self):
-        """Mevcut batarya alarmlarını al (gerçek veri kaynağından)"""
-        # Burada gerçek alarm verilerini alacaksın
-        # Şimdilik örnek veri döndürüyoruz
-        return {
-            "1_5": "Batarya 1-5 Yüksek Sıcaklık",
-            "1_12": None,  # Alarm yok
-            "2_3": "Batarya 2-3 Düşük Gerilim",
-            "3_8": "Batarya 3-8 Yüksek Akım"
-        }
+    def _queue_events(self, events):
+        for event in events:
+            if isinstance(event, SummaryEvent):
+                self._send_summary(event)
+            else:
+                self._send_trap(event.alarm_type, event.arm_num, event.battery_num,
+                                event.alarm_desc, event.status)
     
     def _send_trap(self, alarm_type, arm_num, battery_num, alarm_desc, status):
-        """SNMP Trap gönder"""
-        try:
-            # Trap OID'leri
-            if alarm_type == 'arm_alarm':
-                trap_oid = f'1.3.6.1.4.1.1001.{arm_num}.7.0'
-                trap_name = f"Arm {arm_num} Alarm"
-            else:  # battery_alarm
-                trap_oid = f'1.3.6.1.4.1.1001.{arm_num}.7.{battery_num}'
-                trap_name = f"Battery {arm_num}-{battery_num} Alarm"
-            
-            # Trap mesajı
-            trap_message = f"{trap_name}: {alarm_desc} - Status: {status}"
-            
-            print(f"📤 Trap gönderiliyor: {trap_message}")
-            
-            # Her hedefe trap gönder
-            for target_ip, target_port in self.trap_targets:
-                try:
-                    self._send_single_trap(target_ip, target_port, trap_oid, trap_message)
-                    print(f"✅ Trap gönderildi: {target_ip}:{target_port}")
-                except Exception as e:
-                    print(f"❌ Trap gönderme hatası {target_ip}:{target_port}: {e}")
-                    
-        except Exception as e:
-            print(f"❌ Trap gönderme genel hatası: {e}")
+        """SNMP Trap'i her hedef için outbox'a yaz (gönderim _deliver_due'da)"""
+        # Trap OID'leri
+        if alarm_type == 'arm_alarm':
+            trap_oid = f'1.3.6.1.4.1.1001.{arm_num}.7.0'
+            trap_name = f"Arm {arm_num} Alarm"
+        else:  # battery_alarm
+            trap_oid = f'1.3.6.1.4.1.1001.{arm_num}.7.{battery_num}'
+            trap_name = f"Battery {arm_num}-{battery_num} Alarm"
+        
+        # Trap mesajı
+        trap_message = f"{trap_name}: {alarm_desc} - Status: {status}"
+        
+        trap_log.info("Trap kuyruğa alındı: %s", trap_message)
+        self.outbox.enqueue(trap_oid, trap_message, self.notify_kind, self.trap_targets)
     
-    def _send_single_trap(self, target_ip, target_port, trap_oid, message):
-        """Tek bir trap gönder"""
-        try:
-            # SNMP Trap gönder
-            errorIndication, errorStatus, errorIndex, varBinds = next(
-                sendNotification(
-                    SnmpEngine(),
-                    CommunityData(self.community),
-                    UdpTransportTarget((target_ip, target_port)),
-                    ContextData(),
-                    'trap',
-                    NotificationType(
-                        ObjectIdentity(trap_oid),
-                        [ObjectType(ObjectIdentity('1.3.6.1.4.1.1001.999.1.1'), OctetString(message))]
-                    )
-                )
-            )
-            
-            if errorIndication:
-                print(f"❌ Trap hatası: {errorIndication}")
-            else:
-                print(f"✅ Trap başarılı: {target_ip}")
-                
-        except Exception as e:
-            print(f"❌ Trap gönderme hatası: {e}")
+    def _send_summary(self, summary):
+        """Kol özeti: .{KOL}.7.255, aktif batarya bitmap varbind'i ile"""
+        trap_oid = f'1.3.6.1.4.1.1001.{summary.arm_num}.7.255'
+        trap_message = (f"Arm {summary.arm_num} Battery Alarm Summary: "
+                        f"{summary.active_count} active - Status: SUMMARY")
+        trap_log.info("Özet trap kuyruğa alındı: %s", trap_message)
+        self.outbox.enqueue(trap_oid, trap_message, self.notify_kind, self.trap_targets,
+                            bitmap=summary.bitmap)
+    
+    def _deliver_due(self):
+        """Zamanı gelen outbox satırlarını eşzamanlı gönder, sonuçları işle
+
+        Hız sınırını aşan hedeflerin satırları deneme sayılmadan ertelenir.
+        """
+        groups = {}  # {(oid, mesaj, tür, bitmap): [OutboxEntry]}
+        deferred = {}  # {hedef: [satır id]}
+        now = time.monotonic()
+        for entry in self.outbox.due():
+            if entry.target in deferred or not self.rate_limiter.allow(entry.target, now):
+                deferred.setdefault(entry.target, []).append(entry.id)
+                continue
+            groups.setdefault((entry.trap_oid, entry.message, entry.kind, entry.bitmap), []).append(entry)
+        for target, ids in deferred.items():
+            self.outbox.defer(ids, time.time() + self.rate_limiter.wait_time(target, now))
+            self.rate_deferred += len(ids)
+        sends = [(entries, self.originator.send(trap_oid, message, kind, [e.target for e in entries], bitmap))
+                 for (trap_oid, message, kind, bitmap), entries in groups.items()]
+        delivered, failed = [], []
+        for entries, future in sends:
+            for entry, (_target, error) in zip(entries, future.result()):
+                if error is None:
+                    delivered.append(entry.id)
+                else:
+                    failed.append((entry, error))
+        if delivered or failed:
+            self.outbox.complete(delivered, failed)
     
     def add_trap_target(self, ip, port=162):
         """Yeni trap hedefi ekle"""
         self.trap_targets.append((ip, port))
+        if self.running and not self.originator.add_target(ip, port).result():
+            print(f"❌ Trap hedefi çözülemedi: {ip}:{port}")
+            return
         print(f"➕ Yeni trap hedefi eklendi: {ip}:{port}")
     
     def remove_trap_target(self, ip, port=162):
         """Trap hedefini kaldır"""
         if (ip, port) in self.trap_targets:
             self.trap_targets.remove((ip, port))
+            if self.running:
+                self.originator.remove_target(ip, port).result()
             print(f"➖ Trap hedefi kaldırıldı: {ip}:{port}")
         else:
             print(f"⚠️  Trap hedefi bulunamadı: {ip}:{port}")
+    
+    def target_stats(self):
+        """Hedef başına gönderim/hata sayıları ve gecikmeler"""
+        return self.originator.target_stats()
+    
+    def outbox_stats(self):
+        return {'pending': self.outbox.pending(), 'dropped': self.outbox.dropped}
+    
+    def suppression_stats(self):
+        """Bastırılan geçişler, özet trap'leri ve hız sınırıyla ertelenenler"""
+        return {
+            'suppressed': self.suppressor.suppressed,
+            'summaries': self.suppressor.summaries,
+            'rate_deferred': self.rate_deferred,
+        }
 
 def main():
     """Ana fonksiyon"""
@@ -234,6 +255,7 @@ def main():
         print("  - 'add <ip> <port>' - Yeni hedef ekle")
         print("  - 'remove <ip> <port>' - Hedef kaldır")
         print("  - 'list' - Hedefleri listele")
+        print("  - 'stats' - Hedef başına gönderim/hata/gecikme")
         print("  - 'quit' - Çıkış")
         print("\n⏳ Server çalışıyor... (Ctrl+C ile durdur)")
         
@@ -262,6 +284,12 @@ def main():
                     print("🎯 Mevcut hedefler:")
                     for i, (ip, port) in enumerate(trap_server.trap_targets, 1):
                         print(f"  {i}. {ip}:{port}")
+                elif command == 'stats':
+                    print("📊 Hedef istatistikleri:")
+                    for target, stats in trap_server.target_stats().items():
+                        print(f"  {target}: {stats}")
+                    print(f"  outbox: {trap_server.outbox_stats()}")
+                    print(f"  bastırma: {trap_server.suppression_stats()}")
                 else:
                     print("❌ Bilinmeyen komut!")
                     
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+SOC Estimator - Tablo tabanlı SOC/SOH tahmini
+Calc_SOC / Calc_SOH Gauss toplamlarını her çağrıda math.exp ile
+hesaplamak yerine geçerli aralık üzerinde ince adımlı bir array('d')
+tablosu bir kez hesaplanır; değerler doğrusal interpolasyonla okunur.
+Aralık dışındaki girdiler kapalı formla hesaplanır.
+
+soc_batch() bir periyodun tüm gerilimlerini tek çağrıda çevirir;
+soc_entries() periyot tamponundaki gerilimlerden SOC kayıtları üretir;
+period_soc() depo dizilerinden tüm kolların SOC kayıtlarını üretir.
+"""
+
+import math
+from array import array
+
+from battery_store import ARMS, DTYPES, SLOTS_PER_ARM, SLOTS_PER_K, K_MIN, K_SLOTS
+
+# Gauss terimleri (a, b, c): a * exp(-((x - b) / c) ** 2)
+# a3=0 terimi (b=12.7872, c=0.0025) sonuca katkı vermediği için çıkarıldı
+SOC_TERMS = (
+    (112.1627, 14.2601, 1.8161),
+    (14.3937, 11.6890, 0.8211),
+    (10.5555, 10.9406, 0.3866),
+)
+SOH_TERMS = (
+    (85.918, 0.0181, 0.0083),
+    (85.11, 0.0324, 0.0104),
+    (0.3085, 0.0342, 0.0021),
+    (16.521, 0.0382, 0.0013),
+    (-13.874, 0.0381, 0.0011),
+    (40.077, 0.0474, 0.0079),
+    (18.207, 0.0556, 0.0048),
+)
+
+# Tablo aralıkları: dışında SOC < 0.001, SOH terimleri sönmüş
+SOC_RANGE = (8.0, 20.0, 0.001)      # V, 12001 nokta (low, high, step)
+SOH_RANGE = (0.0, 0.1, 0.00001)     # 10001 nokta
+
+_VOLTAGE_INDEX = DTYPES.index(10)
+
+
+def _gauss_sum(terms, x):
+    return sum(a * math.exp(-((x - b) / c) ** 2) for a, b, c in terms)
+
+
+def soc_exact(x):
+    """Kapalı form SOC (0..100 arası kırpılmış, yuvarlanmamış)"""
+    return min(max(_gauss_sum(SOC_TERMS, x), 0.0), 100.0)
+
+
+def soh_exact(x):
+    """Kapalı form SOH (100 ile sınırlı, yuvarlanmamış)"""
+    return min(_gauss_sum(SOH_TERMS, x), 100.0)
+
+
+class LookupTable:
+    """[low, high) aralığında step adımlı doğrusal interpolasyon tablosu
+
+    Tablo kırpılmamış Gauss toplamını tutar; kırpma (floor/ceiling)
+    interpolasyondan sonra yapılır, böylece 100'deki kırılma noktası
+    interpolasyon hatası üretmez. Aralık dışında exact() kullanılır.
+    """
+
+    def __init__(self, terms, exact, low, high, step, floor=None, ceiling=None):
+        self.exact = exact
+        self.low = low
+        self.high = high
+        self.scale = 1.0 / step
+        self.floor = -math.inf if floor is None else floor
+        self.ceiling = math.inf if ceiling is None else ceiling
+        count = int(round((high - low) * self.scale))
+        # high'a kadar count aralık, count + 1 nokta
+        self.samples = array('d', (_gauss_sum(terms, low + i * step) for i in range(count + 1)))
+        self.last = count - 1  # Son aralığın başlangıç indeksi
+
+    def __call__(self, x):
+        if not self.low <= x < self.high:
+            return self.exact(x)
+        position = (x - self.low) * self.scale
+        i = int(position)
+        if i > self.last:
+            i = self.last
+        y0 = self.samples[i]
+        return min(max(y0 + (self.samples[i + 1] - y0) * (position - i), self.floor), self.ceiling)
+
+    def batch(self, xs):
+        """xs için 4 haneye yuvarlanmış değerler (None/NaN -> None)"""
+        low, high, scale, last = self.low, self.high, self.scale, self.last
+        samples, exact, floor, ceiling = self.samples, self.exact, self.floor, self.ceiling
+        result = []
+        append = result.append
+        for x in xs:
+            if x is None or x != x:
+                append(None)
+            elif low <= x < high:
+                position = (x - low) * scale
+                i = int(position)
+                if i > last:
+                    i = last
+                y0 = samples[i]
+                y = y0 + (samples[i + 1] - y0) * (position - i)
+                append(round(ceiling if y > ceiling else floor if y < floor else y, 4))
+            else:
+                append(round(exact(x), 4))
+        return result
+
+
+SOC_TABLE = LookupTable(SOC_TERMS, soc_exact, *SOC_RANGE, floor=0.0, ceiling=100.0)
+SOH_TABLE = LookupTable(SOH_TERMS, soh_exact, *SOH_RANGE, ceiling=100.0)
+
+
+def Calc_SOC(x):
+    """Gerilimden SOC (%), eski Calc_SOC ile aynı arayüz"""
+    if x is None or x != x:
+        return None
+    return round(SOC_TABLE(x), 4)
+
+
+def Calc_SOH(x):
+    """Eski Calc_SOH ile aynı arayüz"""
+    if x is None or x != x:
+        return None
+    return round(SOH_TABLE(x), 4)
+
+
+def soc_batch(voltages):
+    """Gerilim dizisi için SOC listesi (tek çağrı)"""
+    return SOC_TABLE.batch(voltages)
+
+
+def soh_batch(values):
+    return SOH_TABLE.batch(values)
+
+
+def arm_voltages(values, timestamps, arm):
+    """Kolun batarya gerilimleri: [(k, gerilim)], k=3..122, boş slotlar atlanır"""
+    start = (arm - 1) * SLOTS_PER_ARM + (3 - K_MIN) * SLOTS_PER_K + _VOLTAGE_INDEX
+    stop = (arm - 1) * SLOTS_PER_ARM + K_SLOTS * SLOTS_PER_K
+    stamps = timestamps[start:stop:SLOTS_PER_K]
+    volts = values[start:stop:SLOTS_PER_K]
+    return [(k, volts[i]) for i, k in enumerate(range(3, K_MIN + K_SLOTS)) if stamps[i]]
+
+
+def arm_soc(values, timestamps, arm):
+    """Kolun tüm bataryaları için [(k, soc)], tek soc_batch çağrısı"""
+    entries = arm_voltages(values, timestamps, arm)
+    return list(zip([k for k, _ in entries], soc_batch([v for _, v in entries])))
+
+
+def period_soc(values, timestamps, arms=ARMS):
+    """Tüm kolların SOC kayıtları: [(arm, k, 126, soc)]
+
+    values/timestamps BatteryStore çalışma dizileri veya bir
+    StoreSnapshot'ın dizileridir. Gerilimler tek soc_batch çağrısında çevrilir.
+    """
+    keys, voltages = [], []
+    for arm in arms:
+        for k, voltage in arm_voltages(values, timestamps, arm):
+            keys.append((arm, k, 126))
+            voltages.append(voltage)
+    return [key + (soc,) for key, soc in zip(keys, soc_batch(voltages))]
+
+
+def soc_entries(entries):
+    """[(arm, k, dtype, value)] içindeki batarya gerilimleri için [(arm, k, 126, soc)]
+
+    PeriodAccumulator derive fonksiyonu: periyodun tüm gerilimleri tek
+    soc_batch çağrısında çevrilir (k=2 kol akımıdır, SOC hesaplanmaz).
+    """
+    keys, voltages = [], []
+    for arm, k, dtype, value in entries:
+        if dtype == 10 and k != 2:
+            keys.append((arm, k, 126))
+            voltages.append(value)
+    return [key + (soc,) for key, soc in zip(keys, soc_batch(voltages))]
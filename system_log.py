@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+System Log - Alt sistem bazlı logging katmanı
+ingest, ram, db, modbus, snmp ve trap için ayrı seviyeler, kapalı seviyede
+hiç biçimlendirme yapılmayan debug izleri ve paket başına izler için
+hız sınırlı örnekleyici
+
+Seviyeler ortam değişkeni ile ayarlanır:
+    BATTERY_LOG_LEVEL=INFO
+    BATTERY_LOG_LEVELS="modbus=DEBUG,ram=WARNING"
+Bilinmeyen seviye adları uyarıyla atlanır.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+SUBSYSTEMS = ('ingest', 'ram', 'db', 'modbus', 'snmp', 'trap')
+ROOT_LOGGER = 'battery'
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+
+_configured = False
+
+
+def get_logger(subsystem):
+    """Alt sistem logger'ı (battery.<subsystem>)"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def level_number(level):
+    """"debug"/"DEBUG"/"10"/10 -> 10; bilinmeyen seviye için None"""
+    if isinstance(level, int):
+        return level
+    text = str(level).strip().upper()
+    if text.isdigit():
+        return int(text)
+    number = logging.getLevelName(text)
+    return number if isinstance(number, int) else None
+
+
+def parse_levels(text):
+    """"modbus=DEBUG,ram=WARNING" -> {'modbus': 10, 'ram': 30}
+
+    Bilinmeyen seviyeler uyarıyla atlanır (ilgili alt sistem kök
+    seviyesini devralır).
+    """
+    levels = {}
+    for item in (text or "").split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        number = level_number(level)
+        if number is None:
+            logging.getLogger(ROOT_LOGGER).warning("Bilinmeyen log seviyesi atlandı: %s=%s", name.strip(), level.strip())
+            continue
+        levels[name.strip()] = number
+    return levels
+
+
+def configure_logging(default_level=None, levels=None, stream=None):
+    """Kök handler'ı ve alt sistem seviyelerini ayarla (tekrar çağrılabilir)"""
+    global _configured
+    root = logging.getLogger(ROOT_LOGGER)
+    if not _configured:
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+        root.addHandler(handler)
+        root.propagate = False
+        _configured = True
+
+    if default_level is None:
+        default_level = os.environ.get("BATTERY_LOG_LEVEL", "INFO")
+    number = level_number(default_level)
+    if number is None:
+        root.warning("Bilinmeyen log seviyesi %r, INFO kullanılıyor", default_level)
+        number = INFO
+    root.setLevel(number)
+    if levels is None:
+        levels = parse_levels(os.environ.get("BATTERY_LOG_LEVELS"))
+
+    for subsystem in SUBSYSTEMS:
+        get_logger(subsystem).setLevel(levels.get(subsystem, logging.NOTSET))
+    return root
+
+
+class RateLimitedSampler:
+    """Paket başına izler için hız sınırı
+
+    Her interval saniyede en fazla burst mesaj geçer; atlanan mesaj sayısı
+    bir sonraki geçen mesajla birlikte raporlanır. Seviye kapalıysa veya
+    kota dolmuşsa mesaj biçimlendirilmez.
+    """
+
+    def __init__(self, logger, level=logging.DEBUG, interval=1.0, burst=10):
+        self.logger = logger
+        self.level = level
+        self.interval = interval
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._count = 0
+        self.suppressed = 0
+
+    def _allow(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= self.interval:
+                self._window_start = now
+                self._count = 0
+            if self._count < self.burst:
+                self._count += 1
+                suppressed, self.suppressed = self.suppressed, 0
+                return True, suppressed
+            self.suppressed += 1
+            return False, 0
+
+    def log(self, msg, *args):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        allowed, suppressed = self._allow()
+        if not allowed:
+            return
+        if suppressed:
+            self.logger.log(self.level, msg + " (%d mesaj atlandı)", *args, suppressed)
+        else:
+            self.logger.log(self.level, msg, *args)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - bacs2.mib Tablo Testi
+bacsModuleTable/bacsStringTable hücrelerinin MIB birimlerinde okunduğunu,
+boş hücrelerin atlandığını ve GETNEXT'in sütun sırasında (entry.sütun.satır)
+ilerlediğini kontrol eder
+"""
+
+import random
+
+from pysnmp.entity import engine
+from pysnmp.entity.rfc3413 import context
+from pysnmp.proto.api import v2c
+from pysnmp.smi import exval
+
+from alarm_state import AlarmState
+from bacs_tables import BACS_MODULE_TABLE, BacsModuleTable, BacsStringTable, module_row
+from battery_store import BatteryStore
+from snmp_battery_subtree import battery_subtree_class
+from snmp_schema import PositiveInteger
+
+FULL_COUNTS = {1: 120, 2: 120, 3: 120, 4: 120}
+
+
+def test_module_cells_scaled():
+    """0.01 V, 0.1 °C, SOC %, alarm ve balans bayrakları"""
+    store = BatteryStore()
+    alarms = AlarmState()
+    store.update(3, 5, 10, 12.34)
+    store.update(3, 5, 12, 25.5)
+    store.update(3, 5, 126, 87.6)
+    alarms.apply_batkon(3, 5, 0, 0)
+    alarms.apply_balance(3, 5, 1)
+    table = BacsModuleTable(store, {3: 7}, alarms)
+
+    row = module_row(3, 3)
+    # Resistance ölçülmez: hücre yok (noSuchInstance)
+    assert [table.get((1, column, row)) for column in table.columns] == [1234, 255, 1000, None, 1, 88]
+    assert table.get((1, 2, module_row(3, 8))) is None
+    assert table.get((1, 2, module_row(1, 1))) is None
+    assert table.get((1, 9, row)) is None
+
+
+def test_string_totals():
+    store = BatteryStore()
+    store.update(2, 2, 10, -3.5)
+    store.update(2, 3, 10, 12.0)
+    store.update(2, 4, 10, 13.0)
+    table = BacsStringTable(store, {2: 3})
+    assert table.rows.tolist() == [2]
+    # Deşarj akımı işaretli; CurrentAC ölçülmez
+    assert [table.get((1, column, 2)) for column in table.columns] == [-350, 2500, 1250, None, 0, 0]
+    store.update(2, 5, 10, 14.0)
+    assert table.get((1, 3, 2)) == 3900
+    assert isinstance(table.encode((1, 3, 2), 3900), PositiveInteger)
+    assert isinstance(table.encode((1, 2, 2), -350), v2c.Integer32)
+
+
+def test_empty_cells_skipped():
+    """Veri yoksa veya PositiveInteger aralığı dışındaysa hücre yoktur"""
+    store = BatteryStore()
+    table = BacsModuleTable(store, {1: 3})
+    store.update(1, 4, 10, 12.5)   # Batarya 2
+    store.update(1, 5, 10, 0.0)    # Batarya 3: 0 V PositiveInteger değil
+    assert table.get((1, 2, 1)) is None and table.get((1, 2, 3)) is None
+    assert table.next((1, 2)) == ((1, 2, 2), 1250)
+    assert table.next((1, 2, 2)) == ((1, 4, 1), 0)   # Sıcaklık yok, Bypass 0
+    assert table.next((1, 4, 3)) == ((1, 6, 1), 0)   # Resistance atlanır
+
+    strings = BacsStringTable(store, {1: 3, 2: 1})
+    assert strings.get((1, 3, 2)) is None and strings.get((1, 4, 2)) is None
+    assert strings.next((1, 2)) == ((1, 3, 1), 1250)
+
+
+def test_next_is_column_major():
+    """Rastgele son eklerde GETNEXT = sıralı dolu (1, sütun, satır) listesi"""
+    store = BatteryStore()
+    rng = random.Random(4)
+    for arm, count in ((1, 3), (3, 120), (4, 2)):
+        for battery in range(1, count + 1):
+            for dtype in (10, 12, 126):
+                if rng.random() < 0.7:
+                    store.update(arm, battery + 2, dtype, rng.uniform(1, 30))
+    table = BacsModuleTable(store, {1: 3, 3: 120, 4: 2})
+    cells = sorted((1, column, row) for column in table.columns for row in table.rows
+                   if table.get((1, column, row)) is not None)
+    rng = random.Random(4)
+    probes = [(), (0,), (1,), (1, 7, 999), (2,)]
+    for _ in range(2000):
+        probes.append((1,) + tuple(rng.randint(0, 500) for _ in range(rng.randint(0, 3))))
+    for suffix in probes:
+        expected = next((cell for cell in cells if cell > suffix), None)
+        found = table.next(suffix)
+        assert (found[0] if found else None) == expected, suffix
+
+
+def test_full_table_walk_through_mib_instrum():
+    """480 modülün tamamı sütun sırasında walk edilir"""
+    store = BatteryStore()
+    for arm in range(1, 5):
+        for battery in range(1, 121):
+            store.update(arm, battery + 2, 10, 12.0 + battery / 100)
+    table = BacsModuleTable(store, FULL_COUNTS)
+
+    mib_instrum = context.SnmpContext(engine.SnmpEngine()).get_mib_instrum()
+    mib_builder = mib_instrum.get_mib_builder()
+    MibScalar, = mib_builder.import_symbols("SNMPv2-SMI", "MibScalar")
+    BatterySubtree = battery_subtree_class(MibScalar)
+    mib_builder.export_symbols("__TEST_BACS_MIB", BatterySubtree(BACS_MODULE_TABLE, v2c.Integer32(), table, table.encode))
+
+    walked = []
+    name = BACS_MODULE_TABLE
+    while True:
+        name, value = mib_instrum.read_next_variables((name, None))[0]
+        name = tuple(name)
+        if value is exval.endOfMib or name[:len(BACS_MODULE_TABLE)] != BACS_MODULE_TABLE:
+            break
+        walked.append((name[len(BACS_MODULE_TABLE):], int(value)))
+
+    # Sıcaklık, Resistance ve ChargeLevel verisi yok: Voltage, Bypass, State
+    assert len(walked) == 3 * 480
+    assert walked[0] == ((1, 2, 1), 1201)
+    assert walked[479] == ((1, 2, 480), 1320)
+    assert walked[480] == ((1, 4, 1), 0)
+    assert walked[960] == ((1, 6, 1), 0)
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 bacs2.mib Tablo Testi")
+    print("=" * 50)
+    tests = [
+        test_module_cells_scaled,
+        test_string_totals,
+        test_empty_cells_skipped,
+        test_next_is_column_major,
+        test_full_table_walk_through_mib_instrum,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - İkili Paket Testi
+5/6/7/11 byte'lık paket düzenlerinde k/dtype/arm alanlarını, payload'ı,
+eski hex log formatını ve paketin değiştirilemezliğini kontrol eder
+"""
+
+from battery_packet import BatteryPacket
+
+
+def test_measurement_layout():
+    """11 byte: [0x80, k, dtype, arm, 6 hane, crc]"""
+    raw = bytes([0x80, 0x05, 0x0A, 0x03, 0, 1, 2, 3, 4, 5, 0x5A])
+    packet = BatteryPacket(bytearray(raw))
+    assert (packet.k, packet.dtype, packet.arm) == (5, 10, 3)
+    assert packet.raw == raw and isinstance(packet.raw, bytes)
+    assert packet.payload == bytes([0, 1, 2, 3, 4, 5])
+    assert len(packet) == 11 and packet[0] == 0x80 and packet[-1] == 0x5A
+    assert packet.hex_list() == ['80', '05', '0a', '03', '00', '01', '02', '03', '04', '05', '5a']
+
+
+def test_event_layouts():
+    """5 byte eksik veri, 6 byte armslavecounts, 7 byte batkon alarmı"""
+    missing = BatteryPacket(bytes([0x81, 44, 0x7F, 3, 1]))
+    assert (missing.k, missing.dtype, missing.arm) == (44, 0x7F, 3)
+    assert missing.payload == b'' and missing.hex_list() == ['81', '2c', '7f', '03', '01']
+
+    # armslavecounts: raw[2..5] kol 1-4 batarya sayıları, arm alanı kol 2'nin sayısıdır
+    counts = BatteryPacket(bytes([0x81, 0x7E, 120, 118, 0, 5]))
+    assert (counts.k, counts.dtype, counts.arm) == (0x7E, 120, 118)
+    assert counts.payload == bytes([0])
+
+    batkon = BatteryPacket(bytes([0x81, 57, 0x7D, 2, 4, 1, 0x5A]))
+    assert (batkon.k, batkon.dtype, batkon.arm) == (57, 0x7D, 2)
+    assert batkon.payload == bytes([4, 1])
+    assert batkon.hex_list()[1:4] == ['39', '7d', '02']
+
+    # arm byte'ı olmayan kısa paket
+    short = BatteryPacket(bytes([0x81, 1, 2]))
+    assert short.arm is None and short.payload == b''
+
+
+def test_immutable_and_hashable():
+    raw = bytearray([0x80, 0x02, 0x0B, 0x01, 0, 4, 5, 0, 8, 0, 0])
+    packet = BatteryPacket(raw)
+    raw[1] = 0x09  # Kaynak tampon değişse de paket etkilenmez
+    assert packet.k == 2 and packet.raw[1] == 2
+
+    for name, value in (('k', 3), ('raw', b''), ('arm', 4), ('extra', 1)):
+        try:
+            setattr(packet, name, value)
+            assert False, "AttributeError bekleniyordu"
+        except AttributeError:
+            pass
+    assert not hasattr(packet, '__dict__')
+
+    same = BatteryPacket(bytes(packet.raw))
+    assert packet == same and hash(packet) == hash(same) and len({packet, same}) == 1
+    assert packet != BatteryPacket(bytes([0x80, 0x02, 0x0B, 0x02, 0, 4, 5, 0, 8, 0, 0]))
+    assert packet != packet.raw
+    assert repr(packet) == "BatteryPacket(80020b0100040500080000)"
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 İkili Paket Testi")
+    print("=" * 50)
+    tests = [
+        test_measurement_layout,
+        test_event_layouts,
+        test_immutable_and_hashable,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Zaman Serisi SQLite Depolama Testi
+Aylık bölüm tablolarını, kapsayan anahtar ile aralık sorgusunu, okuyucuların
+yazıcıyı beklemediğini ve alarm kayıtlarını geçici veritabanıyla kontrol eder
+"""
+
+import calendar
+import os
+import sqlite3
+import tempfile
+import threading
+
+from battery_storage import BatteryStorage, partition_name
+
+
+def ms(year, month, day, hour=0):
+    return calendar.timegm((year, month, day, hour, 0, 0)) * 1000
+
+
+def storage(directory, **kwargs):
+    return BatteryStorage(os.path.join(directory, 'battery_data.db'), **kwargs)
+
+
+def test_partitioned_range_query():
+    """3 aya yayılan veri: ay başına tablo, aralık sorgusu bölümleri birleştirir"""
+    with tempfile.TemporaryDirectory() as directory:
+        db = storage(directory)
+        try:
+            rows = []
+            for month in (8, 9, 10):
+                for day in (1, 15, 28):
+                    for k in range(3, 123):
+                        rows.append((1, k, 10, 12.0 + month / 10, ms(2026, month, day)))
+            assert db.insert_battery_rows(rows).result(5) == len(rows)
+            # Aynı anahtar yeniden yazılırsa güncellenir
+            db.insert_battery_rows([(1, 5, 10, 13.5, ms(2026, 9, 15))]).result(5)
+
+            assert db.partitions() == ['battery_data_202608', 'battery_data_202609', 'battery_data_202610']
+            assert db.partitions(ms(2026, 9, 20), ms(2026, 10, 2)) == ['battery_data_202609', 'battery_data_202610']
+
+            result = db.query_battery_data(1, 5, 10, ms(2026, 8, 10), ms(2026, 10, 1))
+            assert result == [(ms(2026, 8, 15), 12.8), (ms(2026, 8, 28), 12.8), (ms(2026, 9, 1), 12.9),
+                              (ms(2026, 9, 15), 13.5), (ms(2026, 9, 28), 12.9), (ms(2026, 10, 1), 13.0)]
+            assert db.latest_battery_data(1, 5, 10) == (ms(2026, 10, 28), 13.0)
+            assert db.latest_battery_data(2, 5, 10) is None
+
+            plan = db.read_query("EXPLAIN QUERY PLAN SELECT timestamp, data FROM battery_data_202609 "
+                                 "WHERE arm = 1 AND k = 5 AND dtype = 10 AND timestamp BETWEEN 0 AND 1")
+            assert 'USING PRIMARY KEY (arm=? AND k=? AND dtype=? AND timestamp>? AND timestamp<?)' in plan[0][3]
+
+            assert db.drop_partitions_before(ms(2026, 9, 5)).result(5) == ['battery_data_202608']
+            assert db.partitions() == ['battery_data_202609', 'battery_data_202610']
+        finally:
+            db.close()
+
+
+def test_day_partitions():
+    assert partition_name(ms(2026, 10, 18, 23), 'day') == 'battery_data_20261018'
+    assert partition_name(ms(2026, 10, 18, 23)) == 'battery_data_202610'
+
+
+def test_readers_do_not_wait_for_writer():
+    """Yazıcı transaction'ı açıkken okuyucu son commit'i okur; okuyucu yazamaz"""
+    with tempfile.TemporaryDirectory() as directory:
+        db = storage(directory)
+        try:
+            db.insert_battery_rows([(2, 3, 10, 12.1, ms(2026, 10, 1))]).result(5)
+            inside, release = threading.Event(), threading.Event()
+
+            def slow_write(conn):
+                conn.execute("INSERT INTO battery_data_202610 VALUES (2, 4, 10, ?, 12.2)", (ms(2026, 10, 1),))
+                inside.set()
+                release.wait(5)
+
+            pending = db._submit(slow_write)
+            assert inside.wait(5)
+            assert db.query_battery_data(2, 3, 10, 0, ms(2027, 1, 1)) == [(ms(2026, 10, 1), 12.1)]
+            assert db.latest_battery_data(2, 4, 10) is None  # Henüz commit edilmedi
+            release.set()
+            pending.result(5)
+            assert db.latest_battery_data(2, 4, 10) == (ms(2026, 10, 1), 12.2)
+
+            try:
+                db.read_query("DELETE FROM alarms")
+                assert False, "Salt okunur bağlantı yazmamalı"
+            except sqlite3.OperationalError:
+                pass
+            assert db.read_query("PRAGMA journal_mode") == [('wal',)]
+        finally:
+            db.close()
+
+
+def test_alarms_and_events():
+    with tempfile.TemporaryDirectory() as directory:
+        db = storage(directory)
+        try:
+            db.insert_alarm(3, 17, 4, 0, 1000)
+            db.insert_alarm(3, 2, 8, 9, 2000)
+            assert not db.resolve_alarm(3, 18).result(5)
+            assert db.resolve_alarm(3, 17, 3000).result(5)
+            assert db.active_alarms() == [(3, 2, 8, 9, 2000)]
+
+            db.insert_arm_slave_counts(1, 120, 1000)
+            db.insert_passive_balance(1, 7, 1, 1000)
+            db.insert_missing_data(1, 8, 0, 1000)
+            db.execute_query("CREATE TABLE IF NOT EXISTS armconfigs (armValue INTEGER)").result(5)
+            try:
+                db.execute_query("INSERT INTO yok VALUES (1)").result(5)
+                assert False, "OperationalError bekleniyordu"
+            except sqlite3.OperationalError:
+                pass
+            assert db.read_query("SELECT slave_count FROM arm_slave_counts") == [(120,)]
+            assert db.stats()['write_errors'] == 1
+        finally:
+            db.close()
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Zaman Serisi SQLite Depolama Testi")
+    print("=" * 50)
+    tests = [
+        test_partitioned_range_query,
+        test_day_partitions,
+        test_readers_do_not_wait_for_writer,
+        test_alarms_and_events,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - BatteryStore Test
+Dizi tabanlı deponun eski battery_data_ram dict yapısı ile aynı sonucu verdiğini kontrol eder
+"""
+
+import random
+
+from battery_store import ARMS, DTYPES, EMPTY_STATS, SLOT_COUNT, BatteryStore, StoreStats, slot_key, slot_of
+
+
+def reference_update(ram, arm, k, dtype, value, timestamp):
+    """Eski update_battery_data_ram mantığı (referans)"""
+    ram.setdefault(arm, {}).setdefault(k, {})[dtype] = {'value': value, 'timestamp': timestamp}
+
+
+def test_slot_roundtrip():
+    """Her slot tek bir (arm, k, dtype) anahtarına karşılık gelir"""
+    seen = set()
+    for slot in range(SLOT_COUNT):
+        key = slot_key(slot)
+        assert slot_of(*key) == slot
+        seen.add(key)
+    assert len(seen) == SLOT_COUNT
+    assert slot_of(5, 3, 10) == -1
+    assert slot_of(1, 3, 99) == -1
+    assert slot_of(1, 200, 10) == -1
+
+
+def test_matches_reference_dict():
+    """Rastgele yazımlar eski dict ile aynı get() sonucunu verir"""
+    rng = random.Random(7)
+    store = BatteryStore()
+    ram = {}
+    for i in range(2000):
+        arm = rng.choice(ARMS)
+        k = rng.randint(2, 20)
+        dtype = rng.choice(DTYPES + (99,))
+        value = round(rng.uniform(0, 15), 3)
+        reference_update(ram, arm, k, dtype, value, i + 1)
+        store.update(arm, k, dtype, value, timestamp=i + 1)
+
+    assert store.get() == ram
+    for arm in ARMS:
+        assert store.get(arm) == ram.get(arm, {})
+        for k in range(2, 21):
+            assert store.get(arm, k) == ram.get(arm, {}).get(k, {})
+            for dtype in DTYPES + (99,):
+                assert store.get(arm, k, dtype) == ram.get(arm, {}).get(k, {}).get(dtype)
+
+
+def test_value_at_and_clear():
+    """Slot okuması ve clear() sonrası boş depo"""
+    store = BatteryStore()
+    store.update(1, 3, 10, 12.5)
+    store.update(1, 3, 126, None)
+    assert store.value_at(slot_of(1, 3, 10)) == 12.5
+    assert store.value_at(slot_of(1, 3, 126)) is None
+    assert store.get(1, 3, 126)['value'] is None
+    assert store.has_k(1, 3)
+    assert not store.has_k(1, 4)
+
+    store.clear()
+    assert store.get() == {}
+    assert store.value_at(slot_of(1, 3, 10)) is None
+    assert not store.has_k(1, 3)
+
+
+def test_snapshot_publishing():
+    """Okuyucu yayınlanana kadar eski kuşağı görür"""
+    store = BatteryStore(publish_every=3)
+    first = store.snapshot
+    store.update(2, 2, 10, 1.5)
+    store.update(2, 3, 10, 12.1)
+    assert store.snapshot is first
+    assert store.get() == {}
+
+    store.update(2, 3, 126, 80.0)
+    assert store.snapshot.generation == first.generation + 1
+    assert store.get(2, 3, 10)['value'] == 12.1
+    assert first.get() == {}
+
+    # Periyot sonu / veri akışı durduğunda
+    store.update(2, 4, 10, 12.2)
+    old = store.snapshot
+    assert store.flush() is not old
+    assert store.flush() is store.snapshot
+    assert store.get(2, 4, 10)['value'] == 12.2
+    assert old.get(2, 4, 10) is None
+
+
+def reference_stats(ram):
+    """Eski 1.3.6.5.2/3/6 handler'larının tam tarama sonucu (referans)"""
+    return StoreStats(
+        sum(1 for arm in ram for k in ram[arm] if k > 2),
+        len(ram),
+        sum(len(ram[arm][k]) for arm in ram for k in ram[arm]),
+    )
+
+
+def test_stats_match_full_scan():
+    """Artımlı toplamlar her yazmada tam taramayla aynı, clear() sıfırlar"""
+    rng = random.Random(3)
+    store = BatteryStore()
+    ram = {}
+    for i in range(1500):
+        arm = rng.choice(ARMS + (7,))
+        k = rng.randint(1, 130)
+        dtype = rng.choice(DTYPES + (99,))
+        reference_update(ram, arm, k, dtype, None if i % 50 == 0 else i / 10, i + 1)
+        store.update(arm, k, dtype, None if i % 50 == 0 else i / 10, timestamp=i + 1)
+        assert store.stats == reference_stats(ram)
+
+    store.clear()
+    assert store.stats == EMPTY_STATS
+    store.update(1, 2, 10, 1.0)
+    assert store.stats == StoreStats(0, 1, 1)
+
+
+def test_stats_follow_publish():
+    """Toplamlar kuşakla birlikte yayınlanır"""
+    store = BatteryStore(publish_every=2)
+    store.update(1, 3, 10, 12.0)
+    assert store.stats == EMPTY_STATS
+    store.update(1, 3, 11, 99.0)
+    assert store.stats == StoreStats(1, 1, 2)
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 BatteryStore Testi")
+    print("=" * 50)
+    tests = [
+        test_slot_roundtrip,
+        test_matches_reference_dict,
+        test_value_at_and_clear,
+        test_snapshot_publishing,
+        test_stats_match_full_scan,
+        test_stats_follow_publish,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
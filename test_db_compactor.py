@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - DB Birleştirmeli Yazma Testi
+Aynı periyotta tekrarlanan ölçümlerin tek satıra indiğini ve tamponun
+tek transaction'da yazıldığını, hata sonrası beklemeyi ve sınırı bellek
+içi SQLite ile kontrol eder
+"""
+
+import sqlite3
+
+from db_compactor import BatteryDataCompactor, insert_rows
+
+
+def database():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE battery_data (arm INTEGER, k INTEGER, dtype INTEGER, data REAL, timestamp INTEGER)")
+    conn.commit()
+    return conn
+
+
+def test_latest_value_per_period():
+    compactor = BatteryDataCompactor()
+    for period in (1000, 2000):
+        for repeat in range(3):
+            for k in range(3, 123):
+                compactor.add(1, k, 10, 12.0 + repeat, period)
+        compactor.add(1, 2, 11, 40.0, period)
+    assert len(compactor) == 2 * 121
+    assert (compactor.added, compactor.superseded) == (2 * 361, 2 * 240)
+
+    conn = database()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    write = lambda rows: insert_rows(conn, rows)
+    assert compactor.flush(write) == 242
+    assert statements[0] == "BEGIN IMMEDIATE" and statements[-1] == "COMMIT"
+    assert len(compactor) == 0 and compactor.flush(write) == 0
+
+    rows = conn.execute("SELECT arm, k, dtype, data, timestamp FROM battery_data ORDER BY rowid").fetchall()
+    assert rows[0] == (1, 3, 10, 14.0, 1000) and rows[121] == (1, 3, 10, 14.0, 2000)
+    assert {row[3] for row in rows if row[2] == 10} == {14.0}
+
+
+def test_failed_flush_keeps_rows():
+    compactor = BatteryDataCompactor(flush_rows=2)
+    compactor.add(2, 5, 12, 25.0, 1000)
+    assert not compactor.due(compactor.last_flush)
+    compactor.add(2, 5, 13, 26.0, 1000)
+    assert compactor.due(compactor.last_flush)
+
+    conn = sqlite3.connect(':memory:')  # Tablo yok
+    try:
+        compactor.flush(lambda rows: insert_rows(conn, rows))
+        assert False, "OperationalError bekleniyordu"
+    except sqlite3.OperationalError:
+        pass
+    assert not conn.in_transaction and len(compactor) == 2
+
+    conn = database()
+    assert compactor.flush(lambda rows: insert_rows(conn, rows)) == 2 and compactor.written == 2
+
+
+def test_failed_flush_backs_off_and_drops():
+    """Hata sonrası flush_interval boyunca due() False; sınırı aşan tampon atılır"""
+    compactor = BatteryDataCompactor(flush_rows=2, flush_interval=5.0, max_rows=4)
+    for k in range(3, 6):
+        compactor.add(1, k, 10, 12.0, 1000)
+
+    def fail(rows):
+        raise sqlite3.OperationalError("database is locked")
+
+    try:
+        compactor.flush(fail)
+        assert False, "OperationalError bekleniyordu"
+    except sqlite3.OperationalError:
+        pass
+    assert len(compactor) == 3 and compactor.failures == 1 and compactor.dropped == 0
+    assert compactor.backing_off() and not compactor.due()
+    assert compactor.due(compactor.last_flush + 5.0)
+
+    compactor.add(1, 6, 10, 12.0, 1000)
+    try:
+        compactor.flush(fail)
+    except sqlite3.OperationalError:
+        pass
+    assert len(compactor) == 0 and (compactor.failures, compactor.dropped) == (2, 4)
+
+    compactor.add(1, 7, 10, 12.0, 2000)
+    conn = database()
+    assert compactor.flush(lambda rows: insert_rows(conn, rows)) == 1
+    assert not compactor.backing_off()
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 DB Birleştirmeli Yazma Testi")
+    print("=" * 50)
+    tests = [
+        test_latest_value_per_period,
+        test_failed_flush_keeps_rows,
+        test_failed_flush_backs_off_and_drops,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
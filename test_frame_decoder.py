@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - UART Frame Decoder Test
+Kaydedilmiş byte akışlarını çözücüye besler ve eski read_serial algoritması ile karşılaştırır
+"""
+
+import random
+
+from uart_frame_decoder import UARTFrameDecoder
+
+# Kaydedilmiş byte akışları (hex)
+RECORDED_STREAMS = {
+    # Kol verisi (k=2) + 2 batarya gerilimi + armslavecounts
+    "periyot": (
+        "80020a0101020305060700"
+        "80020b0100040507080000"
+        "80030a0100010203040500"
+        "80040a0100010209080700"
+        "817e07000000"
+    ),
+    # Başta çöp byte, missing data, balans, Hatkon ve Batkon alarmları
+    "alarm": (
+        "ff00127f"
+        "80057f0301"
+        "81050f0301"
+        "ff"
+        "81027d0304"
+        "80057d0302010000"
+    ),
+    # Başlıksız gürültü
+    "gurultu": "0001020304050607",
+}
+
+
+def reference_frames(stream, chunk_sizes):
+    """Eski read_serial içindeki buffer mantığı (referans)"""
+    buffer = bytearray()
+    frames = []
+    position = 0
+    for size in chunk_sizes:
+        chunk = stream[position:position + size]
+        position += size
+        if not chunk:
+            continue
+        buffer.extend(chunk)
+        while len(buffer) >= 3:
+            header_index = -1
+            for i, byte in enumerate(buffer):
+                if byte == 0x80 or byte == 0x81:
+                    header_index = i
+                    break
+            if header_index == -1:
+                buffer.clear()
+                break
+            if header_index > 0:
+                buffer = buffer[header_index:]
+            if len(buffer) >= 3:
+                dtype = buffer[2]
+                if dtype == 0x7F and len(buffer) >= 5:
+                    packet_length = 5
+                elif len(buffer) >= 6 and (buffer[2] == 0x0F or buffer[1] == 0x7E or (buffer[2] == 0x7D and buffer[1] == 2)):
+                    packet_length = 6
+                elif dtype == 0x7D and len(buffer) >= 7 and buffer[1] > 2:
+                    packet_length = 7
+                else:
+                    packet_length = 11
+                if len(buffer) >= packet_length:
+                    frames.append(bytes(buffer[:packet_length]))
+                    buffer = buffer[packet_length:]
+                else:
+                    break
+            else:
+                break
+    return frames
+
+
+def decoder_frames(stream, chunk_sizes, capacity=4096):
+    """Yeni çözücü ile paketleri ayıkla"""
+    decoder = UARTFrameDecoder(capacity=capacity)
+    frames = []
+    position = 0
+    for size in chunk_sizes:
+        chunk = stream[position:position + size]
+        position += size
+        frames.extend(decoder.feed(chunk))
+    return frames
+
+
+def random_chunks(length, rng, max_chunk=16):
+    """Akışı rastgele parçalara böl"""
+    sizes = []
+    while sum(sizes) < length:
+        sizes.append(rng.randint(1, max_chunk))
+    return sizes
+
+
+def test_recorded_streams_whole():
+    """Kayıtlı akışlar tek parça beslendiğinde referans ile aynı paketler"""
+    for name, hex_stream in RECORDED_STREAMS.items():
+        stream = bytes.fromhex(hex_stream)
+        expected = reference_frames(stream, [len(stream)])
+        assert decoder_frames(stream, [len(stream)]) == expected, name
+
+
+def test_recorded_period_frames():
+    """Periyot akışındaki paket uzunlukları"""
+    stream = bytes.fromhex(RECORDED_STREAMS["periyot"])
+    frames = decoder_frames(stream, [len(stream)])
+    assert [len(frame) for frame in frames] == [11, 11, 11, 11, 6]
+    assert frames[-1] == bytes.fromhex("817e07000000")
+
+
+def test_noise_is_discarded():
+    """Başlıksız byte'lar atılır"""
+    decoder = UARTFrameDecoder()
+    assert decoder.feed(bytes.fromhex(RECORDED_STREAMS["gurultu"])) == []
+    assert len(decoder) == 0
+    assert decoder.discarded_bytes == 8
+
+
+def test_random_chunking_matches_reference():
+    """Rastgele parçalı besleme referans algoritma ile aynı sonucu verir"""
+    rng = random.Random(1234)
+    stream = b"".join(bytes.fromhex(s) for s in RECORDED_STREAMS.values()) * 50
+    for _ in range(50):
+        sizes = random_chunks(len(stream), rng)
+        assert decoder_frames(stream, sizes, capacity=32) == reference_frames(stream, sizes)
+
+
+def test_buffer_grows_for_large_burst():
+    """Kapasiteden büyük patlama verisi kayıpsız işlenir"""
+    stream = bytes.fromhex(RECORDED_STREAMS["periyot"]) * 200
+    frames = decoder_frames(stream, [len(stream)], capacity=16)
+    assert len(frames) == 5 * 200
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 UART Frame Decoder Testi")
+    print("=" * 50)
+    tests = [
+        test_recorded_streams_whole,
+        test_recorded_period_frames,
+        test_noise_is_discarded,
+        test_random_chunking_matches_reference,
+        test_buffer_grows_for_large_burst,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
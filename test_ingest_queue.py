@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Sınırlı Ingest Kuyruğu Testi
+Sürekli paket patlamasında kuyruğun sınırda kaldığını, ölçümlerin
+(arm, k, dtype) başına birleştirildiğini ve sayaçları kontrol eder
+"""
+
+import queue
+import threading
+import time
+
+from battery_packet import BatteryPacket
+from ingest_queue import IngestQueue
+
+
+def measurement(arm, k, dtype, value):
+    return BatteryPacket(bytes([0x80, k, dtype, arm, 0, 1, 2, 3, 4, value, 0]))
+
+
+def alarm(arm, battery):
+    return BatteryPacket(bytes([0x80, battery, 0x7D, arm, 1, 0, 0]))
+
+
+def drain(ingest):
+    items = []
+    while True:
+        try:
+            items.append(ingest.get(block=False))
+        except queue.Empty:
+            return items
+
+
+def test_drop_oldest_stays_bounded():
+    ingest = IngestQueue(capacity=100, policy='drop_oldest')
+    for n in range(1000):
+        ingest.put(measurement(1, n % 120 + 3, 10, n % 256))
+    stats = ingest.stats()
+    assert stats['depth'] == stats['high_water'] == 100
+    assert (stats['enqueued'], stats['dropped'], stats['coalesced']) == (1000, 900, 0)
+    items = drain(ingest)
+    assert [item.raw[9] for item in items] == [n % 256 for n in range(900, 1000)]
+    assert ingest.stats()['dequeued'] == 100
+
+
+def test_coalesce_keeps_latest_in_place():
+    """Aynı ölçüm yerinde güncellenir; olay paketleri birleştirilmez"""
+    ingest = IngestQueue(capacity=100, policy='coalesce')
+    ingest.put(measurement(1, 3, 10, 1))
+    ingest.put(measurement(1, 4, 10, 1))
+    ingest.put(alarm(1, 3))
+    ingest.put(alarm(1, 3))
+    ingest.put(measurement(1, 3, 10, 2))
+    assert [item.raw[9] if len(item) == 11 else 'alarm' for item in drain(ingest)] == [2, 1, 'alarm', 'alarm']
+    assert ingest.stats()['coalesced'] == 1
+
+    # Tüketici 10 periyot geride: periyot içi tekrarlar birleşir, periyotlar
+    # birleşmez; kuyruk sınırda kalır ve en yeni periyotlar tutulur
+    ingest = IngestQueue(capacity=800, policy='coalesce')
+    for period in range(10):
+        for k in range(2, 123):
+            for dtype in (10, 11, 12):
+                ingest.put(measurement(2, k, dtype, period * 2))
+                ingest.put(measurement(2, k, dtype, period * 2 + 1))
+    stats = ingest.stats()
+    assert stats['depth'] == stats['high_water'] == 800
+    assert (stats['coalesced'], stats['dropped']) == (3630, 3630 - 800)
+    items = drain(ingest)
+    assert [(item.k, item.dtype, item.raw[9]) for item in items[-363:-360]] == [(2, 10, 19), (2, 11, 19), (2, 12, 19)]
+    assert all(item.raw[9] == 19 for item in items[-363:]) and items[-364].raw[9] == 17
+
+
+def test_coalesce_respects_period_boundary():
+    """k=2 dışı ölçümden sonra gelen k=2 yeni periyottur; periyotlar birleşmez"""
+    ingest = IngestQueue(capacity=100, policy='coalesce')
+    for period in (1, 2):
+        ingest.put(measurement(1, 2, 10, period))
+        ingest.put(measurement(1, 3, 10, period))
+    assert [(item.k, item.raw[9]) for item in drain(ingest)] == [(2, 1), (3, 1), (2, 2), (3, 2)]
+    assert ingest.stats()['coalesced'] == 0
+
+    # Art arda k=2 paketleri (farklı kol/dtype) aynı periyotta kalır;
+    # olay paketleri periyot sınırını etkilemez
+    ingest.put(measurement(1, 2, 10, 3))
+    ingest.put(measurement(2, 2, 10, 3))
+    ingest.put(alarm(1, 3))
+    ingest.put(measurement(1, 2, 10, 4))
+    assert [item.raw[9] if len(item) == 11 else 'alarm' for item in drain(ingest)] == [4, 3, 'alarm']
+
+
+def test_blocking_get_and_lag():
+    ingest = IngestQueue(capacity=10)
+    started = time.monotonic()
+    try:
+        ingest.get(timeout=0.05)
+        assert False, "queue.Empty bekleniyordu"
+    except queue.Empty:
+        assert time.monotonic() - started >= 0.05
+
+    threading.Timer(0.05, ingest.put, args=(alarm(4, 1),)).start()
+    assert ingest.get(timeout=2) == alarm(4, 1)
+
+    ingest.put(alarm(4, 2))
+    time.sleep(0.05)
+    assert ingest.lag() >= 0.05
+    ingest.get()
+    assert ingest.lag() == 0.0 and ingest.stats()['max_lag'] >= 0.05
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Sınırlı Ingest Kuyruğu Testi")
+    print("=" * 50)
+    tests = [
+        test_drop_oldest_stays_bounded,
+        test_coalesce_keeps_latest_in_place,
+        test_coalesce_respects_period_boundary,
+        test_blocking_get_and_lag,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
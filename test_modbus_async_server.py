@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Async Modbus TCP Server Test
+Bölünmüş/birleşik frame'ler, pipelining, bağlantı sınırı ve boşta zaman aşımı
+"""
+
+import asyncio
+import struct
+
+from modbus_async_server import AsyncModbusServer
+
+
+def read_request(transaction_id, start_address, quantity, unit_id=1):
+    return struct.pack('>HHHBBHH', transaction_id, 0, 6, unit_id, 3, start_address, quantity)
+
+
+def echo_handler(transaction_id, unit_id, pdu):
+    """Başlangıç adresini tek register olarak döndür"""
+    start_address = struct.unpack('>H', pdu[1:3])[0]
+    return struct.pack('>HHHBBBH', transaction_id, 0, 5, unit_id, 3, 2, start_address)
+
+
+async def read_response(reader):
+    header = await reader.readexactly(7)
+    length = struct.unpack('>H', header[4:6])[0]
+    body = await reader.readexactly(length - 1)
+    return struct.unpack('>H', header[0:2])[0], struct.unpack('>H', body[-2:])[0]
+
+
+async def with_server(test, **kwargs):
+    server = AsyncModbusServer('127.0.0.1', 0, echo_handler, **kwargs)
+    await server.start()
+    port = server.server.sockets[0].getsockname()[1]
+    try:
+        await test(server, port)
+    finally:
+        server.server.close()
+        await server.server.wait_closed()
+
+
+def test_split_and_coalesced_frames():
+    """Parça parça ve birleşik gelen istekler doğru ayrılır, sırayla cevaplanır"""
+    async def test(server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        stream = b''.join(read_request(i, 100 + i, 1) for i in range(20))
+        # Frame sınırlarıyla örtüşmeyen parçalar halinde gönder
+        for i in range(0, len(stream), 5):
+            writer.write(stream[i:i + 5])
+            await writer.drain()
+            await asyncio.sleep(0)
+        responses = [await read_response(reader) for _ in range(20)]
+        assert responses == [(i, 100 + i) for i in range(20)]
+        writer.close()
+
+    asyncio.run(with_server(test))
+
+
+def test_connection_cap_and_idle_timeout():
+    """Sınır aşan bağlantı reddedilir, boştaki bağlantı kapatılır"""
+    async def test(server, port):
+        reader1, writer1 = await asyncio.open_connection('127.0.0.1', port)
+        writer1.write(read_request(1, 7, 1))
+        assert await read_response(reader1) == (1, 7)
+
+        reader2, writer2 = await asyncio.open_connection('127.0.0.1', port)
+        assert await reader2.read() == b''
+        assert server.rejected_connections == 1
+
+        # İlk bağlantı boşta kalınca kapanır
+        assert await asyncio.wait_for(reader1.read(), 2) == b''
+        assert server.idle_timeouts == 1
+        writer1.close()
+        writer2.close()
+
+    asyncio.run(with_server(test, max_connections=1, idle_timeout=0.2))
+
+
+def test_invalid_mbap_closes_connection():
+    """protocol_id != 0 olan frame bağlantıyı kapatır"""
+    async def test(server, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(struct.pack('>HHHBBHH', 1, 5, 6, 1, 3, 0, 1))
+        assert await asyncio.wait_for(reader.read(), 2) == b''
+        assert server.framing_errors == 1
+        writer.close()
+
+    asyncio.run(with_server(test))
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Async Modbus TCP Server Testi")
+    print("=" * 50)
+    tests = [
+        test_split_and_coalesced_frames,
+        test_connection_cap_and_idle_timeout,
+        test_invalid_mbap_closes_connection,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
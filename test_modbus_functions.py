@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Modbus Function Code Test
+FC1/2/3/4/5/6/15/16/23 cevapları ve exception kodları
+"""
+
+import os
+import struct
+import tempfile
+
+from alarm_state import AlarmState, balance_bit, battery_alarm_bit
+from battery_store import BatteryStore
+from device_config import (ARMCONFIG_BASE, BATCONFIG_BASE, ConfigRegisters, ConfigStorage,
+                           build_batconfig_packet)
+from modbus_functions import ModbusFunctions
+from register_map import RegisterImage, RegisterMap
+
+
+def make_functions():
+    store = BatteryStore()
+    image = RegisterImage(store, RegisterMap({1: 0, 2: 0, 3: 7, 4: 0}))
+    store.update(3, 3, 10, 12.5)
+    sent = []
+    functions = ModbusFunctions(image, AlarmState(), on_config_write=lambda kind, arm: sent.append((kind, arm)))
+    return functions, sent
+
+
+def request(functions, pdu):
+    """PDU gönder, (function code, cevap gövdesi) döndür"""
+    response = functions.handle(7, 1, pdu)
+    transaction_id, protocol_id, length, unit_id = struct.unpack('>HHHB', response[:7])
+    assert (transaction_id, protocol_id, unit_id) == (7, 0, 1)
+    assert length == len(response) - 6
+    return response[7], response[8:]
+
+
+def test_read_registers():
+    """FC3/FC4 veri alanı ve adres 0 bloğu"""
+    functions, _sent = make_functions()
+    assert request(functions, struct.pack('>BHH', 3, 5, 1)) == (3, b'\x02' + struct.pack('>H', 1250))
+    assert request(functions, struct.pack('>BHH', 4, 0, 4)) == (4, b'\x08' + struct.pack('>4H', 0, 0, 7, 0))
+
+
+def test_exceptions():
+    """Bilinmeyen fonksiyon 01, geçersiz adres 02, geçersiz değer 03"""
+    functions, _sent = make_functions()
+    assert request(functions, b'\x08\x00\x00') == (0x88, b'\x01')
+    assert request(functions, struct.pack('>BHH', 3, 50, 10)) == (0x83, b'\x02')
+    assert request(functions, struct.pack('>BHH', 3, 1, 0)) == (0x83, b'\x03')
+    assert request(functions, struct.pack('>BHH', 3, 1, 126)) == (0x83, b'\x03')
+    assert request(functions, struct.pack('>BHH', 6, 5, 1)) == (0x86, b'\x02')
+    assert request(functions, struct.pack('>BHH', 5, 0, 0x1234)) == (0x85, b'\x03')
+    assert request(functions, b'\x03\x00') == (0x83, b'\x03')
+
+
+def test_config_writes():
+    """FC6/FC16 batconfig/armconfig'e yazar ve değişen kolu cihaza gönderir"""
+    functions, sent = make_functions()
+    vmin_address = BATCONFIG_BASE + 16  # Kol 2 Vmin
+    pdu = struct.pack('>BHH', 6, vmin_address, 1050)
+    assert request(functions, pdu) == (6, pdu[1:])
+    assert sent == [('batconfig', 2)]
+    assert functions.config.get('batconfig', 2)['Vmin'] == 10.5
+    assert build_batconfig_packet(functions.config.get('batconfig', 2))[7:9] == bytes((10, 50))
+
+    # Aynı değer tekrar yazılınca gönderim yok
+    request(functions, pdu)
+    assert sent == [('batconfig', 2)]
+
+    pdu = struct.pack('>BHHB6H', 16, ARMCONFIG_BASE, 6, 12, 100, 500, 90, 10, 60, 5)
+    assert request(functions, pdu) == (16, pdu[1:5])
+    assert sent[-1] == ('armconfig', 1)
+    assert functions.config.get('armconfig', 1)['akimMax'] == 500
+
+    # FC23: yaz ve aynı alanı oku
+    pdu = struct.pack('>BHHHHBH', 23, ARMCONFIG_BASE, 2, ARMCONFIG_BASE + 1, 1, 2, 750)
+    assert request(functions, pdu) == (23, b'\x04' + struct.pack('>2H', 100, 750))
+
+
+def test_fc23_read_checked_before_write():
+    """FC23 okuma aralığı geçersizse yazma ve gönderim yapılmaz"""
+    functions, sent = make_functions()
+    before = functions.config.get('armconfig', 1)
+    pdu = struct.pack('>BHHHHBH', 23, 50, 10, ARMCONFIG_BASE + 1, 1, 2, 750)
+    assert request(functions, pdu) == (0x97, b'\x02')
+    pdu = struct.pack('>BHHHHBH', 23, ARMCONFIG_BASE, 0, ARMCONFIG_BASE + 1, 1, 2, 750)
+    assert request(functions, pdu) == (0x97, b'\x03')
+    assert sent == [] and functions.config.get('armconfig', 1) == before
+
+
+def test_server_device_failure():
+    """Handler içindeki beklenmeyen hata 04 exception cevabı olur"""
+    store = BatteryStore()
+    image = RegisterImage(store, RegisterMap({1: 0, 2: 0, 3: 7, 4: 0}))
+
+    def failing_send(kind, arm):
+        raise OSError("pigpio bağlantısı yok")
+
+    functions = ModbusFunctions(image, AlarmState(), on_config_write=failing_send)
+    assert request(functions, struct.pack('>BHH', 6, BATCONFIG_BASE, 1050)) == (0x86, b'\x04')
+    # Sonraki istekler etkilenmez
+    assert request(functions, struct.pack('>BHH', 3, 5, 1)) == (3, b'\x02\x00\x00')
+
+
+def test_config_storage():
+    """Konfigürasyon batconfigs/armconfigs tablolarına kaydedilir ve son kayıt yüklenir"""
+    with tempfile.TemporaryDirectory() as directory:
+        storage = ConfigStorage(os.path.join(directory, 'battery_data.db'))
+        assert storage.load() == {'batconfig': {}, 'armconfig': {}}
+
+        functions = ModbusFunctions(None, AlarmState(), ConfigRegisters(storage.load()),
+                                    on_config_write=lambda kind, arm: storage.save(kind, functions.config.get(kind, arm)))
+        request(functions, struct.pack('>BHH', 6, BATCONFIG_BASE + 16, 1050))
+        request(functions, struct.pack('>BHH', 6, BATCONFIG_BASE + 16, 1075))
+        request(functions, struct.pack('>BHH', 6, ARMCONFIG_BASE + 3 * 16 + 1, 500))
+
+        configs = ConfigRegisters(storage.load())
+        assert configs.get('batconfig', 2)['Vmin'] == 10.75
+        assert configs.get('armconfig', 4)['akimMax'] == 500
+        # Kaydı olmayan kol varsayılanda kalır
+        assert configs.get('batconfig', 1) == ConfigRegisters().get('batconfig', 1)
+
+
+def test_alarm_bits():
+    """FC2 anlık, FC1 mandallı bitler; FC5/FC15 ile onay"""
+    functions, _sent = make_functions()
+    alarms = functions.alarms
+    alarms.apply_batkon(1, 3, 2, 5)        # Kol 1 Batarya 1 alarm
+    alarms.apply_balance(1, 4, 1)          # Kol 1 Batarya 2 balans
+    alarms.apply_batkon(1, 3, 1, 1)        # Alarm düzeldi
+    assert battery_alarm_bit(1, 1) == 1 and balance_bit(1, 2) == 130
+
+    assert request(functions, struct.pack('>BHH', 2, 0, 8)) == (2, b'\x01\x00')
+    assert request(functions, struct.pack('>BHH', 1, 0, 8)) == (1, b'\x01\x02')
+    assert request(functions, struct.pack('>BHH', 2, 130, 1)) == (2, b'\x01\x01')
+
+    pdu = struct.pack('>BHH', 5, 1, 0x0000)
+    assert request(functions, pdu) == (5, pdu[1:])
+    assert request(functions, struct.pack('>BHH', 1, 0, 8)) == (1, b'\x01\x00')
+
+    pdu = struct.pack('>BHHBB', 15, 0, 3, 1, 0b101)
+    assert request(functions, pdu) == (15, pdu[1:5])
+    assert request(functions, struct.pack('>BHH', 1, 0, 3)) == (1, b'\x01\x05')
+    assert request(functions, struct.pack('>BHH', 1, 1020, 8)) == (0x81, b'\x02')
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Modbus Function Code Testi")
+    print("=" * 50)
+    tests = [
+        test_read_registers,
+        test_exceptions,
+        test_config_writes,
+        test_fc23_read_checked_before_write,
+        test_server_device_failure,
+        test_config_storage,
+        test_alarm_bits,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
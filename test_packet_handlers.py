@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Paket Dağıtım Tablosu Testi
+Kayıtlı her (uzunluk, ayırt edici byte) anahtarı için bir paketi kaydeden
+sink'e dağıtır ve çözülen değerleri eski int(data[x], 16) formülleriyle
+karşılaştırır
+"""
+
+from battery_packet import BatteryPacket
+from packet_handlers import (DEFAULT_HANDLERS, PACKET_HANDLERS, PacketSink,
+                             dispatch_packet, packet_key)
+
+
+class RecordingSink(PacketSink):
+    """Handler çağrılarını (metod, argümanlar) olarak kaydeder"""
+
+    def __init__(self):
+        self.calls = []
+
+    def begin_measurement(self, k_value):
+        self.calls.append(('begin_measurement', k_value))
+
+    def on_invalid_arm(self, arm_value):
+        self.calls.append(('on_invalid_arm', arm_value))
+
+    def on_value(self, arm_value, k_value, dtype, value):
+        self.calls.append(('on_value', arm_value, k_value, dtype, value))
+
+    def on_voltage(self, arm_value, k_value, value):
+        self.calls.append(('on_voltage', arm_value, k_value, value))
+
+    def on_humidity(self, arm_value, value):
+        self.calls.append(('on_humidity', arm_value, value))
+
+    def on_soh(self, arm_value, k_value, value):
+        self.calls.append(('on_soh', arm_value, k_value, value))
+
+    def on_arm_slave_counts(self, counts):
+        self.calls.append(('on_arm_slave_counts', counts))
+
+    def on_balance(self, arm_value, slave_value, status_value):
+        self.calls.append(('on_balance', arm_value, slave_value, status_value))
+
+    def on_hatkon_alarm(self, arm_value, error_msb):
+        self.calls.append(('on_hatkon_alarm', arm_value, error_msb))
+
+    def on_batkon_alarm(self, packet, arm_value, battery, error_msb, error_lsb):
+        self.calls.append(('on_batkon_alarm', arm_value, battery, error_msb, error_lsb))
+
+    def on_missing_data(self, arm_value, slave_value, status_value):
+        self.calls.append(('on_missing_data', arm_value, slave_value, status_value))
+
+
+# Eski db_worker/data_processor formülleri (hex string listesi üzerinde)
+
+def old_salt_data(data):
+    saltData = int(data[4], 16) * 100 + int(data[5], 16) * 10 + int(data[6], 16) + int(data[7], 16) * 0.1 + int(data[8], 16) * 0.01 + int(data[9], 16) * 0.001
+    return round(saltData, 4)
+
+
+def old_percent(data):
+    onlar = int(data[5], 16)
+    birler = int(data[6], 16)
+    kusurat1 = int(data[7], 16)
+    kusurat2 = int(data[8], 16)
+    return round((onlar * 10 + birler) + (kusurat1 * 0.1 + kusurat2 * 0.01), 4)
+
+
+def measurement(k, dtype, arm, digits):
+    return BatteryPacket(bytes([0x80, k, dtype, arm] + list(digits) + [0x5A]))
+
+
+def dispatch(packet):
+    sink = RecordingSink()
+    assert dispatch_packet(packet, sink)
+    return sink.calls
+
+
+def close(a, b):
+    return abs(a - b) < 1e-9
+
+
+def test_every_registered_key_dispatches():
+    frames = {
+        (11, 10): measurement(5, 10, 1, (0, 1, 2, 3, 4, 5)),
+        (11, 11): measurement(5, 11, 2, (0, 9, 5, 1, 2, 0)),
+        (11, 12): measurement(7, 12, 3, (0, 2, 5, 3, 1, 0)),
+        (11, 13): measurement(7, 13, 4, (0, 2, 6, 0, 4, 0)),
+        (6, 0x7E): BatteryPacket(bytes([0x81, 0x7E, 120, 118, 0, 5])),
+        (6, 0x0F): BatteryPacket(bytes([0x81, 17, 0x0F, 3, 1, 0x5A])),
+        (6, 0x7D): BatteryPacket(bytes([0x81, 2, 0x7D, 4, 8, 0x5A])),
+        (7, 0x7D): BatteryPacket(bytes([0x81, 33, 0x7D, 2, 4, 1, 0x5A])),
+        (5, 0x7F): BatteryPacket(bytes([0x81, 44, 0x7F, 3, 1])),
+    }
+    assert set(frames) == set(PACKET_HANDLERS) and set(DEFAULT_HANDLERS) == {11}
+    calls = {}
+    for key, packet in frames.items():
+        assert packet_key(packet.raw) == key
+        calls[key] = dispatch(packet)
+
+    hex_data = {key: packet.hex_list() for key, packet in frames.items()}
+    voltage = calls[(11, 10)]
+    assert voltage[0] == ('begin_measurement', 5)
+    assert voltage[1][:3] == ('on_voltage', 1, 5) and close(voltage[1][3], old_salt_data(hex_data[(11, 10)]))
+    assert calls[(11, 11)][1][:3] == ('on_soh', 2, 5)
+    assert close(calls[(11, 11)][1][3], old_percent(hex_data[(11, 11)]))
+    for key, arm in (((11, 12), 3), ((11, 13), 4)):
+        _, call = calls[key]
+        assert call[:4] == ('on_value', arm, 7, key[1]) and close(call[4], old_salt_data(hex_data[key]))
+
+    assert calls[(6, 0x7E)] == [('on_arm_slave_counts', {1: 120, 2: 118, 3: 0, 4: 5})]
+    assert calls[(6, 0x0F)] == [('on_balance', 3, 17, 1)]
+    assert calls[(6, 0x7D)] == [('on_hatkon_alarm', 4, 8)]
+    assert calls[(5, 0x7F)] == [('on_missing_data', 3, 44, 1)]
+
+
+def test_measurement_formulas_match_old_code():
+    """Tüm hane kombinasyonlarından örnekler: yeni çözümleme eski formüle eşit"""
+    for n in range(0, 1000000, 7919):
+        digits = [int(c) for c in f"{n:06d}"]
+        packet = measurement(9, 10, 1, digits)
+        data = packet.hex_list()
+        assert close(dispatch(packet)[1][3], old_salt_data(data))
+
+        # k=2, dtype=11: kol nemi (raw[5..8])
+        packet = measurement(2, 11, 1, digits)
+        assert dispatch(packet)[1] == ('on_humidity', 1, old_percent(packet.hex_list()))
+
+    # Kayıtsız dtype uzunluğun varsayılan handler'ına düşer ve ham kaydedilir
+    packet = measurement(4, 14, 2, (0, 3, 1, 2, 5, 0))
+    assert packet_key(packet.raw) == (11, 14)
+    _, call = dispatch(packet)
+    assert call[:4] == ('on_value', 2, 4, 14) and close(call[4], old_salt_data(packet.hex_list()))
+
+
+def test_soh_full_and_invalid_arm():
+    # raw[4] == 1 ise diğer haneler ne olursa olsun SOH 100
+    assert dispatch(measurement(5, 11, 1, (1, 0, 0, 0, 0, 0)))[1] == ('on_soh', 1, 5, 100.0)
+    assert dispatch(measurement(5, 11, 1, (1, 7, 3, 2, 1, 0)))[1] == ('on_soh', 1, 5, 100.0)
+    assert dispatch(measurement(5, 11, 1, (0, 8, 7, 6, 5, 0)))[1] == ('on_soh', 1, 5, 87.65)
+    # k=2 ve raw[4] == 1: nem, SOH özel durumu uygulanmaz
+    assert dispatch(measurement(2, 11, 1, (1, 4, 5, 2, 5, 0)))[1] == ('on_humidity', 1, 45.25)
+
+    # Geçersiz arm: periyot takibi yapılır ama değer iletilmez
+    assert dispatch(measurement(5, 10, 7, (0, 1, 2, 3, 4, 5))) == [('begin_measurement', 5), ('on_invalid_arm', 7)]
+
+
+def test_batkon_battery_from_k_byte():
+    """Batkon bataryası raw[1]'den okunur; raw[2] her zaman 0x7D işaretidir"""
+    packet = BatteryPacket(bytes([0x81, 57, 0x7D, 3, 1, 1, 0x5A]))
+    data = packet.hex_list()
+    assert int(data[2], 16) == 0x7D  # Eski kodun battery değeri
+    assert dispatch(packet) == [('on_batkon_alarm', int(data[3], 16), int(data[1], 16),
+                                 int(data[4], 16), int(data[5], 16))]
+
+    # 6 byte'lık pakette raw[1] == 0x7E her zaman armslavecounts'tur
+    assert packet_key(bytes([0x81, 0x7E, 0x0F, 1, 2, 3])) == (6, 0x7E)
+    # Kayıtsız uzunluk dağıtılmaz
+    assert not dispatch_packet(BatteryPacket(bytes([0x81, 1, 2, 3, 4, 5, 6, 7])), RecordingSink())
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Paket Dağıtım Tablosu Testi")
+    print("=" * 50)
+    tests = [
+        test_every_registered_key_dispatches,
+        test_measurement_formulas_match_old_code,
+        test_soh_full_and_invalid_arm,
+        test_batkon_battery_from_k_byte,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Periyot Tamponu Testi
+Bir periyodun değerlerinin tek kilit işlemiyle, ortak periyot zaman
+damgasıyla ve türetilen SOC kayıtlarıyla birlikte depoya yazıldığını kontrol eder
+"""
+
+import threading
+
+from battery_store import BatteryStore
+from period_accumulator import PeriodAccumulator
+from soc_estimator import Calc_SOC, soc_entries
+
+
+class CountingLock:
+    """Kaç kez alındığını sayan kilit"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.acquired += 1
+
+    def __exit__(self, *exc):
+        self.lock.release()
+
+
+def test_period_commits_once():
+    """2 kol x 120 batarya periyodu: tek kilit, tek kuşak, ortak zaman damgası"""
+    lock = CountingLock()
+    store = BatteryStore(lock=lock, publish_every=64)
+    accumulator = PeriodAccumulator(store, derive=soc_entries)
+    for arm in (1, 2):
+        accumulator.stage(arm, 2, 10, 35.0)  # Kol akımı: SOC yok
+        accumulator.stage(arm, 2, 11, 40.5)
+        for k in range(3, 123):
+            accumulator.stage(arm, k, 10, 12.0 + k * 0.01)
+            accumulator.stage(arm, k, 12, 25.0)
+    assert accumulator.pending() == 2 * (2 + 240)
+    assert store.get() == {} and lock.acquired == 0  # Commit'e kadar okuyucu görmez
+
+    assert accumulator.commit(1700000000000) == 2 * (2 + 240 + 120)
+    assert lock.acquired == 1 and store.snapshot.generation == 1
+    assert store.get(2, 50, 126) == {'value': Calc_SOC(12.5), 'timestamp': 1700000000000}
+    assert store.get(1, 2, 126) is None
+    timestamps = {entry['timestamp'] for k_data in store.get(1).values() for entry in k_data.values()}
+    assert timestamps == {1700000000000}
+
+    assert accumulator.commit(1700000001000) == 0 and lock.acquired == 1
+    assert (accumulator.commits, accumulator.committed) == (1, 724)
+
+
+def test_latest_value_wins():
+    store = BatteryStore()
+    accumulator = PeriodAccumulator(store)
+    accumulator.stage(1, 3, 10, 12.0)
+    accumulator.stage(1, 3, 10, 12.7)
+    accumulator.commit(5)
+    assert store.get(1, 3, 10) == {'value': 12.7, 'timestamp': 5}
+    assert store.stats.data_count == 1
+
+
+def test_buffer_is_thread_local_and_bounded():
+    store = BatteryStore()
+    accumulator = PeriodAccumulator(store, limit=4)
+    accumulator.stage(1, 3, 10, 12.0)
+
+    def other():
+        accumulator.stage(2, 3, 10, 13.0)
+        assert accumulator.commit(7) == 1
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    thread.join()
+    assert store.get(2, 3, 10)['value'] == 13.0 and store.get(1, 3, 10) is None
+    assert accumulator.pending() == 1
+
+    # Periyot başlamadan commit yapılmaz; limit dolunca damgasız kayıtlar atılır
+    assert accumulator.commit() == 0 and accumulator.pending() == 1
+    for k in range(4, 7):
+        accumulator.stage(1, k, 10, 12.0)
+    assert accumulator.pending() == 0 and accumulator.discarded == 4
+    assert store.get(1, 6, 10) is None
+
+    accumulator.begin(9)
+    for k in range(3, 7):  # limit'e ulaşınca periyot zaman damgasıyla yazılır
+        accumulator.stage(1, k, 10, 12.0)
+    assert accumulator.pending() == 0 and store.get(1, 6, 10) == {'value': 12.0, 'timestamp': 9}
+    accumulator.stage(1, 7, 10, 12.0)
+    assert accumulator.commit() == 1 and store.get(1, 7, 10)['timestamp'] == 9
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Periyot Tamponu Testi")
+    print("=" * 50)
+    tests = [
+        test_period_commits_once,
+        test_latest_value_wins,
+        test_buffer_is_thread_local_and_bounded,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
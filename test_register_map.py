@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Modbus Register Map Test
+Önceden hesaplanmış adres tablosunun main() içinde belgelenen düzeni verdiğini kontrol eder
+"""
+
+import random
+import struct
+
+from battery_store import BatteryStore, slot_key
+from register_map import RegisterImage, RegisterMap
+
+# Statik düzen: sadece Kol 3'te 7 batarya
+STATIC_COUNTS = {1: 0, 2: 0, 3: 7, 4: 0}
+
+
+def test_static_layout():
+    """Start=1 kol verisi, Start=5 Bat1, Start=12 Bat2"""
+    reg_map = RegisterMap(STATIC_COUNTS)
+    assert len(reg_map) == 4 + 7 * 7
+    assert reg_map.name_range(1, 4) == ["Kol3_Akım(A)", "Kol3_Nem(%)", "Kol3_Sıcaklık(°C)", "Kol3_Sıcaklık2(°C)"]
+    assert reg_map.name_range(5, 1) == ["Kol3_Bat1_Gerilim(V)"]
+    assert reg_map.name_range(12, 2) == ["Kol3_Bat2_Gerilim(V)", "Kol3_Bat2_SOC(%)"]
+    assert [slot_key(slot) for slot in reg_map.slot_range(5, 4)] == [
+        (3, 3, 10), (3, 3, 15), (3, 3, 11), (3, 3, 126)
+    ]
+
+
+def test_full_string_end_of_map():
+    """4 kol x 120 batarya: haritanın sonu doğrudan dilimlenir"""
+    reg_map = RegisterMap({1: 120, 2: 120, 3: 120, 4: 120})
+    assert len(reg_map) == 4 * (4 + 120 * 7)
+    last = len(reg_map)
+    assert slot_key(reg_map.slot_range(last, 1)[0]) == (4, 122, 14)
+    assert len(reg_map.slot_range(last - 124, 125)) == 125
+    assert len(reg_map.slot_range(last + 1, 10)) == 0
+    assert len(reg_map.slot_range(0, 10)) == 0
+
+
+def test_read_from_snapshot():
+    """Boş slotlar 0.0, dolu slotlar değeriyle okunur"""
+    store = BatteryStore()
+    store.update(3, 2, 10, 1.25)
+    store.update(3, 4, 10, 12.5)
+    reg_map = RegisterMap(STATIC_COUNTS)
+    assert reg_map.read(store.snapshot, 1, 2) == [1.25, 0.0]
+    assert reg_map.read(store.snapshot, 12, 1) == [12.5]
+
+
+def reference_pack(registers):
+    """Eski handle_read_holding_registers paketleme mantığı (referans)"""
+    response = b''
+    for reg in registers:
+        if reg == int(reg):
+            response += struct.pack('>H', int(reg))
+        else:
+            response += struct.pack('>H', int(reg * 100))
+    return response
+
+
+def test_image_matches_reference_packing():
+    """Hazır görüntü dilimleri eski paketleme ile aynı byte'ları verir"""
+    rng = random.Random(3)
+    store = BatteryStore(publish_every=50)
+    image = RegisterImage(store, RegisterMap({1: 10, 2: 0, 3: 7, 4: 3}))
+    for _ in range(1000):
+        arm = rng.choice((1, 3, 4))
+        store.update(arm, rng.randint(2, 12), rng.choice((10, 11, 12, 13, 14, 15, 126)),
+                     round(rng.uniform(0, 100), rng.choice((0, 2, 3))))
+    store.publish()
+
+    reg_map = image.view[0]
+    for start in range(1, len(reg_map) + 1, 13):
+        expected = reference_pack(reg_map.read(store.snapshot, start, 125))
+        assert bytes(image.read(start, 125)) == expected
+
+
+def test_image_follows_publish_and_layout():
+    """Görüntü yayınla birlikte değişir, düzen değişince yeniden paketlenir"""
+    store = BatteryStore(publish_every=100)
+    image = RegisterImage(store, RegisterMap(STATIC_COUNTS))
+    store.update(3, 3, 10, 12.34)
+    assert bytes(image.read(5, 1)) == b'\x00\x00'
+    store.publish()
+    assert bytes(image.read(5, 1)) == struct.pack('>H', 1234)
+    # Kol sayıları, ardından batarya/kol/kayıt toplamları
+    assert bytes(image.read(0, 8)) == struct.pack('>8H', 0, 0, 7, 0, 1, 1, 1, 0)
+
+    with store.lock:
+        image.set_map(RegisterMap({1: 1, 2: 0, 3: 7, 4: 0}))
+    # Kol 1 (4 + 7 register) öne eklendi
+    assert bytes(image.read(5 + 11, 1)) == struct.pack('>H', 1234)
+    assert bytes(image.read(0, 2)) == struct.pack('>2H', 1, 0)
+
+    store.clear()
+    assert bytes(image.read(16, 1)) == b'\x00\x00'
+    assert bytes(image.read(0, 7)) == struct.pack('>7H', 1, 0, 7, 0, 0, 0, 0)
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Modbus Register Map Testi")
+    print("=" * 50)
+    tests = [
+        test_static_layout,
+        test_full_string_end_of_map,
+        test_read_from_snapshot,
+        test_image_matches_reference_packing,
+        test_image_follows_publish_and_layout,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Olay Tabanlı Seri Okuma Testi
+fake_pigpio üzerinden bölünmüş ve art arda gelen paketleri SerialIngest'e
+besler; paketlerin çözülüp iletildiğini, hat boşken bekleyişin veri
+geldiğinde ve stop() çağrıldığında hemen bittiğini kontrol eder
+"""
+
+import queue
+import threading
+import time
+
+import fake_pigpio
+from battery_packet import BatteryPacket
+from serial_ingest import SerialIngest
+from uart_frame_decoder import UARTFrameDecoder
+
+RX_PIN = 16
+BAUD_RATE = 9600
+
+FRAMES = [
+    bytes.fromhex("80030a0100010203040500"),
+    bytes.fromhex("81057d03020100"),
+    bytes.fromhex("817e07000000"),
+    bytes.fromhex("80057f0301"),
+    bytes.fromhex("80020b0100040507080000"),
+]
+
+
+class Reader:
+    """Thread'de çalışan SerialIngest ve çıktı kuyruğu"""
+
+    def __init__(self, idle_timeout=5.0):
+        self.pi = fake_pigpio.pi()
+        self.pi.bb_serial_read_open(RX_PIN, BAUD_RATE)
+        self.packets = queue.Queue()
+        self.ingest = SerialIngest(self.pi, RX_PIN, BAUD_RATE, UARTFrameDecoder(),
+                                   lambda frame: self.packets.put(BatteryPacket(frame)),
+                                   idle_timeout=idle_timeout,
+                                   falling_edge=fake_pigpio.FALLING_EDGE)
+        self.thread = threading.Thread(target=self.ingest.run, daemon=True)
+        self.thread.start()
+        wait_until(lambda: self.ingest.idle_waits >= 1)
+
+    def send(self, data):
+        """Byte'ları RX tamponuna koy ve start biti kenarını üret"""
+        self.pi.inject(RX_PIN, data)
+        self.pi.edge(RX_PIN, 0)
+
+    def receive(self, count, timeout=2.0):
+        return [self.packets.get(timeout=timeout) for _ in range(count)]
+
+    def close(self):
+        self.ingest.stop()
+        self.thread.join(2)
+        assert not self.thread.is_alive()
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Koşul zaman aşımına uğradı"
+        time.sleep(0.005)
+
+
+def test_split_frames():
+    """Paketler byte byte ve paket ortasından bölünerek gelir"""
+    reader = Reader()
+    try:
+        fake_pigpio.play_stream(reader.pi, RX_PIN, FRAMES[:2], BAUD_RATE)
+        assert reader.receive(2) == [BatteryPacket(frame) for frame in FRAMES[:2]]
+
+        stream = b"".join(FRAMES[2:])
+        for start in range(0, len(stream), 4):
+            reader.send(stream[start:start + 4])
+            time.sleep(0.01)
+        packets = reader.receive(3)
+        assert packets == [BatteryPacket(frame) for frame in FRAMES[2:]]
+        assert (packets[0].k, packets[2].k, packets[2].dtype, packets[2].arm) == (0x7E, 2, 11, 1)
+        assert reader.packets.empty() and reader.ingest.frames == 5
+    finally:
+        reader.close()
+
+
+def test_concatenated_frames():
+    """Tek okumada gelen art arda paketler ve baştaki çöp byte'lar"""
+    reader = Reader()
+    try:
+        reader.send(b"\xff\x00" + b"".join(FRAMES))
+        assert reader.receive(len(FRAMES)) == [BatteryPacket(frame) for frame in FRAMES]
+        assert reader.packets.empty()
+    finally:
+        reader.close()
+
+
+def test_idle_wait_returns_on_data():
+    """idle_timeout 5 s iken kenar geldiğinde okuma hemen yapılır"""
+    reader = Reader(idle_timeout=5.0)
+    try:
+        # Boştayken yoklama yapılmaz: beklerken okuma sayısı artmaz
+        reads = reader.pi.read_calls
+        time.sleep(0.1)
+        assert reader.pi.read_calls == reads
+
+        started = time.monotonic()
+        reader.send(FRAMES[0])
+        assert reader.receive(1, timeout=1.0) == [BatteryPacket(FRAMES[0])]
+        assert time.monotonic() - started < 0.5
+    finally:
+        reader.close()
+
+
+def test_callback_disarmed_while_streaming():
+    """Veri akarken callback kurulu kalmaz
+
+    Her callback kurulumunda bir sonraki paket tampona düşer (yarış
+    okuması veri bulur); bundan sonraki okumalar callback kurulu değilken
+    yapılmalıdır.
+    """
+    reader = Reader()
+    events = []
+    pending = list(FRAMES[1:] * 3)
+    read, callback = reader.pi.bb_serial_read, reader.pi.callback
+
+    def recording_read(gpio):
+        events.append(('read', bool(reader.pi._callbacks)))
+        return read(gpio)
+
+    def streaming_callback(*args):
+        events.append(('arm', True))
+        if pending:
+            reader.pi.inject(RX_PIN, pending.pop(0))
+        return callback(*args)
+
+    reader.pi.bb_serial_read = recording_read
+    reader.pi.callback = streaming_callback
+    try:
+        reader.send(FRAMES[0])
+        count = 1 + len(FRAMES[1:]) * 3
+        assert reader.receive(count) == [BatteryPacket(frame) for frame in (FRAMES + FRAMES[1:] * 2)]
+        armed_reads = [index for index, (kind, armed) in enumerate(events)
+                       if kind == 'read' and armed and events[index - 1][0] != 'arm']
+        assert events.count(('arm', True)) >= count and armed_reads == []
+    finally:
+        reader.close()
+
+
+def test_stop_wakes_idle_wait():
+    """Hat boşken bloklanan thread stop() ile idle_timeout beklemeden çıkar"""
+    reader = Reader(idle_timeout=5.0)
+    time.sleep(0.05)
+    assert reader.pi._callbacks  # Kenar callback'i kurulu, thread bekliyor
+    started = time.monotonic()
+    reader.close()
+    assert time.monotonic() - started < 0.5
+    assert not reader.pi._callbacks  # Çıkışta callback kaldırılır
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Olay Tabanlı Seri Okuma Testi")
+    print("=" * 50)
+    tests = [
+        test_split_frames,
+        test_concatenated_frames,
+        test_idle_wait_returns_on_data,
+        test_callback_disarmed_while_streaming,
+        test_stop_wakes_idle_wait,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - SNMP 1.3.6.5.10 Dinamik Alt Ağaç Testi
+Aritmetik GETNEXT'in sıralı OID listesiyle aynı sonucu verdiğini ve
+pysnmp MIB instrumentation üzerinden walk yapılabildiğini kontrol eder
+"""
+
+import random
+
+from pysnmp.entity import engine
+from pysnmp.entity.rfc3413 import context
+from pysnmp.smi import exval
+
+from battery_store import DTYPES, BatteryStore
+from snmp_battery_subtree import BATTERY_SUBTREE, BatterySubtreeIndex, battery_subtree_class, successor_slot
+from snmp_schema import ARM4_COUNT, dtype_type, encode_battery_value
+
+COUNTS = {1: 0, 2: 0, 3: 7, 4: 120}
+
+
+def filled_store(seed=5, writes=400):
+    rng = random.Random(seed)
+    store = BatteryStore()
+    for _ in range(writes):
+        store.update(rng.choice((1, 3, 4)), rng.randint(1, 122), rng.choice(DTYPES), round(rng.uniform(0, 100), 2))
+    return store
+
+
+def reference_next(store, suffix):
+    """Tüm dolu instance'ları sıralayıp bir sonrakini bul (referans)"""
+    instances = [(0,)]
+    data = store.get()
+    for arm in data:
+        for k in data[arm]:
+            for dtype in data[arm][k]:
+                instances.append((arm, k, dtype, 0))
+    for instance in sorted(instances):
+        if instance > suffix:
+            return instance
+    return None
+
+
+def test_successor_boundaries():
+    """dtype, k ve kol sınırlarında taşıma"""
+    assert successor_slot(()) == 0
+    assert successor_slot((1, 1, 10)) == 0
+    assert successor_slot((1, 1, 10, 0)) == 1
+    assert successor_slot((1, 1, 126, 0)) == len(DTYPES)
+    assert successor_slot((1, 122, 126, 0)) == successor_slot((2,))
+    assert successor_slot((2, 500)) == successor_slot((3,))
+    assert successor_slot((3, 5, 17)) == successor_slot((3, 5, 126))
+    assert successor_slot((5,)) == successor_slot((4, 122, 126, 0))
+
+
+def test_next_matches_sorted_reference():
+    """Rastgele son eklerde aritmetik GETNEXT = sıralı liste"""
+    store = filled_store()
+    index = BatterySubtreeIndex(store, COUNTS)
+    rng = random.Random(11)
+    probes = [(), (0,), (0, 5), (4, 122, 126, 0), (9,)]
+    for _ in range(500):
+        probes.append(tuple(rng.randint(0, 130) if i else rng.randint(0, 5) for i in range(rng.randint(1, 5))))
+    for suffix in probes:
+        found = index.next(suffix)
+        assert (found[0] if found else None) == reference_next(store, suffix), suffix
+
+
+def test_get_values():
+    store = BatteryStore()
+    store.update(4, 122, 126, 87.5)
+    index = BatterySubtreeIndex(store, COUNTS)
+    assert index.get((0,)) == 120
+    assert index.get((4, 122, 126, 0)) == 87.5
+    assert index.get((4, 121, 126, 0)) == 0
+    assert index.get((4, 122, 126)) is None
+    assert index.get((4, 122, 99, 0)) is None
+
+
+def test_walk_through_mib_instrum():
+    """GETNEXT zinciri 1.3.6.5.9 sonrasından tüm dolu slot'ları gezer"""
+    store = filled_store(seed=7, writes=200)
+    snmp_context = context.SnmpContext(engine.SnmpEngine())
+    mib_instrum = snmp_context.get_mib_instrum()
+    mib_builder = mib_instrum.get_mib_builder()
+    MibScalar, = mib_builder.import_symbols("SNMPv2-SMI", "MibScalar")
+    BatterySubtree = battery_subtree_class(MibScalar)
+    mib_builder.export_symbols(
+        "__TEST_BATTERY_MIB",
+        BatterySubtree(BATTERY_SUBTREE, ARM4_COUNT.syntax, BatterySubtreeIndex(store, COUNTS), encode_battery_value),
+    )
+
+    name, value = mib_instrum.read_variables(((1, 3, 6, 5, 10, 0), None))[0]
+    assert int(value) == 120
+
+    walked = []
+    name = (1, 3, 6, 5, 9)
+    while True:
+        name, value = mib_instrum.read_next_variables((name, None))[0]
+        name = tuple(name)
+        if value is exval.endOfMib or name[:len(BATTERY_SUBTREE)] != BATTERY_SUBTREE:
+            break
+        walked.append(name[len(BATTERY_SUBTREE):])
+        if len(walked) > 1:
+            arm, k, dtype, _ = walked[-1]
+            assert int(value) == dtype_type(dtype).scaled(store.get(arm, k, dtype)['value'])
+
+    expected = [(0,)]
+    while reference_next(store, expected[-1]):
+        expected.append(reference_next(store, expected[-1]))
+    assert walked == expected
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 SNMP Batarya Alt Ağacı Testi")
+    print("=" * 50)
+    tests = [
+        test_successor_boundaries,
+        test_next_matches_sorted_reference,
+        test_get_values,
+        test_walk_through_mib_instrum,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - SNMP Tip Şeması Testi
+Sayısal nesnelerin metin yerine ölçeklenmiş Gauge32/Integer32 olarak
+kodlandığını ve battery-monitoring.mib'deki tip/birimlerle uyumunu kontrol eder
+"""
+
+import os
+import re
+
+from pysnmp.proto import rfc1902
+
+from snmp_schema import SCALAR_TYPES, dtype_type, encode_battery_value, scalar_syntax
+
+MIB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'battery-monitoring.mib')
+
+# MIB nesnesi -> RAM dtype (snmp-agent.py dtype_mapping)
+MIB_DTYPES = {
+    'kol1Akim': 10,
+    'kol1Nem': 11,
+    'kol1RIMT': 12,
+    'kol1NTC1': 12,
+    'kol1Batarya1Gerilim': 10,
+    'kol1Batarya1SOC': 126,
+    'kol1Batarya1RIMT': 12,
+    'kol1Batarya1NTC1': 12,
+    'kol1Batarya1NTC2': 13,
+    'kol1Batarya1NTC3': 14,
+    'kol1Batarya1SOH': 11,
+}
+
+_BASE_TYPES = {'Integer32': rfc1902.Integer32, 'Gauge32': rfc1902.Gauge32}
+
+
+def test_scalar_types():
+    assert isinstance(scalar_syntax((1, 3, 6, 5, 2)), rfc1902.Gauge32)
+    assert isinstance(scalar_syntax((1, 3, 6, 5, 4)), rfc1902.Integer32)
+    assert isinstance(scalar_syntax((1, 3, 6, 5, 5)), rfc1902.OctetString)
+    assert SCALAR_TYPES[(1, 3, 6, 5, 7)].encode(7) == rfc1902.Gauge32(7)
+
+
+def test_battery_values_scaled():
+    """Gerilim 0.01 V, NTC 0.1 °C, SOC 0.01 %, kol sayısı Gauge32"""
+    voltage = encode_battery_value((3, 3, 10, 0), 12.34)
+    assert isinstance(voltage, rfc1902.Integer32) and int(voltage) == 1234
+    assert int(encode_battery_value((3, 3, 12, 0), 25.5)) == 255
+    assert int(encode_battery_value((3, 3, 126, 0), 87.6)) == 8760
+    assert int(encode_battery_value((3, 2, 10, 0), -3.5)) == -350
+    count = encode_battery_value((0,), 120)
+    assert isinstance(count, rfc1902.Gauge32) and int(count) == 120
+
+
+def test_missing_and_out_of_range():
+    """Veri yok (None/NaN) 0, Gauge32 negatif değerde 0'a sıkıştırılır"""
+    assert dtype_type(10).scaled(None) == 0
+    assert dtype_type(10).scaled(float('nan')) == 0
+    assert dtype_type(126).scaled(-5) == 0
+    assert dtype_type(10).scaled(1e12) == 2 ** 31 - 1
+
+
+def test_mib_declares_schema_types():
+    """MIB'deki SYNTAX ve DISPLAY-HINT ölçeği şemadaki tip ve ölçekle aynı"""
+    with open(MIB_PATH, encoding='utf-8') as f:
+        mib = f.read()
+    conventions = {}
+    for name, hint, base in re.findall(
+            r'^(\w+) ::= TEXTUAL-CONVENTION\s+DISPLAY-HINT "d-(\d)".*?SYNTAX (\w+)', mib, re.M | re.S):
+        conventions[name] = (_BASE_TYPES[base], 10 ** int(hint))
+    for name, dtype in MIB_DTYPES.items():
+        syntax = re.search(r'^%s OBJECT-TYPE\s+SYNTAX (\w+)' % name, mib, re.M).group(1)
+        base, scale = conventions[syntax]
+        expected = dtype_type(dtype)
+        assert isinstance(expected.syntax, base) and expected.scale == scale, name
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 SNMP Tip Şeması Testi")
+    print("=" * 50)
+    tests = [
+        test_scalar_types,
+        test_battery_values_scaled,
+        test_missing_and_out_of_range,
+        test_mib_declares_schema_types,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
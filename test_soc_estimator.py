@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - SOC/SOH Tablo Tahmini Testi
+Tablo + interpolasyon sonuçlarının eski kapalı form Calc_SOC/Calc_SOH ile
+yuvarlama hassasiyetinde aynı olduğunu ve batch API'sini kontrol eder
+"""
+
+import math
+
+from battery_store import BatteryStore, slot_of
+from soc_estimator import Calc_SOC, Calc_SOH, arm_soc, period_soc, soc_batch, soh_batch
+
+
+def reference_soc(x):
+    """Eski Calc_SOC kapalı formu (referans)"""
+    a1, a2, a3, a4 = 112.1627, 14.3937, 0, 10.5555
+    b1, b2, b3, b4 = 14.2601, 11.6890, 12.7872, 10.9406
+    c1, c2, c3, c4 = 1.8161, 0.8211, 0.0025, 0.3866
+    soc = (a1 * math.exp(-((x - b1) / c1) ** 2) + a2 * math.exp(-((x - b2) / c2) ** 2) +
+           a3 * math.exp(-((x - b3) / c3) ** 2) + a4 * math.exp(-((x - b4) / c4) ** 2))
+    return round(min(max(soc, 0.0), 100.0), 4)
+
+
+def reference_soh(x):
+    """Eski Calc_SOH kapalı formu (referans)"""
+    terms = ((85.918, 0.0181, 0.0083), (85.11, 0.0324, 0.0104), (0.3085, 0.0342, 0.0021),
+             (16.521, 0.0382, 0.0013), (-13.874, 0.0381, 0.0011), (40.077, 0.0474, 0.0079),
+             (18.207, 0.0556, 0.0048))
+    return round(min(sum(a * math.exp(-((x - b) / c) ** 2) for a, b, c in terms), 100.0), 4)
+
+
+def test_soc_matches_closed_form():
+    """0.1 mV adımla 5..25 V: fark en fazla bir yuvarlama basamağı"""
+    voltages = [5.0 + i * 0.0001 for i in range(200001)]
+    expected = [reference_soc(v) for v in voltages]
+    assert max(abs(Calc_SOC(v) - e) for v, e in zip(voltages, expected)) <= 1.5e-4
+    assert soc_batch(voltages) == [Calc_SOC(v) for v in voltages]
+    assert Calc_SOC(14.0) == 100.0 and Calc_SOC(3.0) == 0.0
+
+
+def test_soh_matches_closed_form():
+    values = [i * 0.000001 for i in range(150001)]
+    assert max(abs(Calc_SOH(x) - reference_soh(x)) for x in values) <= 1.5e-4
+    assert soh_batch(values[::97]) == [Calc_SOH(x) for x in values[::97]]
+
+
+def test_missing_values():
+    assert Calc_SOC(None) is None and Calc_SOC(math.nan) is None
+    assert soc_batch([None, math.nan, 12.0]) == [None, None, Calc_SOC(12.0)]
+
+
+def test_period_soc_from_store():
+    """Depo dizilerinden kolun tüm bataryaları tek batch'te; kol verisi (k=2) hariç"""
+    store = BatteryStore()
+    store.update(1, 2, 10, 35.0)  # Kol akımı
+    for k in range(3, 123):
+        store.update(1, k, 10, 11.0 + k * 0.02)
+    store.update(2, 7, 10, None)
+
+    socs = arm_soc(store.values, store.timestamps, 1)
+    assert [k for k, _ in socs] == list(range(3, 123))
+    assert all(soc == Calc_SOC(11.0 + k * 0.02) for k, soc in socs)
+    assert arm_soc(store.values, store.timestamps, 3) == []
+
+    entries = period_soc(store.values, store.timestamps)
+    assert len(entries) == 121 and entries[-1] == (2, 7, 126, None)
+    store.update_many(entries, timestamp=5)
+    assert store.get(1, 50, 126) == {'value': Calc_SOC(11.0 + 50 * 0.02), 'timestamp': 5}
+    assert store.value_at(slot_of(2, 7, 126)) is None
+    assert store.stats.data_count == 1 + 121 * 2
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 SOC/SOH Tablo Tahmini Testi")
+    print("=" * 50)
+    tests = [
+        test_soc_matches_closed_form,
+        test_soh_matches_closed_form,
+        test_missing_values,
+        test_period_soc_from_store,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Alt Sistem Log Katmanı Testi
+BATTERY_LOG_LEVEL/BATTERY_LOG_LEVELS ile alt sistem seviyelerinin
+ayarlandığını ve hız sınırlı örnekleyicinin pencere içindeki mesajları
+atlayıp sayısını raporladığını kontrol eder
+"""
+
+import logging
+import os
+
+import system_log
+from system_log import (DEBUG, INFO, WARNING, RateLimitedSampler, configure_logging,
+                        get_logger, parse_levels)
+
+
+class ListHandler(logging.Handler):
+    """Biçimlendirilmiş mesajları listede toplar"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class FakeClock:
+    """system_log.time yerine elle ilerletilen saat"""
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+class CountingArg:
+    """Biçimlendirme yapılırsa sayar"""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "arg"
+
+
+def sampler_logger(name, level=DEBUG):
+    logger = logging.getLogger(f"test_system_log.{name}")
+    logger.handlers = []
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger, handler
+
+
+def test_levels_from_environment():
+    saved = {name: os.environ.get(name) for name in ("BATTERY_LOG_LEVEL", "BATTERY_LOG_LEVELS")}
+    os.environ["BATTERY_LOG_LEVEL"] = "warning"
+    os.environ["BATTERY_LOG_LEVELS"] = " modbus = debug ,ram=WARNING,bozuk,snmp=INFO"
+    try:
+        root = configure_logging()
+        assert root.level == WARNING and not root.propagate
+        assert get_logger('modbus').level == DEBUG
+        assert get_logger('ram').level == WARNING
+        assert get_logger('snmp').level == INFO
+        # Listede olmayan alt sistem kök seviyesini devralır
+        assert get_logger('ingest').level == logging.NOTSET
+        assert get_logger('ingest').getEffectiveLevel() == WARNING
+        assert get_logger('modbus').isEnabledFor(DEBUG) and not get_logger('trap').isEnabledFor(INFO)
+
+        # Tekrar çağrılabilir: eski seviyeler sıfırlanır, handler eklenmez
+        handlers = list(root.handlers)
+        configure_logging("INFO", {'trap': DEBUG})
+        assert root.handlers == handlers and root.level == INFO
+        assert get_logger('modbus').level == logging.NOTSET and get_logger('trap').level == DEBUG
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        configure_logging("INFO", {})
+
+    assert parse_levels(None) == {} and parse_levels("") == {}
+    assert parse_levels("ingest=ERROR") == {'ingest': logging.ERROR}
+
+
+def test_unknown_levels_skipped():
+    """Bilinmeyen seviye adı hata vermez, uyarıyla atlanır"""
+    root = configure_logging("INFO", {})
+    handler = ListHandler()
+    root.addHandler(handler)
+    try:
+        assert parse_levels("modbus=verbose,db=debug, ram = 30") == {'db': DEBUG, 'ram': WARNING}
+        configure_logging("yüksek", parse_levels("snmp=çok,db=WARNING"))
+        assert root.level == INFO
+        assert get_logger('snmp').level == logging.NOTSET and get_logger('db').level == WARNING
+        assert handler.messages == ["Bilinmeyen log seviyesi atlandı: modbus=verbose",
+                                    "Bilinmeyen log seviyesi atlandı: snmp=çok",
+                                    "Bilinmeyen log seviyesi 'yüksek', INFO kullanılıyor"]
+    finally:
+        root.removeHandler(handler)
+        configure_logging("INFO", {})
+
+
+def test_sampler_window_and_suppressed_count():
+    logger, handler = sampler_logger('window')
+    clock, saved = FakeClock(), system_log.time
+    system_log.time = clock
+    try:
+        sampler = RateLimitedSampler(logger, level=DEBUG, interval=1.0, burst=3)
+        for n in range(10):
+            sampler.log("paket %d", n)
+        assert handler.messages == ["paket 0", "paket 1", "paket 2"]
+        assert sampler.suppressed == 7
+
+        # Pencere içinde kota dolu kalır
+        clock.now += 0.5
+        sampler.log("paket %d", 10)
+        assert len(handler.messages) == 3 and sampler.suppressed == 8
+
+        # Yeni pencerede ilk mesaj atlanan sayıyı raporlar, sayaç sıfırlanır
+        clock.now += 0.5
+        sampler.log("paket %d", 11)
+        sampler.log("paket %d", 12)
+        assert handler.messages[3:] == ["paket 11 (8 mesaj atlandı)", "paket 12"]
+        assert sampler.suppressed == 0
+    finally:
+        system_log.time = saved
+
+
+def test_sampler_skips_formatting():
+    """Seviye kapalıysa veya kota doluysa argümanlar biçimlendirilmez"""
+    logger, handler = sampler_logger('disabled', level=INFO)
+    clock, saved = FakeClock(), system_log.time
+    system_log.time = clock
+    try:
+        arg = CountingArg()
+        sampler = RateLimitedSampler(logger, level=DEBUG, burst=1)
+        for _ in range(5):
+            sampler.log("değer %s", arg)
+        assert handler.messages == [] and arg.formatted == 0 and sampler.suppressed == 0
+
+        sampler = RateLimitedSampler(logger, level=WARNING, burst=1)
+        for _ in range(5):
+            sampler.log("değer %s", arg)
+        assert handler.messages == ["değer arg"] and arg.formatted == 1 and sampler.suppressed == 4
+    finally:
+        system_log.time = saved
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Alt Sistem Log Katmanı Testi")
+    print("=" * 50)
+    tests = [
+        test_levels_from_environment,
+        test_unknown_levels_skipped,
+        test_sampler_window_and_suppressed_count,
+        test_sampler_skips_formatting,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
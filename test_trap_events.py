@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Olay Tabanlı Alarm Trap Testi
+Hatkon/Batkon paketlerinin AlarmState üzerinden sadece durum değiştiğinde
+trap kuyruğuna eklendiğini kontrol eder
+"""
+
+from alarm_state import AlarmState
+from battery_packet import BatteryPacket
+from packet_handlers import PacketSink, dispatch_packet
+from snmp_trap_server import SNMPTrapServer
+
+
+class AlarmSink(PacketSink):
+    """data_processor'daki gibi alarm paketlerini AlarmState'e uygular"""
+
+    def __init__(self, alarms):
+        self.alarms = alarms
+
+    def on_hatkon_alarm(self, arm_value, error_msb):
+        self.alarms.apply_hatkon(arm_value, error_msb)
+
+    def on_batkon_alarm(self, packet, arm_value, battery, error_msb, error_lsb):
+        self.alarms.apply_batkon(arm_value, battery, error_msb, error_lsb)
+
+    def on_balance(self, arm_value, slave_value, status_value):
+        self.alarms.apply_balance(arm_value, slave_value, status_value)
+
+
+def drain(trap_server):
+    events = []
+    while not trap_server.events.empty():
+        events.append(trap_server.events.get_nowait())
+    return [(e.alarm_type, e.arm_num, e.battery_num, e.status) for e in events]
+
+
+def setup():
+    alarms = AlarmState()
+    trap_server = SNMPTrapServer(trap_targets=[], outbox_path=':memory:')
+    alarms.listeners.append(trap_server)
+    return AlarmSink(alarms), trap_server
+
+
+def feed(sink, *frames):
+    for frame in frames:
+        assert dispatch_packet(BatteryPacket(bytes(frame)), sink)
+
+
+def test_batkon_transitions():
+    """7 byte'lık Batkon: alarm, tekrar (trap yok), düzelme"""
+    sink, trap_server = setup()
+    feed(sink, [0x81, 7, 0x7D, 2, 0, 4, 0])
+    assert drain(trap_server) == [('battery_alarm', 2, 5, 'ACTIVE')]
+    feed(sink, [0x81, 7, 0x7D, 2, 0, 4, 0], [0x81, 7, 0x7D, 2, 3, 2, 0])
+    assert drain(trap_server) == []
+    feed(sink, [0x81, 7, 0x7D, 2, 1, 1, 0])
+    assert drain(trap_server) == [('battery_alarm', 2, 5, 'RESOLVED')]
+
+
+def test_hatkon_and_balance():
+    """6 byte'lık Hatkon (0x7D) kol trap'i üretir, balans üretmez"""
+    sink, trap_server = setup()
+    feed(sink, [0x81, 0, 0x7D, 3, 1, 0])
+    assert drain(trap_server) == []
+    feed(sink, [0x81, 0, 0x7D, 3, 4, 0], [0x81, 5, 0x0F, 3, 1, 0])
+    assert drain(trap_server) == [('arm_alarm', 3, 0, 'ACTIVE')]
+    feed(sink, [0x81, 0, 0x7D, 3, 0, 0])
+    assert drain(trap_server) == [('arm_alarm', 3, 0, 'RESOLVED')]
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Olay Tabanlı Alarm Trap Testi")
+    print("=" * 50)
+    tests = [
+        test_batkon_transitions,
+        test_hatkon_and_balance,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
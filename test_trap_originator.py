@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Kalıcı Trap Originator Testi
+Tek engine ile tüm hedeflere gönderimi, eşzamanlı fan-out'u ve hedef
+başına sayaçları yerel UDP soketleriyle kontrol eder
+"""
+
+import socket
+import time
+
+from trap_originator import TrapOriginator
+
+
+def receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(2)
+    return sock, sock.getsockname()[1]
+
+
+def test_trap_reaches_every_target():
+    """Aynı engine ile ardışık trap'ler tüm hedeflere gider"""
+    sockets = [receiver() for _ in range(2)]
+    originator = TrapOriginator(targets=[('127.0.0.1', port) for _, port in sockets])
+    originator.start()
+    try:
+        engine = originator.engine
+        for i in range(3):
+            results = originator.send('1.3.6.1.4.1.1001.1.7.0', f"Arm 1 Alarm {i}").result(5)
+            assert [error for _, error in results] == [None, None]
+            for sock, _ in sockets:
+                assert b"Arm 1 Alarm %d" % i in sock.recv(2048)
+        assert originator.engine is engine
+
+        bitmap = bytes([0xA5] * 15)
+        originator.send('1.3.6.1.4.1.1001.3.7.255', "Arm 3 Summary", bitmap=bitmap).result(5)
+        for sock, _ in sockets:
+            assert bitmap in sock.recv(2048)
+
+        stats = originator.target_stats()
+        assert [(s['sent'], s['failed']) for s in stats.values()] == [(4, 0), (4, 0)]
+
+        assert originator.remove_target('127.0.0.1', sockets[0][1]).result(5)
+        assert len(originator.send('1.3.6.1.4.1.1001.1.7.0', "tek hedef").result(5)) == 1
+    finally:
+        originator.stop()
+        for sock, _ in sockets:
+            sock.close()
+
+
+def test_slow_targets_do_not_serialize():
+    """Cevap vermeyen INFORM hedefleri birbirini beklemez"""
+    sockets = [receiver() for _ in range(3)]
+    originator = TrapOriginator(targets=[('127.0.0.1', port) for _, port in sockets], timeout=0.5)
+    originator.start()
+    try:
+        started = time.monotonic()
+        results = originator.send('1.3.6.1.4.1.1001.2.7.5', "cevapsız", kind='inform').result(10)
+        elapsed = time.monotonic() - started
+        assert all(error is not None for _, error in results)
+        assert elapsed < 1.2, elapsed  # Sıralı gönderimde >= 1.5 s
+        assert all(s['failed'] == 1 and s['last_error'] for s in originator.target_stats().values())
+    finally:
+        originator.stop()
+        for sock, _ in sockets:
+            sock.close()
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Trap Originator Testi")
+    print("=" * 50)
+    tests = [
+        test_trap_reaches_every_target,
+        test_slow_targets_do_not_serialize,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Kalıcı Trap Outbox Testi
+Üstel geri çekilmeyi, deneme sınırını ve yeniden başlatmada bekleyen
+bildirimlerin gönderildiğini kontrol eder
+"""
+
+import os
+import socket
+import tempfile
+import time
+
+from snmp_trap_server import SNMPTrapServer
+from trap_outbox import TrapOutbox, backoff_delay
+
+TARGETS = [('127.0.0.1', 1162), ('127.0.0.1', 2162)]
+
+
+def test_backoff_and_drop():
+    """Başarısız hedef 2, 4, 8 ... s sonra tekrar denenir, sınırda bırakılır"""
+    outbox = TrapOutbox(':memory:', max_attempts=3)
+    outbox.enqueue('1.3.6.1.4.1.1001.1.7.0', "Arm 1 Alarm", 'inform', TARGETS, now=100.0)
+    entries = outbox.due(now=100.0)
+    assert [e.target for e in entries] == TARGETS
+    assert outbox.next_due_in(now=100.0) == 0.0
+
+    outbox.complete([entries[0].id], [(entries[1], 'timeout')], now=100.0)
+    assert outbox.pending() == 1
+    assert outbox.next_due_in(now=100.0) == backoff_delay(1) == 2.0
+    assert outbox.due(now=101.0) == []
+
+    entry, = outbox.due(now=102.0)
+    assert entry.attempts == 1
+    outbox.complete([], [(entry, 'timeout')], now=102.0)
+    entry, = outbox.due(now=102.0 + backoff_delay(2))
+    outbox.complete([], [(entry, 'timeout')], now=110.0)
+    assert outbox.pending() == 0 and outbox.dropped == 1
+    assert outbox.next_due_in() is None
+
+
+def test_replay_on_restart():
+    """Kapanmadan önce gönderilemeyen bildirim yeniden başlatmada gider"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(3)
+    target = ('127.0.0.1', sock.getsockname()[1])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trap_outbox.db')
+        outbox = TrapOutbox(path)
+        outbox.enqueue('1.3.6.1.4.1.1001.2.7.5', "Battery 2-5 Alarm: bekleyen - Status: ACTIVE", 'trap', [target])
+        outbox.close()
+
+        trap_server = SNMPTrapServer(trap_targets=[target], outbox_path=path)
+        trap_server.start()
+        try:
+            assert b"Battery 2-5 Alarm: bekleyen" in sock.recv(2048)
+            deadline = time.monotonic() + 3
+            while trap_server.outbox.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert trap_server.outbox_stats() == {'pending': 0, 'dropped': 0}
+        finally:
+            trap_server.stop()
+            sock.close()
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Trap Outbox Testi")
+    print("=" * 50)
+    tests = [
+        test_backoff_and_drop,
+        test_replay_on_restart,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
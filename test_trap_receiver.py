@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - asyncio Trap Receiver Testi
+Trap'lerin çözülüp insan okunur log ve JSONL dosyalarına batch'ler
+halinde yazıldığını kontrol eder
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from snmp_trap_receiver import SNMPTrapReceiver, classify
+from trap_originator import TrapOriginator
+
+
+def test_classify():
+    assert classify('1.3.6.1.4.1.1001.2.7.0') == ("Kol 2", "KOL ALARMI")
+    assert classify('1.3.6.1.4.1.1001.2.7.17') == ("Kol 2, Batarya 17", "BATARYA ALARMI")
+    assert classify('1.3.6.1.4.1.1001.4.7.255') == ("Kol 4", "KOL ÖZETİ")
+    assert classify('1.3.6.1.6.3.1.1.5.1')[1] == "BİLİNMEYEN ALARM"
+
+
+def test_storm_is_logged_in_batches():
+    """300 trap + INFORM özet: her biri iki dosyada bir satır"""
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, 'snmp_trap_log.txt')
+        jsonl_path = os.path.join(directory, 'snmp_trap_log.jsonl')
+        receiver = SNMPTrapReceiver(listen_port=0, listen_host='127.0.0.1', log_path=log_path,
+                                    jsonl_path=jsonl_path, fsync_interval=0.05)
+        receiver.start()
+        originator = TrapOriginator(targets=[('127.0.0.1', receiver.listen_port)])
+        originator.start()
+        try:
+            futures = [originator.send(f'1.3.6.1.4.1.1001.1.7.{n % 120 + 1}',
+                                       f"Battery 1-{n % 120 + 1} Alarm: Batarya Batkon Alarmı - Status: ACTIVE")
+                       for n in range(300)]
+            for future in futures:
+                future.result(5)
+            deadline = time.monotonic() + 5
+            while receiver.stats['written'] < 300 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            _, error = originator.send('1.3.6.1.4.1.1001.1.7.255', "Arm 1 Battery Alarm Summary: 120 active - Status: SUMMARY",
+                                       kind='inform', bitmap=b'\xff' * 15).result(5)[0]
+            assert error is None  # INFORM onaylandı
+
+            deadline = time.monotonic() + 5
+            while receiver.stats['written'] < 301 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            originator.stop()
+            receiver.stop()
+
+        stats = receiver.stats
+        assert stats['received'] == stats['written'] == 301 and stats['dropped'] == 0
+        assert stats['batches'] <= 301 and stats['fsyncs'] >= 1
+
+        with open(log_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        with open(jsonl_path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert len(lines) == len(records) == 301
+        assert lines[0].split(' | ')[1:4] == ['1.3.6.1.4.1.1001.1.7.1', 'Kol 1, Batarya 1', 'BATARYA ALARMI']
+        assert records[0]['message'].endswith("Batkon Alarmı - Status: ACTIVE")
+        assert records[-1]['alarm_type'] == "KOL ÖZETİ" and records[-1]['bitmap'] == 'ff' * 15
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Trap Receiver Testi")
+    print("=" * 50)
+    tests = [
+        test_classify,
+        test_storm_is_logged_in_batches,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Test Script - Trap Fırtınası Bastırma Testi
+Çırpınan alarmların hold-down ile tek trap'e indiğini, kol çapında
+olayın özet trap'ine katlandığını ve hedef hız sınırını kontrol eder
+"""
+
+from snmp_trap_server import TrapEvent, alarm_description
+from trap_suppressor import SummaryEvent, TargetRateLimiter, TrapSuppressor, battery_bitmap
+
+
+def battery_event(arm, battery, status):
+    return TrapEvent('battery_alarm', arm, battery,
+                     alarm_description('battery_alarm', arm, battery), status, 0.0)
+
+
+def summary(events):
+    return [(e.battery_num, e.status) if isinstance(e, TrapEvent) else e for e in events]
+
+
+def test_flapping_hold_down():
+    """İlk geçiş hemen, pencere içindeki çırpınma pencere sonunda son durumla"""
+    suppressor = TrapSuppressor(hold_down=2.0, arm_burst=None)
+    assert summary(suppressor.offer(battery_event(1, 5, 'ACTIVE'), 0.0)) == [(5, 'ACTIVE')]
+    assert suppressor.offer(battery_event(1, 5, 'RESOLVED'), 0.5) == []
+    assert suppressor.offer(battery_event(1, 5, 'ACTIVE'), 1.0) == []
+    assert suppressor.next_deadline() == 2.0
+    assert suppressor.flush(1.9) == []
+    # Son durum gönderilenle aynı: trap yok
+    assert suppressor.flush(2.0) == []
+    assert suppressor.next_deadline() is None
+
+    # Pencere bitti: yeni geçiş hemen, ardından gelen çırpınma bekletilir
+    assert summary(suppressor.offer(battery_event(1, 5, 'RESOLVED'), 2.5)) == [(5, 'RESOLVED')]
+    assert suppressor.offer(battery_event(1, 5, 'ACTIVE'), 3.0) == []
+    assert summary(suppressor.flush(4.5)) == [(5, 'ACTIVE')]
+    assert suppressor.suppressed == 2
+
+
+def test_arm_storm_folds_into_summary():
+    """120 batarya alarmı: arm_burst tekil trap + pencere sonunda tek özet"""
+    suppressor = TrapSuppressor(hold_down=2.0, arm_burst=10, summary_window=5.0)
+    sent = []
+    for battery in range(1, 121):
+        sent.extend(suppressor.offer(battery_event(3, battery, 'ACTIVE'), battery * 0.005))
+    assert summary(sent) == [(battery, 'ACTIVE') for battery in range(1, 11)]
+    assert suppressor.suppressed == 110
+
+    # Başka kol etkilenmez
+    assert len(suppressor.offer(battery_event(1, 1, 'ACTIVE'), 1.0)) == 1
+
+    deadline = suppressor.next_deadline()
+    assert 5.0 < deadline < 5.1
+    flushed = suppressor.flush(deadline)
+    assert flushed == [SummaryEvent(3, 120, battery_bitmap(range(1, 121)))]
+    assert flushed[0].bitmap == b'\xff' * 15
+
+
+def test_bitmap_order():
+    assert battery_bitmap([1, 9, 120]) == b'\x80\x80' + bytes(12) + b'\x01'
+
+
+def test_target_rate_limit():
+    limiter = TargetRateLimiter(rate=10.0, burst=3)
+    target = ('10.0.0.1', 162)
+    assert [limiter.allow(target, 0.0) for _ in range(4)] == [True, True, True, False]
+    assert abs(limiter.wait_time(target, 0.0) - 0.1) < 1e-9
+    assert limiter.allow(('10.0.0.2', 162), 0.0)
+    assert limiter.allow(target, 0.1)
+
+
+def main():
+    """Ana test fonksiyonu"""
+    print("🧪 Trap Fırtınası Bastırma Testi")
+    print("=" * 50)
+    tests = [
+        test_flapping_hold_down,
+        test_arm_storm_folds_into_summary,
+        test_bitmap_order,
+        test_target_rate_limit,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("✅ Tüm testler tamamlandı!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+"""
+Trap Originator - Kalıcı SNMP notification originator
+Tek SnmpEngine ve tek asyncio döngüsü (ayrı thread) tüm trap'ler için
+kullanılır. Hedef adresleri eklenirken bir kez çözülür; her trap tüm
+hedeflere aynı anda gönderilir, yavaş veya erişilemeyen bir hedef
+diğerlerini bekletmez. Hedef başına gecikme ve hata sayaçları tutulur.
+"""
+
+import asyncio
+import threading
+import time
+
+from pysnmp.hlapi.v3arch.asyncio import (
+    CommunityData,
+    ContextData,
+    NotificationType,
+    ObjectIdentity,
+    ObjectType,
+    OctetString,
+    SnmpEngine,
+    UdpTransportTarget,
+    send_notification,
+)
+
+from system_log import get_logger
+
+trap_log = get_logger('trap')
+
+MESSAGE_OID = '1.3.6.1.4.1.1001.999.1.1'  # Trap mesaj varbind'i
+BITMAP_OID = '1.3.6.1.4.1.1001.999.1.2'   # Kol özeti: aktif batarya bitmap'i
+TARGET_TIMEOUT = 1.0  # s, INFORM cevabı ve adres çözümleme için
+TARGET_RETRIES = 0
+
+
+def cancel_pending_tasks(loop):
+    """Döngü kapanmadan önce kalan görevleri (dispatcher zamanlayıcısı) iptal et"""
+    tasks = asyncio.all_tasks(loop)
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+class TargetStats:
+    """Bir hedefin gönderim sayaçları (gecikmeler ms)"""
+
+    __slots__ = ('sent', 'failed', 'last_latency', 'max_latency', 'total_latency', 'last_error')
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self.last_error = None
+
+    def record(self, latency, error=None):
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+            self.last_error = str(error)
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+    def as_dict(self):
+        count = self.sent + self.failed
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'last_latency_ms': round(self.last_latency, 3),
+            'avg_latency_ms': round(self.total_latency / count, 3) if count else 0.0,
+            'max_latency_ms': round(self.max_latency, 3),
+            'last_error': self.last_error,
+        }
+
+
+class TrapOriginator:
+    """Kalıcı engine ve hedef tablosu ile trap gönderici
+
+    start() döngü thread'ini başlatır. send() ve hedef metodları her
+    thread'den çağrılabilir; iş döngüye run_coroutine_threadsafe ile
+    aktarılır ve concurrent.futures.Future döner.
+    """
+
+    def __init__(self, community='public', targets=(), timeout=TARGET_TIMEOUT, retries=TARGET_RETRIES):
+        self.community = community
+        self.timeout = timeout
+        self.retries = retries
+        self.loop = None
+        self.engine = None
+        self.targets = {}  # {(ip, port): UdpTransportTarget}, sadece döngüde değişir
+        self.stats = {}    # {(ip, port): TargetStats}
+        self._initial_targets = list(targets)
+        self._thread = None
+        self._ready = threading.Event()
+
+    # Yaşam döngüsü
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='trap-originator', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.engine = SnmpEngine()
+        self._auth = CommunityData(self.community)
+        self._context = ContextData()
+        for target in self._initial_targets:
+            self.loop.run_until_complete(self._add_target(*target))
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.engine.close_dispatcher()
+            cancel_pending_tasks(self.loop)
+            self.loop.close()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._ready.clear()
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    # Hedef tablosu
+
+    async def _add_target(self, ip, port):
+        try:
+            transport = await UdpTransportTarget.create((ip, port), timeout=self.timeout, retries=self.retries)
+        except Exception as e:
+            trap_log.warning("Trap hedefi çözülemedi %s:%s: %s", ip, port, e)
+            return False
+        self.targets[(ip, port)] = transport
+        self.stats.setdefault((ip, port), TargetStats())
+        return True
+
+    async def _remove_target(self, ip, port):
+        return self.targets.pop((ip, port), None) is not None
+
+    def add_target(self, ip, port=162):
+        """Hedefi bir kez çöz ve tabloya ekle (Future[bool])"""
+        return self._submit(self._add_target(ip, port))
+
+    def remove_target(self, ip, port=162):
+        return self._submit(self._remove_target(ip, port))
+
+    # Gönderim
+
+    def notification(self, trap_oid, message, bitmap=None):
+        var_binds = [ObjectType(ObjectIdentity(MESSAGE_OID), OctetString(message.encode('utf-8')))]
+        if bitmap is not None:
+            var_binds.append(ObjectType(ObjectIdentity(BITMAP_OID), OctetString(bytes(bitmap))))
+        return NotificationType(ObjectIdentity(trap_oid)).add_varbinds(*var_binds)
+
+    async def _send_one(self, key, transport, notification, kind):
+        started = time.perf_counter()
+        try:
+            error_indication, error_status, _error_index, _var_binds = await send_notification(
+                self.engine, self._auth, transport, self._context, kind, notification)
+            error = error_indication or (error_status.prettyPrint() if error_status else None)
+        except Exception as e:
+            error = e
+        latency = (time.perf_counter() - started) * 1000
+        self.stats[key].record(latency, error)
+        if error is not None:
+            trap_log.warning("Trap gönderme hatası %s:%s: %s", key[0], key[1], error)
+        else:
+            trap_log.debug("Trap gönderildi %s:%s (%.1f ms)", key[0], key[1], latency)
+        return key, error
+
+    async def _unknown_target(self, key):
+        return key, 'bilinmeyen hedef'
+
+    async def _fan_out(self, trap_oid, message, kind, keys, bitmap):
+        notification = self.notification(trap_oid, message, bitmap)
+        if keys is None:
+            keys = list(self.targets)
+        return await asyncio.gather(*(
+            self._send_one(key, self.targets[key], notification, kind) if key in self.targets
+            else self._unknown_target(key)
+            for key in keys
+        ))
+
+    def send(self, trap_oid, message, kind='trap', targets=None, bitmap=None):
+        """Hedeflere (varsayılan: tümü) eşzamanlı gönder
+
+        kind 'trap' veya 'inform' (alıcı onayı beklenir); bitmap verilirse
+        BITMAP_OID varbind'i eklenir.
+        Future[[((ip, port), hata veya None)]] döner.
+        """
+        return self._submit(self._fan_out(trap_oid, message, kind, targets, bitmap))
+
+    def target_stats(self):
+        """{'ip:port': sayaçlar}"""
+        return {f"{ip}:{port}": stats.as_dict() for (ip, port), stats in self.stats.items()}
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+Trap Outbox - Diskte kalıcı bekleyen bildirim kuyruğu (SQLite)
+Her (bildirim, hedef) çifti bir satırdır: gönderilene (TRAP) veya alıcı
+onaylayana (INFORM) kadar silinmez. Başarısız gönderim üstel geri
+çekilme ile yeniden denenir; MAX_ATTEMPTS denemeden sonra bırakılır.
+Program yeniden başladığında bekleyen satırlar kaldığı yerden gönderilir.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from system_log import get_logger
+
+trap_log = get_logger('trap')
+
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 2.0   # s, ilk yeniden deneme
+BACKOFF_MAX = 300.0  # s
+
+OutboxEntry = namedtuple('OutboxEntry', 'id trap_oid message kind target attempts bitmap')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trap_oid TEXT NOT NULL,
+    message TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target_ip TEXT NOT NULL,
+    target_port INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    created REAL NOT NULL,
+    last_error TEXT,
+    bitmap BLOB
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt, id);
+"""
+
+
+def backoff_delay(attempts):
+    """attempts başarısız denemeden sonra bekleme süresi (s)"""
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+class TrapOutbox:
+    """SQLite tabanlı bildirim kuyruğu
+
+    Yazıcı trap thread'idir; bağlantı kilit ile korunur, sayaç okumaları
+    başka thread'lerden de yapılabilir. Zamanlar time.time() saniyesidir.
+    """
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.dropped = 0  # Deneme hakkı biten bildirimler
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(outbox)")]
+        if 'bitmap' not in columns:  # Özet trap'inden önceki outbox dosyası
+            self.db.execute("ALTER TABLE outbox ADD COLUMN bitmap BLOB")
+        self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def enqueue(self, trap_oid, message, kind, targets, now=None, bitmap=None):
+        """Bildirimi her hedef için kalıcı olarak kuyruğa yaz (tek transaction)"""
+        now = time.time() if now is None else now
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT INTO outbox (trap_oid, message, kind, target_ip, target_port, next_attempt, created, bitmap) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(trap_oid, message, kind, ip, port, now, now, bitmap) for ip, port in targets])
+
+    def due(self, now=None, limit=256):
+        """Zamanı gelmiş satırlar, kuyruğa giriş sırasıyla"""
+        now = time.time() if now is None else now
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, trap_oid, message, kind, target_ip, target_port, attempts, bitmap FROM outbox "
+                "WHERE next_attempt <= ? ORDER BY id LIMIT ?", (now, limit)).fetchall()
+        return [OutboxEntry(row[0], row[1], row[2], row[3], (row[4], row[5]), row[6], row[7]) for row in rows]
+
+    def next_due_in(self, now=None):
+        """Bir sonraki denemeye kalan süre (s); bekleyen yoksa None"""
+        now = time.time() if now is None else now
+        with self.lock:
+            row = self.db.execute("SELECT MIN(next_attempt) FROM outbox").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - now)
+
+    def complete(self, delivered, failed, now=None):
+        """Sonuçları tek transaction'da işle
+
+        delivered: gönderilen satır id'leri; failed: [(OutboxEntry, hata)]
+        """
+        now = time.time() if now is None else now
+        retry, drop = [], []
+        for entry, error in failed:
+            attempts = entry.attempts + 1
+            if attempts >= self.max_attempts:
+                drop.append((entry.id,))
+                trap_log.error("Trap bırakıldı (%d deneme) %s:%s: %s", attempts,
+                               entry.target[0], entry.target[1], entry.message)
+            else:
+                retry.append((attempts, now + backoff_delay(attempts), str(error), entry.id))
+        with self.lock, self.db:
+            self.db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in delivered] + drop)
+            self.db.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?", retry)
+        self.dropped += len(drop)
+
+    def defer(self, ids, until):
+        """Deneme sayılmadan ertele (hız sınırı)"""
+        with self.lock, self.db:
+            self.db.executemany("UPDATE outbox SET next_attempt = ? WHERE id = ?", [(until, i) for i in ids])
+
+    def pending(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+Trap Suppressor - Trap fırtınası bastırma
+Alarm olayları outbox'a yazılmadan önce bu aşamadan geçer:
+
+* Hold-down: bir alarmın ilk geçişi hemen gönderilir, aynı alarmın
+  hold_down süresi içindeki sonraki geçişleri bekletilir; süre sonunda
+  son durum gönderilen durumdan farklıysa tek trap gönderilir
+  (ACTIVE -> RESOLVED -> ACTIVE çırpınması tek trap'e iner).
+* Kol özeti: bir kolda summary_window içinde arm_burst'ten fazla batarya
+  trap'i çıkarsa fazlası tek tek gönderilmez; pencere sonunda kol başına
+  aktif batarya bitmap'i taşıyan tek özet trap'i gönderilir.
+* TokenBucket: outbox gönderiminde hedef başına hız sınırı.
+
+Zamanlar time.monotonic() saniyesidir; sınıflar tek thread'den
+(trap thread'i) kullanılır.
+"""
+
+from collections import namedtuple
+
+from alarm_state import MAX_BATTERIES
+
+HOLD_DOWN = 2.0        # s
+ARM_BURST = 10         # summary_window başına kol başına tekil batarya trap'i
+SUMMARY_WINDOW = 5.0   # s
+TARGET_RATE = 20.0     # trap/s, hedef başına
+TARGET_BURST = 40
+
+BITMAP_BYTES = (MAX_BATTERIES + 7) // 8
+
+# Kol özeti: bitmap'te batarya n, (n-1). bit (SNMP BITS sırası, MSB önce)
+SummaryEvent = namedtuple('SummaryEvent', 'arm_num active_count bitmap')
+
+
+def battery_bitmap(batteries):
+    bitmap = bytearray(BITMAP_BYTES)
+    for battery in batteries:
+        index = battery - 1
+        bitmap[index >> 3] |= 0x80 >> (index & 7)
+    return bytes(bitmap)
+
+
+class TokenBucket:
+    """rate/s dolan, en fazla burst jetonluk kova"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now):
+        """Jeton varsa harca ve True döndür"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now):
+        """Bir sonraki jetona kalan süre (s)"""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class TargetRateLimiter:
+    """Hedef başına TokenBucket"""
+
+    def __init__(self, rate=TARGET_RATE, burst=TARGET_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def allow(self, target, now):
+        bucket = self.buckets.get(target)
+        if bucket is None:
+            bucket = self.buckets[target] = TokenBucket(self.rate, self.burst, now)
+        return bucket.take(now)
+
+    def wait_time(self, target, now):
+        return self.buckets[target].wait_time(now)
+
+
+class TrapSuppressor:
+    """Hold-down ve kol özeti aşaması
+
+    offer(event, now) ve flush(now) hemen gönderilecek TrapEvent /
+    SummaryEvent listesini döndürür; next_deadline() bir sonraki flush
+    zamanıdır (yoksa None). arm_burst=None kol özetini kapatır.
+    """
+
+    def __init__(self, hold_down=HOLD_DOWN, arm_burst=ARM_BURST, summary_window=SUMMARY_WINDOW):
+        self.hold_down = hold_down
+        self.arm_burst = arm_burst
+        self.summary_window = summary_window
+        self.sent_status = {}   # {(tür, kol, batarya): son gönderilen durum}
+        self.hold_until = {}    # {anahtar: hold-down bitişi}
+        self.held = {}          # {anahtar: hold-down içinde gelen son olay}
+        self.active = {}        # {kol: aktif batarya kümesi}
+        self.arm_buckets = {}   # {kol: TokenBucket}
+        self.summary_due = {}   # {kol: özet zamanı}
+        self.suppressed = 0     # Gönderilmeyen (çırpınma/özete katılan) geçişler
+        self.summaries = 0
+
+    @staticmethod
+    def _key(event):
+        return event.alarm_type, event.arm_num, event.battery_num
+
+    def offer(self, event, now):
+        if event.alarm_type == 'battery_alarm':
+            active = self.active.setdefault(event.arm_num, set())
+            if event.status == 'ACTIVE':
+                active.add(event.battery_num)
+            else:
+                active.discard(event.battery_num)
+        key = self._key(event)
+        if now < self.hold_until.get(key, 0.0):
+            if key in self.held:
+                self.suppressed += 1
+            self.held[key] = event
+            return []
+        return self._emit(key, event, now)
+
+    def _emit(self, key, event, now):
+        if self.sent_status.get(key, 'RESOLVED') == event.status:
+            self.suppressed += 1  # Hold-down içinde eski duruma döndü
+            return []
+        self.sent_status[key] = event.status
+        self.hold_until[key] = now + self.hold_down
+        if event.alarm_type == 'battery_alarm' and self.arm_burst is not None:
+            arm = event.arm_num
+            bucket = self.arm_buckets.get(arm)
+            if bucket is None:
+                bucket = self.arm_buckets[arm] = TokenBucket(
+                    self.arm_burst / self.summary_window, self.arm_burst, now)
+            if arm in self.summary_due or not bucket.take(now):
+                self.suppressed += 1
+                self.summary_due.setdefault(arm, now + self.summary_window)
+                return []
+        return [event]
+
+    def flush(self, now):
+        output = []
+        for key in [key for key in self.held if self.hold_until[key] <= now]:
+            output.extend(self._emit(key, self.held.pop(key), now))
+        for arm in [arm for arm, due in self.summary_due.items() if due <= now]:
+            del self.summary_due[arm]
+            active = self.active.get(arm, ())
+            self.summaries += 1
+            output.append(SummaryEvent(arm, len(active), battery_bitmap(active)))
+        return output
+
+    def next_deadline(self):
+        deadlines = [self.hold_until[key] for key in self.held]
+        deadlines.extend(self.summary_due.values())
+        return min(deadlines) if deadlines else None
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+UART Frame Decoder - Bit-banging UART akışından paket ayıklama
+0x80/0x81 başlıklı paketleri okuma imleci ile kopyalamadan bulur
+"""
+
+HEADER_BYTES = (0x80, 0x81)
+
+
+class UARTFrameDecoder:
+    """Artımlı UART paket çözücü
+
+    Gelen byte'lar sabit bir bytearray'e yazılır, okuma imleci (start) ve
+    yazma imleci (end) ile takip edilir. Paket başlığı bytearray.find ile
+    aranır; işlenmiş byte'lar silinmez, sadece imleç ilerletilir. Tampon
+    sonuna gelindiğinde kalan (az sayıdaki) byte başa taşınır.
+    """
+
+    def __init__(self, capacity=4096):
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0  # Okuma imleci
+        self._end = 0    # Yazma imleci
+        self.discarded_bytes = 0  # Başlık bulunamadığı için atılan byte sayısı
+
+    def __len__(self):
+        return self._end - self._start
+
+    def clear(self):
+        """Tamponu boşalt"""
+        self._start = 0
+        self._end = 0
+
+    def _append(self, data):
+        """Veriyi tampon sonuna yaz, gerekirse sıkıştır veya büyüt"""
+        size = len(data)
+        if self._end + size > len(self._buf):
+            pending = self._end - self._start
+            if pending + size > len(self._buf):
+                # Kapasite yetmiyor, tamponu büyüt
+                new_buf = bytearray(max(len(self._buf) * 2, pending + size))
+                new_buf[:pending] = self._view[self._start:self._end]
+                self._view.release()
+                self._buf = new_buf
+                self._view = memoryview(self._buf)
+            elif pending:
+                # Kalan byte'ları başa taşı
+                self._view[:pending] = self._view[self._start:self._end]
+            self._start = 0
+            self._end = pending
+        self._view[self._end:self._end + size] = data
+        self._end += size
+
+    def _find_header(self):
+        """Okuma imlecinden itibaren ilk 0x80/0x81 başlığını bul"""
+        buf = self._buf
+        index = buf.find(0x80, self._start, self._end)
+        stop = index if index != -1 else self._end
+        index_81 = buf.find(0x81, self._start, stop)
+        if index_81 != -1:
+            return index_81
+        return index
+
+    def _packet_length(self, start, available):
+        """Başlık konumundaki paket uzunluğunu belirle"""
+        buf = self._buf
+        dtype = buf[start + 2]
+        # 5 byte'lık missing data paketi kontrolü
+        if dtype == 0x7F and available >= 5:
+            return 5
+        # 6 byte'lık paket kontrolü
+        if available >= 6 and (dtype == 0x0F or buf[start + 1] == 0x7E or (dtype == 0x7D and buf[start + 1] == 2)):
+            return 6
+        if dtype == 0x7D and available >= 7 and buf[start + 1] > 2:
+            return 7
+        return 11
+
+    def feed(self, data):
+        """Yeni byte'ları ekle ve tamamlanan paketleri bytes listesi olarak döndür"""
+        if data:
+            self._append(data)
+
+        frames = []
+        while self._end - self._start >= 3:
+            header_index = self._find_header()
+            if header_index == -1:
+                self.discarded_bytes += self._end - self._start
+                self.clear()
+                break
+
+            self.discarded_bytes += header_index - self._start
+            self._start = header_index
+
+            available = self._end - self._start
+            if available < 3:
+                break
+
+            packet_length = self._packet_length(self._start, available)
+            if available < packet_length:
+                # Paket tamamlanmamış, daha fazla veri bekle
+                break
+
+            frames.append(bytes(self._view[self._start:self._start + packet_length]))
+            self._start += packet_length
+
+        if self._start == self._end:
+            self._start = 0
+            self._end = 0
+        return frames